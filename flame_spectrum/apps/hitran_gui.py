@@ -41,6 +41,7 @@ class HitranGUI(QMainWindow):
         self.global_min_wn = float('inf')
         self.global_max_wn = 0.0
         self.calc_thread = None
+        self.stale_threads = []     # 已取消但尚未退出的计算线程
 
         # 1. 先确定 Q 文件夹路径，但不设置控件
         if q_folder:
@@ -158,7 +159,7 @@ class HitranGUI(QMainWindow):
         layout.addWidget(wn_group)
 
         self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
 
@@ -167,6 +168,10 @@ class HitranGUI(QMainWindow):
         self.calc_btn.setStyleSheet("background-color: #2196F3; color: white; font-weight: bold; padding: 8px;")
         self.calc_btn.clicked.connect(self.start_calculation)
         btn_calc_layout.addWidget(self.calc_btn)
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_calculation)
+        btn_calc_layout.addWidget(self.cancel_btn)
         self.clear_btn = QPushButton("清除图形")
         self.clear_btn.clicked.connect(self.clear_plot)
         btn_calc_layout.addWidget(self.clear_btn)
@@ -331,8 +336,12 @@ class HitranGUI(QMainWindow):
         resolution = self.resolution_spin.value()
         omega_wing = self.omega_wing_spin.value()
 
-        self.calc_btn.setEnabled(False)
+        # 仍在运行的旧计算直接取消，不在其后排队
+        self.abort_stale_calculation()
+
+        self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
+        self.cancel_btn.setEnabled(True)
         self.log("开始计算...")
 
         # 使用分离出的 CalculationThread
@@ -341,11 +350,36 @@ class HitranGUI(QMainWindow):
         )
         self.calc_thread.finished.connect(self.on_calculation_finished)
         self.calc_thread.error.connect(self.on_calculation_error)
+        self.calc_thread.cancelled.connect(self.on_calculation_cancelled)
+        self.calc_thread.progress.connect(self.progress_bar.setValue)
         self.calc_thread.start()
 
+    def abort_stale_calculation(self):
+        """取消正在运行的计算并断开其信号，旧结果不再更新界面"""
+        self.stale_threads = [t for t in self.stale_threads if t.isRunning()]
+        thread = self.calc_thread
+        self.calc_thread = None
+        if thread is None or not thread.isRunning():
+            return
+        for signal in (thread.finished, thread.error, thread.cancelled, thread.progress):
+            signal.disconnect()
+        thread.cancel()
+        self.stale_threads.append(thread)
+        self.log("已取消上一次计算")
+
+    def cancel_calculation(self):
+        if self.calc_thread is not None and self.calc_thread.isRunning():
+            self.cancel_btn.setEnabled(False)
+            self.calc_thread.cancel()
+
+    def on_calculation_cancelled(self):
+        self.progress_bar.setVisible(False)
+        self.cancel_btn.setEnabled(False)
+        self.log("计算已取消")
+
     def on_calculation_finished(self, results):
         self.progress_bar.setVisible(False)
-        self.calc_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         self.log("计算完成，绘图...")
 
         # 直接调用画布的绘图方法
@@ -372,7 +406,7 @@ class HitranGUI(QMainWindow):
 
     def on_calculation_error(self, error_msg):
         self.progress_bar.setVisible(False)
-        self.calc_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         QMessageBox.critical(self, "计算错误", error_msg)
         self.log(f"错误: {error_msg}")
 
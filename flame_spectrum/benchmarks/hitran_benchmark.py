@@ -0,0 +1,244 @@
+# benchmarks/hitran_benchmark.py
+"""
+HITRAN 光谱引擎 (core.hitran_spectrum) 基准测试
+计时: .par 解析、配分函数表读取、单分子吸收截面、混合气体 OD_mixture
+吞吐量: 谱线/秒、网格点/秒
+精度: 与 reference_spectra.npz 中存储的参考光谱比较（相对最大误差）
+
+用法 (在 flame_spectrum/ 下运行):
+    python benchmarks/hitran_benchmark.py                     # 默认矩阵
+    python benchmarks/hitran_benchmark.py --full              # 完整矩阵（较慢）
+    python benchmarks/hitran_benchmark.py --update-reference  # 确认结果正确后重新生成参考光谱
+    python -m pytest benchmarks/test_hitran_benchmark.py      # pytest-benchmark
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.hitran_spectrum import HitranSpectrum
+
+DB_DIR = os.path.join(PROJECT_ROOT, 'hitran_database')
+Q_FOLDER = os.path.join(DB_DIR, 'Q')
+REFERENCE_FILE = os.path.join(BENCH_DIR, 'reference_spectra.npz')
+
+# 分子 -> (par 文件, 吸收截面波数窗口 [cm⁻¹], 混合计算中的摩尔分数)
+DATASETS = {
+    'CO':  ('05_CO/CO_1416.par',            (2140.0, 2150.0), 0.01),
+    'N2O': ('04_N2O/2000-3000.par',         (2210.0, 2220.0), 1e-4),
+    'H2O': ('01_H2O/H2O-1900-3000.par',     (2100.0, 2110.0), 0.1),
+    'NO':  ('08_NO/NO_fundamental_1416.par', (1870.0, 1880.0), 1e-3),
+}
+
+# 参数矩阵
+MATRIX = {
+    'resolution': (0.01, 0.002),
+    'wing': (5.0, 25.0),
+    'T': (296.0, 1500.0),
+    'p': (0.1, 1.0),
+}
+FULL_MATRIX = {
+    'resolution': (0.01, 0.005, 0.002, 0.001),
+    'wing': (5.0, 10.0, 25.0, 50.0),
+    'T': (296.0, 800.0, 1500.0, 2500.0),
+    'p': (0.1, 1.0, 10.0),
+}
+
+# 混合气体 OD_mixture 工况（各分子同时计算）
+MIXTURE_WINDOW = (2100.0, 2250.0)
+MIXTURE_CASES = [
+    {'T': 296.0, 'p': 1.0, 'L': 10.0, 'resolution': 0.01, 'wing': 10.0},
+    {'T': 1500.0, 'p': 1.0, 'L': 10.0, 'resolution': 0.01, 'wing': 10.0},
+]
+
+RTOL = 1e-5     # 相对最大误差阈值（参考光谱以 float32 存储）
+
+
+# ---------- 工况 ----------
+def par_path(molecule):
+    return os.path.join(DB_DIR, DATASETS[molecule][0])
+
+
+def q_path(engine, molecule):
+    """与 HitranSpectrum.add_molecule 相同的 Q 文件查找规则"""
+    mol_id = engine.molecules[molecule]['mol_id']
+    for name in (f'q{mol_id}.txt', f'Q{mol_id}.txt'):
+        path = os.path.join(Q_FOLDER, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"配分函数文件 q{mol_id}.txt 不存在")
+
+
+def cross_section_cases(matrix=None, molecules=None):
+    """矩阵展开为工况字典列表"""
+    matrix = matrix or MATRIX
+    molecules = molecules or list(DATASETS)
+    cases = []
+    for molecule in molecules:
+        for res, wing, T, p in itertools.product(matrix['resolution'], matrix['wing'],
+                                                 matrix['T'], matrix['p']):
+            cases.append({'molecule': molecule, 'resolution': res, 'wing': wing,
+                          'T': T, 'p': p})
+    return cases
+
+
+def case_id(case):
+    if 'molecule' in case:
+        return (f"{case['molecule']}_res{case['resolution']:g}_wing{case['wing']:g}"
+                f"_T{case['T']:g}_p{case['p']:g}")
+    return (f"mixture_res{case['resolution']:g}_wing{case['wing']:g}"
+            f"_T{case['T']:g}_p{case['p']:g}_L{case['L']:g}")
+
+
+def case_grid(case):
+    start, end = DATASETS[case['molecule']][1] if 'molecule' in case else MIXTURE_WINDOW
+    return np.arange(start, end, case['resolution'])
+
+
+def build_engine(molecules=None):
+    """加载分子（浓度取 DATASETS 中的混合摩尔分数）"""
+    engine = HitranSpectrum(q_folder=Q_FOLDER)
+    for molecule in molecules or DATASETS:
+        engine.add_molecule(par_path(molecule), DATASETS[molecule][2], name=molecule)
+    return engine
+
+
+# ---------- 单项计算（计时对象） ----------
+def run_parse(engine, molecule):
+    return engine._read_par(par_path(molecule))
+
+
+def run_q_load(engine, molecule):
+    return engine._read_q(q_path(engine, molecule))
+
+
+def run_cross_section(engine, case):
+    return engine.cross_section(case['molecule'], case['T'], case['p'],
+                                case_grid(case), case['wing'])
+
+
+def run_mixture(engine, case):
+    OD, Ab, Tr, wn, total_k, ind_k = engine.OD_mixture(
+        case['T'], case['p'], case['L'], wavenumber=case_grid(case), wing=case['wing'])
+    return Tr
+
+
+# ---------- 参考光谱 ----------
+def load_reference(path=REFERENCE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def save_reference(spectra, path=REFERENCE_FILE):
+    np.savez_compressed(path, **{key: np.asarray(val, dtype=np.float32)
+                                 for key, val in spectra.items()})
+
+
+def relative_error(result, reference):
+    """max|Δ| / max|参考|；网格长度不一致时返回 inf"""
+    if reference is None:
+        return None
+    if len(result) != len(reference):
+        return float('inf')
+    scale = np.max(np.abs(reference))
+    if scale == 0:
+        return float(np.max(np.abs(result)))
+    return float(np.max(np.abs(result - reference)) / scale)
+
+
+# ---------- 独立脚本 ----------
+def _time(func, *args, repeat=1):
+    """返回 (最短耗时 s, 结果)"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_benchmarks(matrix=None, update_reference=False, repeat=1):
+    """运行全部基准，打印结果表；返回 (记录列表, 是否全部在误差阈值内)"""
+    engine = build_engine()
+    reference = {} if update_reference else load_reference()
+    new_reference = {}
+    records = []
+    ok = True
+
+    print(f"\n{'项目':<50}{'耗时 (s)':>10}{'谱线/s':>12}{'网格点/s':>12}{'相对误差':>12}")
+    print('-' * 96)
+
+    def report(name, seconds, n_lines=None, n_points=None, error=None):
+        nonlocal ok
+        lines_rate = f"{n_lines / seconds:12.3g}" if n_lines else f"{'':>12}"
+        points_rate = f"{n_points / seconds:12.3g}" if n_points else f"{'':>12}"
+        if error is None:
+            err = f"{'-':>12}"
+        else:
+            err = f"{error:12.2e}"
+            if error > RTOL:
+                err += '  !'
+                ok = False
+        print(f"{name:<50}{seconds:10.4f}{lines_rate}{points_rate}{err}")
+        records.append({'name': name, 'seconds': seconds, 'lines': n_lines,
+                        'points': n_points, 'error': error})
+
+    for molecule in DATASETS:
+        seconds, (db, _) = _time(run_parse, engine, molecule, repeat=max(repeat, 3))
+        report(f"parse {molecule}", seconds, n_lines=len(db))
+    for molecule in DATASETS:
+        seconds, _ = _time(run_q_load, engine, molecule, repeat=max(repeat, 3))
+        report(f"Q table {molecule}", seconds)
+
+    for case in cross_section_cases(matrix):
+        key = case_id(case)
+        seconds, sigma = _time(run_cross_section, engine, case, repeat=repeat)
+        new_reference[key] = sigma
+        n_lines = len(engine.molecules[case['molecule']]['db'])
+        report(f"sigma {key}", seconds, n_lines, len(sigma),
+               relative_error(sigma, reference.get(key)))
+
+    for case in MIXTURE_CASES:
+        key = case_id(case)
+        seconds, Tr = _time(run_mixture, engine, case, repeat=repeat)
+        new_reference[key] = Tr
+        n_lines = sum(len(engine.molecules[m]['db']) for m in engine.molecule_order)
+        report(f"OD_mixture {key}", seconds, n_lines, len(Tr),
+               relative_error(Tr, reference.get(key)))
+
+    if update_reference:
+        # 合并已有参考，--full 生成的工况不会覆盖掉默认矩阵
+        merged = load_reference()
+        merged.update(new_reference)
+        save_reference(merged)
+        print(f"\n参考光谱已写入 {REFERENCE_FILE} ({len(merged)} 条)")
+    return records, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HITRAN 光谱引擎基准测试")
+    parser.add_argument('--full', action='store_true', help="使用完整参数矩阵")
+    parser.add_argument('--repeat', type=int, default=1, help="每项重复次数（取最短）")
+    parser.add_argument('--update-reference', action='store_true',
+                        help="用本次结果重新生成参考光谱")
+    args = parser.parse_args()
+
+    _, ok = run_benchmarks(FULL_MATRIX if args.full else MATRIX,
+                           update_reference=args.update_reference, repeat=args.repeat)
+    if not ok:
+        print(f"\n警告: 存在超过相对误差阈值 {RTOL:g} 的结果")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/test_hitran_benchmark.py
+"""
+pytest-benchmark 版本的 HITRAN 引擎基准（工况与参考光谱见 hitran_benchmark.py）
+
+在 flame_spectrum/ 下运行:
+    python -m pytest benchmarks/test_hitran_benchmark.py
+    python -m pytest benchmarks/test_hitran_benchmark.py --benchmark-save=baseline
+    python -m pytest benchmarks/test_hitran_benchmark.py --benchmark-compare
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("pytest_benchmark")
+
+import hitran_benchmark as hb
+
+CROSS_SECTION_CASES = hb.cross_section_cases()
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return hb.build_engine()
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return hb.load_reference()
+
+
+def _record_rates(benchmark, n_lines=None, n_points=None):
+    seconds = benchmark.stats.stats.min
+    if n_lines:
+        benchmark.extra_info['lines_per_s'] = n_lines / seconds
+    if n_points:
+        benchmark.extra_info['points_per_s'] = n_points / seconds
+
+
+def _check_reference(result, reference, key, benchmark):
+    error = hb.relative_error(result, reference.get(key))
+    if error is None:
+        pytest.skip(f"缺少参考光谱 {key}（运行 hitran_benchmark.py --update-reference 生成）")
+    benchmark.extra_info['relative_error'] = error
+    assert error <= hb.RTOL, f"{key}: 相对误差 {error:.2e} > {hb.RTOL:g}"
+
+
+@pytest.mark.parametrize("molecule", list(hb.DATASETS))
+def test_parse(benchmark, engine, molecule):
+    db, info = benchmark.pedantic(hb.run_parse, args=(engine, molecule), rounds=3)
+    assert info['molecule_id'] == engine.molecules[molecule]['mol_id']
+    _record_rates(benchmark, n_lines=len(db))
+
+
+@pytest.mark.parametrize("molecule", list(hb.DATASETS))
+def test_q_load(benchmark, engine, molecule):
+    q_data = benchmark.pedantic(hb.run_q_load, args=(engine, molecule), rounds=5)
+    assert len(q_data['T']) == len(q_data['Q']) > 0
+
+
+@pytest.mark.parametrize("case", CROSS_SECTION_CASES, ids=hb.case_id)
+def test_cross_section(benchmark, engine, reference, case):
+    sigma = benchmark.pedantic(hb.run_cross_section, args=(engine, case), rounds=1)
+    _record_rates(benchmark, len(engine.molecules[case['molecule']]['db']), len(sigma))
+    _check_reference(sigma, reference, hb.case_id(case), benchmark)
+
+
+@pytest.mark.parametrize("case", hb.MIXTURE_CASES, ids=hb.case_id)
+def test_od_mixture(benchmark, engine, reference, case):
+    Tr = benchmark.pedantic(hb.run_mixture, args=(engine, case), rounds=1)
+    n_lines = sum(len(engine.molecules[m]['db']) for m in engine.molecule_order)
+    _record_rates(benchmark, n_lines, len(Tr))
+    _check_reference(Tr, reference, hb.case_id(case), benchmark)
@@ -0,0 +1,171 @@
+# core/flame_pipeline.py
+"""
+化学平衡 -> HITRAN 光谱 无界面流水线
+Cantera 平衡结果（T, p, 摩尔分数）直接写入 HitranSpectrum，浓度为 0 的分子不计算。
+吸收截面与浓度、光程无关，按 (T, p, 波数网格, 线翼) 缓存，同一状态下改变光程或组分时复用；
+温度同时进入线强与 Voigt 线型，φ 扫描中平衡温度每次都变，截面总要重新计算。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import cantera as ct
+
+from core.flame_simulator import GasCompositionSimulator
+from core.hitran_spectrum import HitranSpectrum
+
+
+def find_par_file(db_dir, species):
+    """按 HITRAN 数据库目录约定 (如 01_H2O/) 查找分子的第一个 .par 文件，找不到返回 None"""
+    mol_id = None
+    for (mid, _), vals in HitranSpectrum.ISO.items():
+        if vals[4] == species:
+            mol_id = mid
+            break
+    if mol_id is None:
+        return None
+    folder = os.path.join(db_dir, f"{mol_id:02d}_{species}")
+    if not os.path.isdir(folder):
+        return None
+    par_files = sorted(f for f in os.listdir(folder) if f.endswith('.par'))
+    return os.path.join(folder, par_files[0]) if par_files else None
+
+
+class FlameSpectrumPipeline:
+    """
+    (燃料, 氧化剂, φ) -> 平衡组分 -> 透射率
+
+    参数:
+        q_folder: 配分函数文件夹
+        molecule_files: {分子名: par 文件路径}，分子名需与 Cantera 组分名一致
+        mechanism_file: 反应机理
+        species: 可选组分子集（仅做平衡时减小机理规模）
+    """
+
+    def __init__(self, q_folder, molecule_files, mechanism_file='gri30.yaml', species=None):
+        self.simulator = GasCompositionSimulator()
+        success, msg = self.simulator.initialize_gas(mechanism_file, species)
+        if not success:
+            raise RuntimeError(msg)
+
+        self.hitran = HitranSpectrum(q_folder=q_folder)
+        for name, par_file in molecule_files.items():
+            self.hitran.add_molecule(par_file, concentration=0.0, name=name)
+
+        self._sigma_cache = {}      # 分子名 -> (状态键, σ(ν))
+
+    # ---------- 平衡 ----------
+    def equilibrate(self, fuel, oxidizer, phi, T_initial=300.0, P_initial=ct.one_atm,
+                    equilibrate_method='HP'):
+        """计算化学平衡，返回 GasCompositionSimulator.results"""
+        success, msg = self.simulator.calculate_equilibrium(
+            T_initial, P_initial, {}, use_equivalence_ratio=True,
+            fuel=fuel, oxidizer=oxidizer, phi=phi,
+            equilibrate_method=equilibrate_method)
+        if not success:
+            raise RuntimeError(msg)
+        return self.simulator.results
+
+    def apply_state(self, results):
+        """将平衡结果的摩尔分数写入光谱引擎，返回 (T [K], p [atm])"""
+        mole_fractions = results['mole_fractions']
+        for name in self.hitran.molecule_order:
+            self.hitran.molecules[name]['conc'] = float(mole_fractions.get(name, 0.0))
+        return float(results['temperature']), float(results['pressure'] / ct.one_atm)
+
+    # ---------- 光谱 ----------
+    def cross_section(self, name, T, p, wavenumber, wing=10.0):
+        """带缓存的吸收截面：(T, p, 网格, 线翼) 与上次相同时直接复用（浓度、光程不影响截面）"""
+        key = (T, p, wavenumber[0], wavenumber[-1], len(wavenumber), wing)
+        cached = self._sigma_cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        sigma = self.hitran.cross_section(name, T, p, wavenumber, wing)
+        self._sigma_cache[name] = (key, sigma)
+        return sigma
+
+    def spectrum(self, T, p, L, wavenumber=None, start=None, end=None,
+                 resolution=0.01, wing=10.0):
+        """
+        用当前浓度计算光谱（浓度为 0 的分子不计算吸收截面）
+        返回 dict: wavenumber, total_coef, individual_coefs, OD, Ab, Tr
+        """
+        if wavenumber is None:
+            wavenumber = np.arange(start, end, resolution)
+
+        total_k = np.zeros_like(wavenumber)
+        individual_k = {}
+        for name in self.hitran.molecule_order:
+            if self.hitran.molecules[name]['conc'] <= 0:
+                individual_k[name] = np.zeros_like(wavenumber)
+                continue
+            sigma = self.cross_section(name, T, p, wavenumber, wing)
+            k_i = sigma * self.hitran.number_density(name, T, p)
+            individual_k[name] = k_i
+            total_k += k_i
+
+        OD = total_k * L
+        Tr = np.exp(-OD)
+        return {
+            'wavenumber': wavenumber,
+            'total_coef': total_k,
+            'individual_coefs': individual_k,
+            'OD': OD,
+            'Ab': 1.0 - Tr,
+            'Tr': Tr,
+        }
+
+    def run(self, fuel, oxidizer, phi, L, start, end, resolution=0.01, wing=10.0,
+            T_initial=300.0, P_initial=ct.one_atm, equilibrate_method='HP'):
+        """一次调用：(燃料, 氧化剂, φ) -> 平衡 -> 光谱"""
+        results = self.equilibrate(fuel, oxidizer, phi, T_initial, P_initial, equilibrate_method)
+        T, p = self.apply_state(results)
+        out = self.spectrum(T, p, L, start=start, end=end, resolution=resolution, wing=wing)
+        out['params'] = {'T': T, 'p': p, 'l': L, 'phi': phi, 'omega_wing': wing}
+        out['concentrations'] = {name: self.hitran.molecules[name]['conc']
+                                 for name in self.hitran.molecule_order}
+        return out
+
+
+# ---------- 批量 / 并行 ----------
+_worker_pipeline = None
+
+
+def _init_worker(q_folder, molecule_files, mechanism_file, species):
+    # Cantera 对象不能跨进程传递，每个工作进程各建一条流水线
+    global _worker_pipeline
+    _worker_pipeline = FlameSpectrumPipeline(q_folder, molecule_files, mechanism_file, species)
+
+
+def _run_case(case):
+    return _worker_pipeline.run(**case)
+
+
+def run_batch(cases, q_folder, molecule_files, mechanism_file='gri30.yaml',
+              species=None, workers=None):
+    """
+    批量计算多组工况，结果顺序与 cases 一致
+
+    cases: FlameSpectrumPipeline.run 的关键字参数字典列表
+    workers: 进程数；None 或 1 时在当前进程串行计算
+    """
+    if not workers or workers == 1:
+        pipeline = FlameSpectrumPipeline(q_folder, molecule_files, mechanism_file, species)
+        return [pipeline.run(**case) for case in cases]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(q_folder, molecule_files, mechanism_file, species)) as pool:
+        return list(pool.map(_run_case, cases))
+
+
+# ---------- 示例 (在 flame_spectrum/ 下运行: python -m core.flame_pipeline) ----------
+if __name__ == "__main__":
+    db_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'hitran_database')
+    files = {sp: find_par_file(db_dir, sp) for sp in ('H2O', 'CO', 'NO')}
+    files = {sp: f for sp, f in files.items() if f}
+    cases = [{'fuel': 'CH4:1', 'oxidizer': 'O2:1, N2:3.76', 'phi': phi,
+              'L': 10.0, 'start': 2100, 'end': 2200, 'resolution': 0.01}
+             for phi in (0.8, 1.0, 1.2)]
+    for case, res in zip(cases, run_batch(cases, os.path.join(db_dir, 'Q'), files, workers=3)):
+        print(f"φ={case['phi']}: T={res['params']['T']:.1f} K, min Tr={res['Tr'].min():.4f}")
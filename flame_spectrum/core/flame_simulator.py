@@ -1,7 +1,8 @@
 # core/flame_simulator.py
-import os
 import cantera as ct
 
+from core.mechanism_cache import find_mechanism_files, load_mechanism
+
 class GasCompositionSimulator:
     """气体组分模拟核心类 (Cantera 化学平衡)"""
 
@@ -14,17 +15,13 @@ class GasCompositionSimulator:
         self.mechanism_files = self.find_mechanism_files()
 
     def find_mechanism_files(self):
-        mechanism_files = []
-        for file in os.listdir('.'):
-            if file.endswith(('.yaml', '.cti')):
-                mechanism_files.append(file)
-        if not mechanism_files:
-            mechanism_files = ['gri30.yaml']
-        return mechanism_files
+        # 机理文件索引在进程内只扫描一次
+        return find_mechanism_files()
 
-    def initialize_gas(self, mechanism_file='gri30.yaml'):
+    def initialize_gas(self, mechanism_file='gri30.yaml', species=None):
+        """species: 可选组分子集，仅做化学平衡时可减小机理规模"""
         try:
-            self.gas = ct.Solution(mechanism_file)
+            self.gas = load_mechanism(mechanism_file, species)
             return True, f"成功加载反应机理: {mechanism_file}"
         except Exception as e:
             return False, f"加载反应机理失败: {e}"
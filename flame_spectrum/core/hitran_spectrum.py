@@ -5,6 +5,11 @@ import math
 import os
 import matplotlib.pyplot as plt
 
+
+class CalculationCancelled(Exception):
+    """光谱计算被取消 (cancel 事件已置位)"""
+
+
 class HitranSpectrum:
     """
     HITRAN 光谱仿真类（支持多分子混合）
@@ -22,6 +27,9 @@ class HitranSpectrum:
     # 多普勒宽度系数 √(2 N_A k_B ln2) / c
     cGammaD = math.sqrt(2.0 * cBolts * cNA * math.log(2.0)) / cc
 
+    # 每计算这么多条谱线检查一次取消并汇报进度
+    PROGRESS_CHUNK = 1000
+
     # ---------- HITRAN 160 位字段定义 ----------
     HITRAN_FMT = {
         'M':         (1, 2, int),
@@ -238,7 +246,8 @@ class HitranSpectrum:
         print(f"加载 {mol_name}: {len(db)} 条谱线, 浓度 {concentration}")
 
     # ---------- 光谱计算 ----------
-    def cross_section(self, mol_name, T, p, wavenumber, wing=10.0):
+    def cross_section(self, mol_name, T, p, wavenumber, wing=10.0,
+                      progress=None, cancel=None):
         """
         计算单个分子的吸收截面 σ(ν) [cm²/molecule]
         参数:
@@ -246,6 +255,8 @@ class HitranSpectrum:
             p: 总压 (atm)
             wavenumber: 波数网格
             wing: 线翼截断倍数
+            progress: 可选回调 progress(已处理谱线数, 总谱线数)
+            cancel: 可选 threading.Event，置位后抛出 CalculationCancelled
         """
         mol = self.molecules[mol_name]
         db = mol['db']
@@ -258,7 +269,12 @@ class HitranSpectrum:
 
         sigma_arr = np.zeros_like(wavenumber)
 
-        for line in db:
+        n_lines = len(db)
+        for i, line in enumerate(db):
+            if i % self.PROGRESS_CHUNK == 0:
+                self._check_cancel(cancel)
+                if progress is not None:
+                    progress(i, n_lines)
             nu = line[0]
             # 线翼截断
             gamma_D = self.cGammaD * math.sqrt(T / mass_gmol) * nu   # HWHM
@@ -278,28 +294,43 @@ class HitranSpectrum:
             profile = self._voigt(nu, wavenumber, line[3], line[6], p, T, mass_gmol)
             sigma_arr += intensity * profile
 
+        if progress is not None:
+            progress(n_lines, n_lines)
         return sigma_arr
 
-    def coef_mixture(self, T, p, wavenumber, wing=10.0):
+    def number_density(self, mol_name, T, p):
+        """分子数密度 N_i = (p * conc_i * cP) / (kB * T)   [分子/cm³]"""
+        return p * self.molecules[mol_name]['conc'] * self.cP / (self.cBolts * T)
+
+    def coef_mixture(self, T, p, wavenumber, wing=10.0, progress=None, cancel=None):
         """
         计算混合气体总吸收系数 k(ν) [cm⁻¹]
         k = Σ N_i * σ_i
+        progress 按全部分子的谱线总数汇报: progress(已处理, 总数)
         """
         total_k = np.zeros_like(wavenumber)
         individual_k = {}
+        total_lines = sum(len(self.molecules[n]['db']) for n in self.molecule_order)
+        done = 0
         for name in self.molecule_order:
-            mol = self.molecules[name]
-            sigma = self.cross_section(name, T, p, wavenumber, wing)
-            # 数密度 N_i = (p * conc_i * cP) / (kB * T)   [分子/cm³]
-            N_i = p * mol['conc'] * self.cP / (self.cBolts * T)
-            k_i = sigma * N_i
+            self._check_cancel(cancel)
+            mol_progress = None
+            if progress is not None:
+                mol_progress = lambda i, n, offset=done: progress(offset + i, total_lines)
+            sigma = self.cross_section(name, T, p, wavenumber, wing,
+                                       progress=mol_progress, cancel=cancel)
+            done += len(self.molecules[name]['db'])
+            k_i = sigma * self.number_density(name, T, p)
             individual_k[name] = k_i
             total_k += k_i
         return total_k, wavenumber, individual_k
 
     def OD_mixture(self, T, p, L, wavenumber=None, start=None, end=None,
-                   resolution=0.01, wing=10.0):
-        """计算混合气体光学深度、透射率和吸收率"""
+                   resolution=0.01, wing=10.0, progress=None, cancel=None):
+        """
+        计算混合气体光学深度、透射率和吸收率
+        progress / cancel 见 coef_mixture
+        """
         if wavenumber is None:
             if start is None or end is None:
                 # 自动范围
@@ -308,13 +339,19 @@ class HitranSpectrum:
                 start, end = min(starts), max(ends)
             wavenumber = np.arange(start, end, resolution)
 
-        total_k, wavenumber, ind_k = self.coef_mixture(T, p, wavenumber, wing)
+        total_k, wavenumber, ind_k = self.coef_mixture(T, p, wavenumber, wing,
+                                                       progress=progress, cancel=cancel)
         OD = total_k * L
         Tr = np.exp(-OD)
         Ab = 1.0 - Tr
         return OD, Ab, Tr, wavenumber, total_k, ind_k
 
     # ---------- 内部工具 ----------
+    @staticmethod
+    def _check_cancel(cancel):
+        if cancel is not None and cancel.is_set():
+            raise CalculationCancelled("光谱计算已取消")
+
     def _read_par(self, filename):
         db = []
         mol_ids = set()
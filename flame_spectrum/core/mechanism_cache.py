@@ -0,0 +1,113 @@
+# core/mechanism_cache.py
+"""
+反应机理缓存 (Cantera)
+同一进程内每个机理文件只解析一次（缓存组分与反应对象），每次调用由缓存构建新的 ct.Solution，
+调用者之间不共享状态；可用机理文件只索引一次。
+可选组分子集：仅做化学平衡时无需反应，只保留所需组分的热力学数据。
+"""
+import os
+import cantera as ct
+
+# Cantera 自带的气相机理：只检查这些文件名，不扫描整个数据目录
+KNOWN_MECHANISMS = ('gri30.yaml', 'h2o2.yaml', 'air.yaml')
+
+_parsed_cache = {}          # (机理键, 组分子集) -> ct.Solution 构造参数（模型名、组分、反应）
+_mechanism_index = {}       # 搜索目录的绝对路径 -> 可用机理文件列表
+
+
+def _mechanism_key(mechanism_file):
+    """本地文件以绝对路径为键；Cantera 数据目录中的机理以文件名为键"""
+    if os.path.isfile(mechanism_file):
+        return os.path.abspath(mechanism_file)
+    return mechanism_file
+
+
+def find_mechanism_files(refresh=False, extra_dirs=()):
+    """
+    索引当前目录（及 extra_dirs 指定的目录）下的 .yaml/.cti 机理文件，
+    再加上 Cantera 数据目录中存在的 KNOWN_MECHANISMS；同一组目录只扫描一次
+    返回列表：当前目录的文件名在前，其次 extra_dirs 中的文件路径，gri30.yaml 保证存在
+    """
+    search_dirs = tuple(os.path.abspath(d) for d in ('.',) + tuple(extra_dirs))
+    if search_dirs in _mechanism_index and not refresh:
+        return list(_mechanism_index[search_dirs])
+
+    mechanism_files = []
+    for k, folder in enumerate(search_dirs):
+        if not os.path.isdir(folder):
+            continue
+        for file in sorted(os.listdir(folder)):
+            # 当前目录给出文件名（Cantera 可直接加载），其他目录给出完整路径
+            name = file if k == 0 else os.path.join(folder, file)
+            if file.endswith(('.yaml', '.cti')) and name not in mechanism_files:
+                mechanism_files.append(name)
+
+    data_dirs = ct.get_data_directories()
+    for name in KNOWN_MECHANISMS:
+        if name not in mechanism_files and (
+                name == 'gri30.yaml'
+                or any(os.path.isfile(os.path.join(d, name)) for d in data_dirs)):
+            mechanism_files.append(name)
+
+    _mechanism_index[search_dirs] = mechanism_files
+    return list(mechanism_files)
+
+
+def load_mechanism(mechanism_file='gri30.yaml', species=None, transport=False):
+    """
+    获取机理对应的新 ct.Solution（机理文件进程内只解析一次）
+
+    参数:
+        mechanism_file: 机理文件路径或 Cantera 数据目录中的文件名
+        species: 可选组分名列表；给定时返回仅含这些组分、无反应的
+                 理想气体对象，用于只做化学平衡的场景
+        transport: 是否带机理中的输运模型（拟合输运参数较慢，平衡计算不需要）
+    每次返回独立的对象（初始状态 300 K, 1 atm），调用者可随意设置 TPX / equilibrate
+    """
+    subset = tuple(sorted(species)) if species else None
+    key = (_mechanism_key(mechanism_file), subset)
+    parsed = _parsed_cache.get(key)
+    if parsed is None:
+        parsed = _parse_mechanism(mechanism_file, subset)
+        _parsed_cache[key] = parsed
+
+    kwargs = {k: v for k, v in parsed.items() if k != 'transport_model'}
+    if transport and parsed['transport_model'] != 'none':
+        kwargs['transport_model'] = parsed['transport_model']
+    gas = ct.Solution(**kwargs)
+    gas.TP = 300.0, ct.one_atm
+    return gas
+
+
+def _parse_mechanism(mechanism_file, subset):
+    """解析机理，返回构造 ct.Solution 所需的模型名与组分、反应对象"""
+    full = _parsed_cache.get((_mechanism_key(mechanism_file), None))
+    if full is None:
+        gas = ct.Solution(mechanism_file)
+        full = {
+            'thermo': gas.thermo_model,
+            'kinetics': gas.kinetics_model,
+            'transport_model': gas.transport_model,
+            'species': gas.species(),
+            'reactions': gas.reactions(),
+        }
+        _parsed_cache[(_mechanism_key(mechanism_file), None)] = full
+    if subset is None:
+        return full
+
+    names = [sp.name for sp in full['species']]
+    missing = [name for name in subset if name not in names]
+    if missing:
+        raise ValueError(f"机理 {mechanism_file} 中不存在组分: {', '.join(missing)}")
+    # 保持机理中的组分顺序
+    return {
+        'thermo': 'ideal-gas',
+        'transport_model': 'none',
+        'species': [sp for sp in full['species'] if sp.name in subset],
+    }
+
+
+def clear_mechanism_cache():
+    """清空已解析的机理与文件索引（机理文件被修改后调用）"""
+    _parsed_cache.clear()
+    _mechanism_index.clear()
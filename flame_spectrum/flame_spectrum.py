@@ -1,6 +1,7 @@
 # combined_gas_spectrum_gui.py
 import sys
 import os
+import threading
 import numpy as np
 import cantera as ct
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -17,7 +18,10 @@ from matplotlib.figure import Figure
 
 # 导入HitranSpectrum类（多分子版本）
 sys.path.insert(0, 'voigt_simulation')
-from hitran_spectrum_dual import HitranSpectrum
+from hitran_spectrum_dual import HitranSpectrum, CalculationCancelled
+from core.mechanism_cache import find_mechanism_files, load_mechanism
+from gui.decimated_plot import DecimatedPlot
+from gui.spectrum_plotter import sync_wavelength_axis
 
 # 强制使用系统自带中文字体（Windows 微软雅黑）
 rcParams['font.family'] = 'sans-serif'
@@ -39,26 +43,13 @@ class GasCompositionSimulator:
         self.mechanism_files = self.find_mechanism_files()
 
     def find_mechanism_files(self):
-        """查找可用的反应机理文件"""
-        mechanism_files = []
-        possible_files = ['gri30.yaml', 'gri30.cti', 'gri3.0.yaml', 'gri3.0.cti']
+        """查找可用的反应机理文件（索引在进程内只扫描一次）"""
+        return find_mechanism_files()
 
-        for file in possible_files:
-            if os.path.exists(file):
-                mechanism_files.append(file)
-
-        # 也可以查找当前目录下的所有.yaml和.cti文件
-        for file in os.listdir('.'):
-            if file.endswith(('.yaml', '.cti')):
-                if file not in mechanism_files:
-                    mechanism_files.append(file)
-
-        return mechanism_files
-
-    def initialize_gas(self, mechanism_file='gri30.yaml'):
-        """初始化气体对象"""
+    def initialize_gas(self, mechanism_file='gri30.yaml', species=None):
+        """初始化气体对象（机理解析结果缓存，species 为可选组分子集）"""
         try:
-            self.gas = ct.Solution(mechanism_file)
+            self.gas = load_mechanism(mechanism_file, species)
             return True, f"成功加载反应机理: {mechanism_file}"
         except Exception as e:
             return False, f"加载反应机理失败: {e}"
@@ -232,10 +223,11 @@ class GasCompositionSimulator:
 
 
 class SpectrumCalculationThread(QThread):
-    """光谱计算线程"""
+    """光谱计算线程（可取消，按谱线进度汇报）"""
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
+    cancelled = pyqtSignal()
     info = pyqtSignal(str)  # 用于发送信息消息
 
     def __init__(self, hitran, params, concentrations):
@@ -243,32 +235,36 @@ class SpectrumCalculationThread(QThread):
         self.hitran = hitran
         self.params = params
         self.concentrations = concentrations  # 新增：存储浓度信息
+        self.cancel_event = threading.Event()
+        self._last_percent = -1
+
+    def cancel(self):
+        """请求取消：计算在下一批谱线/下一个分子前停止"""
+        self.cancel_event.set()
+
+    def _report_progress(self, done, total):
+        percent = int(100 * done / total) if total else 100
+        if percent != self._last_percent:   # 只在百分比变化时发信号
+            self._last_percent = percent
+            self.progress.emit(percent)
 
     def run(self):
         try:
-            # 重定向输出到GUI
-            import io
-            import contextlib
-
-            # 创建字符串流来捕获输出
-            output_stream = io.StringIO()
-
-            # 重定向标准输出和标准错误
-            with contextlib.redirect_stdout(output_stream), contextlib.redirect_stderr(output_stream):
-                # 执行计算
-                OD, Ab, Tr, wavenumber, total_coef, individual_ODs = self.hitran.OD_mixture(
-                    self.params['T'], self.params['p'], self.params['l'],
-                    start=self.params['start'], end=self.params['end'],
-                    resolution=self.params['resolution'], omega_wing=self.params['omega_wing']
-                )
+            # 执行计算
+            OD, Ab, Tr, wavenumber, total_coef, individual_ODs = self.hitran.OD_mixture(
+                self.params['T'], self.params['p'], self.params['l'],
+                start=self.params['start'], end=self.params['end'],
+                resolution=self.params['resolution'], omega_wing=self.params['omega_wing'],
+                progress=self._report_progress, cancel=self.cancel_event
+            )
 
-                # 计算各分子的单独透射率
-                individual_Trs = {}
-                for molecule_name, od in individual_ODs.items():
-                    individual_Trs[molecule_name] = np.exp(-od)
+            # 计算各分子的单独透射率
+            individual_Trs = {}
+            for molecule_name, od in individual_ODs.items():
+                individual_Trs[molecule_name] = np.exp(-od)
 
-                # 计算对应的波长（单位：微米）
-                wavelength_micron = 10000.0 / wavenumber  # 波数(cm⁻¹)转波长(微米)
+            # 计算对应的波长（单位：微米）
+            wavelength_micron = 10000.0 / wavenumber  # 波数(cm⁻¹)转波长(微米)
 
             results = {
                 'wavenumber': wavenumber,
@@ -285,6 +281,8 @@ class SpectrumCalculationThread(QThread):
 
             self.finished.emit(results)
 
+        except CalculationCancelled:
+            self.cancelled.emit()
         except Exception as e:
             self.error.emit(str(e))
 
@@ -296,6 +294,8 @@ class MplCanvas(FigureCanvas):
         self.fig = Figure(figsize=(width, height), dpi=dpi)
         self.axes = self.fig.add_subplot(111)
         super().__init__(self.fig)
+        # 光谱曲线按像素 min/max 包络降采样，缩放时自动重算
+        self.decimator = DecimatedPlot(self)
 
 
 class ThermodynamicTableWidget(QTableWidget):
@@ -368,7 +368,11 @@ class CombinedGasSpectrumGUI(QMainWindow):
         self.gas_simulator = GasCompositionSimulator()
         self.spectrum_simulator = None
         self.current_spectrum_results = None
+        self.transmittance_legend_text = None  # 图例中透射率条目（切换类型时直接改文字）
+        self._wavelength_cid = None  # 顶部波长轴的 xlim_changed 回调（主坐标轴复用，重绘前断开）
         self.calculation_thread = None
+        self.stale_threads = []  # 已取消但尚未退出的计算线程（保持引用直到结束）
+        self.imported_gas_state = None  # 传输的平衡状态 {'T', 'p', 'mole_fractions'}：T、p 避免从标签文本解析，组分用于填充浓度下拉框
 
         # 文件路径设置
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -930,6 +934,7 @@ class CombinedGasSpectrumGUI(QMainWindow):
         self.transmittance_combo = QComboBox()
         self.transmittance_combo.addItems(
             ["总透射率", "H2O透射率", "CO2透射率", "CO透射率", "NO透射率", "N2O透射率", "NO2透射率"])
+        self.transmittance_combo.currentTextChanged.connect(self.on_transmittance_changed)
         trans_type_layout.addWidget(self.transmittance_combo)
         transmittance_layout.addLayout(trans_type_layout)
 
@@ -989,6 +994,11 @@ class CombinedGasSpectrumGUI(QMainWindow):
         self.calculate_spectrum_btn.setEnabled(False)
         button_layout.addWidget(self.calculate_spectrum_btn)
 
+        self.cancel_spectrum_btn = QPushButton("取消计算")
+        self.cancel_spectrum_btn.clicked.connect(self.cancel_spectrum_calculation)
+        self.cancel_spectrum_btn.setEnabled(False)
+        button_layout.addWidget(self.cancel_spectrum_btn)
+
         self.clear_spectrum_btn = QPushButton("清除光谱")
         self.clear_spectrum_btn.clicked.connect(self.clear_spectrum_results)
         self.clear_spectrum_btn.setEnabled(False)
@@ -1163,6 +1173,35 @@ class CombinedGasSpectrumGUI(QMainWindow):
             self.import_conc_combos[molecule_name] = combo
             conc_layout.addWidget(combo)
             parent_layout.addLayout(conc_layout)
+            # 传输之后才选中的分子，直接用已保存的平衡组分填充
+            self.fill_import_concentration_combo(molecule_name)
+
+    def fill_import_concentration_combo(self, molecule_name):
+        """由传输的平衡组分填充分子的浓度下拉框，返回匹配的 (物种, 摩尔分数) 列表"""
+        if self.imported_gas_state is None or molecule_name not in self.import_conc_combos:
+            return []
+        combo = self.import_conc_combos[molecule_name]
+        combo.clear()
+
+        # 查找该分子的所有相关物种
+        options = []
+        for species, fraction in self.imported_gas_state['mole_fractions'].items():
+            # 精确匹配分子名称
+            if molecule_name.upper() == species.upper():
+                options.append((species, fraction))
+            # 或者包含分子名称（如H2O可能包含在H2O(L)中）
+            elif molecule_name.upper() in species.upper():
+                options.append((species, fraction))
+
+        if options:
+            for species, fraction in options:
+                # 显示分数和ppm两种单位
+                ppm_value = fraction * 1000000
+                combo.addItem(f"{species}: {fraction:.6f} ({ppm_value:.2f} ppm)", fraction)
+            combo.setCurrentIndex(0)
+        else:
+            combo.addItem(f"未找到{molecule_name}", 0.0)
+        return options
 
     def remove_import_concentration_combo(self, molecule_name):
         """从导入组移除浓度下拉框"""
@@ -1358,6 +1397,31 @@ class CombinedGasSpectrumGUI(QMainWindow):
                 self.transmittance_combo.setCurrentIndex(i)
                 break
 
+    def on_transmittance_changed(self, text):
+        """切换透射率类型：复用已有曲线，只替换数据"""
+        if (self.current_spectrum_results is None
+                or 'Tr' not in self.canvas.decimator.traces):
+            return
+        transmittance_data, transmittance_label = self.get_selected_transmittance()
+        line = self.canvas.decimator.traces['Tr']['line']
+        line.set_label(transmittance_label)
+        if self.transmittance_legend_text is not None:
+            self.transmittance_legend_text.set_text(transmittance_label)
+        self.canvas.decimator.set_data('Tr', self.current_spectrum_results['wavenumber'],
+                                       transmittance_data)
+
+    def get_selected_transmittance(self):
+        """返回当前选择的透射率数据与标签"""
+        individual_Trs = self.current_spectrum_results['individual_Trs']
+        selected_transmittance = self.transmittance_combo.currentText()
+        if selected_transmittance != "总透射率":
+            for molecule in self.selected_molecules:
+                if selected_transmittance.startswith(molecule):
+                    if molecule in individual_Trs:
+                        return individual_Trs[molecule], f"{molecule}透射率"
+                    break
+        return self.current_spectrum_results['Tr'], "总透射率"
+
     def on_grid_density_changed(self, density):
         """图形网格密度改变"""
         if self.current_spectrum_results is not None:
@@ -1623,38 +1687,24 @@ class CombinedGasSpectrumGUI(QMainWindow):
         # 更新浓度选择框
         mole_fractions = self.gas_simulator.results['mole_fractions']
 
+        # 保存全精度状态，计算时直接使用（标签仅用于显示）
+        self.imported_gas_state = {
+            'T': float(temperature),
+            'p': float(pressure_atm),
+            'mole_fractions': dict(mole_fractions)
+        }
+
         # 更新所有选中分子的浓度下拉框
         for molecule_name in self.selected_molecules:
-            if molecule_name in self.import_conc_combos:
-                combo = self.import_conc_combos[molecule_name]
-                combo.clear()
-
-                # 查找该分子的所有相关物种
-                options = []
-                for species, fraction in mole_fractions.items():
-                    # 精确匹配分子名称
-                    if molecule_name.upper() == species.upper():
-                        options.append((species, fraction))
-                    # 或者包含分子名称（如H2O可能包含在H2O(L)中）
-                    elif molecule_name.upper() in species.upper():
-                        options.append((species, fraction))
+            options = self.fill_import_concentration_combo(molecule_name)
 
+            # 同时更新手动组的ppm输入框（如果有该分子）
+            if molecule_name in self.manual_conc_spins:
+                ppm_value = 0.0
                 if options:
-                    for species, fraction in options:
-                        # 显示分数和ppm两种单位
-                        ppm_value = fraction * 1000000
-                        combo.addItem(f"{species}: {fraction:.6f} ({ppm_value:.2f} ppm)", fraction)
-                    combo.setCurrentIndex(0)
-                else:
-                    combo.addItem(f"未找到{molecule_name}", 0.0)
-
-                # 同时更新手动组的ppm输入框（如果有该分子）
-                if molecule_name in self.manual_conc_spins:
-                    ppm_value = 0.0
-                    if options:
-                        # 取第一个匹配的浓度
-                        ppm_value = options[0][1] * 1000000
-                    self.manual_conc_spins[molecule_name].setValue(ppm_value)
+                    # 取第一个匹配的浓度
+                    ppm_value = options[0][1] * 1000000
+                self.manual_conc_spins[molecule_name].setValue(ppm_value)
 
         # 切换到光谱模拟标签页
         self.tab_widget.setCurrentIndex(1)
@@ -1788,15 +1838,12 @@ class CombinedGasSpectrumGUI(QMainWindow):
             return
 
         try:
-            # 禁用计算按钮，显示进度条
-            self.calculate_spectrum_btn.setEnabled(False)
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, 0)  # 不确定进度
-
             # 获取计算参数
             if self.import_gas_check.isChecked():
-                T = float(self.import_temp_label.text())
-                p = float(self.import_pressure_label.text())
+                if self.imported_gas_state is None:
+                    raise ValueError("请先将气体平衡结果传输到光谱模拟")
+                T = self.imported_gas_state['T']
+                p = self.imported_gas_state['p']
             else:
                 T = self.manual_temp_spin.value()
                 p = self.manual_pressure_spin.value()
@@ -1816,18 +1863,56 @@ class CombinedGasSpectrumGUI(QMainWindow):
             # 获取当前所有分子的浓度
             concentrations = self.get_all_concentrations()
 
+            # 仍在运行的旧计算直接取消，不在其后排队
+            self.abort_stale_calculation()
+
+            # 显示进度条（按谱线数汇报）
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(0)
+            self.progress_bar.setVisible(True)
+            self.cancel_spectrum_btn.setEnabled(True)
+
             # 在单独的线程中执行计算，传入浓度信息
             self.calculation_thread = SpectrumCalculationThread(
                 self.spectrum_simulator, params, concentrations
             )
             self.calculation_thread.finished.connect(self.on_spectrum_calculation_finished)
             self.calculation_thread.error.connect(self.on_spectrum_calculation_error)
+            self.calculation_thread.cancelled.connect(self.on_spectrum_calculation_cancelled)
+            self.calculation_thread.progress.connect(self.progress_bar.setValue)
             self.calculation_thread.start()
 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"计算失败: {e}")
-            self.calculate_spectrum_btn.setEnabled(True)
-            self.progress_bar.setVisible(False)
+            self.reset_spectrum_calculation_ui()
+
+    def abort_stale_calculation(self):
+        """取消正在运行的计算并断开其信号，旧结果不再更新界面"""
+        self.stale_threads = [t for t in self.stale_threads if t.isRunning()]
+        thread = self.calculation_thread
+        self.calculation_thread = None
+        if thread is None or not thread.isRunning():
+            return
+        for signal in (thread.finished, thread.error, thread.cancelled, thread.progress):
+            signal.disconnect()
+        thread.cancel()
+        self.stale_threads.append(thread)
+
+    def cancel_spectrum_calculation(self):
+        """取消按钮"""
+        if self.calculation_thread is not None and self.calculation_thread.isRunning():
+            self.cancel_spectrum_btn.setEnabled(False)
+            self.calculation_thread.cancel()
+
+    def on_spectrum_calculation_cancelled(self):
+        """光谱计算已取消"""
+        self.reset_spectrum_calculation_ui()
+        self.spectrum_info_text.append("光谱计算已取消")
+
+    def reset_spectrum_calculation_ui(self):
+        self.calculate_spectrum_btn.setEnabled(True)
+        self.cancel_spectrum_btn.setEnabled(False)
+        self.progress_bar.setVisible(False)
 
     def on_spectrum_calculation_finished(self, results):
         """光谱计算完成"""
@@ -1846,8 +1931,7 @@ class CombinedGasSpectrumGUI(QMainWindow):
         self.update_spectrum_stats_text()
 
         # 恢复界面状态
-        self.calculate_spectrum_btn.setEnabled(True)
-        self.progress_bar.setVisible(False)
+        self.reset_spectrum_calculation_ui()
         self.clear_spectrum_btn.setEnabled(True)
 
         QMessageBox.information(self, "成功", "光谱计算完成！")
@@ -1855,12 +1939,13 @@ class CombinedGasSpectrumGUI(QMainWindow):
     def on_spectrum_calculation_error(self, error_msg):
         """光谱计算错误"""
         QMessageBox.critical(self, "错误", f"光谱计算失败: {error_msg}")
-        self.calculate_spectrum_btn.setEnabled(True)
-        self.progress_bar.setVisible(False)
+        self.reset_spectrum_calculation_ui()
 
     def clear_spectrum_results(self):
         """清除光谱结果"""
         # 清除图形
+        self.canvas.decimator.clear()
+        self.transmittance_legend_text = None
         self.canvas.axes.clear()
 
         # 重置坐标轴范围到默认值
@@ -1892,37 +1977,28 @@ class CombinedGasSpectrumGUI(QMainWindow):
         QMessageBox.information(self, "成功", "光谱结果已清除")
 
     def update_spectrum_plot(self):
-        """更新光谱图形 - 改为柱状图显示"""
+        """更新光谱图形（曲线按像素 min/max 包络降采样，缩放时重算）"""
         if self.current_spectrum_results is None:
             return
 
-        # 清除图形
+        # 清除图形（连同上次创建的双轴）
+        self.canvas.decimator.clear()
+        self.transmittance_legend_text = None
+        if self._wavelength_cid is not None:
+            self.canvas.axes.callbacks.disconnect(self._wavelength_cid)
+            self._wavelength_cid = None
+        for ax in self.canvas.fig.get_axes():
+            if ax is not self.canvas.axes:
+                ax.remove()
         self.canvas.axes.clear()
 
         # 获取结果数据
         params = self.current_spectrum_results['params']
         wavenumber = self.current_spectrum_results['wavenumber']
-        wavelength_micron = self.current_spectrum_results['wavelength_micron']
         individual_ODs = self.current_spectrum_results['individual_ODs']
-        individual_Trs = self.current_spectrum_results['individual_Trs']
-        Tr_total = self.current_spectrum_results['Tr']
-
-        # 获取选择的透射率类型
-        selected_transmittance = self.transmittance_combo.currentText()
 
         # 确定要显示的透射率数据
-        if selected_transmittance == "总透射率":
-            transmittance_data = Tr_total
-            transmittance_label = "总透射率"
-        else:
-            transmittance_data = Tr_total
-            transmittance_label = "总透射率"
-            for molecule in self.selected_molecules:
-                if selected_transmittance.startswith(molecule):
-                    if molecule in individual_Trs:
-                        transmittance_data = individual_Trs[molecule]
-                        transmittance_label = f"{molecule}透射率"
-                    break
+        transmittance_data, transmittance_label = self.get_selected_transmittance()
 
         lines = []
 
@@ -1948,51 +2024,32 @@ class CombinedGasSpectrumGUI(QMainWindow):
             grid_linestyle = '-'
             grid_linewidth = 0.8
 
-        # 显示吸收系数（柱状图）
+        # 显示吸收系数
         if self.show_abs_check.isChecked():
             colors = {'H2O': 'tab:blue', 'CO2': 'tab:green', 'CO': 'tab:red',
                       'NO': 'tab:purple', 'N2O': 'tab:pink', 'NO2': 'tab:brown'}
 
-            # 计算柱状图宽度
-            if len(wavenumber) > 1:
-                # 根据数据点间隔确定柱宽
-                wavenumber_diff = np.diff(wavenumber)
-                avg_diff = np.mean(wavenumber_diff)
-                bar_width = avg_diff * 0.8  # 柱宽为平均间隔的80%
-            else:
-                bar_width = 0.1  # 默认值
-
             for molecule_name, coef in individual_coefs.items():
                 if molecule_name in colors and np.max(np.abs(coef)) > 1e-10:
-                    # 使用柱状图代替曲线图
-                    bars = self.canvas.axes.bar(
-                        wavenumber, coef,
-                        width=bar_width,
+                    line = self.canvas.decimator.plot(
+                        self.canvas.axes, molecule_name, wavenumber, coef,
                         color=colors[molecule_name],
-                        alpha=0.7,
-                        edgecolor=colors[molecule_name],
-                        linewidth=0.5,
+                        alpha=0.8,
+                        linewidth=0.8,
                         label=f'{molecule_name}吸收系数'
                     )
-                    # 存储第一个柱状作为图例项
-                    if bars:
-                        lines.append(bars[0])
+                    lines.append(line)
 
         # 设置x轴标签（底部：波数，顶部：波长）
         if self.wavelength_check.isChecked():
             ax_top = self.canvas.axes.twiny()
             self.canvas.axes.set_xlabel('波数 (cm$^{-1}$)', fontsize=11, labelpad=12)
             ax_top.set_xlabel('波长 ($\mu$m)', fontsize=11, labelpad=12)
-            ax_top.set_xlim(self.canvas.axes.get_xlim())  # 修正这里！
-
-            # 设置顶部x轴的刻度
-            wavenumber_ticks = self.canvas.axes.get_xticks()
-            wavenumber_ticks = wavenumber_ticks[(wavenumber_ticks >= wavenumber.min()) &
-                                                (wavenumber_ticks <= wavenumber.max())]
-            wavelength_ticks = 10000.0 / wavenumber_ticks
-            ax_top.set_xticks(wavenumber_ticks)
-            ax_top.set_xticklabels([f'{w:.4f}' for w in wavelength_ticks], fontsize=10)
-            ax_top.tick_params(axis='x', which='major', size=6, width=1.5, direction='in', top=True)
+            # 刻度随缩放/平移同步（底部刻度在后面重设时也会触发）
+            sync_wavelength_axis(self.canvas.axes, ax_top, '{:.4f}')
+            self._wavelength_cid = self.canvas.axes.callbacks.connect(
+                'xlim_changed', lambda ax: sync_wavelength_axis(ax, ax_top, '{:.4f}'))
+            ax_top.tick_params(axis='x', which='major', labelsize=10, size=6, width=1.5, direction='in', top=True)
             ax_top.tick_params(axis='x', which='minor', size=3, width=1, direction='in', top=True)
             ax_top.grid(True, alpha=grid_alpha * 0.7, linestyle=':', linewidth=0.3)
         else:
@@ -2006,61 +2063,25 @@ class CombinedGasSpectrumGUI(QMainWindow):
             self.canvas.axes.set_ylabel('透射率', color='tab:orange', fontsize=11)
             self.canvas.axes.tick_params(axis='y', labelcolor='tab:orange', labelsize=10)
 
-        # 显示透射率（柱状图）
+        # 显示透射率
         if self.show_trans_check.isChecked():
+            color = 'tab:orange'
             if self.show_abs_check.isChecked():
-                ax2 = self.canvas.axes.twinx()
-                color = 'tab:orange'
-                ax2.set_ylabel('透射率', color=color, fontsize=11)
-
-                # 计算柱宽
-                if len(wavenumber) > 1:
-                    wavenumber_diff = np.diff(wavenumber)
-                    avg_diff = np.mean(wavenumber_diff)
-                    bar_width = avg_diff * 0.8
-                else:
-                    bar_width = 0.1
-
-                # 使用柱状图显示透射率
-                bars_tr = ax2.bar(
-                    wavenumber, transmittance_data,
-                    width=bar_width,
-                    color=color,
-                    alpha=0.5,
-                    edgecolor=color,
-                    linewidth=0.5,
-                    label=transmittance_label
-                )
-                if bars_tr:
-                    lines.append(bars_tr[0])
-
-                ax2.tick_params(axis='y', labelcolor=color, labelsize=10)
-                ax2.set_ylim(0, 1)
+                ax_tr = self.canvas.axes.twinx()
+                ax_tr.set_ylabel('透射率', color=color, fontsize=11)
+                ax_tr.tick_params(axis='y', labelcolor=color, labelsize=10)
             else:
-                color = 'tab:orange'
-
-                # 计算柱宽
-                if len(wavenumber) > 1:
-                    wavenumber_diff = np.diff(wavenumber)
-                    avg_diff = np.mean(wavenumber_diff)
-                    bar_width = avg_diff * 0.8
-                else:
-                    bar_width = 0.1
-
-                # 使用柱状图显示透射率
-                bars_tr = self.canvas.axes.bar(
-                    wavenumber, transmittance_data,
-                    width=bar_width,
-                    color=color,
-                    alpha=0.5,
-                    edgecolor=color,
-                    linewidth=0.5,
-                    label=transmittance_label
-                )
-                if bars_tr:
-                    lines.append(bars_tr[0])
-
-                self.canvas.axes.set_ylim(0, 1)
+                ax_tr = self.canvas.axes
+
+            line_tr = self.canvas.decimator.plot(
+                ax_tr, 'Tr', wavenumber, transmittance_data,
+                color=color,
+                alpha=0.8,
+                linewidth=0.8,
+                label=transmittance_label
+            )
+            lines.append(line_tr)
+            ax_tr.set_ylim(0, 1)
 
         # 添加图例
         if lines:
@@ -2073,6 +2094,9 @@ class CombinedGasSpectrumGUI(QMainWindow):
             )
             legend.get_frame().set_edgecolor('black')
             legend.get_frame().set_linewidth(0.5)
+            self.canvas.decimator.add_overlay(legend)
+            if self.show_trans_check.isChecked():
+                self.transmittance_legend_text = legend.get_texts()[-1]
 
         # 添加标题（包含浓度信息）
         conc_info = []
@@ -2084,7 +2108,7 @@ class CombinedGasSpectrumGUI(QMainWindow):
 
         conc_str = ", ".join(conc_info)
 
-        title = f'混合气体吸收光谱（柱状图）\nT={params["T"]}K, p={params["p"]}atm, l={params["l"]}cm'
+        title = f'混合气体吸收光谱\nT={params["T"]}K, p={params["p"]}atm, l={params["l"]}cm'
         if conc_str:
             title += f'\n浓度: {conc_str}'
 
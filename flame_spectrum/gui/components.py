@@ -1,11 +1,16 @@
 # gui/components.py
+import threading
+
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from core.hitran_spectrum import CalculationCancelled
+
 class CalculationThread(QThread):
-    """通用后台计算线程，适配多分子 HITRAN 引擎"""
+    """通用后台计算线程，适配多分子 HITRAN 引擎（可取消，按谱线进度汇报）"""
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
-    progress = pyqtSignal(int)          # 可选，当前未使用
+    progress = pyqtSignal(int)          # 0-100
+    cancelled = pyqtSignal()
 
     def __init__(self, hitran_engine, T, p, L, wn_start, wn_end, resolution, omega_wing):
         super().__init__()
@@ -17,6 +22,18 @@ class CalculationThread(QThread):
         self.wn_end = wn_end
         self.resolution = resolution
         self.omega_wing = omega_wing
+        self.cancel_event = threading.Event()
+        self._last_percent = -1
+
+    def cancel(self):
+        """请求取消：计算在下一批谱线/下一个分子前停止"""
+        self.cancel_event.set()
+
+    def _report_progress(self, done, total):
+        percent = int(100 * done / total) if total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress.emit(percent)
 
     def run(self):
         try:
@@ -26,7 +43,9 @@ class CalculationThread(QThread):
                 start=self.wn_start,
                 end=self.wn_end,
                 resolution=self.resolution,
-                wing=self.omega_wing
+                wing=self.omega_wing,
+                progress=self._report_progress,
+                cancel=self.cancel_event
             )
             results = {
                 'wavenumber': wavenumber,
@@ -43,6 +62,8 @@ class CalculationThread(QThread):
                 }
             }
             self.finished.emit(results)
+        except CalculationCancelled:
+            self.cancelled.emit()
         except Exception as e:
             import traceback
-            self.error.emit(f"{str(e)}\n{traceback.format_exc()}")
\ No newline at end of file
+            self.error.emit(f"{str(e)}\n{traceback.format_exc()}")
@@ -0,0 +1,191 @@
+# gui/decimated_plot.py
+"""
+大数据量光谱曲线显示
+每条曲线只绘制当前 x 范围内 "每像素列 min/max" 的包络（峰值位置与高度不丢失），
+缩放/平移时通过 xlim_changed 回调重新计算；曲线对象 (Line2D) 复用 set_data，
+坐标范围不变、仅数据变化时用 blitting 局部重绘，不清空坐标轴。
+"""
+import numpy as np
+
+
+def minmax_envelope(x, y, xlim=None, n_bins=2000):
+    """
+    单调递增 x 上的 min/max 包络
+
+    参数:
+        x, y: 一维数组，x 单调递增
+        xlim: (x0, x1) 可见范围；None 表示全部
+        n_bins: 包络列数（通常取坐标轴像素宽度）
+    返回:
+        (x_env, y_env)，长度不超过 2*n_bins + 4；每列的最小/最大点按原顺序交错，
+        点数不多时原样返回
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if xlim is not None and len(x) > 0:
+        lo, hi = min(xlim), max(xlim)
+        # 两侧各多留一个点，保证曲线延伸到坐标轴边界
+        i0 = max(int(np.searchsorted(x, lo, side='left')) - 1, 0)
+        i1 = min(int(np.searchsorted(x, hi, side='right')) + 1, len(x))
+        x, y = x[i0:i1], y[i0:i1]
+
+    n_bins = max(int(n_bins), 1)
+    n = len(x)
+    if n <= 2 * n_bins:
+        return x, y
+
+    per_bin = n // n_bins
+    m = per_bin * n_bins
+    yb = y[:m].reshape(n_bins, per_bin)
+    i_min = yb.argmin(axis=1)
+    i_max = yb.argmax(axis=1)
+    base = np.arange(n_bins) * per_bin
+    idx = np.empty(2 * n_bins, dtype=np.intp)
+    idx[0::2] = base + np.minimum(i_min, i_max)
+    idx[1::2] = base + np.maximum(i_min, i_max)
+
+    # 末尾不足一列的点
+    if m < n:
+        tail = y[m:]
+        idx = np.concatenate([idx, np.sort(m + np.array([tail.argmin(), tail.argmax()]))])
+    return x[idx], y[idx]
+
+
+class DecimatedPlot:
+    """
+    画布上的降采样曲线管理器
+
+    用法:
+        plot = DecimatedPlot(canvas)
+        plot.plot(ax, 'Tr', wn, tr, color='blue')     # 新建或复用曲线
+        plot.set_data('Tr', wn, tr_new)                # 更新数据 (blit 或 draw_idle)
+        plot.clear()                                   # 清空坐标轴/图形前调用
+
+    blit=True 时曲线为 animated 艺术家：常规重绘只画背景（坐标轴、网格、标题），
+    曲线在 draw_event 中叠加；保存图片时 matplotlib 会正常绘制 animated 艺术家。
+    """
+
+    def __init__(self, canvas, blit=True):
+        self.canvas = canvas
+        self.blit = blit
+        self.traces = {}            # key -> {'line', 'x', 'y'}
+        self.overlays = []          # 叠加在曲线上方的艺术家（图例等）
+        self._axes_cids = {}        # ax -> xlim_changed 回调 id
+        self._background = None
+        self._background_limits = None
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    # ---------- 曲线 ----------
+    def plot(self, ax, key, x, y, **kwargs):
+        """在 ax 上绘制/复用名为 key 的曲线，返回 Line2D"""
+        x = np.asarray(x)
+        y = np.asarray(y)
+        trace = self.traces.get(key)
+        if trace is not None and trace['line'].axes is ax:
+            trace['line'].set(**kwargs)
+            trace['x'], trace['y'] = x, y
+            self._refresh_trace(trace, self._initial_xlim(ax, x))
+            return trace['line']
+
+        if trace is not None:
+            self.remove(key)
+        # 新曲线直接以包络数据创建，坐标轴的数据范围 (dataLim) 随之更新
+        x_env, y_env = minmax_envelope(x, y, self._initial_xlim(ax, x), self._n_bins(ax))
+        line, = ax.plot(x_env, y_env, animated=self.blit, **kwargs)
+        self.traces[key] = {'line': line, 'x': x, 'y': y}
+        if ax not in self._axes_cids:
+            self._axes_cids[ax] = ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+        return line
+
+    def set_data(self, key, x, y, redraw=True):
+        """替换曲线数据（复用 Line2D）；需要自动缩放时由调用者 relim"""
+        trace = self.traces[key]
+        trace['x'] = np.asarray(x)
+        trace['y'] = np.asarray(y)
+        ax = trace['line'].axes
+        self._refresh_trace(trace, self._initial_xlim(ax, trace['x']))
+        if redraw:
+            self.update()
+
+    def add_overlay(self, artist):
+        """图例等需要画在曲线上方的艺术家"""
+        if self.blit:
+            artist.set_animated(True)
+        self.overlays.append(artist)
+
+    def remove(self, key):
+        trace = self.traces.pop(key, None)
+        if trace is not None and trace['line'].axes is not None:
+            trace['line'].remove()
+
+    def clear(self):
+        """断开回调并遗忘所有曲线（坐标轴将被清空/删除时调用）"""
+        for ax, cid in self._axes_cids.items():
+            ax.callbacks.disconnect(cid)
+        self._axes_cids.clear()
+        self.traces.clear()
+        self.overlays.clear()
+        self._background = None
+        self._background_limits = None
+
+    # ---------- 重绘 ----------
+    def update(self):
+        """坐标范围未变且已有背景时 blit，否则整体重绘"""
+        if (not self.blit or self._background is None
+                or self._background_limits != self._limits()):
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def _on_draw(self, event):
+        if not self.blit:
+            return
+        if self.canvas.is_saving():
+            # 保存图片时渲染器分辨率不同，背景作废
+            self._background = None
+            return
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._background_limits = self._limits()
+        self._draw_animated()
+
+    def _draw_animated(self):
+        fig = self.canvas.figure
+        for trace in self.traces.values():
+            line = trace['line']
+            if line.axes is not None and line.get_visible():
+                fig.draw_artist(line)
+        for artist in self.overlays:
+            if artist.get_figure() is not None and artist.get_visible():
+                fig.draw_artist(artist)
+
+    def _limits(self):
+        axes = {trace['line'].axes for trace in self.traces.values()}
+        return tuple(sorted((id(ax), ax.get_xlim(), ax.get_ylim(),
+                             tuple(ax.bbox.bounds)) for ax in axes if ax is not None))
+
+    # ---------- 降采样 ----------
+    def _on_xlim_changed(self, ax):
+        xlim = ax.get_xlim()
+        for trace in self.traces.values():
+            if trace['line'].axes is ax:
+                self._refresh_trace(trace, xlim)
+        self.canvas.draw_idle()
+
+    def _refresh_trace(self, trace, xlim):
+        line = trace['line']
+        x_env, y_env = minmax_envelope(trace['x'], trace['y'], xlim, self._n_bins(line.axes))
+        line.set_data(x_env, y_env)
+
+    @staticmethod
+    def _n_bins(ax):
+        """包络列数 = 坐标轴像素宽度"""
+        return max(int(ax.bbox.width), 200)
+
+    @staticmethod
+    def _initial_xlim(ax, x):
+        """坐标轴仍处于自动缩放时按全部数据降采样，否则按当前可见范围"""
+        if ax.get_autoscalex_on() or len(x) == 0:
+            return None
+        return ax.get_xlim()
@@ -5,6 +5,19 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 
+from gui.decimated_plot import DecimatedPlot
+
+def sync_wavelength_axis(ax_bottom, ax_top, fmt='{:.3f}'):
+    """顶部波长轴 (µm) 的范围与刻度对齐底部波数轴 (cm⁻¹)；连接到底部轴的 xlim_changed 以随缩放更新"""
+    x0, x1 = sorted(ax_bottom.get_xlim())
+    ax_top.set_xlim(ax_bottom.get_xlim())
+    ticks = ax_bottom.xaxis.get_major_locator().tick_values(x0, x1)
+    ticks = ticks[(ticks > 0) & (ticks >= x0) & (ticks <= x1)]
+    if len(ticks) > 10:
+        ticks = np.linspace(max(x0, 1e-6), x1, 8)
+    ax_top.set_xticks(ticks)
+    ax_top.set_xticklabels([fmt.format(10000 / t) for t in ticks])
+
 class SpectrumCanvas(FigureCanvas):
     def __init__(self, parent=None, width=10, height=6, dpi=100):
         self.fig = Figure(figsize=(width, height), dpi=dpi)
@@ -12,31 +25,53 @@ class SpectrumCanvas(FigureCanvas):
         super().__init__(self.fig)
         self.toolbar = NavigationToolbar(self, parent)   # 工具栏
         self.axes.set_facecolor('#fcfcfc')
+        # 曲线按像素 min/max 包络降采样，缩放时自动重算
+        self.decimator = DecimatedPlot(self)
+        self.ax_top = None
+        self._layout = None
 
     def clear_all(self):
+        self.decimator.clear()
         self.fig.clear()
         self.axes = self.fig.add_subplot(111)
         self.axes.set_facecolor('#fcfcfc')
+        self.ax_top = None
+        self._layout = None
 
     def plot_mixture(self, wavenumber, total_coef, individual_coefs, transmittance,
                      params=None, title="Mixture Spectrum",
                      grid_density='fine', show_wavelength=True):
         """
         绘制混合光谱：总吸收系数、各分子分量、透射率
+        曲线组合与样式不变时复用已有曲线，只替换数据
         """
-        self.clear_all()
         if len(wavenumber) == 0:
+            self.clear_all()
             self.draw()
             return
 
-        # 下采样（避免 UI 卡顿）
-        step = max(1, len(wavenumber) // 50000)
-        wn = wavenumber[::step]
-
         # 颜色方案
         colors = ['orange', 'green', 'purple', 'brown', 'pink', 'cyan']
         # 分子列表按名称排序，保证颜色一致
         mol_names = sorted(individual_coefs.keys())
+        shown = [name for name in mol_names
+                 if np.max(np.abs(individual_coefs[name])) > 1e-12]
+        has_total = np.max(np.abs(total_coef)) > 1e-12
+
+        final_title = title
+        if params:
+            T = params.get('T', '?')
+            p = params.get('p', '?')
+            l = params.get('l', '?')
+            final_title += f" (T={T} K, p={p} atm, L={l} cm)"
+
+        layout = (tuple(shown), has_total, show_wavelength, grid_density)
+        if layout == self._layout:
+            self._replace_data(wavenumber, total_coef, individual_coefs, transmittance,
+                               shown, has_total, final_title)
+            return
+
+        self.clear_all()
 
         # ---- 左轴：吸收系数 ----
         ax_left = self.axes
@@ -44,18 +79,19 @@ class SpectrumCanvas(FigureCanvas):
         labels = []
 
         # 各分子分量（虚线）
-        for i, name in enumerate(mol_names):
-            coef = individual_coefs[name][::step]
-            if np.max(np.abs(coef)) > 1e-12:
-                line, = ax_left.plot(wn, coef, linestyle='--', color=colors[i % len(colors)],
-                                     linewidth=1.0, alpha=0.7, label=f'{name}')
-                lines.append(line)
-                labels.append(f'Abs. Coeff ({name})')
+        for name in shown:
+            i = mol_names.index(name)
+            line = self.decimator.plot(ax_left, name, wavenumber, individual_coefs[name],
+                                       linestyle='--', color=colors[i % len(colors)],
+                                       linewidth=1.0, alpha=0.7, label=f'{name}')
+            lines.append(line)
+            labels.append(f'Abs. Coeff ({name})')
 
         # 总吸收系数（实线）
-        if np.max(np.abs(total_coef)) > 1e-12:
-            line_total, = ax_left.plot(wn, total_coef[::step], color='red',
-                                       linewidth=1.5, alpha=0.8, label='Total Abs. Coeff')
+        if has_total:
+            line_total = self.decimator.plot(ax_left, 'Total', wavenumber, total_coef,
+                                             color='red', linewidth=1.5, alpha=0.8,
+                                             label='Total Abs. Coeff')
             lines.append(line_total)
             labels.append('Total Abs. Coeff')
 
@@ -65,34 +101,24 @@ class SpectrumCanvas(FigureCanvas):
 
         # ---- 右轴：透射率 ----
         ax_right = ax_left.twinx()
-        line_tr, = ax_right.plot(wn, transmittance[::step], color='blue',
-                                 linewidth=1.5, alpha=0.9, label='Transmittance')
+        line_tr = self.decimator.plot(ax_right, 'Transmittance', wavenumber, transmittance,
+                                      color='blue', linewidth=1.5, alpha=0.9,
+                                      label='Transmittance')
         lines.append(line_tr)
         labels.append('Transmittance')
         ax_right.set_ylabel('Transmittance', color='blue', fontsize=11)
         ax_right.tick_params(axis='y', labelcolor='blue')
         ax_right.set_ylim(-0.05, 1.05)
 
-        # ---- 双 X 轴：波长 ----
+        # ---- 双 X 轴：波长（随缩放同步） ----
         if show_wavelength:
-            ax_top = ax_left.twiny()
-            ax_top.set_xlim(ax_left.get_xlim())
-            ax_top.set_xlabel('Wavelength (µm)', fontsize=11)
-            ticks = ax_left.get_xticks()
-            ticks = ticks[(ticks > 0) & (ticks >= wavenumber.min()) & (ticks <= wavenumber.max())]
-            if len(ticks) > 10:
-                ticks = np.linspace(wavenumber.min(), wavenumber.max(), 8)
-            ax_top.set_xticks(ticks)
-            ax_top.set_xticklabels([f'{10000/t:.3f}' for t in ticks])
-            ax_top.tick_params(axis='x', direction='in', pad=10)
+            self.ax_top = ax_left.twiny()
+            self.ax_top.set_xlabel('Wavelength (µm)', fontsize=11)
+            self.ax_top.tick_params(axis='x', direction='in', pad=10)
+            self._sync_wavelength_axis(ax_left)
+            ax_left.callbacks.connect('xlim_changed', self._sync_wavelength_axis)
 
         # ---- 标题 ----
-        final_title = title
-        if params:
-            T = params.get('T', '?')
-            p = params.get('p', '?')
-            l = params.get('l', '?')
-            final_title += f" (T={T} K, p={p} atm, L={l} cm)"
         ax_left.set_title(final_title, fontsize=12, fontweight='bold')
 
         # ---- 图例 ----
@@ -100,6 +126,7 @@ class SpectrumCanvas(FigureCanvas):
             legend = ax_left.legend(lines, labels, loc='upper right', fontsize=9,
                                     framealpha=0.9)
             legend.get_frame().set_edgecolor('gray')
+            self.decimator.add_overlay(legend)
 
         # ---- 网格 ----
         grid_styles = {'fine': {'alpha':0.3, 'ls':':', 'lw':0.5},
@@ -109,4 +136,32 @@ class SpectrumCanvas(FigureCanvas):
         ax_left.grid(True, alpha=gs['alpha'], linestyle=gs['ls'], linewidth=gs['lw'])
 
         self.fig.tight_layout(pad=3.0)
-        self.draw()
\ No newline at end of file
+        self._layout = layout
+        self.draw()
+
+    def _replace_data(self, wavenumber, total_coef, individual_coefs, transmittance,
+                      shown, has_total, final_title):
+        """复用已有曲线：x 轴恢复自动缩放后替换数据"""
+        ax_left = self.axes
+        ax_left.set_autoscalex_on(True)
+        ax_left.set_autoscaley_on(True)
+        for name in shown:
+            self.decimator.set_data(name, wavenumber, individual_coefs[name], redraw=False)
+        if has_total:
+            self.decimator.set_data('Total', wavenumber, total_coef, redraw=False)
+        self.decimator.set_data('Transmittance', wavenumber, transmittance, redraw=False)
+        ax_left.relim()
+        ax_left.autoscale_view()
+
+        # 标题变化需要整体重绘；否则坐标范围不变时只 blit 曲线
+        if ax_left.get_title() != final_title:
+            ax_left.set_title(final_title, fontsize=12, fontweight='bold')
+            self.draw_idle()
+        else:
+            self.decimator.update()
+
+    def _sync_wavelength_axis(self, ax_left=None):
+        """顶部波长轴与底部波数轴保持一致"""
+        if self.ax_top is None:
+            return
+        sync_wavelength_axis(ax_left or self.axes, self.ax_top)
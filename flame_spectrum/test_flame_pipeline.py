@@ -0,0 +1,82 @@
+# test_flame_pipeline.py
+"""
+FlameSpectrumPipeline / run_batch：φ 扫描结果与逐步调用 spectrum()、HitranSpectrum 一致
+
+在 flame_spectrum/ 下运行:
+    python -m pytest test_flame_pipeline.py
+"""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cantera")
+
+from core.flame_pipeline import FlameSpectrumPipeline, run_batch
+
+DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hitran_database')
+Q_FOLDER = os.path.join(DB_DIR, 'Q')
+MOLECULE_FILES = {
+    'CO': os.path.join(DB_DIR, '05_CO', 'CO_1416.par'),
+    'NO': os.path.join(DB_DIR, '08_NO', '08_hit08.par'),
+}
+CASES = [{'fuel': 'CH4:1', 'oxidizer': 'O2:1, N2:3.76', 'phi': phi, 'L': 10.0,
+          'start': 1890.0, 'end': 1910.0, 'resolution': 0.05}
+         for phi in (0.8, 1.0, 1.2)]
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return FlameSpectrumPipeline(Q_FOLDER, MOLECULE_FILES)
+
+
+@pytest.fixture(scope="module")
+def serial():
+    return run_batch(CASES, Q_FOLDER, MOLECULE_FILES)
+
+
+def test_phi_sweep_matches_spectrum(pipeline, serial):
+    """run_batch 的 φ 扫描与逐步 equilibrate -> apply_state -> spectrum() 及光谱引擎直接计算一致"""
+    assert len(serial) == len(CASES)
+    assert len({res['params']['T'] for res in serial}) == len(CASES)
+    for case, res in zip(CASES, serial):
+        results = pipeline.equilibrate(case['fuel'], case['oxidizer'], case['phi'])
+        T, p = pipeline.apply_state(results)
+        assert res['params']['T'] == pytest.approx(T)
+        assert res['params']['p'] == pytest.approx(p)
+        for name, conc in res['concentrations'].items():
+            assert conc == pytest.approx(pipeline.hitran.molecules[name]['conc'])
+
+        ref = pipeline.spectrum(T, p, case['L'], start=case['start'], end=case['end'],
+                                resolution=case['resolution'])
+        np.testing.assert_allclose(res['wavenumber'], ref['wavenumber'])
+        np.testing.assert_allclose(res['Tr'], ref['Tr'], rtol=1e-12)
+        for name in MOLECULE_FILES:
+            np.testing.assert_allclose(res['individual_coefs'][name],
+                                       ref['individual_coefs'][name], rtol=1e-12)
+
+        # 不经缓存、直接由光谱引擎计算
+        total_k, _, _ = pipeline.hitran.coef_mixture(T, p, ref['wavenumber'])
+        np.testing.assert_allclose(ref['total_coef'], total_k, rtol=1e-12)
+        np.testing.assert_allclose(ref['Tr'], np.exp(-total_k * case['L']), rtol=1e-12)
+        assert ref['Tr'].min() < 1.0
+
+
+def test_run_batch_parallel_matches_serial(serial):
+    """进程池与串行结果一致，顺序与 cases 相同"""
+    pooled = run_batch(CASES, Q_FOLDER, MOLECULE_FILES, workers=2)
+    for case, a, b in zip(CASES, serial, pooled):
+        assert b['params']['phi'] == case['phi']
+        assert a['params']['T'] == pytest.approx(b['params']['T'], rel=1e-12)
+        np.testing.assert_allclose(a['Tr'], b['Tr'], rtol=1e-9)
+
+
+def test_cross_section_cache(pipeline):
+    """同一状态复用截面；温度变化时重新计算"""
+    wn = np.arange(1890.0, 1910.0, 0.05)
+    first = pipeline.cross_section('NO', 2000.0, 1.0, wn)
+    assert pipeline.cross_section('NO', 2000.0, 1.0, wn) is first
+    hotter = pipeline.cross_section('NO', 2200.0, 1.0, wn)
+    assert hotter is not first
+    np.testing.assert_allclose(hotter, pipeline.hitran.cross_section('NO', 2200.0, 1.0, wn))
+    assert not np.allclose(hotter, first, rtol=1e-3, atol=0.0)
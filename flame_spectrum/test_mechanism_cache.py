@@ -0,0 +1,43 @@
+# test_mechanism_cache.py
+"""
+load_mechanism：机理只解析一次，每次返回独立的 ct.Solution，结果与直接加载一致
+
+在 flame_spectrum/ 下运行:
+    python -m pytest test_mechanism_cache.py
+"""
+import pytest
+
+ct = pytest.importorskip("cantera")
+
+from core.mechanism_cache import clear_mechanism_cache, load_mechanism
+
+
+def _equilibrium_T(gas):
+    gas.TPX = 300.0, ct.one_atm, 'CH4:1, O2:2, N2:7.52'
+    gas.equilibrate('HP')
+    return gas.T
+
+
+def test_solutions_are_independent():
+    """两次调用得到不同对象：一个被 equilibrate 后另一个状态不变"""
+    clear_mechanism_cache()
+    a, b = load_mechanism(), load_mechanism()
+    assert a is not b
+    assert a.n_reactions == b.n_reactions > 0
+    T_eq = _equilibrium_T(a)
+    assert b.T == pytest.approx(300.0) and b.P == pytest.approx(ct.one_atm)
+    assert T_eq == pytest.approx(_equilibrium_T(ct.Solution('gri30.yaml')), rel=1e-10)
+    assert load_mechanism(transport=True).transport_model != 'none'
+
+
+def test_species_subset():
+    """组分子集保持机理顺序、无反应；不存在的组分报错"""
+    names = ['N2', 'O2', 'CH4', 'CO2', 'H2O', 'CO', 'H2', 'OH', 'H', 'O']
+    gas = load_mechanism(species=names)
+    assert gas is not load_mechanism(species=names)
+    full = load_mechanism().species_names
+    assert gas.species_names == [n for n in full if n in names]
+    assert gas.n_reactions == 0
+    assert 2000.0 < _equilibrium_T(gas) < 2400.0
+    with pytest.raises(ValueError):
+        load_mechanism(species=['N2', 'XX'])
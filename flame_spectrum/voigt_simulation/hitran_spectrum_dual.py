@@ -14,6 +14,11 @@ from scipy import constants
 import pathlib
 import os
 
+
+class CalculationCancelled(Exception):
+    """光谱计算被取消 (cancel 事件已置位)"""
+
+
 class HitranSpectrum:
     """
     HITRAN光谱仿真类
@@ -203,6 +208,9 @@ class HitranSpectrum:
     cP = constants.physical_constants['standard atmosphere'][0] * 10  # 压力单位转换为CGS的Ba
     cGammaD = math.sqrt(2 * cBolts * cNA * math.log(2)) / cc  # 多普勒展宽常数
     
+    # 每计算这么多条谱线检查一次取消并汇报进度
+    PROGRESS_CHUNK = 1000
+    
     def __init__(self, q_folder=None):
         """
         初始化HitranSpectrum类
@@ -475,7 +483,8 @@ class HitranSpectrum:
         
         return voigt
     
-    def coef_single(self, molecule_name, T, p, wavenumber=None, start=None, end=None, resolution=0.001, omega_wing=10):
+    def coef_single(self, molecule_name, T, p, wavenumber=None, start=None, end=None, resolution=0.001, omega_wing=10,
+                    progress=None, cancel=None):
         """
         计算单个分子的吸收系数
         
@@ -488,6 +497,8 @@ class HitranSpectrum:
         end: 结束波数 (可选)
         resolution: 分辨率 (cm⁻¹)
         omega_wing: 谱线计算域的倍数
+        progress: 可选回调 progress(已处理谱线数, 总谱线数)
+        cancel: 可选 threading.Event，置位后抛出 CalculationCancelled
         
         返回:
         coef_array: 吸收系数数组
@@ -515,7 +526,12 @@ class HitranSpectrum:
         q_T = self.get_partition_function(molecule_name, int(T))
         q_T_ref = self.get_partition_function(molecule_name, int(self.T_ref))
         
-        for line in database:
+        n_lines = len(database)
+        for i, line in enumerate(database):
+            if i % self.PROGRESS_CHUNK == 0:
+                self._check_cancel(cancel)
+                if progress is not None:
+                    progress(i, n_lines)
             nu = line[0]
             S = line[1]
             gamma_air = line[3]
@@ -553,9 +569,12 @@ class HitranSpectrum:
             # 累加到吸收系数
             coef_array[indices] += profile * intensity
         
+        if progress is not None:
+            progress(n_lines, n_lines)
         return coef_array, wavenumber
     
-    def coef_mixture(self, T, p, wavenumber=None, start=None, end=None, resolution=0.001, omega_wing=10):
+    def coef_mixture(self, T, p, wavenumber=None, start=None, end=None, resolution=0.001, omega_wing=10,
+                     progress=None, cancel=None):
         """
         计算混合气体的总吸收系数
         
@@ -567,6 +586,8 @@ class HitranSpectrum:
         end: 结束波数 (可选)
         resolution: 分辨率 (cm⁻¹)
         omega_wing: 谱线计算域的倍数
+        progress: 可选回调，按全部分子的谱线总数汇报 progress(已处理, 总数)
+        cancel: 可选 threading.Event，置位后抛出 CalculationCancelled
         
         返回:
         total_coef: 总吸收系数数组
@@ -589,16 +610,26 @@ class HitranSpectrum:
         total_coef = np.zeros(len(wavenumber))
         individual_coefs = {}
         
+        total_lines = sum(len(self.molecules[name]['database']) for name in self.molecule_list)
+        done = 0
+        
         # 计算每个分子的吸收系数并累加
         for molecule_name in self.molecule_list:
+            self._check_cancel(cancel)
             print(f"计算分子 {molecule_name} 的吸收系数...")
-            coef_array, _ = self.coef_single(molecule_name, T, p, wavenumber, start, end, resolution, omega_wing)
+            molecule_progress = None
+            if progress is not None:
+                molecule_progress = lambda i, n, offset=done: progress(offset + i, total_lines)
+            coef_array, _ = self.coef_single(molecule_name, T, p, wavenumber, start, end, resolution, omega_wing,
+                                             progress=molecule_progress, cancel=cancel)
+            done += len(self.molecules[molecule_name]['database'])
             individual_coefs[molecule_name] = coef_array
             total_coef += coef_array
         
         return total_coef, wavenumber, individual_coefs
     
-    def OD_mixture(self, T, p, l, wavenumber=None, start=None, end=None, resolution=0.001, omega_wing=10):
+    def OD_mixture(self, T, p, l, wavenumber=None, start=None, end=None, resolution=0.001, omega_wing=10,
+                   progress=None, cancel=None):
         """
         计算混合气体的光学深度、吸收率和透射率
         
@@ -611,6 +642,7 @@ class HitranSpectrum:
         end: 结束波数 (可选)
         resolution: 分辨率 (cm⁻¹)
         omega_wing: 谱线计算域的倍数
+        progress, cancel: 见 coef_mixture
         
         返回:
         OD: 总光学深度
@@ -621,7 +653,8 @@ class HitranSpectrum:
         individual_ODs: 各分子光学深度字典
         """
         # 计算总吸收系数
-        total_coef, wavenumber, individual_coefs = self.coef_mixture(T, p, wavenumber, start, end, resolution, omega_wing)
+        total_coef, wavenumber, individual_coefs = self.coef_mixture(T, p, wavenumber, start, end, resolution, omega_wing,
+                                                                     progress=progress, cancel=cancel)
         
         # 计算总光学深度、透射率和吸收率
         # 注意：这里使用总压力p，因为各分子的浓度已经在吸收系数计算中考虑了
@@ -638,6 +671,11 @@ class HitranSpectrum:
         
         return OD, Ab, Tr, wavenumber, total_coef, individual_ODs
     
+    @staticmethod
+    def _check_cancel(cancel):
+        if cancel is not None and cancel.is_set():
+            raise CalculationCancelled("光谱计算已取消")
+    
     def get_molecule_info(self, molecule_name=None):
         """
         获取分子信息
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+整段序列导出物理量基准测试
+对比: 逐帧循环 (liutex_2d + compute_all_fields，各自计算一次梯度)
+      与 compute_fields_stack（共用梯度，按时间分块向量化）
+并检查两者结果一致。
+
+用法 (在 piv_plif_loader/ 下运行):
+    python benchmarks/field_benchmark.py                    # 合成数据 200 帧 128x160
+    python benchmarks/field_benchmark.py --nt 1000 --ny 256 --nx 320
+    python benchmarks/field_benchmark.py --chunks 8 32 128
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.liutex import liutex_2d
+from core.field_calculations import compute_all_fields, compute_fields_stack
+
+QUANTITIES = ('Velocity magnitude', 'Vorticity', 'Divergence', 'Grad U', 'Grad V', 'Liutex')
+
+
+def make_field(nt, ny, nx, seed=0):
+    """带随机扰动的一列对流涡 (float32)"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:ny, 0:nx].astype(np.float32)
+    U = np.empty((nt, ny, nx), dtype=np.float32)
+    V = np.empty((nt, ny, nx), dtype=np.float32)
+    for t in range(nt):
+        phase = 2 * np.pi * (x / 40.0 - t / 25.0)
+        U[t] = 1.0 + 0.3 * np.sin(phase) * np.cos(2 * np.pi * y / 40.0)
+        V[t] = -0.3 * np.cos(phase) * np.sin(2 * np.pi * y / 40.0)
+    U += 0.01 * rng.standard_normal(U.shape, dtype=np.float32)
+    V += 0.01 * rng.standard_normal(V.shape, dtype=np.float32)
+    return U, V
+
+
+def per_frame(U, V, dx, dy):
+    """原 precompute_fields 的做法"""
+    out = {q: np.empty(U.shape, dtype=np.float32) for q in QUANTITIES}
+    for t in range(U.shape[0]):
+        R, _, _, _ = liutex_2d(U[t], V[t], dx, dy, signed=True)
+        fields = compute_all_fields(U[t], V[t], dx, dy)
+        for q in QUANTITIES[:-1]:
+            out[q][t] = fields[q]
+        out['Liutex'][t] = R
+    return out
+
+
+def _time(func, *args, repeat=3, **kwargs):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="整段序列导出物理量基准测试")
+    parser.add_argument('--nt', type=int, default=200)
+    parser.add_argument('--ny', type=int, default=128)
+    parser.add_argument('--nx', type=int, default=160)
+    parser.add_argument('--chunks', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--repeat', type=int, default=3, help="每项重复次数（取最短）")
+    args = parser.parse_args()
+
+    dx, dy = 0.5, 0.5
+    U, V = make_field(args.nt, args.ny, args.nx)
+    n_frames = args.nt
+    print(f"\n序列 {U.shape}, float32, {U.nbytes / 1e6:.1f} MB / 分量")
+    print(f"{'方法':<34}{'耗时 (s)':>10}{'帧/s':>10}{'加速比':>9}{'最大误差':>12}")
+    print('-' * 75)
+
+    base, ref = _time(per_frame, U, V, dx, dy, repeat=args.repeat)
+    print(f"{'逐帧循环':<34}{base:10.3f}{n_frames / base:10.1f}{1.0:9.2f}{'-':>12}")
+    for chunk in args.chunks:
+        seconds, out = _time(compute_fields_stack, U, V, dx, dy, QUANTITIES,
+                             chunk_size=chunk, repeat=args.repeat)
+        err = max(float(np.max(np.abs(out[q] - ref[q]))) for q in QUANTITIES)
+        name = f"compute_fields_stack chunk={chunk}"
+        print(f"{name:<34}{seconds:10.3f}{n_frames / seconds:10.1f}{base / seconds:9.2f}{err:12.2e}")
+
+    # 输出数组预先分配（如写入 np.memmap）时不计分配与首次写入缺页的开销
+    out = {q: np.zeros(U.shape, dtype=np.float32) for q in QUANTITIES}
+    seconds, _ = _time(compute_fields_stack, U, V, dx, dy, QUANTITIES, out=out,
+                       repeat=args.repeat)
+    name = "compute_fields_stack out=预分配"
+    print(f"{name:<34}{seconds:10.3f}{n_frames / seconds:10.1f}{base / seconds:9.2f}{'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF TIFF 序列读取基准测试
+对比: load_plif_batch（逐个文件、每个文件依次尝试读取库、转为 float64）
+      与 read_tiff_stack（后端只选一次，线程池解码到预分配 uint16 数组，原地右移）
+并给出读取吞吐量 (MB/s)，与磁盘顺序读速度对照。
+
+用法 (在 piv_plif_loader/ 下运行):
+    python benchmarks/plif_read_benchmark.py                       # 合成 500 帧 512x640
+    python benchmarks/plif_read_benchmark.py --folder D:/PLIF/run1 # 真实 Photron 文件夹
+    python benchmarks/plif_read_benchmark.py --workers 1 4 8
+"""
+import os
+import sys
+import time
+import pathlib
+import tempfile
+import argparse
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.plif_loader import load_plif_batch
+from core.plif_reader import read_tiff_stack
+
+
+def make_folder(folder, nt, ny, nx, shift=4, seed=0):
+    """合成 12-bit 有效位、高位存储的 16-bit TIFF 序列"""
+    import tifffile
+    rng = np.random.default_rng(seed)
+    files = []
+    for i in range(nt):
+        path = pathlib.Path(folder) / f"C001H001S0001{i:06d}.tif"
+        tifffile.imwrite(path, rng.integers(0, 4096, (ny, nx), dtype=np.uint16) << shift)
+        files.append(path)
+    return files
+
+
+def run(files, workers_list, shift, serial):
+    nbytes = sum(f.stat().st_size for f in files)
+    print(f"{len(files)} 帧, {nbytes / 2**20:.0f} MB")
+    # 顺序读原始字节作为磁盘速度参考（二次读取通常命中页缓存）
+    t0 = time.perf_counter()
+    for f in files:
+        f.read_bytes()
+    t = time.perf_counter() - t0
+    print(f"  {'原始字节读取':<28s} {t:7.2f} s  {nbytes / 2**20 / t:8.0f} MB/s")
+    if serial:
+        t0 = time.perf_counter()
+        load_plif_batch(files, bit_shift=shift, verbose=False)
+        t = time.perf_counter() - t0
+        print(f"  {'load_plif_batch':<28s} {t:7.2f} s  {nbytes / 2**20 / t:8.0f} MB/s")
+    for w in workers_list:
+        t0 = time.perf_counter()
+        r = read_tiff_stack(files, bit_shift=shift, workers=w)
+        t = time.perf_counter() - t0
+        label = f"read_tiff_stack({w} 线程)"
+        print(f"  {label:<28s} {t:7.2f} s  {nbytes / 2**20 / t:8.0f} MB/s  [{r['backend']}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PLIF TIFF 读取基准")
+    parser.add_argument('--folder', default=None, help="已有 TIFF 文件夹（默认生成合成数据）")
+    parser.add_argument('--nt', type=int, default=500)
+    parser.add_argument('--ny', type=int, default=512)
+    parser.add_argument('--nx', type=int, default=640)
+    parser.add_argument('--shift', type=int, default=4)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--no-serial', action='store_true', help="不运行 load_plif_batch 对照")
+    args = parser.parse_args()
+    workers = sorted(set(args.workers))
+
+    if args.folder:
+        folder = pathlib.Path(args.folder)
+        files = sorted(folder.glob('*.tif')) + sorted(folder.glob('*.tiff'))
+        run(files, workers, args.shift, not args.no_serial)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_folder(tmp, args.nt, args.ny, args.nx, args.shift)
+        run(files, workers, args.shift, not args.no_serial)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF 分区条件统计
+PLIF（或其增强掩膜）配准到 PIV 网格后按阈值分区（如 0 = 未燃、1 = 已燃），
+对 PIV 导出量（涡量、Liutex、散度 ...）统计各区、各帧的样本数、均值、方差与直方图。
+
+统计按时间块一遍完成：每块把 (帧, 区) 合成一个下标，用 np.bincount 加权计数一次得到
+所有帧、所有区的 Σ1、Σx、Σx²（相对参考值平移后累加，避免大均值时方差相消）；
+直方图同样以 (区, 箱) 为下标 bincount；frame_hist=True 时另以 (帧, 区, 箱) 为下标得到
+逐帧直方图。NaN（速度无效或 PLIF 范围外）不计入。
+
+plif_zones            PLIF 序列 → PIV 网格上的区标签 (nt, ny, nx) int8，-1 为无效
+conditional_statistics  条件统计主函数
+conditional_table / save_conditional / plot_conditional  导出与绘图
+"""
+
+import pathlib
+from typing import Callable, Dict, Any, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.plif_enhance import enhance_frame
+from core.plif_registration import cached_registration_map, apply_registration
+from core.plif_sequence import PlifSequence
+
+DEFAULT_ZONES = ('unburned', 'burned')
+HIST_BINS = 128
+
+
+def zone_labels(scalar: np.ndarray, thresholds: Sequence[float] = (0.5,)) -> np.ndarray:
+    """
+    按递增阈值分区：scalar < t0 为 0 区，t0 ≤ scalar < t1 为 1 区 ...；NaN 为 -1
+    增强图像（掩膜外为 0）取默认阈值 0.5 即 0 = 掩膜外（未燃）、1 = 掩膜内（已燃）
+    """
+    scalar = np.asarray(scalar)
+    labels = np.digitize(scalar, np.asarray(thresholds, dtype=np.float64)).astype(np.int8)
+    labels[~np.isfinite(scalar)] = -1
+    return labels
+
+
+def plif_zones(plif, piv_X: np.ndarray, piv_Y: np.ndarray, nt: Optional[int] = None,
+               thresholds: Sequence[float] = (0.5,), enhance: Optional[Dict[str, Any]] = None,
+               progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+    """
+    PLIF 序列配准到 PIV 网格后分区
+
+    Parameters
+    ----------
+    plif : PlifSequence 或 load_plif 格式的帧字典列表
+    piv_X, piv_Y : PIV 网格
+    nt : 输出帧数（通常为 PIV 帧数），PLIF 帧数较少时取最后一帧；None 为 PLIF 帧数
+    thresholds : 见 zone_labels；作用于增强图像（enhance 给出时）或原始标量场
+    enhance : enhance_frame 的参数（{} 为默认参数），None 为不增强
+
+    Returns
+    -------
+    (nt, ny, nx) int8 区标签，-1 为 PLIF 范围外
+    """
+    first = plif[0]
+    reg = cached_registration_map(first['X'], first['Y'], piv_X, piv_Y)
+    n_plif = len(plif)
+    nt = n_plif if nt is None else int(nt)
+    labels = np.empty((nt,) + tuple(reg['shape']), dtype=np.int8)
+    last = None
+    for t in range(nt):
+        i = min(t, n_plif - 1)
+        if i != last:
+            scalar = plif.scalar(i) if isinstance(plif, PlifSequence) else plif[i]['scalar']
+            if enhance is not None:
+                scalar = enhance_frame(scalar, **enhance)
+            zone = zone_labels(apply_registration(reg, scalar), thresholds)
+            last = i
+        labels[t] = zone
+        if progress is not None and ((t + 1) % 16 == 0 or t + 1 == nt):
+            progress(t + 1, nt)
+    return labels
+
+
+def _hist_range(v):
+    """由有效值的 0.5/99.5 分位数确定直方图区间，两端各留出一半跨度"""
+    lo, hi = np.percentile(v, (0.5, 99.5))
+    span = max(float(hi - lo), 1e-12)
+    return (float(lo) - 0.5 * span, float(hi) + 0.5 * span)
+
+
+def conditional_statistics(fields: Mapping[str, np.ndarray], labels: np.ndarray,
+                           zones: Sequence[str] = DEFAULT_ZONES, bins: int = HIST_BINS,
+                           hist_ranges: Optional[Mapping[str, Sequence[float]]] = None,
+                           chunk_mb: float = 64, frame_hist: bool = False,
+                           progress: Optional[Callable[[int, int], None]] = None
+                           ) -> Dict[str, Any]:
+    """
+    PIV 导出量在各区内的逐帧与整体条件统计
+
+    Parameters
+    ----------
+    fields : {物理量: (nt, ny, nx) 数组}（如 compute_fields_stack 的结果，可为 np.memmap）
+    labels : (nt, ny, nx) 整数区标签（plif_zones / zone_labels），< 0 不计入
+    zones : 各区名称，len(zones) 为区数
+    bins : 直方图箱数
+    hist_ranges : {物理量: (lo, hi)}；未给出的由首个含有效值的时间块确定，超出部分计入端箱
+    chunk_mb : 每个时间块（单个物理量 float64）的内存 [MB]
+    frame_hist : 同时统计逐帧直方图（每个物理量 nt × nz × bins 个计数）
+    progress : progress(已处理帧数, 总帧数)
+
+    Returns
+    -------
+    dict :
+        zones, fields           名称
+        count (nt, nz)          各帧各区的像素数（标签有效的点）
+        mean, var {物理量: (nt, nz)}   逐帧条件均值 / 方差（该区无有效值时为 NaN）
+        n {物理量: (nt, nz)}    逐帧参与统计的有效值个数
+        zone_mean, zone_var, zone_n {物理量: (nz,)}   整段序列的条件均值 / 方差 / 个数
+        histogram {物理量: (nz, bins)}, bin_edges {物理量: (bins + 1,)}
+        pdf {物理量: (nz, bins)}   各区归一化概率密度
+        frame_histogram {物理量: (nt, nz, bins)}   逐帧直方图（仅 frame_hist=True），
+                                与 histogram 共用 bin_edges，对帧求和即为 histogram
+    """
+    names = list(fields)
+    if not names:
+        raise ValueError("没有要统计的物理量")
+    labels_shape = np.shape(labels)
+    nt = labels_shape[0]
+    for name in names:
+        if np.shape(fields[name]) != labels_shape:
+            raise ValueError(f"{name} 形状 {np.shape(fields[name])} 与区标签 {labels_shape} 不一致")
+    nz = len(zones)
+    n_pix = int(np.prod(labels_shape[1:]))
+    step = max(1, int(chunk_mb * 2**20 // (n_pix * 8)))
+    hist_ranges = dict(hist_ranges or {})
+
+    count = np.zeros(nt * nz, dtype=np.int64)
+    s0 = {q: np.zeros(nt * nz) for q in names}
+    s1 = {q: np.zeros(nt * nz) for q in names}
+    s2 = {q: np.zeros(nt * nz) for q in names}
+    shift = {}
+    hist = {q: np.zeros(nz * bins, dtype=np.int64) for q in names}
+    frame_counts = {q: np.zeros(nt * nz * bins, dtype=np.int64) for q in names} if frame_hist else {}
+    edges = {}
+
+    for t0 in range(0, nt, step):
+        t1 = min(t0 + step, nt)
+        lab = np.asarray(labels[t0:t1]).reshape(t1 - t0, -1)
+        ok = (lab >= 0) & (lab < nz)
+        # (帧, 区) 合成下标，整块一次 bincount
+        idx = (np.arange(t0, t1)[:, None] * nz + lab)[ok]
+        count += np.bincount(idx, minlength=nt * nz)
+        for q in names:
+            x = np.asarray(fields[q][t0:t1], dtype=np.float64).reshape(t1 - t0, -1)
+            valid = ok & np.isfinite(x)
+            v = x[valid]
+            if q not in shift:
+                if v.size == 0:
+                    # 本块无有效值（如点火前、PLIF 范围外），参考值与直方图区间留给首个有数据的块
+                    continue
+                shift[q] = float(v.mean())
+                lo, hi = hist_ranges.get(q) or _hist_range(v)
+                edges[q] = np.linspace(lo, hi, bins + 1)
+            iv = (np.arange(t0, t1)[:, None] * nz + lab)[valid]
+            xv = v - shift[q]
+            s0[q] += np.bincount(iv, minlength=nt * nz)
+            s1[q] += np.bincount(iv, weights=xv, minlength=nt * nz)
+            s2[q] += np.bincount(iv, weights=xv * xv, minlength=nt * nz)
+            b = np.searchsorted(edges[q], v, side='right') - 1
+            np.clip(b, 0, bins - 1, out=b)
+            hist[q] += np.bincount(lab[valid].astype(np.intp) * bins + b, minlength=nz * bins)
+            if frame_hist:
+                # (帧, 区, 箱) 合成下标，只对本块的帧计数
+                k = (t1 - t0) * nz * bins
+                frame_counts[q][t0 * nz * bins:t0 * nz * bins + k] += np.bincount(
+                    (iv - t0 * nz) * bins + b, minlength=k)
+        if progress is not None:
+            progress(t1, nt)
+    for q in names:
+        if q not in shift:          # 整段序列都没有有效值
+            shift[q] = 0.0
+            edges[q] = np.linspace(*(hist_ranges.get(q) or (-1.0, 1.0)), bins + 1)
+
+    result = {
+        'zones': list(zones), 'fields': names,
+        'count': count.reshape(nt, nz),
+        'mean': {}, 'var': {}, 'n': {},
+        'zone_mean': {}, 'zone_var': {}, 'zone_n': {},
+        'histogram': {}, 'bin_edges': edges, 'pdf': {},
+    }
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for q in names:
+            n = s0[q].reshape(nt, nz)
+            a, b = s1[q].reshape(nt, nz), s2[q].reshape(nt, nz)
+            m = a / n
+            result['n'][q] = n.astype(np.int64)
+            result['mean'][q] = np.where(n > 0, m + shift[q], np.nan)
+            result['var'][q] = np.where(n > 0, np.maximum(b / n - m * m, 0.0), np.nan)
+            N, A, B = n.sum(axis=0), a.sum(axis=0), b.sum(axis=0)
+            M = A / N
+            result['zone_n'][q] = N.astype(np.int64)
+            result['zone_mean'][q] = np.where(N > 0, M + shift[q], np.nan)
+            result['zone_var'][q] = np.where(N > 0, np.maximum(B / N - M * M, 0.0), np.nan)
+            h = hist[q].reshape(nz, bins)
+            result['histogram'][q] = h
+            width = np.diff(edges[q])
+            total = h.sum(axis=1, keepdims=True)
+            result['pdf'][q] = np.where(total > 0, h / (total * width), 0.0)
+    if frame_hist:
+        result['frame_histogram'] = {q: c.reshape(nt, nz, bins) for q, c in frame_counts.items()}
+    return result
+
+
+def conditional_table(result: Dict[str, Any], per_frame: bool = True) -> pd.DataFrame:
+    """
+    条件统计的长表：每行 (frame, zone, field, n, mean, std)；per_frame=False 时为整段序列
+    （frame 列为 -1）
+    """
+    zones, rows = result['zones'], []
+    for q in result['fields']:
+        if per_frame:
+            n, mean, var = result['n'][q], result['mean'][q], result['var'][q]
+            nt = n.shape[0]
+            frame = np.repeat(np.arange(nt), len(zones))
+            zone = np.tile(zones, nt)
+        else:
+            n, mean, var = result['zone_n'][q], result['zone_mean'][q], result['zone_var'][q]
+            frame = np.full(len(zones), -1)
+            zone = np.asarray(zones)
+        rows.append(pd.DataFrame({
+            'frame': frame, 'zone': zone, 'field': q,
+            'n': np.ravel(n), 'mean': np.ravel(mean), 'std': np.sqrt(np.ravel(var)),
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def save_conditional(result: Dict[str, Any], path):
+    """
+    导出为 .npz（各物理量的逐帧均值/方差、直方图（含逐帧直方图）与箱边界）与同名 .csv 长表
+    （逐帧在前，整段序列 frame = -1 在后）
+    """
+    arrays = {'count': result['count'], 'zones': np.asarray(result['zones'])}
+    for q in result['fields']:
+        key = q.replace(' ', '_')
+        arrays[f'mean_{key}'] = result['mean'][q]
+        arrays[f'var_{key}'] = result['var'][q]
+        arrays[f'histogram_{key}'] = result['histogram'][q]
+        arrays[f'bin_edges_{key}'] = result['bin_edges'][q]
+        if 'frame_histogram' in result:
+            arrays[f'frame_histogram_{key}'] = result['frame_histogram'][q]
+    np.savez(path, **arrays)
+    table = pd.concat([conditional_table(result), conditional_table(result, per_frame=False)],
+                      ignore_index=True)
+    table.to_csv(pathlib.Path(path).with_suffix('.csv'), index=False)
+
+
+def plot_conditional(ax, result: Dict[str, Any], field: str,
+                     kind: str = 'pdf', zones: Optional[List[str]] = None):
+    """
+    在 matplotlib Axes 上绘制条件统计
+    kind='pdf' 为各区概率密度；kind='mean' 为各区逐帧均值 ± 标准差随帧的变化
+    """
+    zones = zones or result['zones']
+    for z in zones:
+        k = result['zones'].index(z)
+        if kind == 'pdf':
+            e = result['bin_edges'][field]
+            ax.plot(0.5 * (e[:-1] + e[1:]), result['pdf'][field][k], label=z)
+            ax.set_xlabel(field)
+            ax.set_ylabel('PDF')
+        elif kind == 'mean':
+            m = result['mean'][field][:, k]
+            s = np.sqrt(result['var'][field][:, k])
+            t = np.arange(len(m))
+            ax.plot(t, m, label=z)
+            ax.fill_between(t, m - s, m + s, alpha=0.2)
+            ax.set_xlabel('帧')
+            ax.set_ylabel(field)
+        else:
+            raise ValueError(f"未知绘图类型: {kind}")
+    ax.legend()
@@ -11,6 +11,8 @@ import pandas as pd
 import re
 from typing import Optional, Union, Tuple, Dict, Any, List
 
+from core.parallel_loader import load_stack_parallel, stack_to_frames
+
 
 # ============================================================================
 # 内部工具函数
@@ -285,8 +287,21 @@ def load_piv_batch(file_list: List[Union[str, pathlib.Path]],
                    size: int = 1,
                    x_origin: Optional[float] = None,
                    y_origin: Optional[float] = None,
-                   verbose: bool = True) -> List[Dict[str, Any]]:
-    """批量加载多个 PIV 文件"""
+                   verbose: bool = True,
+                   workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    批量加载多个 PIV 文件
+
+    workers 给定时用进程池并行解析：U、V 直接写入共享的 (n_frames, ny, nx) 数组，
+    返回的逐帧字典引用该数组的视图（X、Y 各帧共用），顺序与 file_list 一致。
+    """
+    if workers:
+        # 与逐个加载相同：全部失败时返回空列表
+        stack = load_stack_parallel(load_piv, file_list, workers, verbose, allow_empty=True,
+                                    filetype=filetype, size=size, x_origin=x_origin,
+                                    y_origin=y_origin)
+        return stack_to_frames(stack)
+
     results = []
     for f in file_list:
         try:
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+动态模态分解 (DMD)
+每帧的若干个场（如 PIV 的 U, V 与/或 PLIF 标量）展平拼接为快照 x_t，
+求线性映射 x_{t+1} ≈ K x_t 的特征值 λ 与模态 φ：
+频率 f = arg(λ) / (2π dt) [Hz]，增长率 σ = ln|λ| / dt [1/s]。
+
+compute_dmd     精确 DMD (Tu et al. 2014)，可选 SVD 秩截断。通过快照 Gram 矩阵求 SVD，
+                按空间行带分块访问各场（可为 np.memmap），内存只需一个行带 + nt × nt 矩阵
+StreamingDMD    流式 DMD (Hemati et al. 2014)，逐帧 update()，只保存秩不超过 max_rank 的
+                正交基与小矩阵，记录长度不受内存限制
+
+dt 为物理帧间隔，通常取 1 / core.fft_analyzer.sampling_rate(...)。
+"""
+
+from typing import Callable, Dict, Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def _field_bands(field, chunk_mb):
+    nt = field.shape[0]
+    row = int(np.prod(field.shape[2:], dtype=np.int64)) if field.ndim > 2 else 1
+    rows = max(1, int(chunk_mb * 2**20 / (nt * row * 8)))
+    n_rows = field.shape[1]
+    return [slice(y0, min(y0 + rows, n_rows)) for y0 in range(0, n_rows, rows)]
+
+
+def _blocks(fields, means, chunk_mb):
+    """逐个场、逐行带给出快照块 (nt, n_b)，float64，NaN 置 0"""
+    for f, (field, mean) in enumerate(zip(fields, means)):
+        for ys in _field_bands(field, chunk_mb):
+            block = np.asarray(field[:, ys], dtype=np.float64).reshape(field.shape[0], -1)
+            if mean is not None:
+                block = block - mean[ys].reshape(-1)
+            yield f, ys, np.nan_to_num(block, copy=False)
+
+
+def _spectrum(eigvals, dt):
+    with np.errstate(divide='ignore'):
+        omega = np.log(eigvals.astype(np.complex128)) / dt
+    return omega.imag / (2 * np.pi), omega.real
+
+
+def _result(eigvals, modes, amplitudes, dt, singular_values, shapes):
+    """按模态振幅降序整理结果，模态拆回各场的形状"""
+    freq, growth = _spectrum(eigvals, dt)
+    order = np.argsort(-np.abs(amplitudes))
+    split = np.cumsum([int(np.prod(s)) for s in shapes])[:-1]
+    parts = np.split(modes[:, order], split, axis=0)
+    return {
+        'eigenvalues': eigvals[order],
+        'frequency': freq[order],
+        'growth_rate': growth[order],
+        'amplitude': amplitudes[order],
+        'modes': [p.T.reshape((len(order),) + tuple(s)).astype(np.complex64)
+                  for p, s in zip(parts, shapes)],
+        'singular_values': singular_values,
+        'dt': dt,
+    }
+
+
+def compute_dmd(fields: Sequence[np.ndarray], dt: float = 1.0, rank: Optional[int] = None,
+                subtract_mean: bool = False, chunk_mb: float = 256,
+                progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    精确 DMD
+
+    Parameters
+    ----------
+    fields : [ndarray 或 np.memmap (nt, ...)]
+        参与分解的场，帧数须相同，空间形状可不同（如 [seq.U, seq.V, plif]）
+    dt : 帧间隔 [s]
+    rank : SVD 截断秩；None 时保留全部非零奇异值
+    subtract_mean : 是否先减去各点的时间平均（去掉 λ = 1 的平均流模态）
+    chunk_mb : 每个行带块的内存 [MB]
+    progress : progress(完成遍数, 总遍数)
+
+    Returns
+    -------
+    dict :
+        eigenvalues, frequency [Hz], growth_rate [1/s], amplitude (r,)  按 |amplitude| 降序
+        modes : [(r, ...) complex64]，与 fields 一一对应
+        singular_values, dt
+    """
+    fields = list(fields)
+    if not fields:
+        raise ValueError("至少需要一个场")
+    nt = fields[0].shape[0]
+    if any(f.shape[0] != nt for f in fields):
+        raise ValueError(f"各场帧数不一致: {[f.shape[0] for f in fields]}")
+    if nt < 3:
+        raise ValueError("DMD 至少需要 3 帧")
+    shapes = [f.shape[1:] for f in fields]
+
+    if subtract_mean:
+        means = []
+        for field in fields:
+            mean = np.empty(field.shape[1:])
+            for ys in _field_bands(field, chunk_mb):
+                mean[ys] = np.nanmean(np.asarray(field[:, ys]), axis=0, dtype=np.float64)
+            means.append(mean)
+    else:
+        means = [None] * len(fields)
+
+    # 第一遍：Gram 矩阵 G = A Aᵀ，X = A[:-1]ᵀ, Y = A[1:]ᵀ
+    G = np.zeros((nt, nt))
+    for _, _, A in _blocks(fields, means, chunk_mb):
+        G += A @ A.T
+    if progress is not None:
+        progress(1, 2)
+
+    # X = U Σ Vᵀ：XᵀX = V Σ² Vᵀ
+    lam, V = np.linalg.eigh(G[:-1, :-1])
+    order = np.argsort(lam)[::-1]
+    lam, V = lam[order], V[:, order]
+    keep = lam > max(lam[0], 0.0) * np.finfo(np.float64).eps * nt
+    if not keep.any():
+        raise ValueError("快照全为零，无法分解")
+    r = int(keep.sum()) if rank is None else max(1, min(int(rank), int(keep.sum())))
+    sigma = np.sqrt(lam[:r])
+    V = V[:, :r]
+    # Ã = Uᵀ Y V Σ⁻¹ = Σ⁻¹ Vᵀ (XᵀY) V Σ⁻¹
+    A_tilde = (V.T @ G[:-1, 1:] @ V) / np.outer(sigma, sigma)
+    eigvals, W = np.linalg.eig(A_tilde)
+    # 振幅：x_0 在投影模态 U W 上的坐标，Uᵀ x_0 = Σ Vᵀ e_0
+    amplitudes = np.linalg.solve(W, sigma * V[0])
+
+    # 第二遍：精确模态 Φ = Y V Σ⁻¹ W Λ⁻¹
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = (V / sigma) @ W / np.where(eigvals != 0, eigvals, np.inf)
+    modes = np.empty((sum(int(np.prod(s)) for s in shapes), r), dtype=np.complex128)
+    pos = 0
+    for _, _, A in _blocks(fields, means, chunk_mb):
+        nb = A.shape[1]
+        modes[pos:pos + nb] = A[1:].T @ weights
+        pos += nb
+    if progress is not None:
+        progress(2, 2)
+
+    result = _result(eigvals, modes, amplitudes, dt, np.sqrt(np.maximum(lam, 0.0)), shapes)
+    result['mean'] = means if subtract_mean else None
+    return result
+
+
+class StreamingDMD:
+    """
+    流式 DMD：逐帧更新，内存 O(n · max_rank)
+
+    Parameters
+    ----------
+    max_rank : 正交基的最大秩（超过时按 Gram 矩阵的主成分压缩）
+    tol : 新快照相对残差小于 tol 时不扩充基
+
+    用法:
+        sdmd = StreamingDMD(max_rank=20)
+        for frame in seq:
+            sdmd.update([frame['U'], frame['V']])
+        result = sdmd.compute(dt)
+    """
+
+    def __init__(self, max_rank: int = 20, tol: float = 1e-10):
+        self.max_rank = int(max_rank)
+        self.tol = float(tol)
+        self.n_frames = 0
+        self.shapes = None
+        self._x_prev = None
+        self._x0 = None
+        self.Qx = self.Qy = None
+        self.A = self.Gx = self.Gy = None
+
+    def update(self, fields: Sequence[np.ndarray]):
+        """加入一帧（与 compute_dmd 的 fields 顺序相同，每个为一帧的数组）"""
+        shapes = [np.shape(f) for f in fields]
+        if self.shapes is None:
+            self.shapes = shapes
+        elif shapes != self.shapes:
+            raise ValueError(f"快照形状 {shapes} 与首帧 {self.shapes} 不一致")
+        x = np.nan_to_num(np.concatenate([np.asarray(f, dtype=np.float64).ravel() for f in fields]))
+        self.n_frames += 1
+        if self._x_prev is None:
+            self._x_prev = self._x0 = x
+            return
+        self._add_pair(self._x_prev, x)
+        self._x_prev = x
+
+    def _add_pair(self, x, y):
+        if self.Qx is None:
+            nx, ny = np.linalg.norm(x), np.linalg.norm(y)
+            self.Qx = (x / nx if nx > 0 else x)[:, None]
+            self.Qy = (y / ny if ny > 0 else y)[:, None]
+            self.A = np.array([[ny * nx]])
+            self.Gx = np.array([[nx * nx]])
+            self.Gy = np.array([[ny * ny]])
+            return
+        if self._expand('Qx', x):
+            self.A = np.pad(self.A, ((0, 0), (0, 1)))
+            self.Gx = np.pad(self.Gx, ((0, 1), (0, 1)))
+        if self._expand('Qy', y):
+            self.A = np.pad(self.A, ((0, 1), (0, 0)))
+            self.Gy = np.pad(self.Gy, ((0, 1), (0, 1)))
+        if self.Qx.shape[1] > self.max_rank:
+            self.Qx, self.Gx, Ux = self._compress(self.Qx, self.Gx)
+            self.A = self.A @ Ux
+        if self.Qy.shape[1] > self.max_rank:
+            self.Qy, self.Gy, Uy = self._compress(self.Qy, self.Gy)
+            self.A = Uy.T @ self.A
+        xt, yt = self.Qx.T @ x, self.Qy.T @ y
+        self.A += np.outer(yt, xt)
+        self.Gx += np.outer(xt, xt)
+        self.Gy += np.outer(yt, yt)
+
+    def _expand(self, name, v):
+        """v 的残差超过 tol 时扩充正交基（两次 Gram-Schmidt）"""
+        Q = getattr(self, name)
+        e = v - Q @ (Q.T @ v)
+        e -= Q @ (Q.T @ e)
+        norm_v = np.linalg.norm(v)
+        if norm_v == 0 or np.linalg.norm(e) / norm_v <= self.tol:
+            return False
+        setattr(self, name, np.column_stack([Q, e / np.linalg.norm(e)]))
+        return True
+
+    def _compress(self, Q, G):
+        lam, U = np.linalg.eigh(G)
+        U = U[:, np.argsort(lam)[::-1][:self.max_rank]]
+        return Q @ U, U.T @ G @ U, U
+
+    def compute(self, dt: float = 1.0) -> Dict[str, Any]:
+        """当前的 DMD 结果（格式同 compute_dmd；振幅以首帧为参考）"""
+        if self.Qx is None:
+            raise ValueError("DMD 至少需要 2 帧")
+        # K ≈ Qy A Gx⁺ Qxᵀ，在 Qx 上的投影 Qxᵀ Qy A Gx⁺
+        K = self.Qx.T @ self.Qy @ self.A @ np.linalg.pinv(self.Gx)
+        eigvals, W = np.linalg.eig(K)
+        modes = self.Qx @ W
+        amplitudes = np.linalg.lstsq(W, self.Qx.T @ self._x0, rcond=None)[0]
+        sv = np.sqrt(np.maximum(np.linalg.eigvalsh(self.Gx)[::-1], 0.0))
+        result = _result(eigvals, modes, amplitudes, dt, sv, self.shapes)
+        result['mean'] = None
+        return result
+
+
+def dmd_table(result: Dict[str, Any]) -> pd.DataFrame:
+    """DMD 谱的表格（频率、增长率、特征值、振幅），用于导出 CSV"""
+    lam = result['eigenvalues']
+    return pd.DataFrame({
+        'frequency_Hz': result['frequency'],
+        'growth_rate_1/s': result['growth_rate'],
+        'eig_real': lam.real,
+        'eig_imag': lam.imag,
+        'eig_abs': np.abs(lam),
+        'amplitude': np.abs(result['amplitude']),
+    })
+
+
+def save_dmd(result: Dict[str, Any], path, names: Optional[List[str]] = None):
+    """导出为 .npz（模态按场名保存为 mode_<name>）与同名 .csv 谱表"""
+    names = names or [f'field{i}' for i in range(len(result['modes']))]
+    arrays = {k: result[k] for k in ('eigenvalues', 'frequency', 'growth_rate',
+                                     'amplitude', 'singular_values')}
+    arrays.update({f'mode_{n}': m for n, m in zip(names, result['modes'])})
+    np.savez(path, dt=result['dt'], **arrays)
+    dmd_table(result).to_csv(str(path).rsplit('.', 1)[0] + '.csv', index=False)
@@ -1,15 +1,23 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
 import numpy as np
+from scipy import signal as sps
+
+from core.field_registry import default_registry
 
-def point_fft(signal, dt=1.0):
+def point_fft(signal, dt=1.0, window=None):
     """
-    对输入信号进行 FFT 并返回半谱频率和幅值。
+    对输入信号进行 FFT (rfft) 并返回半谱频率和幅值。
 
     Parameters
     ----------
     signal : 1D array
         时间序列。
     dt : float
-        采样时间间隔。
+        采样时间间隔 [s]（见 sampling_rate）。
+    window : str, optional
+        窗函数名（同 scipy.signal.get_window）；幅值按窗的相干增益修正。
 
     Returns
     -------
@@ -18,10 +26,240 @@ def point_fft(signal, dt=1.0):
     amplitude : ndarray
         对应的幅值（单边谱）。
     """
+    signal = np.asarray(signal, dtype=np.float64)
     n = len(signal)
-    fft_vals = np.fft.fft(signal)
-    freqs = np.fft.fftfreq(n, d=dt)
+    win = sps.get_window(window, n) if window is not None else np.ones(n)
+    fft_vals = np.fft.rfft(signal * win)
+    freqs = np.fft.rfftfreq(n, d=dt)
     half = n // 2
     # 跳过 0 Hz (DC 分量)
-    amplitude = np.abs(fft_vals[1:half]) * 2.0 / n
+    amplitude = np.abs(fft_vals[1:half]) * 2.0 / win.sum()
     return freqs[1:half], amplitude
+
+
+def welch_psd(x, fs=1.0, nperseg=256, noverlap=None, window='hann', axis=0):
+    """
+    Welch 平均功率谱密度（单边, density 标定，逐段去均值），即 scipy.signal.welch
+
+    Parameters
+    ----------
+    x : ndarray
+        时间序列，时间沿 axis；其余轴（如空间点）一次向量化处理
+    fs : 采样频率 [Hz]
+    nperseg : 段长（不超过序列长度）
+    noverlap : 相邻段重叠点数；None 为 nperseg // 2
+    window : 窗函数名或长度为 nperseg 的数组
+
+    Returns
+    -------
+    freqs : (nf,)
+    psd : ndarray，时间轴替换为频率轴 (nf)
+    """
+    x = np.asarray(x)
+    nperseg = min(int(nperseg), x.shape[axis])
+    if noverlap is not None:
+        noverlap = min(int(noverlap), nperseg - 1)
+    return sps.welch(x, fs=fs, window=window, nperseg=nperseg, noverlap=noverlap, axis=axis)
+
+
+def sampling_rate(frames=None, record_rate=None, default=1.0):
+    """
+    序列的采样频率 [Hz]
+
+    record_rate 为相机/PIV 系统帧率（如 Photron .cihx 的 recordRate）；帧元数据中的
+    'step'（DaVis 文件头中的帧号）相邻差值的中位数作为导出间隔，fs = record_rate / 间隔。
+    没有 record_rate 时返回 default（即频率单位为 1/帧）。
+    """
+    if not record_rate:
+        return float(default)
+    stride = 1.0
+    if frames:
+        steps = np.array([f.get('step', np.nan) for f in frames], dtype=np.float64)
+        diffs = np.diff(steps)
+        diffs = diffs[np.isfinite(diffs) & (diffs > 0)]
+        if len(diffs):
+            stride = float(np.median(diffs))
+    return float(record_rate) / stride
+
+
+def region_signal(seq, ys, xs, quantity='U', spacing=(1.0, 1.0)):
+    """
+    子区域 [ys, xs] 内物理量的时间序列 (nt, h, w)
+
+    seq 为 PivSequence（或任何提供 region_series 的序列）；导出物理量取外扩一格的
+    速度块整体计算后裁剪，结果与整场计算后取该区域相同。
+    """
+    ny, nx = seq.shape[1:]
+    ys, xs = slice(*ys.indices(ny)[:2]), slice(*xs.indices(nx)[:2])
+    halo = 0 if quantity in ('U', 'V') else 1
+    ey = slice(max(ys.start - halo, 0), min(ys.stop + halo, ny))
+    ex = slice(max(xs.start - halo, 0), min(xs.stop + halo, nx))
+    U, V = seq.region_series(ey, ex)
+    dx, dy = spacing
+    # (nt, h, w) 时间序列块当作一帧交给注册表计算
+    block = default_registry(None, dx, dy).get(0, quantity, {'U': U, 'V': V})
+    return block[:, ys.start - ey.start:ys.stop - ey.start, xs.start - ex.start:xs.stop - ex.start]
+
+
+def region_psd(seq, ys, xs, quantity='U', spacing=(1.0, 1.0), fs=1.0,
+               nperseg=256, noverlap=None, window='hann'):
+    """
+    区域平均功率谱：子区域内每点做 Welch PSD 后对空间取平均（对谱平均，而非对信号平均）
+
+    Returns
+    -------
+    freqs : (nf,)
+    psd : (nf,) 区域平均 PSD
+    """
+    data = region_signal(seq, ys, xs, quantity, spacing)
+    freqs, psd = welch_psd(data, fs=fs, nperseg=nperseg, noverlap=noverlap, window=window)
+    return freqs, psd.mean(axis=(1, 2))
+
+
+# ---------- 全场谱分析 ----------
+def psd_maps(freqs, psd, bands=()):
+    """
+    由 PSD 立方体 (nf, ...) 计算各点的主频、峰值 PSD 与频带功率
+
+    Parameters
+    ----------
+    freqs : 1D array (nf,)
+    psd : ndarray (nf, ...)
+    bands : [(f_lo, f_hi), ...]
+        频带 [Hz]；功率为带内 PSD 之和 × Δf
+
+    Returns
+    -------
+    dict : dominant_freq, peak_psd (...)，band_power {(f_lo, f_hi): (...)}
+    """
+    # 跳过 0 Hz (DC 分量)
+    k = np.argmax(psd[1:], axis=0) + 1 if len(freqs) > 1 else np.zeros(psd.shape[1:], int)
+    df = freqs[1] - freqs[0] if len(freqs) > 1 else 1.0
+    band_power = {}
+    for f_lo, f_hi in bands:
+        mask = (freqs >= f_lo) & (freqs <= f_hi)
+        band_power[(f_lo, f_hi)] = (psd[mask].sum(axis=0) * df).astype(np.float32)
+    return {
+        'dominant_freq': freqs[k].astype(np.float32),
+        'peak_psd': np.take_along_axis(psd, k[None], axis=0)[0].astype(np.float32),
+        'band_power': band_power,
+    }
+
+
+def _tile_psd(task):
+    """工作进程：子区域时间序列块 -> 物理量 -> Welch PSD -> 各点谱特征"""
+    U, V = task['U'], task['V']
+    quantity = task['quantity']
+    if quantity in ('U', 'V'):
+        data = U if quantity == 'U' else V
+    else:
+        dx, dy = task['spacing']
+        data = default_registry(None, dx, dy).get(0, quantity, {'U': U, 'V': V})
+    cy, cx = task['crop']
+    data = data[:, cy, cx]
+    freqs, psd = sps.welch(data, fs=task['fs'], window=task['window'], nperseg=task['nperseg'],
+                           noverlap=task['noverlap'], axis=0)
+    psd = psd.astype(np.float32)
+    maps = psd_maps(freqs, psd, task['bands'])
+    maps['psd_sum'] = psd.reshape(len(freqs), -1).sum(axis=1, dtype=np.float64)
+    return task['ys'], task['xs'], freqs, psd if task['keep_psd'] else None, maps
+
+
+def field_psd_maps(U, V, quantity='U', fs=1.0, spacing=(1.0, 1.0), nperseg=256,
+                   noverlap=None, window='hann', bands=(), tile=None, tile_mb=64,
+                   workers=None, keep_psd=False, progress=None):
+    """
+    全场 Welch 功率谱密度：每个网格点的时间序列沿 axis 0 做 scipy.signal.welch
+
+    按空间子区域 (tile) 读取 (nt, h, w) 时间序列块交给进程池计算，主进程同时只持有
+    约 2×workers 个块；U, V 为 np.memmap（如 PIV 缓存）时整段序列不会读入内存。
+
+    Parameters
+    ----------
+    U, V : ndarray 或 np.memmap (nt, ny, nx)
+    quantity : 'U', 'V' 或 core.field_registry.default_registry 中的物理量（如 'Vorticity'）
+    fs : 采样频率 [Hz]
+    spacing : (dx, dy) 网格间距（导出物理量的差分用）
+    nperseg, noverlap, window : 同 welch_psd（nperseg 不超过帧数）
+    bands : [(f_lo, f_hi), ...] 频带功率
+    tile : 子区域边长（格点）；None 时按 tile_mb 每块内存自动选择
+    workers : 进程数；None 为 CPU 核数，1 为在当前进程计算
+    keep_psd : True 时返回完整 PSD 立方体 (nf, ny, nx)
+    progress : progress(完成块数, 总块数)
+
+    Returns
+    -------
+    dict : freqs, dominant_freq, peak_psd (ny, nx), band_power {band: (ny, nx)}，
+           mean_psd (nf,) 全场平均谱；keep_psd 时另含 psd (nf, ny, nx)
+    """
+    nt, ny, nx = U.shape
+    nperseg = min(int(nperseg), nt)
+    if noverlap is not None:
+        noverlap = min(int(noverlap), nperseg - 1)
+    if tile is None:
+        # 每块 U、V 两个分量，float32
+        tile = int(np.sqrt(tile_mb * 2**20 / (nt * 4 * 2)))
+    tile = max(int(tile), 4)
+    halo = 0 if quantity in ('U', 'V') else 1      # 差分需要相邻一格
+    workers = workers or os.cpu_count() or 1
+    bands = [tuple(b) for b in bands]
+
+    def tasks():
+        for y0 in range(0, ny, tile):
+            for x0 in range(0, nx, tile):
+                ys, xs = slice(y0, min(y0 + tile, ny)), slice(x0, min(x0 + tile, nx))
+                ey0, ex0 = max(y0 - halo, 0), max(x0 - halo, 0)
+                ey1, ex1 = min(ys.stop + halo, ny), min(xs.stop + halo, nx)
+                yield {
+                    'U': np.asarray(U[:, ey0:ey1, ex0:ex1]),
+                    'V': np.asarray(V[:, ey0:ey1, ex0:ex1]),
+                    'quantity': quantity, 'spacing': spacing,
+                    'crop': (slice(y0 - ey0, ys.stop - ey0), slice(x0 - ex0, xs.stop - ex0)),
+                    'ys': ys, 'xs': xs, 'fs': fs, 'window': window, 'nperseg': nperseg,
+                    'noverlap': noverlap, 'bands': bands, 'keep_psd': keep_psd,
+                }
+
+    n_tiles = len(range(0, ny, tile)) * len(range(0, nx, tile))
+    result = None
+    done = 0
+
+    def collect(out):
+        nonlocal result, done
+        ys, xs, freqs, psd, maps = out
+        if result is None:
+            result = {
+                'freqs': freqs,
+                'dominant_freq': np.empty((ny, nx), dtype=np.float32),
+                'peak_psd': np.empty((ny, nx), dtype=np.float32),
+                'band_power': {b: np.empty((ny, nx), dtype=np.float32) for b in bands},
+                'mean_psd': np.zeros(len(freqs)),
+            }
+            if keep_psd:
+                result['psd'] = np.empty((len(freqs), ny, nx), dtype=np.float32)
+        result['dominant_freq'][ys, xs] = maps['dominant_freq']
+        result['peak_psd'][ys, xs] = maps['peak_psd']
+        for b in bands:
+            result['band_power'][b][ys, xs] = maps['band_power'][b]
+        result['mean_psd'] += maps['psd_sum'] / (ny * nx)
+        if keep_psd:
+            result['psd'][:, ys, xs] = psd
+        done += 1
+        if progress is not None:
+            progress(done, n_tiles)
+
+    if workers == 1 or n_tiles == 1:
+        for task in tasks():
+            collect(_tile_psd(task))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for task in tasks():
+            pending.add(pool.submit(_tile_psd, task))
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    collect(fut.result())
+        for fut in pending:
+            collect(fut.result())
+    return result
@@ -1,11 +1,36 @@
 import numpy as np
 
+from core.liutex import liutex_from_gradients
+from core.velocity_gradient import CRITERION_FUNCS
+
 def compute_gradients(u, v, dx, dy):
-    """计算速度梯度分量 ux, uy, vx, vy"""
-    uy, ux = np.gradient(u, dy, dx, axis=(0, 1))
-    vy, vx = np.gradient(v, dy, dx, axis=(0, 1))
+    """计算速度梯度分量 ux, uy, vx, vy（沿最后两个轴，u, v 可为 (nt, ny, nx)）"""
+    u, v = np.asarray(u), np.asarray(v)
+    dtype = np.result_type(u, v, np.float32)
+    ux, uy, vx, vy = (np.empty(u.shape, dtype=dtype) for _ in range(4))
+    _gradient_last2(u, dy, dx, uy, ux)
+    _gradient_last2(v, dy, dx, vy, vx)
     return ux, uy, vx, vy
 
+def _gradient_last2(a, dy, dx, ay, ax):
+    """沿最后两个轴的一阶差分，写入 ay, ax（与 np.gradient 默认 edge_order=1 相同）"""
+    if a.shape[-1] < 2 or a.shape[-2] < 2:
+        raise ValueError(f"网格每个方向至少需要 2 个点，实际为 {a.shape[-2:]}")
+    # y 方向（倒数第二轴）：内部中心差分，边界单侧差分
+    np.subtract(a[..., 2:, :], a[..., :-2, :], out=ay[..., 1:-1, :])
+    ay[..., 1:-1, :] /= 2.0 * dy
+    np.subtract(a[..., 1, :], a[..., 0, :], out=ay[..., 0, :])
+    ay[..., 0, :] /= dy
+    np.subtract(a[..., -1, :], a[..., -2, :], out=ay[..., -1, :])
+    ay[..., -1, :] /= dy
+    # x 方向（最后一轴）
+    np.subtract(a[..., 2:], a[..., :-2], out=ax[..., 1:-1])
+    ax[..., 1:-1] /= 2.0 * dx
+    np.subtract(a[..., 1], a[..., 0], out=ax[..., 0])
+    ax[..., 0] /= dx
+    np.subtract(a[..., -1], a[..., -2], out=ax[..., -1])
+    ax[..., -1] /= dx
+
 def compute_all_fields(u, v, dx, dy):
     """
     返回一个包含常用物理量的字典：
@@ -16,6 +41,10 @@ def compute_all_fields(u, v, dx, dy):
     - grad_v: |∇v|
     """
     ux, uy, vx, vy = compute_gradients(u, v, dx, dy)
+    return fields_from_gradients(u, v, ux, uy, vx, vy)
+
+def fields_from_gradients(u, v, ux, uy, vx, vy):
+    """由速度及其梯度分量计算 compute_all_fields 的各物理量（逐点运算，任意形状）"""
     velocity_mag = np.sqrt(u**2 + v**2)
     vorticity = vx - uy
     divergence = ux + vy
@@ -35,3 +64,108 @@ def compute_scalar_gradient(scalar, dx, dy):
     """计算标量场的梯度模"""
     sy, sx = np.gradient(scalar, dy, dx, axis=(0, 1))
     return np.sqrt(sx**2 + sy**2)
+
+# ---------- 整段序列 (nt, ny, nx) ----------
+SEQUENCE_QUANTITIES = ('Velocity magnitude', 'Vorticity', 'Divergence', 'Grad U', 'Grad V',
+                       'Q-criterion', 'lambda2', 'Delta-criterion', 'Swirling strength',
+                       'Strain rate', 'Liutex', 'Liutex S', 'lambda_ci')
+_LIUTEX_QUANTITIES = ('Liutex', 'Liutex S', 'lambda_ci')
+
+def derived_fields(u, v, dx, dy, quantities=None):
+    """
+    一次梯度计算得到导出物理量
+    u, v 形状为 (ny, nx) 或 (nt, ny, nx)，梯度沿最后两个轴；
+    返回 {物理量: 数组}，键为 SEQUENCE_QUANTITIES 中的名称（Liutex 为带符号的 R），
+    结果与 compute_all_fields / liutex_2d 逐帧计算相同；梯度张量判据的定义见 core.velocity_gradient
+    """
+    quantities = list(quantities or SEQUENCE_QUANTITIES)
+    dtype = np.result_type(u, v, np.float32)
+    out = {q: np.empty(u.shape, dtype=dtype) for q in quantities}
+    work = [np.empty(u.shape, dtype=dtype) for _ in range(7)]
+    _derived_into(u, v, dx, dy, quantities, out, work)
+    return out
+
+def compute_fields_stack(U, V, dx, dy, quantities=None, chunk_size=8, out=None):
+    """
+    整段序列的导出物理量，按时间分块计算以限制中间数组的内存
+
+    Parameters
+    ----------
+    U, V : ndarray 或 np.memmap (nt, ny, nx)
+    quantities : 物理量名称列表，None 为 SEQUENCE_QUANTITIES 全部
+    chunk_size : 每块帧数；中间数组为 7 × chunk_size 帧，块较小时可留在 CPU 缓存中
+    out : dict, optional
+        预分配的 {物理量: (nt, ny, nx) 数组}（可为 np.memmap），结果直接写入
+
+    Returns
+    -------
+    dict : {物理量: float32 数组 (nt, ny, nx)}
+    """
+    quantities = list(quantities or SEQUENCE_QUANTITIES)
+    if out is None:
+        out = {q: np.empty(U.shape, dtype=np.float32) for q in quantities}
+    nt = U.shape[0]
+    chunk_size = max(1, min(int(chunk_size), nt))
+    work = [np.empty((chunk_size,) + U.shape[1:], dtype=np.float32) for _ in range(7)]
+    for t0 in range(0, nt, chunk_size):
+        t1 = min(t0 + chunk_size, nt)
+        k = t1 - t0
+        _derived_into(np.asarray(U[t0:t1]), np.asarray(V[t0:t1]), dx, dy, quantities,
+                      {q: out[q][t0:t1] for q in quantities}, [w[:k] for w in work])
+    return out
+
+def _derived_into(u, v, dx, dy, quantities, out, work):
+    """计算 quantities 写入 out[q]；work 为 7 个与 u 同形的临时数组"""
+    uy, ux, vy, vx, t1, t2, t3 = work
+    _gradient_last2(u, dy, dx, uy, ux)
+    _gradient_last2(v, dy, dx, vy, vx)
+
+    for q in quantities:
+        o = out[q]
+        if q == 'Velocity magnitude':
+            a, b = u, v
+        elif q == 'Grad U':
+            a, b = ux, uy
+        elif q == 'Grad V':
+            a, b = vx, vy
+        elif q == 'Vorticity':
+            np.subtract(vx, uy, out=o)
+            continue
+        elif q == 'Divergence':
+            np.add(ux, vy, out=o)
+            continue
+        elif q in CRITERION_FUNCS:
+            # 梯度张量判据（core.velocity_gradient），临时数组用 t1, t2
+            CRITERION_FUNCS[q](ux, uy, vx, vy, out=o, work=(t1, t2))
+            continue
+        else:
+            continue
+        # sqrt(a² + b²)
+        np.multiply(a, a, out=o)
+        np.multiply(b, b, out=t1)
+        o += t1
+        np.sqrt(o, out=o)
+
+    if any(q in quantities for q in _LIUTEX_QUANTITIES):
+        # 与 liutex.liutex_from_gradients 相同的运算顺序
+        omega, lam_sq, disc = t1, t2, t3
+        np.subtract(vx, uy, out=omega)
+        np.multiply(ux, vy, out=lam_sq)
+        np.multiply(uy, vx, out=disc)
+        lam_sq -= disc
+        np.maximum(lam_sq, 0.0, out=lam_sq)
+        if 'lambda_ci' in quantities:
+            np.sqrt(lam_sq, out=out['lambda_ci'])
+        np.multiply(omega, omega, out=disc)
+        lam_sq *= 4.0
+        disc -= lam_sq
+        np.maximum(disc, 0.0, out=disc)
+        np.sqrt(disc, out=disc)                 # sqrt_disc = S
+        if 'Liutex S' in quantities:
+            out['Liutex S'][...] = disc
+        if 'Liutex' in quantities:
+            R = out['Liutex']
+            np.abs(omega, out=R)
+            R -= disc
+            np.sign(omega, out=omega)
+            R *= omega
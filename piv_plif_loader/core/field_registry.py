@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出物理量的按需计算注册表
+每个物理量登记为带依赖的计算 (名称, 依赖, 函数)，首次访问时才计算，
+结果按 (帧号, 物理量) 缓存（含梯度等中间量），总字节数超过内存预算时淘汰最久未用的项。
+计算均为逐点运算或沿最后两个轴的差分，也可直接用于 (nt, ny, nx) 的时间序列块。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from core.field_calculations import compute_gradients
+from core.liutex import liutex_from_gradients
+from core.velocity_gradient import CRITERION_FUNCS
+
+BASE_FIELDS = ('U', 'V')
+
+
+class FieldRegistry:
+    """
+    Parameters
+    ----------
+    source : callable or None
+        source(index) -> 含 'U', 'V' 的帧（如 PivSequence 的一帧）；
+        get() 传入 frame 时不调用
+    memory_budget : int
+        缓存的字节数上限
+
+    用法:
+        reg = default_registry(lambda i: seq[i], dx, dy)
+        omega = reg.get(10, 'Vorticity')        # 同时缓存 ux, uy, vx, vy
+        Q = reg.get(10, 'Q-criterion')          # 复用已缓存的梯度
+    """
+
+    def __init__(self, source: Optional[Callable[[int], dict]] = None,
+                 memory_budget: int = 512 * 2**20):
+        self.source = source
+        self.memory_budget = int(memory_budget)
+        self._nodes: Dict[str, tuple] = {}          # 名称 -> (输出名称, 依赖, 函数)
+        self._display: List[str] = []
+        self._cache: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    # ---------- 登记 ----------
+    def register(self, names: Union[str, Sequence[str]], deps: Sequence[str],
+                 func: Callable, display: bool = True):
+        """
+        登记计算：func(*依赖数组) 返回一个数组，或按 names 顺序返回多个数组
+        display=False 的量（如梯度分量）只作为中间量，不出现在 quantities 中；
+        单个中间量也可以是数组的元组（如 '_liutex'），由下游的量取出各分量
+        """
+        names = (names,) if isinstance(names, str) else tuple(names)
+        for dep in deps:
+            if dep not in BASE_FIELDS and dep not in self._nodes:
+                raise KeyError(f"依赖 {dep} 尚未登记")
+        node = (names, tuple(deps), func)
+        for name in names:
+            self._nodes[name] = node
+            if display and name not in self._display:
+                self._display.append(name)
+
+    @property
+    def quantities(self) -> List[str]:
+        """可显示的物理量名称（登记顺序）"""
+        return list(self._display)
+
+    def dependencies(self, name: str) -> List[str]:
+        """name 直接与间接依赖的全部量"""
+        result = []
+        stack = list(self._nodes[name][1])
+        while stack:
+            dep = stack.pop()
+            if dep in result:
+                continue
+            result.append(dep)
+            if dep in self._nodes:
+                stack.extend(self._nodes[dep][1])
+        return result
+
+    # ---------- 取值 ----------
+    def get(self, index: int, name: str, frame: Optional[dict] = None) -> np.ndarray:
+        """帧 index 的物理量 name；frame 为该帧数据（省略时由 source 提供）"""
+        if name in BASE_FIELDS:
+            return (frame if frame is not None else self.source(index))[name]
+        key = (index, name)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        if name not in self._nodes:
+            raise KeyError(f"未登记的物理量: {name}")
+
+        names, deps, func = self._nodes[name]
+        if frame is None and any(d in BASE_FIELDS for d in deps):
+            frame = self.source(index)
+        args = [self.get(index, dep, frame) for dep in deps]
+        outputs = func(*args)
+        if len(names) == 1:
+            outputs = (outputs,)
+        for out_name, value in zip(names, outputs):
+            self._store((index, out_name), value)
+        return outputs[names.index(name)]
+
+    def is_cached(self, index: int, name: str) -> bool:
+        with self._lock:
+            return (index, name) in self._cache
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._nbytes = 0
+
+    def _store(self, key: tuple, value: np.ndarray):
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._nbytes -= _nbytes(old)
+            self._cache[key] = value
+            self._nbytes += _nbytes(value)
+            while self._nbytes > self.memory_budget and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._nbytes -= _nbytes(evicted)
+
+
+def _nbytes(value) -> int:
+    """缓存项的字节数（数组或数组元组）"""
+    if isinstance(value, tuple):
+        return sum(a.nbytes for a in value)
+    return value.nbytes
+
+
+def default_registry(source: Optional[Callable[[int], dict]], dx: float, dy: float,
+                     memory_budget: int = 512 * 2**20) -> FieldRegistry:
+    """登记常用物理量：速度梯度为共用的中间量"""
+    reg = FieldRegistry(source, memory_budget)
+    reg.register(('ux', 'uy', 'vx', 'vy'), ('U', 'V'),
+                 lambda u, v: compute_gradients(u, v, dx, dy), display=False)
+    reg.register('Velocity magnitude', ('U', 'V'), lambda u, v: np.sqrt(u**2 + v**2))
+    reg.register('Vorticity', ('vx', 'uy'), lambda vx, uy: vx - uy)
+    reg.register('Divergence', ('ux', 'vy'), lambda ux, vy: ux + vy)
+    reg.register('Grad U', ('ux', 'uy'), lambda ux, uy: np.sqrt(ux**2 + uy**2))
+    reg.register('Grad V', ('vx', 'vy'), lambda vx, vy: np.sqrt(vx**2 + vy**2))
+    # 梯度张量判据（见 core.velocity_gradient），都只依赖已缓存的梯度分量
+    grads = ('ux', 'uy', 'vx', 'vy')
+    for name, func in CRITERION_FUNCS.items():
+        reg.register(name, grads, func)
+    # Liutex 分解 (R, S, λ_ci, ω) 每帧只算一次，作为中间量缓存；R / S / λ_ci 从中取出
+    reg.register('_liutex', grads, liutex_from_gradients, display=False)
+    for k, name in enumerate(('Liutex', 'Liutex S', 'lambda_ci')):
+        reg.register(name, ('_liutex',), lambda parts, k=k: parts[k])
+    return reg
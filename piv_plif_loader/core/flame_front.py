@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF 火焰锋面提取与跟踪
+每帧（可先经 core.plif_enhance 增强）按阈值二值化、高斯平滑为进度变量 c ∈ [0, 1]，
+再用 marching squares (contourpy) 取 c = 0.5 的亚像素等值线作为锋面。
+沿每条锋面向量化计算：
+    弧长、单位法向 n（指向未燃侧，即 -∇c 方向）、曲率 κ = ∇·n（向未燃侧凸出为正）
+逐帧得到锋面长度、褶皱比 L / L0 与曲率统计；给定 PIV 序列时在锋面点上双线性插值速度，
+得到法向流速 u_n = u·n，并由相邻两帧锋面的法向位移得到锋面速度 V_n 与
+位移速度 S_d = V_n - u_n。
+坐标与速度的长度单位可以不同（DaVis 坐标为 mm、速度为 m/s）：V_n 由 length_scale
+（1 坐标单位 = length_scale 速度长度单位）换算到 PIV 速度单位后再与 u_n 相减。
+
+extract_fronts  整段序列线程池并行提取，结果按帧顺序逐行写入表格（可同时追加到 CSV）
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from contourpy import contour_generator
+from scipy.ndimage import gaussian_filter, gaussian_filter1d
+from scipy.spatial import cKDTree
+
+from core.plif_enhance import enhance_frame, _frame_source
+from core.plif_registration import registration_map, apply_registration
+
+
+def progress_variable(image: np.ndarray, level: float, sigma: float = 2.0) -> np.ndarray:
+    """阈值二值化 (image > level 为已燃侧) 后高斯平滑，float32；sigma 以像素计，0 为不平滑"""
+    c = (np.nan_to_num(np.asarray(image, dtype=np.float32)) > level).astype(np.float32)
+    if sigma > 0:
+        gaussian_filter(c, sigma, output=c, mode='nearest')
+    return c
+
+
+def front_contours(c: np.ndarray, X: np.ndarray, Y: np.ndarray,
+                   min_points: int = 8) -> List[np.ndarray]:
+    """c = 0.5 的等值线 [(n, 2) 物理坐标]，封闭曲线首尾点相同；点数少于 min_points 的舍去"""
+    gen = contour_generator(np.asarray(X, dtype=np.float64), np.asarray(Y, dtype=np.float64),
+                            c, name='serial', line_type='Separate')
+    return [line for line in gen.lines(0.5) if len(line) >= min_points]
+
+
+def _pixel_size(X: np.ndarray, Y: np.ndarray) -> float:
+    """网格的最小点距（X, Y 为 1D 坐标或 2D 网格，可为转置网格）"""
+    d = [float(np.abs(np.diff(A, axis=k)).max())
+         for A in (np.asarray(X), np.asarray(Y)) for k in range(A.ndim) if A.shape[k] > 1]
+    d = [v for v in d if v > 0]
+    return min(d) if d else 1.0
+
+
+def _geometry(pts: np.ndarray, step: float, smooth: float):
+    """
+    单条曲线按等弧长 step 重采样、沿弧长高斯平滑 smooth 个点后求切向导数（对弧长）
+    与每点弧长权重；封闭曲线按周期处理。marching squares 顶点间距不均，
+    直接对顶点差分的曲率噪声随分辨率提高而增大
+    """
+    closed = len(pts) > 3 and np.array_equal(pts[0], pts[-1])
+    s = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(pts, axis=0).T))])
+    length = s[-1]
+    if closed:
+        n = max(int(round(length / step)), 3)
+        h = length / n
+        s_new = np.arange(n) * h
+    else:
+        n = max(int(round(length / step)), 2)
+        h = length / n
+        s_new = np.linspace(0.0, length, n + 1)
+    pts = np.stack([np.interp(s_new, s, pts[:, 0]), np.interp(s_new, s, pts[:, 1])], axis=1)
+    if smooth > 0:
+        pts = gaussian_filter1d(pts, smooth, axis=0, mode='wrap' if closed else 'nearest')
+    if closed:
+        d1 = (np.roll(pts, -1, axis=0) - np.roll(pts, 1, axis=0)) / (2 * h)
+        d2 = (np.roll(pts, -1, axis=0) - 2 * pts + np.roll(pts, 1, axis=0)) / h**2
+        ds = np.full(n, h)
+    else:
+        d1 = np.gradient(pts, h, axis=0)
+        d2 = np.gradient(d1, h, axis=0)
+        ds = np.full(n + 1, h)
+        ds[[0, -1]] = 0.5 * h
+    return pts, d1, d2, ds, closed
+
+
+def front_geometry(contours: List[np.ndarray], c: np.ndarray, X: np.ndarray,
+                   Y: np.ndarray, smooth: float = 6.0) -> Dict[str, np.ndarray]:
+    """
+    锋面各点的几何量（所有曲线拼接）
+    曲线先按约 1 像素的等弧长重采样，再沿弧长高斯平滑 smooth 个点（0 为不平滑）后求导；
+    sigma 与 smooth 都以像素计，比较不同分辨率的曲率时应按同一物理尺度换算
+
+    Returns
+    -------
+    dict :
+        points (n, 2), segment (n,) 所属曲线编号, ds (n,) 每点弧长权重,
+        normal (n, 2) 指向未燃侧的单位法向, curvature (n,) [1/长度],
+        segment_length (m,), closed (m,)
+    """
+    step = _pixel_size(X, Y)
+    parts = [_geometry(np.asarray(p, dtype=np.float64), step, smooth) for p in contours]
+    parts = [p for p in parts if len(p[0]) >= 3]
+    if not parts:
+        empty = np.empty((0, 2))
+        return {'points': empty, 'segment': np.empty(0, dtype=np.intp), 'ds': np.empty(0),
+                'normal': empty, 'curvature': np.empty(0), 'segment_length': np.empty(0),
+                'closed': np.empty(0, dtype=bool)}
+    pts = np.concatenate([p[0] for p in parts])
+    d1 = np.concatenate([p[1] for p in parts])
+    d2 = np.concatenate([p[2] for p in parts])
+    ds = np.concatenate([p[3] for p in parts])
+    segment = np.repeat(np.arange(len(parts)), [len(p[0]) for p in parts])
+
+    speed = np.hypot(d1[:, 0], d1[:, 1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tangent = d1 / speed[:, None]
+        kappa = (d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0]) / speed**3
+    # 沿前进方向的右手法向；与 -∇c 反向的曲线整体翻转（法向、曲率同时变号）
+    normal = np.stack([tangent[:, 1], -tangent[:, 0]], axis=1)
+    gy, gx = np.gradient(c, np.asarray(Y, dtype=np.float64), np.asarray(X, dtype=np.float64))
+    reg = registration_map(X, Y, pts[:, 0], pts[:, 1])
+    grad = apply_registration(reg, np.stack([gx, gy]))
+    align = -(normal[:, 0] * grad[0] + normal[:, 1] * grad[1])
+    sign = np.where(np.bincount(segment, np.nan_to_num(align)) < 0, -1.0, 1.0)[segment]
+    return {
+        'points': pts,
+        'segment': segment,
+        'ds': ds,
+        'normal': normal * sign[:, None],
+        'curvature': kappa * sign,
+        'segment_length': np.bincount(segment, ds),
+        'closed': np.array([p[4] for p in parts]),
+    }
+
+
+def _piv_axes(X: np.ndarray, Y: np.ndarray):
+    """PIV 网格 (可为转置视图) 的 1D 递增坐标，以及把场整理为 (len(y), len(x)) 的函数"""
+    X = np.asarray(X)
+    Y = np.asarray(Y)
+    transpose = X.shape[1] < 2 or X[0, 1] == X[0, 0]
+    if transpose:
+        X, Y = X.T, Y.T
+    x, y = X[0].astype(np.float64), Y[:, 0].astype(np.float64)
+    fx = slice(None, None, -1) if x[-1] < x[0] else slice(None)
+    fy = slice(None, None, -1) if y[-1] < y[0] else slice(None)
+
+    def arrange(field):
+        field = np.asarray(field)
+        field = field.T if transpose else field
+        return field[fy, fx]
+
+    return x[fx], y[fy], arrange
+
+
+def sample_velocity(front: Dict[str, np.ndarray], piv_X: np.ndarray, piv_Y: np.ndarray,
+                    U: np.ndarray, V: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    在锋面点上双线性插值 PIV 速度，写入 front['velocity'] (n, 2) 与法向流速 front['u_n']
+    （PIV 范围外或速度无效处为 NaN）
+    """
+    x, y, arrange = _piv_axes(piv_X, piv_Y)
+    pts = front['points']
+    reg = registration_map(x, y, pts[:, 0], pts[:, 1])
+    uv = apply_registration(reg, np.stack([arrange(U), arrange(V)]))
+    front['velocity'] = uv.T
+    front['u_n'] = np.sum(uv.T * front['normal'], axis=1)
+    return front
+
+
+def front_speed(front: Dict[str, np.ndarray], next_front: Dict[str, np.ndarray], dt: float,
+                max_distance: Optional[float] = None, length_scale: float = 1.0) -> np.ndarray:
+    """
+    锋面法向速度 V_n (n,)：每点到下一帧锋面最近点的位移在法向上的投影 × length_scale / dt
+    （length_scale 把坐标单位换算为速度的长度单位，如 mm → m 为 1e-3）
+    最近距离（坐标单位）超过 max_distance（或下一帧没有锋面）时为 NaN
+    """
+    pts = front['points']
+    if len(pts) == 0 or len(next_front['points']) == 0:
+        return np.full(len(pts), np.nan)
+    dist, idx = cKDTree(next_front['points']).query(pts)
+    disp = next_front['points'][idx] - pts
+    vn = np.sum(disp * front['normal'], axis=1) * (length_scale / dt)
+    if max_distance is not None:
+        vn[dist > max_distance] = np.nan
+    return vn
+
+
+def _weighted(values, weights):
+    """长度加权的均值与标准差（忽略 NaN）"""
+    ok = np.isfinite(values)
+    w = weights[ok]
+    if w.sum() <= 0:
+        return np.nan, np.nan
+    mean = np.average(values[ok], weights=w)
+    return float(mean), float(np.sqrt(np.average((values[ok] - mean)**2, weights=w)))
+
+
+def front_statistics(front: Dict[str, np.ndarray], reference_length: float) -> Dict[str, float]:
+    """一帧锋面的长度、褶皱比与曲率（及速度）统计，长度加权"""
+    length = float(front['ds'].sum())
+    k_mean, k_std = _weighted(front['curvature'], front['ds'])
+    row = {
+        'n_segments': int(len(front['segment_length'])),
+        'n_points': int(len(front['points'])),
+        'length': length,
+        'wrinkling': length / reference_length if reference_length > 0 else np.nan,
+        'curvature_mean': k_mean,
+        'curvature_std': k_std,
+        'curvature_positive': (float(front['ds'][front['curvature'] > 0].sum() / length)
+                               if length > 0 else np.nan),
+    }
+    for key in ('u_n', 'V_n', 'S_d'):
+        if key in front:
+            row[f'{key}_mean'], row[f'{key}_std'] = _weighted(front[key], front['ds'])
+    return row
+
+
+def extract_front(image: np.ndarray, X: np.ndarray, Y: np.ndarray, level: float,
+                  sigma: float = 2.0, min_points: int = 8,
+                  smooth: float = 6.0) -> Dict[str, np.ndarray]:
+    """单帧锋面：二值化、平滑、等值线与几何量（见 front_geometry）"""
+    c = progress_variable(image, level, sigma)
+    return front_geometry(front_contours(c, X, Y, min_points), c, X, Y, smooth)
+
+
+def extract_fronts(frames, level: float = 0.5, sigma: float = 2.0,
+                   enhance: Optional[Dict[str, Any]] = None, min_points: int = 8,
+                   reference_length: Optional[float] = None, piv=None, dt: float = 1.0,
+                   length_scale: float = 1.0, max_distance: Optional[float] = None,
+                   smooth: float = 6.0, workers: Optional[int] = None,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   csv_path: Optional[Union[str, os.PathLike]] = None,
+                   keep_fronts: bool = True) -> Dict[str, Any]:
+    """
+    整段 PLIF 序列的锋面提取与统计
+
+    Parameters
+    ----------
+    frames : PlifSequence 或 load_plif 格式的帧字典列表（坐标取 X, Y）
+    level : 二值化阈值；enhance 给出时作用于增强图像（掩膜外为 0，默认 0.5 即掩膜边界）
+    sigma : 二值图的高斯平滑 [像素]，决定锋面与曲率的平滑程度
+    enhance : enhance_frame 的参数（{} 为默认参数），None 为不增强、直接对标量场取阈值
+    min_points : 舍去点数少于此值的小曲线（噪声、孤岛）
+    reference_length : 褶皱比 L / L0 的 L0，默认为图像宽度（水平平直锋面）
+    piv : PivSequence / LazyPivSequence，第 i 帧 PLIF 对应第 i 帧 PIV（多出的取最后一帧）
+    dt : 帧间隔 [s]，用于锋面速度；默认 1 即 V_n 的时间单位为帧
+    length_scale : 1 个坐标单位等于多少个 PIV 速度的长度单位；DaVis（坐标 mm、速度 m/s）
+                   为 1e-3。V_n 按此换算到速度单位后才与 u_n 相减得到 S_d
+    max_distance : 相邻帧锋面点配对的最大距离 [坐标单位]，超过时 V_n 为 NaN
+    smooth : 锋面等弧长重采样（约 1 像素）后沿弧长的高斯平滑 [点]，与 sigma 一起决定
+             曲率的平滑程度（像素阶梯在 κ 上的噪声）
+    workers : 线程数，None 为 CPU 核数
+    progress : progress(已完成帧数, 总帧数)
+    csv_path : 给定时逐帧追加写入 CSV（表头在第一行）
+    keep_fronts : 是否在结果中保留每帧锋面的逐点数据
+
+    Returns
+    -------
+    dict :
+        table   DataFrame，每帧一行（统计均按弧长加权）：
+                frame, n_segments, n_points
+                length [坐标单位]、wrinkling = length / reference_length [-]
+                curvature_mean/std [1/坐标单位]、curvature_positive（κ > 0 的长度比例）[-]
+                V_n_mean/std [速度长度单位 / dt 的时间单位]（length_scale 换算后）
+                给定 piv 时另有 u_n_mean/std、S_d_mean/std [PIV 速度单位]
+                （末帧没有 V_n、S_d）
+        fronts  每帧的 front_geometry 字典（含 velocity, u_n, V_n, S_d），keep_fronts=False 时为 None
+    """
+    first = frames[0]
+    X, Y = np.asarray(first['X']), np.asarray(first['Y'])
+    if reference_length is None:
+        reference_length = float(X[-1] - X[0])
+    source = _frame_source(frames)
+    nt = len(frames)
+    enhance_kwargs = dict(enhance) if enhance is not None else None
+    if piv is not None:
+        piv_X, piv_Y = piv.X, piv.Y
+
+    def run(i):
+        image = source(i)
+        if enhance_kwargs is not None:
+            image = enhance_frame(image, **enhance_kwargs)
+        front = extract_front(image, X, Y, level, sigma, min_points, smooth)
+        if piv is not None:
+            p = piv[min(i, len(piv) - 1)]
+            sample_velocity(front, piv_X, piv_Y, p['U'], p['V'])
+        return front
+
+    rows, fronts = [], [] if keep_fronts else None
+    csv_file = open(csv_path, 'w', newline='', encoding='utf-8') if csv_path else None
+
+    def emit(i, front):
+        row = {'frame': i}
+        row.update(front_statistics(front, reference_length))
+        rows.append(row)
+        if csv_file is not None:
+            pd.DataFrame([row]).to_csv(csv_file, header=(i == 0), index=False)
+            csv_file.flush()
+        if fronts is not None:
+            fronts.append(front)
+
+    workers = workers or os.cpu_count() or 1
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # 最多 2 × workers 帧在途，按帧顺序取回；相邻帧到齐后算位移速度再输出上一帧
+            pending = deque()
+            previous = None
+            for i in range(nt):
+                pending.append(pool.submit(run, i))
+                while len(pending) > 2 * workers or (i == nt - 1 and pending):
+                    front = pending.popleft().result()
+                    k = 0 if previous is None else previous[0] + 1
+                    if previous is not None:
+                        prev = previous[1]
+                        prev['V_n'] = front_speed(prev, front, dt, max_distance, length_scale)
+                        if piv is not None:
+                            prev['S_d'] = prev['V_n'] - prev['u_n']
+                        emit(previous[0], prev)
+                    previous = (k, front)
+                    if progress is not None:
+                        progress(k + 1, nt)
+            if previous is not None:
+                emit(previous[0], previous[1])
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+    return {'table': pd.DataFrame(rows), 'fronts': fronts}
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逐帧计算结果的 LRU 缓存 + 后台预取
+compute(index) 的结果（如一帧速度场及其导出物理量）按帧号缓存，最多保留 maxsize 帧；
+prefetch() 把接下来要显示的帧交给后台线程提前计算，播放时取帧不必等待。
+不依赖 Qt，可用于脚本或 GUI。
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Iterable
+
+
+class FrameCache:
+    """
+    线程安全的帧结果 LRU 缓存
+
+    Parameters
+    ----------
+    compute : callable
+        compute(index) -> 结果；在调用线程或后台预取线程中执行
+    maxsize : int
+        最多缓存的帧数（含预取的帧）
+
+    用法:
+        cache = FrameCache(lambda i: heavy(i), maxsize=32)
+        data = cache.get(10)
+        cache.prefetch(range(11, 19))   # 替换尚未开始的预取请求
+        cache.close()
+    """
+
+    def __init__(self, compute: Callable[[int], Any], maxsize: int = 32):
+        self.compute = compute
+        self.maxsize = max(int(maxsize), 1)
+        self._cache: 'OrderedDict[int, Any]' = OrderedDict()
+        self._in_flight = set()             # 正在计算的帧号
+        self._queue = deque()               # 待预取帧号
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._prefetch_loop, daemon=True,
+                                        name='FrameCachePrefetch')
+        self._thread.start()
+
+    # ---------- 取帧 ----------
+    def get(self, index: int) -> Any:
+        """返回帧 index 的结果；已缓存时直接返回，预取线程正在计算时等待其完成"""
+        with self._cond:
+            while True:
+                if index in self._cache:
+                    self._cache.move_to_end(index)
+                    return self._cache[index]
+                if index not in self._in_flight:
+                    break
+                self._cond.wait()
+            self._in_flight.add(index)
+        try:
+            result = self.compute(index)
+        except BaseException:
+            with self._cond:
+                self._in_flight.discard(index)
+                self._cond.notify_all()
+            raise
+        self._store(index, result)
+        return result
+
+    def __contains__(self, index: int) -> bool:
+        with self._cond:
+            return index in self._cache
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._cache)
+
+    # ---------- 预取 ----------
+    def prefetch(self, indices: Iterable[int]):
+        """后台计算这些帧（按给定顺序）；替换上一次尚未开始的预取请求"""
+        with self._cond:
+            self._queue.clear()
+            self._queue.extend(i for i in indices
+                               if i not in self._cache and i not in self._in_flight)
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._queue.clear()
+            self._cache.clear()
+
+    def close(self):
+        """停止预取线程（正在计算的一帧完成后退出）"""
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def _prefetch_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                index = self._queue.popleft()
+                if index in self._cache or index in self._in_flight:
+                    continue
+                self._in_flight.add(index)
+            try:
+                result = self.compute(index)
+            except Exception:
+                # 预取失败不缓存；显示该帧时 get() 会重新计算并抛出异常
+                with self._cond:
+                    self._in_flight.discard(index)
+                    self._cond.notify_all()
+                continue
+            self._store(index, result)
+
+    def _store(self, index: int, result: Any):
+        with self._cond:
+            self._in_flight.discard(index)
+            self._cache[index] = result
+            self._cache.move_to_end(index)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            self._cond.notify_all()
@@ -27,7 +27,17 @@ def liutex_2d(u, v, dx=1.0, dy=1.0, signed=True):
     # 梯度计算
     uy, ux = np.gradient(u, dy, dx, axis=(0, 1))
     vy, vx = np.gradient(v, dy, dx, axis=(0, 1))
+    return liutex_from_gradients(ux, uy, vx, vy, signed)
 
+
+def liutex_from_gradients(ux, uy, vx, vy, signed=True):
+    """
+    由速度梯度分量计算 Liutex（逐点运算，数组可为任意形状，如 (nt, ny, nx)）。
+
+    Returns
+    -------
+    R, S, lambda_ci, omega : 同 liutex_2d
+    """
     omega = vx - uy
     lambda_ci_sq = np.maximum(ux * vy - uy * vx, 0.0)
     lambda_ci = np.sqrt(lambda_ci_sq)
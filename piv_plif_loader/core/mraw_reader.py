@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Photron FASTCAM .mraw 原始文件直接读取
+.mraw 为无文件头的连续帧，尺寸、位深、帧数由同名 .cihx 给出 (parse_cihx)。
+8/16 bit 直接映射为 np.memmap；12 bit 为每 3 字节 2 个像素的紧凑格式
+（p0 = b0 << 4 | b1 >> 4, p1 = (b1 & 0xF) << 8 | b2），由 MrawArray 在取数据时解包。
+切片帧、行都不读取或转换其余数据，无需先导出为 TIFF 序列。
+"""
+
+import pathlib
+from typing import Optional, Union, Dict, Any
+
+import numpy as np
+
+SUPPORTED_DEPTHS = (8, 12, 16)
+
+
+def _unpack12(packed: np.ndarray) -> np.ndarray:
+    """沿最后一轴把 12 bit 紧凑字节 (..., 3k/2) 解包为 uint16 (..., k)"""
+    b = packed.reshape(packed.shape[:-1] + (-1, 3)).astype(np.uint16)
+    out = np.empty(b.shape[:-1] + (2,), dtype=np.uint16)
+    out[..., 0] = (b[..., 0] << 4) | (b[..., 1] >> 4)
+    out[..., 1] = ((b[..., 1] & 0x0F) << 8) | b[..., 2]
+    return out.reshape(packed.shape[:-1] + (-1,))
+
+
+def _as_slice(r: range) -> slice:
+    """range -> 等价的基本切片（用于 memmap 下标）"""
+    if len(r) == 0:
+        return slice(0, 0)
+    stop = r[-1] + (1 if r.step > 0 else -1)
+    return slice(r.start, stop if stop >= 0 else None, r.step)
+
+
+class MrawArray:
+    """
+    .mraw 帧数据的惰性 uint16 数组 (nt, ny, nx)
+
+    对帧、行两个轴的切片返回新的 MrawArray（不读数据）；整数下标、列下标或
+    np.asarray 时才从映射中读取对应的帧与行，解包 12 bit 并右移 bit_shift。
+    支持 PlifSequence / compute_dmd 等使用的 shape、len、基本下标与 np.asarray。
+    """
+
+    ndim = 3
+    dtype = np.dtype(np.uint16)
+
+    def __init__(self, mm: np.memmap, width: int, bit_depth: int, bit_shift: int = 0,
+                 frames: Optional[range] = None, rows: Optional[range] = None):
+        self._mm = mm                   # (nt, ny, 每行字节数) uint8 或 (nt, ny, nx) uint16
+        self.width = int(width)
+        self.bit_depth = int(bit_depth)
+        self.bit_shift = int(bit_shift)
+        self._frames = frames if frames is not None else range(mm.shape[0])
+        self._rows = rows if rows is not None else range(mm.shape[1])
+
+    @property
+    def shape(self):
+        return (len(self._frames), len(self._rows), self.width)
+
+    @property
+    def nbytes(self) -> int:
+        """解包后的字节数（数据本身在磁盘上，不占内存）"""
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis or k is None for k in key) or len(key) > 3:
+            raise IndexError("MrawArray 只支持整数与切片下标")
+        key = key + (slice(None),) * (3 - len(key))
+        kt, ky, kx = key
+        if isinstance(kt, slice) and isinstance(ky, slice) and kx == slice(None):
+            return MrawArray(self._mm, self.width, self.bit_depth, self.bit_shift,
+                             self._frames[kt], self._rows[ky])
+        t, y = self._frames[kt], self._rows[ky]
+        block = self._mm[t if isinstance(t, int) else _as_slice(t),
+                         y if isinstance(y, int) else _as_slice(y)]
+        return self._decode(block)[..., kx]
+
+    def __array__(self, dtype=None, copy=None):
+        block = self._decode(self._mm[_as_slice(self._frames), _as_slice(self._rows)])
+        return block if dtype is None else block.astype(dtype, copy=False)
+
+    def _decode(self, block: np.ndarray) -> np.ndarray:
+        if self.bit_depth == 12:
+            img = _unpack12(np.asarray(block))
+        else:
+            img = np.array(block, dtype=np.uint16)
+        if self.bit_shift > 0:
+            np.right_shift(img, self.bit_shift, out=img)
+        return img
+
+    def __repr__(self):
+        return f"MrawArray(shape={self.shape}, bit_depth={self.bit_depth})"
+
+
+def find_mraw(folder: Union[str, pathlib.Path]):
+    """文件夹中的 (.mraw, .cihx) 路径对，优先同名；没有时返回 None"""
+    folder = pathlib.Path(folder)
+    mraws = sorted(folder.glob('*.mraw'))
+    cihxs = sorted(folder.glob('*.cihx'))
+    if not mraws or not cihxs:
+        return None
+    for mraw in mraws:
+        cihx = mraw.with_suffix('.cihx')
+        if cihx.exists():
+            return mraw, cihx
+    return mraws[0], cihxs[0]
+
+
+def open_mraw(path: Union[str, pathlib.Path], metadata: Optional[Dict[str, Any]] = None,
+              bit_shift: Optional[int] = None):
+    """
+    以内存映射打开 .mraw
+
+    Parameters
+    ----------
+    path : .mraw 文件路径
+    metadata : parse_cihx 的结果；None 时读取同名 .cihx
+    bit_shift : 右移位数；None 时按 cihx 有效位（高位存储时为 bit_depth - effective_depth）
+
+    Returns
+    -------
+    (nt, ny, nx) 数组：8/16 bit 且无需移位时为 np.memmap 本身（不复制、不转换），
+    否则为 MrawArray。帧数取 total_frame 与文件实际大小的较小值。
+    """
+    path = pathlib.Path(path)
+    if metadata is None:
+        from core.plif_loader import parse_cihx
+        metadata = parse_cihx(path.with_suffix('.cihx'))
+    width, height = metadata['width'], metadata['height']
+    depth = metadata['bit_depth']
+    if width <= 0 or height <= 0:
+        raise ValueError(f"cihx 中的分辨率无效: {width}x{height}")
+    if depth not in SUPPORTED_DEPTHS:
+        raise ValueError(f"不支持的 .mraw 位深: {depth} bit（支持 {SUPPORTED_DEPTHS}，彩色格式除外）")
+    if depth == 12 and width % 2:
+        raise ValueError("12 bit .mraw 的宽度应为偶数")
+    if bit_shift is None:
+        bit_shift = 0
+        if metadata['effective_side'].lower() == 'higher' and 0 < metadata['effective_depth'] < depth:
+            bit_shift = depth - metadata['effective_depth']
+
+    row_bytes = width * depth // 8
+    frame_bytes = row_bytes * height
+    n_file = path.stat().st_size // frame_bytes
+    nt = min(n_file, metadata['total_frame']) if metadata['total_frame'] > 0 else n_file
+    if nt <= 0:
+        raise ValueError(f"{path.name} 小于一帧 ({frame_bytes} 字节)")
+
+    if depth == 16:
+        mm = np.memmap(path, dtype='<u2', mode='r', shape=(nt, height, width))
+    else:
+        mm = np.memmap(path, dtype=np.uint8, mode='r', shape=(nt, height, row_bytes))
+    if depth in (8, 16) and bit_shift == 0:
+        return mm
+    return MrawArray(mm, width, depth, bit_shift)
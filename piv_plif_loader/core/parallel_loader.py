@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PIV 序列并行加载
+多进程解析文件，各进程直接把 U、V 写入预分配的数组 (n_frames, ny, nx)，
+结果按文件顺序排列，避免逐帧字典经管道回传。预分配的数组为：
+    memmap_dir 给定时    该目录下的 U.npy / V.npy（各进程以 r+ 映射写入，直接作为结果返回）
+    否则                 共享内存段；返回前须拷出一次，见 load_stack_parallel
+"""
+
+import os
+import time
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Optional, Union, Dict, Any, List
+
+import numpy as np
+
+# 工作进程内的共享数组（由 _init_worker 绑定）
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(load_func: Callable, load_kwargs: Dict[str, Any], target: tuple, shape: tuple):
+    """target 为 ('shm', U 段名, V 段名) 或 ('npy', U.npy 路径, V.npy 路径)"""
+    kind, u_ref, v_ref = target
+    if kind == 'npy':
+        _worker_state.update(load_func=load_func, load_kwargs=load_kwargs,
+                             U=np.load(u_ref, mmap_mode='r+'), V=np.load(v_ref, mmap_mode='r+'))
+        return
+    shm_u = shared_memory.SharedMemory(name=u_ref)
+    shm_v = shared_memory.SharedMemory(name=v_ref)
+    _worker_state.update(
+        load_func=load_func, load_kwargs=load_kwargs, shm=(shm_u, shm_v),
+        U=np.ndarray(shape, dtype=np.float32, buffer=shm_u.buf),
+        V=np.ndarray(shape, dtype=np.float32, buffer=shm_v.buf))
+
+
+def _load_into_shared(task):
+    """解析一帧并写入共享数组第 index 帧；返回 (index, 元数据 或 错误信息)"""
+    index, path = task
+    try:
+        data = _worker_state['load_func'](path, **_worker_state['load_kwargs'])
+        _store_frame(_worker_state['U'], _worker_state['V'], index, data)
+    except Exception as e:
+        return index, f"{type(e).__name__}: {e}"
+    return index, _frame_meta(data)
+
+
+def _store_frame(U: np.ndarray, V: np.ndarray, index: int, data: Dict[str, Any]):
+    if data['U'].shape != U.shape[1:]:
+        raise ValueError(f"网格尺寸 {data['U'].shape} 与首帧 {U.shape[1:]} 不一致")
+    U[index] = data['U']
+    V[index] = data['V']
+
+
+def _frame_meta(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in data.items() if k not in ('X', 'Y', 'U', 'V')}
+
+
+def load_stack_parallel(load_func: Callable,
+                        file_list: List[Union[str, pathlib.Path]],
+                        workers: Optional[int] = None,
+                        verbose: bool = True,
+                        memmap_dir: Optional[Union[str, pathlib.Path]] = None,
+                        allow_empty: bool = False,
+                        **load_kwargs) -> Dict[str, Any]:
+    """
+    并行加载 PIV 序列为堆叠数组
+
+    Parameters
+    ----------
+    load_func : callable
+        单帧加载函数（模块级函数，可被子进程导入），如 load_piv
+    file_list : list
+        文件路径列表，结果保持此顺序
+    workers : int or None
+        进程数；None 为 CPU 核数，1 为在当前进程串行写入
+    memmap_dir : str or Path, optional
+        给定时 U、V 直接写入该目录下的 U.npy / V.npy 并以内存映射返回，不再拷贝；
+        有失败帧时成功帧在文件内前移，返回前 n_ok 帧的视图
+    allow_empty : bool
+        所有文件都加载失败时返回空结果（X、Y 为 None，U、V 为 0 帧），否则抛出 RuntimeError
+    **load_kwargs
+        传给 load_func 的参数 (filetype, size, x_origin, y_origin)
+
+    Returns
+    -------
+    dict :
+        - X, Y : 首帧坐标网格（各帧共用）
+        - U, V : float32 数组 (n_frames, ny, nx)，只含成功加载的帧。
+                 共享内存段在返回前必须 close/unlink（仍有 numpy 数组引用其缓冲区时无法 close，
+                 Windows 上最后一个句柄关闭即释放），因此不用 memmap_dir 时结果从共享内存拷出
+                 一次，峰值内存约为两倍；大序列请用 memmap_dir
+        - frames : 每帧元数据字典列表（step, file_name, ... 不含数组）
+        - failed : [(文件路径, 错误信息)]
+        - fps : 加载吞吐量（帧/秒）
+    """
+    file_list = [str(f) for f in file_list]
+    if not file_list:
+        raise ValueError("文件列表为空")
+    workers = workers or os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    # 首个可读帧在主进程加载，确定网格尺寸与坐标
+    failed = []
+    for first_index, path in enumerate(file_list):
+        try:
+            first = load_func(path, **load_kwargs)
+            break
+        except Exception as e:
+            failed.append((path, f"{type(e).__name__}: {e}"))
+            if verbose:
+                print(f"  加载失败 {path}: {e}")
+    else:
+        if not allow_empty:
+            raise RuntimeError("没有成功加载任何文件")
+        empty = np.empty((0, 0, 0), dtype=np.float32)
+        return {'X': None, 'Y': None, 'U': empty, 'V': empty.copy(), 'frames': [],
+                'failed': failed, 'fps': 0.0}
+    shape = (len(file_list),) + first['U'].shape
+    nbytes = int(np.prod(shape)) * np.dtype(np.float32).itemsize
+
+    shm_u = shm_v = None
+    if memmap_dir is not None:
+        folder = pathlib.Path(memmap_dir)
+        folder.mkdir(parents=True, exist_ok=True)
+        U = np.lib.format.open_memmap(folder / 'U.npy', mode='w+', dtype=np.float32, shape=shape)
+        V = np.lib.format.open_memmap(folder / 'V.npy', mode='w+', dtype=np.float32, shape=shape)
+        target = ('npy', str(folder / 'U.npy'), str(folder / 'V.npy'))
+    else:
+        shm_u = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        shm_v = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        U = np.ndarray(shape, dtype=np.float32, buffer=shm_u.buf)
+        V = np.ndarray(shape, dtype=np.float32, buffer=shm_v.buf)
+        target = ('shm', shm_u.name, shm_v.name)
+    try:
+        _store_frame(U, V, first_index, first)
+
+        meta: List[Optional[Dict[str, Any]]] = [None] * len(file_list)
+        meta[first_index] = _frame_meta(first)
+        tasks = list(enumerate(file_list))[first_index + 1:]
+
+        if workers == 1 or len(tasks) == 0:
+            results = []
+            for index, path in tasks:
+                try:
+                    data = load_func(path, **load_kwargs)
+                    _store_frame(U, V, index, data)
+                    results.append((index, _frame_meta(data)))
+                except Exception as e:
+                    results.append((index, f"{type(e).__name__}: {e}"))
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(load_func, load_kwargs, target, shape)) as pool:
+                results = list(pool.map(_load_into_shared, tasks, chunksize=chunksize))
+
+        for index, info in results:
+            if isinstance(info, str):
+                failed.append((file_list[index], info))
+                if verbose:
+                    print(f"  加载失败 {file_list[index]}: {info}")
+            else:
+                meta[index] = info
+
+        ok = np.array([m is not None for m in meta])
+        if shm_u is None:
+            # 磁盘映射：成功帧在文件内前移，返回视图
+            for dst, src in enumerate(np.flatnonzero(ok)):
+                if dst != src:
+                    U[dst] = U[src]
+                    V[dst] = V[src]
+            U.flush()
+            V.flush()
+            U_out, V_out = U[:int(ok.sum())], V[:int(ok.sum())]
+        else:
+            # 拷出共享内存（同时去掉失败帧），随后释放共享段
+            U_out = U[ok] if not ok.all() else U.copy()
+            V_out = V[ok] if not ok.all() else V.copy()
+    finally:
+        U = V = None        # 释放对共享缓冲区的引用，否则无法 close
+        for shm in (shm_u, shm_v):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    elapsed = time.perf_counter() - t0
+    n_ok = int(ok.sum())
+    fps = n_ok / elapsed if elapsed > 0 else float('inf')
+    if verbose:
+        print(f"  已加载 {n_ok}/{len(file_list)} 帧, 用时 {elapsed:.2f} s, "
+              f"{fps:.1f} 帧/秒 ({workers} 进程)")
+
+    return {
+        'X': first['X'],
+        'Y': first['Y'],
+        'U': U_out,
+        'V': V_out,
+        'frames': [m for m in meta if m is not None],
+        'failed': failed,
+        'fps': fps,
+    }
+
+
+def stack_to_frames(stack: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    堆叠结果转为逐帧字典列表（与 load_piv 返回格式一致）
+    U, V 为堆叠数组的视图，X, Y 各帧共用同一数组，不复制数据
+    """
+    frames = []
+    for i, meta in enumerate(stack['frames']):
+        frame = dict(meta)
+        frame.update(X=stack['X'], Y=stack['Y'], U=stack['U'][i], V=stack['V'][i])
+        frames.append(frame)
+    return frames
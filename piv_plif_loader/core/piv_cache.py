@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PIV 序列二进制缓存
+DaVis txt/dat 序列一次性转换为目录下的 .npy 文件 + meta.json：
+    X.npy, Y.npy        共用坐标网格 (ny, nx)
+    U.npy, V.npy        float32 (nt, ny, nx)，C 顺序，每帧在文件中连续存放
+    meta.json           格式版本、加载参数、源文件签名 (大小, 修改时间)、文件头信息、逐帧元数据
+再次打开时以 np.memmap 只读映射，只有被访问的帧才从磁盘读取。
+默认缓存目录名含文件列表的哈希，不同的文件子集各用一个目录；转换先写入临时目录，
+完成后再改名替换，已打开的旧缓存的内存映射不会被截断。
+
+命令行 (在 piv_plif_loader/ 下运行):
+    python -m core.piv_cache data/PIV_example/*.txt --size 2
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import pathlib
+from typing import Optional, Union, Dict, Any, List
+
+import numpy as np
+
+from core.data_loader import _read_piv_header, _parse_davis_header
+from core.parallel_loader import load_stack_parallel
+from core.piv_loader import load_piv, load_piv_sequence, load_piv_lazy
+from core.piv_sequence import PivSequence, LazyPivSequence
+
+CACHE_VERSION = 1
+META_FILE = 'meta.json'
+
+
+def default_cache_dir(file_list: List[Union[str, pathlib.Path]], size: int = 1,
+                      root: Optional[Union[str, pathlib.Path]] = None) -> pathlib.Path:
+    """
+    默认缓存位置：root（默认为数据所在目录）下的 .piv_cache_bin{size}_{哈希}
+    哈希取自文件列表的绝对路径（按顺序），不同的文件子集不会共用同一个缓存目录
+    """
+    digest = hashlib.sha1('\n'.join(str(pathlib.Path(f).resolve()) for f in file_list)
+                          .encode('utf-8')).hexdigest()[:12]
+    root = pathlib.Path(file_list[0]).parent if root is None else pathlib.Path(root)
+    return root / f".piv_cache_bin{int(size)}_{digest}"
+
+
+def _source_signature(file_list) -> List[list]:
+    sig = []
+    for f in file_list:
+        st = pathlib.Path(f).stat()
+        sig.append([pathlib.Path(f).name, st.st_size, st.st_mtime_ns])
+    return sig
+
+
+def _load_params(filetype, size, x_origin, y_origin) -> Dict[str, Any]:
+    return {'filetype': filetype, 'size': int(size), 'x_origin': x_origin, 'y_origin': y_origin}
+
+
+def _read_header(path: pathlib.Path, filetype: str) -> Dict[str, Any]:
+    """首个文件的文件头：原始首行 + 解析出的 step, xnum, ynum"""
+    with open(path, 'r') as f:
+        line = f.readline().strip()
+    header = {'line': line}
+    try:
+        header['step'], header['xnum'], header['ynum'] = _read_piv_header(path, filetype)
+    except ValueError:
+        try:
+            header['xnum'], header['ynum'] = _parse_davis_header(path)
+        except ValueError:
+            pass
+    return header
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"无法序列化 {type(obj).__name__}")
+
+
+def read_cache_meta(cache_dir: Union[str, pathlib.Path]) -> Optional[Dict[str, Any]]:
+    """读取 meta.json；不存在、损坏或版本不符时返回 None"""
+    path = pathlib.Path(cache_dir) / META_FILE
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != CACHE_VERSION:
+        return None
+    return meta
+
+
+def is_cache_valid(cache_dir: Union[str, pathlib.Path],
+                   file_list: List[Union[str, pathlib.Path]],
+                   filetype: str = 'txt', size: int = 1,
+                   x_origin: Optional[float] = None, y_origin: Optional[float] = None) -> bool:
+    """缓存与源文件（名称、大小、修改时间）及加载参数一致时为 True"""
+    meta = read_cache_meta(cache_dir)
+    if meta is None:
+        return False
+    if meta['params'] != _load_params(filetype, size, x_origin, y_origin):
+        return False
+    try:
+        return meta['sources'] == _source_signature(file_list)
+    except OSError:
+        return False
+
+
+def convert_piv_cache(file_list: List[Union[str, pathlib.Path]],
+                      cache_dir: Union[str, pathlib.Path],
+                      filetype: str = 'txt', size: int = 1,
+                      x_origin: Optional[float] = None, y_origin: Optional[float] = None,
+                      workers: Optional[int] = None,
+                      verbose: bool = True) -> PivSequence:
+    """
+    解析 PIV 序列并写入二进制缓存，返回由该缓存映射的 PivSequence
+
+    用一个进程池（workers 个进程）解析全部文件，各进程直接写入 U.npy / V.npy 的内存映射，
+    内存占用与序列长度无关。加载失败或网格尺寸与首帧不一致的文件被跳过并逐个记入 meta['failed']。
+    所有文件先写入同级的临时目录，完成后改名为 cache_dir（替换旧缓存），
+    中断的转换不会留下半成品，仍打开着的旧缓存的内存映射也不受影响。
+    """
+    file_list = [str(f) for f in file_list]
+    if not file_list:
+        raise ValueError("文件列表为空")
+    cache_dir = pathlib.Path(cache_dir)
+    cache_dir.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    tmp_dir = cache_dir.with_name(f"{cache_dir.name}.tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    try:
+        n, failed = _convert_into(file_list, tmp_dir, filetype, size, x_origin, y_origin,
+                                  workers, verbose)
+        if cache_dir.exists():
+            # 旧目录先改名再删除：已映射的文件在 POSIX 上仍可访问，Windows 上删除失败则留下
+            old_dir = cache_dir.with_name(f"{cache_dir.name}.old{os.getpid()}")
+            shutil.rmtree(old_dir, ignore_errors=True)
+            cache_dir.rename(old_dir)
+            tmp_dir.rename(cache_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            tmp_dir.rename(cache_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if verbose:
+        print(f"  缓存已写入 {cache_dir}: {n} 帧, 失败 {len(failed)} 个, "
+              f"用时 {time.perf_counter() - t0:.2f} s")
+    return open_piv_cache(cache_dir)
+
+
+def _convert_into(file_list, cache_dir, filetype, size, x_origin, y_origin, workers, verbose):
+    """解析 file_list 写入 cache_dir（.npy 与 meta.json），返回 (帧数, 失败列表)"""
+    params = _load_params(filetype, size, x_origin, y_origin)
+    sources = _source_signature(file_list)
+    # 一个进程池解析全部文件，各进程直接写入 U.npy / V.npy；网格尺寸不符的文件逐个记为失败
+    stack = load_stack_parallel(load_piv, file_list, workers or 1, verbose=verbose,
+                                memmap_dir=cache_dir, **params)
+    n = len(stack['frames'])
+    frames, failed = stack['frames'], stack['failed']
+    grid = (stack['X'], stack['Y'])
+    del stack
+    np.save(cache_dir / 'X.npy', grid[0])
+    np.save(cache_dir / 'Y.npy', grid[1])
+
+    meta = {
+        'version': CACHE_VERSION,
+        'n_frames': n,
+        'params': params,
+        'sources': sources,
+        'header': _read_header(pathlib.Path(file_list[0]), filetype),
+        'frames': frames,
+        'failed': [list(f) for f in failed],
+    }
+    with open(cache_dir / META_FILE, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, default=_json_default)
+    return n, failed
+
+
+def open_piv_cache(cache_dir: Union[str, pathlib.Path], mode: str = 'r') -> PivSequence:
+    """打开二进制缓存（U、V 为内存映射，不读取帧数据）"""
+    cache_dir = pathlib.Path(cache_dir)
+    meta = read_cache_meta(cache_dir)
+    if meta is None:
+        raise ValueError(f"{cache_dir} 不是有效的 PIV 缓存")
+    n = meta['n_frames']
+    U = np.load(cache_dir / 'U.npy', mmap_mode=mode)[:n]
+    V = np.load(cache_dir / 'V.npy', mmap_mode=mode)[:n]
+    return PivSequence(np.load(cache_dir / 'X.npy'), np.load(cache_dir / 'Y.npy'),
+                       U, V, meta['frames'], meta['header'])
+
+
+def load_piv_cached(file_list: List[Union[str, pathlib.Path]],
+                    filetype: str = 'txt', size: int = 1,
+                    x_origin: Optional[float] = None, y_origin: Optional[float] = None,
+                    verbose: bool = True, workers: Optional[int] = None,
+                    cache_dir: Optional[Union[str, pathlib.Path]] = None,
+                    lazy: bool = False) -> Union[PivSequence, LazyPivSequence]:
+    """
+    优先使用有效的二进制缓存，否则解析源文件并写入缓存
+
+    cache_dir 为 None 时使用 default_cache_dir；缓存目录不可写时退回
+    load_piv_sequence（只在内存中加载）。
+    lazy=True 且没有有效缓存时不做转换，返回按需解析文件的 LazyPivSequence。
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir(file_list, size)
+    if is_cache_valid(cache_dir, file_list, filetype, size, x_origin, y_origin):
+        if verbose:
+            print(f"  使用缓存 {cache_dir}")
+        return open_piv_cache(cache_dir)
+    if lazy:
+        return load_piv_lazy(file_list, filetype, size, x_origin, y_origin)
+    try:
+        return convert_piv_cache(file_list, cache_dir, filetype, size, x_origin, y_origin,
+                                 workers=workers, verbose=verbose)
+    except OSError as e:
+        if verbose:
+            print(f"  无法写入缓存 {cache_dir}: {e}，改为直接加载")
+        return load_piv_sequence(file_list, filetype, size, x_origin, y_origin,
+                                 verbose, workers)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PIV 序列转换为二进制缓存")
+    parser.add_argument('files', nargs='+', help="PIV 文件 (txt/dat)")
+    parser.add_argument('--filetype', default='txt', choices=('txt', 'dat'))
+    parser.add_argument('--size', type=int, default=1, help="bin 平均大小")
+    parser.add_argument('--out', default=None,
+                        help="缓存目录（默认数据目录下 .piv_cache_bin{size}_{文件列表哈希}）")
+    parser.add_argument('--workers', type=int, default=None, help="并行进程数")
+    args = parser.parse_args()
+
+    files = sorted(args.files)
+    out = args.out or default_cache_dir(files, args.size)
+    convert_piv_cache(files, out, args.filetype, args.size, workers=args.workers)
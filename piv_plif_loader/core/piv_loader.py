@@ -10,6 +10,9 @@ import numpy as np
 import pandas as pd
 import re
 
+from core.parallel_loader import load_stack_parallel, stack_to_frames
+from core.piv_sequence import PivSequence, LazyPivSequence
+
 # ============================================================================
 # PIV数据加载函数
 # ============================================================================
@@ -155,7 +158,8 @@ def load_piv(filename, filetype='txt', size=1, x_origin=None, y_origin=None):
     return result
 
 
-def load_piv_batch(file_list, filetype='txt', size=1, x_origin=None, y_origin=None, verbose=True):
+def load_piv_batch(file_list, filetype='txt', size=1, x_origin=None, y_origin=None, verbose=True,
+                   workers=None):
     """
     批量加载多个PIV文件
     
@@ -171,11 +175,21 @@ def load_piv_batch(file_list, filetype='txt', size=1, x_origin=None, y_origin=No
         原点坐标，如果为None则不进行平移
     verbose : bool
         是否打印加载信息
+    workers : int or None
+        并行进程数；None 时逐个加载。给定时各进程把 U、V 写入共享的
+        (n_frames, ny, nx) 数组，返回的字典中 U、V 为该数组的视图，X、Y 各帧共用
     
     返回:
     --------
-    list: 每个文件的PIV数据字典
+    list: 每个文件的PIV数据字典（顺序与 file_list 一致，加载失败的文件被跳过）
     """
+    if workers:
+        # 与逐个加载相同：全部失败时返回空列表
+        stack = load_stack_parallel(load_piv, file_list, workers, verbose, allow_empty=True,
+                                    filetype=filetype, size=size, x_origin=x_origin,
+                                    y_origin=y_origin)
+        return stack_to_frames(stack)
+
     results = []
     for file_path in file_list:
         try:
@@ -191,6 +205,37 @@ def load_piv_batch(file_list, filetype='txt', size=1, x_origin=None, y_origin=No
     return results
 
 
+def load_piv_sequence(file_list, filetype='txt', size=1, x_origin=None, y_origin=None,
+                      verbose=True, workers=None, memmap_dir=None):
+    """
+    加载PIV序列为 PivSequence（共用网格 + 堆叠的 float32 U、V）
+
+    参数同 load_piv_batch；workers 为 None 时在当前进程逐个解析。
+    memmap_dir 给定时 U、V 存为该目录下的 .npy 内存映射文件。
+
+    返回:
+    --------
+    PivSequence: 下标取帧得到与 load_piv 返回字典兼容的只读映射
+    """
+    # memmap_dir 给定时各进程直接写入磁盘映射，不经内存中转
+    stack = load_stack_parallel(load_piv, file_list, workers or 1, verbose,
+                                memmap_dir=memmap_dir, filetype=filetype, size=size,
+                                x_origin=x_origin, y_origin=y_origin)
+    return PivSequence.from_stack(stack)
+
+
+def load_piv_lazy(file_list, filetype='txt', size=1, x_origin=None, y_origin=None):
+    """
+    按需加载的PIV序列：只解析首个可读文件确定网格，其余帧在下标访问时才解析
+
+    返回:
+    --------
+    LazyPivSequence: 下标取帧返回 load_piv 格式的字典
+    """
+    return LazyPivSequence(load_piv, file_list, filetype=filetype, size=size,
+                           x_origin=x_origin, y_origin=y_origin)
+
+
 def get_piv_info(filename, filetype='txt'):
     """
     快速获取PIV文件的基本信息（不加载完整数据）
@@ -260,6 +305,8 @@ if __name__ == "__main__":
     print("此模块提供以下函数:")
     print("  - load_piv: 加载单个PIV文件")
     print("  - load_piv_batch: 批量加载多个PIV文件")
+    print("  - load_piv_sequence: 加载PIV序列为堆叠数组容器 PivSequence")
+    print("  - load_piv_lazy: 按需解析的PIV序列 LazyPivSequence")
     print("  - get_piv_info: 获取PIV文件基本信息")
     print("="*50)
     print("\n使用示例:")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PIV 序列容器
+整段序列只保存一份坐标网格 X, Y (ny, nx) 与堆叠的 float32 速度 U, V (nt, ny, nx)，
+可由内存数组或 np.memmap 支撑。取帧、取单点时间序列均为视图，不复制数据；
+按下标取帧得到与 load_piv 返回字典兼容的只读映射，原有逐帧代码无需修改。
+"""
+
+import pathlib
+from collections.abc import Mapping
+from typing import Optional, Union, Dict, Any, List
+
+import numpy as np
+
+_ARRAY_KEYS = ('X', 'Y', 'U', 'V')
+
+
+class PivFrame(Mapping):
+    """序列中的一帧：X, Y 为共用网格，U, V 为堆叠数组的视图，其余键为该帧元数据"""
+
+    __slots__ = ('_seq', '_index')
+
+    def __init__(self, seq: 'PivSequence', index: int):
+        self._seq = seq
+        self._index = index
+
+    def __getitem__(self, key):
+        seq = self._seq
+        if key == 'X':
+            return seq.X
+        if key == 'Y':
+            return seq.Y
+        if key == 'U':
+            return seq.U[self._index]
+        if key == 'V':
+            return seq.V[self._index]
+        return seq.frames[self._index][key]
+
+    def __iter__(self):
+        yield from _ARRAY_KEYS
+        yield from self._seq.frames[self._index]
+
+    def __len__(self):
+        return len(_ARRAY_KEYS) + len(self._seq.frames[self._index])
+
+    def __repr__(self):
+        name = self._seq.frames[self._index].get('file_name', '')
+        return f"PivFrame({self._index}, {name!r})"
+
+
+class PivSequence:
+    """
+    堆叠存储的 PIV 序列
+
+    Parameters
+    ----------
+    X, Y : ndarray (ny, nx)
+        各帧共用的坐标网格
+    U, V : ndarray 或 np.memmap (nt, ny, nx)
+        速度分量；非 float32 的内存数组会被转换
+    frames : list of dict, optional
+        每帧元数据 (step, file_name, ...)，不含数组
+    header : dict, optional
+        序列级信息（如缓存中记录的源文件头）
+
+    用法:
+        seq = PivSequence.from_frames(load_piv_batch(files))
+        frame = seq[10]                 # 与 load_piv 返回的字典用法相同
+        u_t = seq.point_series(iy, ix)  # (nt,) 视图
+    """
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray, U: np.ndarray, V: np.ndarray,
+                 frames: Optional[List[Dict[str, Any]]] = None,
+                 header: Optional[Dict[str, Any]] = None):
+        if U.ndim != 3 or U.shape != V.shape:
+            raise ValueError(f"U, V 形状应为相同的 (nt, ny, nx)，实际为 {U.shape}, {V.shape}")
+        if X.shape != U.shape[1:] or Y.shape != U.shape[1:]:
+            raise ValueError(f"网格形状 {X.shape} 与速度场 {U.shape[1:]} 不一致")
+        if not isinstance(U, np.memmap):
+            U = np.asarray(U, dtype=np.float32)
+        if not isinstance(V, np.memmap):
+            V = np.asarray(V, dtype=np.float32)
+        self.X = X
+        self.Y = Y
+        self.U = U
+        self.V = V
+        self.frames = frames if frames is not None else [{} for _ in range(U.shape[0])]
+        self.header = header if header is not None else {}
+        if len(self.frames) != U.shape[0]:
+            raise ValueError(f"元数据 {len(self.frames)} 条与帧数 {U.shape[0]} 不一致")
+
+    # ---------- 构造 ----------
+    @classmethod
+    def from_stack(cls, stack: Dict[str, Any],
+                   memmap_dir: Optional[Union[str, pathlib.Path]] = None) -> 'PivSequence':
+        """由 load_stack_parallel 的返回值构造；给定 memmap_dir 时 U、V 写入磁盘映射"""
+        seq = cls(stack['X'], stack['Y'], stack['U'], stack['V'], list(stack['frames']))
+        return seq.to_memmap(memmap_dir) if memmap_dir is not None else seq
+
+    @classmethod
+    def from_frames(cls, frames: List[Dict[str, Any]],
+                    memmap_dir: Optional[Union[str, pathlib.Path]] = None) -> 'PivSequence':
+        """由 load_piv 逐帧字典列表构造（网格取首帧，各帧网格尺寸须一致）"""
+        if not frames:
+            raise ValueError("帧列表为空")
+        shape = (len(frames),) + frames[0]['U'].shape
+        if memmap_dir is not None:
+            U, V = _create_memmaps(memmap_dir, shape)
+        else:
+            U = np.empty(shape, dtype=np.float32)
+            V = np.empty(shape, dtype=np.float32)
+        meta = []
+        for i, frame in enumerate(frames):
+            if frame['U'].shape != shape[1:]:
+                raise ValueError(f"第 {i} 帧网格尺寸 {frame['U'].shape} 与首帧 {shape[1:]} 不一致")
+            U[i] = frame['U']
+            V[i] = frame['V']
+            meta.append({k: v for k, v in frame.items() if k not in _ARRAY_KEYS})
+        return cls(frames[0]['X'], frames[0]['Y'], U, V, meta)
+
+    def to_memmap(self, folder: Union[str, pathlib.Path]) -> 'PivSequence':
+        """把 U、V 写入 folder 下的 .npy 文件，返回由磁盘映射支撑的新序列"""
+        U, V = _create_memmaps(folder, self.U.shape)
+        U[:] = self.U
+        V[:] = self.V
+        U.flush()
+        V.flush()
+        return PivSequence(self.X, self.Y, U, V, self.frames, self.header)
+
+    # ---------- 访问 ----------
+    def __len__(self):
+        return self.U.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PivSequence(self.X, self.Y, self.U[index], self.V[index],
+                               self.frames[index], self.header)
+        n = len(self)
+        index = int(index)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"帧序号 {index} 超出范围 [0, {n})")
+        return PivFrame(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield PivFrame(self, i)
+
+    def frame(self, index: int) -> PivFrame:
+        return self[index]
+
+    def point_series(self, iy: int, ix: int, component: str = 'U') -> np.ndarray:
+        """网格点 (iy, ix) 的时间序列 (nt,)，component 为 'U' 或 'V'"""
+        if component not in ('U', 'V'):
+            raise ValueError(f"未知分量: {component}")
+        return getattr(self, component)[:, iy, ix]
+
+    def region_series(self, ys: slice, xs: slice):
+        """子区域 [ys, xs] 的时间序列 (U, V)，各为 (nt, h, w) 视图"""
+        return self.U[:, ys, xs], self.V[:, ys, xs]
+
+    @property
+    def shape(self):
+        """(nt, ny, nx)"""
+        return self.U.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.X.nbytes + self.Y.nbytes + self.U.nbytes + self.V.nbytes
+
+    def transposed(self) -> 'PivSequence':
+        """交换网格两个方向（视图），元数据中的 xnum/ynum 随之交换"""
+        frames = []
+        for meta in self.frames:
+            meta = dict(meta)
+            if 'xnum' in meta and 'ynum' in meta:
+                meta['xnum'], meta['ynum'] = meta['ynum'], meta['xnum']
+            frames.append(meta)
+        return PivSequence(self.X.T, self.Y.T, self.U.transpose(0, 2, 1),
+                           self.V.transpose(0, 2, 1), frames, self.header)
+
+
+class LazyPivSequence:
+    """
+    按需解析的 PIV 序列：只在构造时加载首个可读帧确定网格，
+    下标取帧时才调用 load_func 解析对应文件（返回 load_piv 格式的字典）。
+    与 PivSequence 接口一致（len, 下标, X/Y, shape, transposed, region_series），
+    通常配合 core.frame_cache.FrameCache 缓存已解析的帧。
+    """
+
+    def __init__(self, load_func, file_list: List[Union[str, pathlib.Path]], **load_kwargs):
+        self.load_func = load_func
+        self.file_list = [str(f) for f in file_list]
+        self.load_kwargs = load_kwargs
+        self.header = {}
+        self._transpose = False
+        if not self.file_list:
+            raise ValueError("文件列表为空")
+        errors = []
+        for path in self.file_list:
+            try:
+                first = load_func(path, **load_kwargs)
+                break
+            except Exception as e:
+                errors.append(f"{path}: {e}")
+        else:
+            raise RuntimeError("没有成功加载任何文件\n" + "\n".join(errors[:5]))
+        self._X, self._Y = first['X'], first['Y']
+
+    @property
+    def X(self) -> np.ndarray:
+        return self._X.T if self._transpose else self._X
+
+    @property
+    def Y(self) -> np.ndarray:
+        return self._Y.T if self._transpose else self._Y
+
+    @property
+    def shape(self):
+        """(nt, ny, nx)"""
+        return (len(self.file_list),) + self.X.shape
+
+    def __len__(self):
+        return len(self.file_list)
+
+    def __getitem__(self, index) -> Dict[str, Any]:
+        if isinstance(index, slice):
+            seq = LazyPivSequence.__new__(LazyPivSequence)
+            seq.__dict__.update(self.__dict__)
+            seq.file_list = self.file_list[index]
+            return seq
+        data = self.load_func(self.file_list[index], **self.load_kwargs)
+        if data['U'].shape != self._X.shape:
+            raise ValueError(f"{data['file_name']} 网格尺寸 {data['U'].shape} "
+                             f"与首帧 {self._X.shape} 不一致")
+        data['X'], data['Y'] = self._X, self._Y
+        if self._transpose:
+            for key in _ARRAY_KEYS:
+                data[key] = data[key].T
+            data['xnum'], data['ynum'] = data['ynum'], data['xnum']
+        return data
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def frame(self, index: int) -> Dict[str, Any]:
+        return self[index]
+
+    def region_series(self, ys: slice, xs: slice):
+        """子区域 [ys, xs] 的时间序列 (U, V)，各为 (nt, h, w)；需逐帧解析文件"""
+        U, V = [], []
+        for frame in self:
+            U.append(frame['U'][ys, xs])
+            V.append(frame['V'][ys, xs])
+        return np.stack(U), np.stack(V)
+
+    def transposed(self) -> 'LazyPivSequence':
+        """交换网格两个方向，取帧时对数组转置（视图）"""
+        seq = LazyPivSequence.__new__(LazyPivSequence)
+        seq.__dict__.update(self.__dict__)
+        seq._transpose = not self._transpose
+        return seq
+
+
+def _create_memmaps(folder: Union[str, pathlib.Path], shape: tuple):
+    folder = pathlib.Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    U = np.lib.format.open_memmap(folder / 'U.npy', mode='w+', dtype=np.float32, shape=shape)
+    V = np.lib.format.open_memmap(folder / 'V.npy', mode='w+', dtype=np.float32, shape=shape)
+    return U, V
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF 增强流水线
+enhance_frame 与 enhance_plif 的算法相同（归一化 → 边缘保持滤波 → 阈值掩膜 → 模糊归一化），
+但每个线程复用自己的三通道缓冲区，不再每帧 cv2.merge 分配；关闭边缘保持滤波时掩膜直接由
+单通道图像得到，完全不经过三通道。
+整段序列由线程池并行处理（OpenCV 计算时释放 GIL）；PlifEnhancer 按 (参数, 帧号) 缓存结果，
+供主窗口叠加与原始图像浏览共用，参数改回原值时直接命中缓存。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+ENHANCE_DEFAULTS = {
+    'sigma_s': 10,
+    'sigma_r': 10.0,
+    'thres_hold': 30,
+    'blur_size': 15,
+    'edge_preserving': True,
+}
+
+_local = threading.local()
+
+
+def _bgr_buffer(shape) -> np.ndarray:
+    """当前线程复用的 (ny, nx, 3) uint8 缓冲区"""
+    buf = getattr(_local, 'bgr', None)
+    if buf is None or buf.shape[:2] != shape:
+        buf = _local.bgr = np.empty(shape + (3,), dtype=np.uint8)
+    return buf
+
+
+def enhance_frame(scalar_raw: np.ndarray, sigma_s: int = 10, sigma_r: float = 10.0,
+                  thres_hold: int = 30, blur_size: int = 15,
+                  edge_preserving: bool = True) -> np.ndarray:
+    """
+    单帧增强，返回 float32 (ny, nx)，掩膜内为 1-100，掩膜外为 0
+
+    edge_preserving=False 时跳过边缘保持滤波，阈值直接作用于归一化后的单通道图像
+    """
+    import cv2
+
+    if scalar_raw is None or scalar_raw.size == 0:
+        if scalar_raw is not None:
+            return np.zeros_like(scalar_raw, dtype='float32')
+        return np.zeros((1, 1), dtype='float32')
+    scalar_raw = np.nan_to_num(np.asarray(scalar_raw, dtype=np.float32), nan=0.0)
+
+    # 归一化到 0-255
+    norm = cv2.normalize(scalar_raw, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+
+    if edge_preserving:
+        # edgePreservingFilter 只支持 8 位三通道：写入线程内复用的缓冲区，只取一个通道
+        src = cv2.cvtColor(norm, cv2.COLOR_GRAY2BGR, dst=_bgr_buffer(norm.shape))
+        gray = cv2.edgePreservingFilter(src, flags=2, sigma_s=sigma_s, sigma_r=sigma_r)[:, :, 0]
+    else:
+        gray = norm
+
+    # 阈值掩膜
+    _, mask = cv2.threshold(gray, thres_hold, 1, cv2.THRESH_BINARY)
+
+    # 模糊与归一化
+    blurred = cv2.blur(norm, (blur_size, blur_size))
+    blurred_norm = cv2.normalize(blurred, None, 1, 100, cv2.NORM_MINMAX)
+
+    return (blurred_norm * mask).astype(np.float32)
+
+
+def _default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _params_key(params: Dict[str, Any]) -> Tuple:
+    merged = dict(ENHANCE_DEFAULTS, **params)
+    unknown = set(merged) - set(ENHANCE_DEFAULTS)
+    if unknown:
+        raise TypeError(f"未知的增强参数: {sorted(unknown)}")
+    return tuple((k, merged[k]) for k in ENHANCE_DEFAULTS)
+
+
+def _frame_source(frames) -> Callable[[int], np.ndarray]:
+    """PlifSequence / 帧字典列表 / (nt, ny, nx) 数组 -> source(index)"""
+    if hasattr(frames, 'scalar') and callable(frames.scalar):
+        return frames.scalar
+    if isinstance(frames, np.ndarray):
+        return lambda i: frames[i]
+    return lambda i: frames[i]['scalar']
+
+
+def enhance_sequence(frames, workers: Optional[int] = None,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     **params) -> np.ndarray:
+    """
+    整段序列增强，线程池并行，结果写入预分配的 (nt, ny, nx) float32 数组
+
+    frames : PlifSequence、帧字典列表或 (nt, ny, nx) 数组
+    params : enhance_frame 的参数（省略的取 ENHANCE_DEFAULTS）
+    """
+    kwargs = dict(_params_key(params))
+    source = _frame_source(frames)
+    nt = len(frames)
+    first = enhance_frame(source(0), **kwargs)
+    out = np.empty((nt,) + first.shape, dtype=np.float32)
+    out[0] = first
+
+    def run(i):
+        out[i] = enhance_frame(source(i), **kwargs)
+
+    done = 1
+    with ThreadPoolExecutor(max_workers=workers or _default_workers()) as pool:
+        for _ in pool.map(run, range(1, nt)):
+            done += 1
+            if progress is not None and (done % 16 == 0 or done == nt):
+                progress(done, nt)
+    return out
+
+
+class PlifEnhancer:
+    """
+    可复用的增强阶段：按 (参数, 帧号) 缓存增强结果，后台线程池预取
+
+    Parameters
+    ----------
+    frames : PlifSequence、帧字典列表或 (nt, ny, nx) 数组
+    workers : 线程数，None 为 CPU 核数
+    maxsize : 最多缓存的帧数（所有参数合计）
+    params : 初始增强参数
+
+    用法:
+        enh = PlifEnhancer(seq, thres_hold=40)
+        img = enh.get(10)
+        enh.prefetch(range(11, 19))
+        enh.set_params(blur_size=9)     # 之后 get() 按新参数计算，旧参数的结果仍保留在缓存中
+        enh.close()
+    """
+
+    def __init__(self, frames, workers: Optional[int] = None, maxsize: int = 64, **params):
+        self.frames = frames
+        self._source = _frame_source(frames)
+        self.maxsize = max(int(maxsize), 1)
+        self._key = _params_key(params)
+        self._cache: 'OrderedDict[Tuple, Future]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers or _default_workers(),
+                                        thread_name_prefix='PlifEnhance')
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return dict(self._key)
+
+    def set_params(self, **params):
+        """修改增强参数（未给出的保持当前值）"""
+        self._key = _params_key(dict(self._key, **params))
+
+    def _submit(self, index: int) -> Future:
+        key = (self._key, index)
+        with self._lock:
+            fut = self._cache.get(key)
+            if fut is not None:
+                self._cache.move_to_end(key)
+                return fut
+            kwargs = dict(self._key)
+            fut = self._pool.submit(lambda: enhance_frame(self._source(index), **kwargs))
+            self._cache[key] = fut
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return fut
+
+    def get(self, index: int) -> np.ndarray:
+        """当前参数下第 index 帧的增强结果 (ny, nx) float32"""
+        fut = self._submit(index)
+        try:
+            return fut.result()
+        except Exception:
+            with self._lock:
+                self._cache.pop((self._key, index), None)
+            raise
+
+    def prefetch(self, indices: Iterable[int]):
+        """后台计算这些帧（已缓存或正在计算的跳过）"""
+        for i in indices:
+            self._submit(i)
+
+    def is_cached(self, index: int) -> bool:
+        with self._lock:
+            fut = self._cache.get((self._key, index))
+            return fut is not None and fut.done()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        """停止线程池（已提交的帧完成后退出）"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -3,7 +3,7 @@
 """
 PLIF 数据加载模块 - 读取 TIFF 标量图像
 支持 bin 平均、可选物理坐标、多格式自动回退、
-Photron FASTCAM .cihx 元数据解析，原始文件夹批量加载。
+Photron FASTCAM .cihx 元数据解析，原始文件夹批量加载（TIFF 序列或 .mraw 内存映射）。
 """
 
 import xml.etree.ElementTree as ET
@@ -13,40 +13,30 @@ import pathlib
 import numpy as np
 from typing import Optional
 from typing import Union, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+
+from core.plif_reader import BACKENDS, select_tiff_backend, read_tiff_stack
+from core.plif_sequence import PlifSequence, plif_coords
+from core.mraw_reader import find_mraw, open_mraw
+from core.plif_stats import streaming_statistics
+from core.plif_registration import cached_registration_map, apply_registration
+from core.plif_enhance import enhance_frame
+
+
+_last_backend = [None]     # 上次成功的读取后端，下个文件优先使用
 
 
 def _read_tiff(filename: str) -> np.ndarray:
-    """读取 TIFF 文件，tifffile 优先 (避免 cv2 卡死)。"""
-    try:
-        import tifffile
-        img = tifffile.imread(str(filename))
-        if img is not None:
-            return np.asarray(img)
-    except Exception:
-        pass
-    try:
-        import imageio.v3 as iio
-        img = iio.imread(str(filename))
-        if img is not None:
-            return np.asarray(img)
-    except Exception:
-        pass
-    try:
-        from PIL import Image
-        with Image.open(str(filename)) as im:
-            img = np.array(im)
-            if img is not None:
-                return img
-    except Exception:
-        pass
-    try:
-        import cv2
-        img = cv2.imread(str(filename), cv2.IMREAD_UNCHANGED)
-        if img is not None:
-            return img
-    except Exception:
-        pass
-    raise IOError(f"无法读取图像文件: {filename}")
+    """读取单个 TIFF 文件，tifffile 优先 (避免 cv2 卡死)；上次成功的后端先尝试。"""
+    order = list(BACKENDS)
+    if _last_backend[0] is not None:
+        order.remove(_last_backend[0])
+        order.insert(0, _last_backend[0])
+    name, _, img = select_tiff_backend(filename, order)
+    _last_backend[0] = name
+    return img
+
+
 def parse_cihx(cihx_path: Union[str, pathlib.Path]) -> Dict[str, Any]:
     """
     解析 Photron FASTCAM .cihx 文件，提取相机参数和图像元数据。
@@ -141,11 +131,15 @@ def load_plif_raw_folder(folder: Union[str, pathlib.Path],
                          dx: float = 1.0,
                          dy: float = 1.0,
                          max_frames: Optional[int] = None,
-                         verbose: bool = True) -> Dict[str, Any]:
+                         verbose: bool = True,
+                         workers: Optional[int] = None,
+                         memmap_path: Optional[Union[str, pathlib.Path]] = None,
+                         prefer_mraw: bool = True) -> Dict[str, Any]:
     """
     加载 Photron FASTCAM 原始 PLIF 数据文件夹。
 
-    自动查找文件夹中的 .cihx 文件和 .tif/.tiff 图像序列。
+    自动查找文件夹中的 .cihx 文件和 .tif/.tiff 图像序列；
+    有 .mraw 与 .cihx 时（prefer_mraw=True）直接内存映射 .mraw，不读取 TIFF。
 
     Parameters
     ----------
@@ -159,18 +153,37 @@ def load_plif_raw_folder(folder: Union[str, pathlib.Path],
     x0, y0, dx, dy : 物理标定参数。
     max_frames : int or None
         最大加载帧数，None = 全部。
+    workers : int or None
+        读取线程数（见 core.plif_reader.read_tiff_stack）。
+    memmap_path : str or Path or None
+        给定时原始 uint16 图像直接读入该 .npy 内存映射文件（仅 TIFF 序列）。
+    prefer_mraw : bool
+        文件夹中有 .mraw 时优先使用。
 
     Returns
     -------
-    dict : {'frames': [...], 'metadata': {...}, 'folder': str}
+    dict : {'frames': PlifSequence, 'metadata': {...}, 'folder': str, 'source': 'mraw' | 'tiff'}
+        frames 按下标取帧与 load_plif 返回的字典用法相同，读取失败的帧被剔除
     """
     folder = pathlib.Path(folder)
     if not folder.is_dir():
         raise ValueError(f"路径不是文件夹: {folder}")
+    size = int(size)
+    if dx <= 0 or dy <= 0:
+        raise ValueError("dx 和 dy 必须为正值")
+
+    mraw = find_mraw(folder) if prefer_mraw else None
+    if mraw is not None:
+        seq = load_plif_mraw(mraw[0], size=size, bit_shift=bit_shift, x0=x0, y0=y0,
+                             dx=dx, dy=dy, max_frames=max_frames, cihx_path=mraw[1],
+                             verbose=verbose)
+        return {'frames': seq, 'metadata': seq.metadata, 'folder': str(folder),
+                'source': 'mraw'}
 
     cihx_files = list(folder.glob('*.cihx'))
     metadata = None
-    shift = 0
+    # 显式给定的 bit_shift 无论有无 cihx 都生效
+    shift = bit_shift or 0
     if cihx_files:
         metadata = parse_cihx(cihx_files[0])
         if verbose:
@@ -178,9 +191,8 @@ def load_plif_raw_folder(folder: Union[str, pathlib.Path],
             print(f"    相机: {metadata['camera_name']}, "
                   f"分辨率: {metadata['width']}x{metadata['height']}, "
                   f"帧率: {metadata['record_rate']} fps")
-        if bit_shift is not None:
-            shift = bit_shift
-        elif metadata['effective_side'].lower() == 'higher' and metadata['effective_depth'] > 0:
+        if (bit_shift is None and metadata['effective_side'].lower() == 'higher'
+                and metadata['effective_depth'] > 0):
             shift = metadata['bit_depth'] - metadata['effective_depth']
             if verbose:
                 print(f"    有效位 {metadata['effective_depth']}bit 高位存储, 自动右移 {shift} 位")
@@ -195,12 +207,86 @@ def load_plif_raw_folder(folder: Union[str, pathlib.Path],
     if verbose:
         print(f"  找到 {len(tiff_files)} 个 TIFF 文件")
 
-    frames = load_plif_batch(
-        tiff_files, size=size, x0=x0, y0=y0, dx=dx, dy=dy,
-        bit_shift=shift, verbose=verbose
-    )
+    seq = load_plif_sequence(tiff_files, size=size, bit_shift=shift, x0=x0, y0=y0,
+                             dx=dx, dy=dy, verbose=verbose, workers=workers,
+                             memmap_path=memmap_path)
+    seq.metadata = metadata
+    return {'frames': seq, 'metadata': metadata, 'folder': str(folder), 'source': 'tiff'}
+
+
+def load_plif_mraw(mraw_path: Union[str, pathlib.Path],
+                   size: int = 1,
+                   bit_shift: Optional[int] = None,
+                   x0: float = 0.0,
+                   y0: float = 0.0,
+                   dx: float = 1.0,
+                   dy: float = 1.0,
+                   max_frames: Optional[int] = None,
+                   cihx_path: Optional[Union[str, pathlib.Path]] = None,
+                   verbose: bool = True) -> PlifSequence:
+    """
+    以内存映射打开 Photron .mraw 为 PlifSequence（不读取、不转换帧数据）
 
-    return {'frames': frames, 'metadata': metadata, 'folder': str(folder)}
+    cihx_path 默认为同名 .cihx；bit_shift 为 None 时按 cihx 有效位自动确定。
+    其余参数同 load_plif_raw_folder。
+    """
+    mraw_path = pathlib.Path(mraw_path)
+    cihx_path = pathlib.Path(cihx_path) if cihx_path is not None else mraw_path.with_suffix('.cihx')
+    metadata = parse_cihx(cihx_path)
+    raw = open_mraw(mraw_path, metadata, bit_shift)
+    if max_frames is not None:
+        raw = raw[:max_frames]
+    if verbose:
+        print(f"  映射 {mraw_path.name}: {len(raw)} 帧 {metadata['width']}x{metadata['height']}, "
+              f"{metadata['bit_depth']} bit, 帧率 {metadata['record_rate']} fps")
+    frames = [{'file_name': f"{mraw_path.name}[{i}]", 'file_path': str(mraw_path)}
+              for i in range(len(raw))]
+    return PlifSequence(raw, size, x0, y0, dx, dy, frames, metadata)
+
+
+def load_plif_sequence(file_list: List[Union[str, pathlib.Path]],
+                       size: int = 1,
+                       bit_shift: int = 0,
+                       x0: float = 0.0,
+                       y0: float = 0.0,
+                       dx: float = 1.0,
+                       dy: float = 1.0,
+                       verbose: bool = True,
+                       workers: Optional[int] = None,
+                       memmap_path: Optional[Union[str, pathlib.Path]] = None) -> PlifSequence:
+    """
+    加载 PLIF 序列为 PlifSequence（uint16 堆叠 + 共用坐标，取帧时才转为 float32）
+
+    参数同 load_plif_batch；memmap_path 给定时原始图像读入该 .npy 内存映射文件。
+    读取失败的帧被剔除（其后各帧前移），结果保持文件顺序。
+    """
+    if dx <= 0 or dy <= 0:
+        raise ValueError("dx 和 dy 必须为正值")
+    file_list = [pathlib.Path(f) for f in file_list]
+    out = None
+    if memmap_path is not None:
+        # 先读首帧确定图像尺寸，再建立映射文件
+        shape = (len(file_list),) + np.asarray(_read_tiff(str(file_list[0]))).shape[:2]
+        memmap_path = pathlib.Path(memmap_path)
+        memmap_path.parent.mkdir(parents=True, exist_ok=True)
+        out = np.lib.format.open_memmap(memmap_path, mode='w+', dtype=np.uint16, shape=shape)
+
+    # 后端只选一次，线程池解码到 uint16 堆叠数组，右移原地完成
+    stack = read_tiff_stack(file_list, bit_shift=bit_shift, workers=workers, out=out,
+                            verbose=verbose)
+    raw = stack['data']
+    bad = {index for index, _, _ in stack['failed']}
+    good = [i for i in range(len(file_list)) if i not in bad]
+    if not good:
+        raise RuntimeError("所有 PLIF 文件加载失败")
+    if bad:
+        # 原地前移有效帧，不复制整个数组
+        for k, i in enumerate(good):
+            if k != i:
+                raw[k] = raw[i]
+        raw = raw[:len(good)]
+    frames = [{'file_name': file_list[i].name, 'file_path': str(file_list[i])} for i in good]
+    return PlifSequence(raw, size, x0, y0, dx, dy, frames)
 
 
 def load_plif(filename: Union[str, pathlib.Path],
@@ -253,6 +339,13 @@ def load_plif(filename: Union[str, pathlib.Path],
     if bit_shift > 0:
         img = img >> bit_shift
 
+    return _plif_frame(img, size, x0, y0, dx, dy, filename)
+
+
+def _plif_frame(img: np.ndarray, size: int, x0: float, y0: float, dx: float, dy: float,
+                filename: Union[str, pathlib.Path]) -> Dict[str, Any]:
+    """单通道图像 -> load_plif 格式的字典（上下翻转、bin 平均、物理坐标）"""
+    filename = pathlib.Path(filename)
     # 确保为浮点类型
     if np.issubdtype(img.dtype, np.integer):
         img = img.astype('float64')
@@ -266,14 +359,7 @@ def load_plif(filename: Union[str, pathlib.Path],
     ny_new, nx_new = scalar.shape
 
     # 重新计算物理坐标（注意翻转后 y0 仍为最小 Y，dy 为正）
-    X = np.arange(x0, x0 + nx_new * dx * size, dx * size, dtype='float32')
-    Y = np.arange(y0, y0 + ny_new * dy * size, dy * size, dtype='float32')
-
-    # 确保坐标数组长度匹配（float32 累加误差可能导致多出元素）
-    if len(X) > nx_new:
-        X = X[:nx_new]
-    if len(Y) > ny_new:
-        Y = Y[:ny_new]
+    X, Y = plif_coords(nx_new, ny_new, x0, y0, dx, dy, size)
 
     return {
         'x_num': nx_new,
@@ -293,7 +379,8 @@ def load_plif_batch(file_list: List[Union[str, pathlib.Path]],
                     y0: float = 0.0,
                     dx: float = 1.0,
                     dy: float = 1.0,
-                    verbose: bool = True) -> List[Dict[str, Any]]:
+                    verbose: bool = True,
+                    workers: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     批量加载多个 PLIF 文件。
 
@@ -304,21 +391,33 @@ def load_plif_batch(file_list: List[Union[str, pathlib.Path]],
     size, bit_shift, x0, y0, dx, dy : 同 load_plif。
     verbose : bool
         是否打印加载信息。
+    workers : int or None
+        读取线程数；None 或 1 为逐个读取。结果保持文件顺序。
 
     Returns
     -------
     list of dict : 每个文件的 PLIF 数据字典
     """
-    results = []
-    for f in file_list:
+    def load(f):
         try:
-            data = load_plif(f, size, bit_shift, x0, y0, dx, dy)
+            return f, load_plif(f, size, bit_shift, x0, y0, dx, dy), None
+        except Exception as e:
+            return f, None, e
+
+    if workers is not None and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(load, file_list))
+    else:
+        outcomes = map(load, file_list)
+
+    results = []
+    for f, data, error in outcomes:
+        if error is None:
             results.append(data)
             if verbose:
                 print(f"  已加载 PLIF: {data['file_name']}")
-        except Exception as e:
-            if verbose:
-                print(f"  加载失败 {f}: {e}")
+        elif verbose:
+            print(f"  加载失败 {f}: {error}")
     return results
 
 
@@ -342,30 +441,24 @@ def align_plif_to_piv(plif_data: Dict[str, Any],
 
     plif_data 包含 1D 坐标 X, Y，以及 2D scalar；
     piv_data 包含 2D 网格 X, Y（形状 ny×nx）。
-    返回插值后的标量场，形状与 piv X 相同。
+    返回插值后的标量场，形状与 piv X 相同，PLIF 范围外为 NaN。
+    PLIF 为规则网格，按双线性插值；下标与权重映射按坐标缓存（见 core.plif_registration），
+    同一标定下逐帧调用只做一次向量化取值。
     """
-    from scipy.interpolate import griddata
-
-    Xp, Yp = np.meshgrid(plif_data['X'], plif_data['Y'])
-    points = np.column_stack((Xp.ravel(), Yp.ravel()))
-    values = plif_data['scalar'].ravel()
-
-    Xpiv = piv_data['X']  # 2D, (ny, nx)
-    Ypiv = piv_data['Y']
-
-    aligned = griddata(points, values, (Xpiv, Ypiv), method='linear',
-                       fill_value=np.nan)
-    return aligned.astype('float32')
+    reg = cached_registration_map(plif_data['X'], plif_data['Y'], piv_data['X'], piv_data['Y'])
+    return apply_registration(reg, plif_data['scalar'])
 
 
 def enhance_plif(scalar_raw: np.ndarray,
                  sigma_s: int = 10,
                  sigma_r: float = 10.0,
                  thres_hold: int = 30,
-                 blur_size: int = 15) -> np.ndarray:
+                 blur_size: int = 15,
+                 edge_preserving: bool = True) -> np.ndarray:
     """
     对 PLIF 标量场进行边缘保持滤波、阈值掩膜和模糊增强，
-    用于更好的可视化叠加。
+    用于更好的可视化叠加。整段序列请用 core.plif_enhance 的
+    enhance_sequence（线程池并行）或 PlifEnhancer（按参数缓存）。
 
     参数
     ----
@@ -373,65 +466,24 @@ def enhance_plif(scalar_raw: np.ndarray,
     sigma_s, sigma_r : 边缘保持滤波参数
     thres_hold : 二值化阈值（0-255）
     blur_size : 模糊核大小
+    edge_preserving : False 时跳过边缘保持滤波，直接对归一化图像取阈值
 
     返回
     -------
     enhanced : 2D numpy 数组 (ny, nx)，uint8 范围内的浮点值
     """
-    import cv2
-
-    # 处理全 NaN 或全零输入
-    if scalar_raw is None or scalar_raw.size == 0:
-        if scalar_raw is not None:
-            return np.zeros_like(scalar_raw, dtype='float32')
-        return np.zeros((1, 1), dtype='float32')
-    scalar_raw = np.nan_to_num(scalar_raw, nan=0.0)
-
-    # 归一化到 0-255
-    norm = cv2.normalize(scalar_raw, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-
-    # 三通道供边缘保持滤波使用
-    src = cv2.merge([norm, norm, norm])
-    filtered = cv2.edgePreservingFilter(src, flags=2, sigma_s=sigma_s, sigma_r=sigma_r)
-    gray = filtered[:, :, 0]
+    return enhance_frame(scalar_raw, sigma_s, sigma_r, thres_hold, blur_size, edge_preserving)
 
-    # 阈值掩膜
-    _, mask = cv2.threshold(gray, thres_hold, 1, cv2.THRESH_BINARY)
 
-    # 模糊与归一化
-    blurred = cv2.blur(norm, (blur_size, blur_size))
-    blurred_norm = cv2.normalize(blurred, None, 1, 100, cv2.NORM_MINMAX)
-
-    # 应用掩膜
-    enhanced = (blurred_norm * mask).astype(np.float32)
-    return enhanced
-
-
-def compute_plif_statistics(frames: List[Dict[str, Any]]) -> Dict[str, Any]:
+def compute_plif_statistics(frames, percentiles=(2, 98), chunk_mb: float = 64,
+                            progress=None) -> Dict[str, Any]:
     """
-    计算 PLIF 帧序列的统计信息。
+    计算 PLIF 帧序列的统计信息（按时间块单遍计算，见 core.plif_stats）。
 
     Returns
     -------
-    dict : global_min, global_max, per_frame [{min, max, mean, std}, ...]
+    dict : global_min, global_max, per_frame [{min, max, mean, std}, ...]，
+        以及 mean_image / rms_image 等逐像素统计、分位数与显示用的 clim
     """
-    if not frames:
-        return {}
-    global_min = np.inf
-    global_max = -np.inf
-    per_frame = []
-    for f in frames:
-        s = f['scalar']
-        stats = {
-            'min': float(np.nanmin(s)),
-            'max': float(np.nanmax(s)),
-            'mean': float(np.nanmean(s)),
-            'std': float(np.nanstd(s)),
-        }
-        global_min = min(global_min, stats['min'])
-        global_max = max(global_max, stats['max'])
-        per_frame.append(stats)
-    return {
-        'global_min': global_min, 'global_max': global_max,
-        'per_frame': per_frame,
-    }
+    return streaming_statistics(frames, percentiles=percentiles, chunk_mb=chunk_mb,
+                                progress=progress)
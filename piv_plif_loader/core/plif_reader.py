@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF TIFF 序列并行读取
+读取后端 (tifffile / PIL / cv2 / imageio) 在首个文件上选定一次，整个序列都用它，
+不再对每个文件依次尝试各库。线程池解码（tifffile 解码时释放 GIL），各帧直接写入预分配的
+(nt, ny, nx) uint16 数组（也可为 np.memmap），Photron 高位存储的右移 (bit_shift) 原地完成。
+iter_tiff_frames 为生成器模式：按顺序逐帧给出，只预读有限帧，不持有整段序列。
+"""
+
+import os
+import time
+import pathlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+BACKENDS = ('tifffile', 'PIL', 'cv2', 'imageio')
+
+
+def _backend_reader(name: str) -> Callable:
+    """后端的读取函数 read(path, out=None)；out 为预分配的一帧，能直接解码时写入并返回 out"""
+    if name == 'tifffile':
+        import tifffile
+
+        def read(path, out=None):
+            if out is not None:
+                try:
+                    return tifffile.imread(path, out=out)
+                except ValueError:          # 形状或类型与 out 不符
+                    pass
+            return tifffile.imread(path)
+    elif name == 'PIL':
+        from PIL import Image
+
+        def read(path, out=None):
+            with Image.open(path) as im:
+                return np.array(im)
+    elif name == 'cv2':
+        import cv2
+
+        def read(path, out=None):
+            img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if img is None:
+                raise IOError(f"cv2 无法读取 {path}")
+            return img
+    elif name == 'imageio':
+        import imageio.v3 as iio
+
+        def read(path, out=None):
+            return iio.imread(path)
+    else:
+        raise ValueError(f"未知后端: {name}，可选 {BACKENDS}")
+    return read
+
+
+def select_tiff_backend(path: Union[str, pathlib.Path],
+                        backends: Sequence[str] = BACKENDS) -> Tuple[str, Callable, np.ndarray]:
+    """在 path 上依次尝试各后端，返回 (后端名称, 读取函数, 该文件的图像)"""
+    errors = []
+    for name in backends:
+        try:
+            read = _backend_reader(name)
+            img = np.asarray(read(str(path)))
+            if img.ndim >= 2:
+                return name, read, img
+            errors.append(f"{name}: 维数 {img.ndim}")
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}: {e}")
+    raise IOError(f"无法读取图像文件: {path}\n" + "\n".join(errors))
+
+
+def _to_gray(img: np.ndarray) -> np.ndarray:
+    """多通道图像取亮度（加权平均），单通道原样返回"""
+    if img.ndim == 3:
+        if img.shape[2] >= 3:
+            return 0.299 * img[:, :, 0] + 0.587 * img[:, :, 1] + 0.114 * img[:, :, 2]
+        return img[:, :, 0]
+    return img
+
+
+def _store(out: np.ndarray, img: np.ndarray, bit_shift: int):
+    """一帧写入 out（uint16）并原地右移 bit_shift 位"""
+    if img is not out:
+        img = _to_gray(np.asarray(img))
+        if img.shape != out.shape:
+            raise ValueError(f"图像尺寸 {img.shape} 与首帧 {out.shape} 不一致")
+        if np.issubdtype(img.dtype, np.integer):
+            out[...] = img
+        else:
+            np.clip(np.rint(img), 0, np.iinfo(out.dtype).max, out=out, casting='unsafe')
+    if bit_shift > 0:
+        np.right_shift(out, bit_shift, out=out)
+
+
+def _default_workers() -> int:
+    # 读文件以 I/O 与解码为主，线程数可多于核数
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def read_tiff_stack(file_list: List[Union[str, pathlib.Path]], bit_shift: int = 0,
+                    workers: Optional[int] = None, out: Optional[np.ndarray] = None,
+                    backend: Optional[str] = None,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    verbose: bool = False) -> Dict[str, Any]:
+    """
+    读取 TIFF 序列为 uint16 堆叠数组
+
+    Parameters
+    ----------
+    file_list : 文件路径列表，结果保持此顺序
+    bit_shift : 右移位数（Photron 高位存储，见 load_plif_raw_folder）
+    workers : 线程数；None 为 min(32, CPU 核数 + 4)，1 为串行
+    out : 预分配的 (nt, ny, nx) uint16 数组（如 np.lib.format.open_memmap），None 时新建
+    backend : 指定后端；None 时在首个文件上自动选择
+    progress : progress(完成帧数, 总帧数)
+
+    Returns
+    -------
+    dict :
+        - data : uint16 (nt, ny, nx)，读取失败的帧为 0（保持帧序号与时间对应）
+        - failed : [(序号, 文件路径, 错误信息)]
+        - backend : 使用的后端
+        - fps : 读取吞吐量（帧/秒）
+    """
+    file_list = [str(f) for f in file_list]
+    if not file_list:
+        raise ValueError("文件列表为空")
+    workers = workers or _default_workers()
+    t0 = time.perf_counter()
+
+    if backend is None:
+        backend, read, first = select_tiff_backend(file_list[0])
+    else:
+        read = _backend_reader(backend)
+        first = np.asarray(read(file_list[0]))
+    shape = (len(file_list),) + _to_gray(first).shape
+    if out is None:
+        out = np.empty(shape, dtype=np.uint16)
+    elif out.shape != shape:
+        raise ValueError(f"out 形状 {out.shape} 与序列 {shape} 不一致")
+    _store(out[0], first, bit_shift)
+    del first
+
+    failed = []
+    done = 1
+
+    def load(index):
+        try:
+            _store(out[index], read(file_list[index], out=out[index]), bit_shift)
+        except Exception as e:
+            out[index] = 0
+            return index, f"{type(e).__name__}: {e}"
+        return index, None
+
+    indices = range(1, len(file_list))
+    if workers == 1:
+        results = map(load, indices)
+        pool = None
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        results = pool.map(load, indices)
+    try:
+        for index, error in results:
+            if error is not None:
+                failed.append((index, file_list[index], error))
+                if verbose:
+                    print(f"  加载失败 {file_list[index]}: {error}")
+            done += 1
+            if progress is not None and (done % 64 == 0 or done == len(file_list)):
+                progress(done, len(file_list))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    fps = len(file_list) / max(time.perf_counter() - t0, 1e-9)
+    if verbose:
+        print(f"  读取 {len(file_list)} 帧 ({backend}, {workers} 线程), "
+              f"失败 {len(failed)} 帧, {fps:.0f} 帧/秒")
+    return {'data': out, 'failed': failed, 'backend': backend, 'fps': fps}
+
+
+def iter_tiff_frames(file_list: List[Union[str, pathlib.Path]], bit_shift: int = 0,
+                     workers: Optional[int] = None, backend: Optional[str] = None,
+                     ahead: Optional[int] = None,
+                     verbose: bool = False) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    按顺序逐帧给出 (序号, uint16 图像)，线程池最多预读 ahead 帧（默认 2 × workers）
+    读取失败的帧被跳过（序号不连续）
+    """
+    file_list = [str(f) for f in file_list]
+    if not file_list:
+        return
+    workers = workers or _default_workers()
+    ahead = max(1, ahead or 2 * workers)
+    if backend is None:
+        backend, read, first = select_tiff_backend(file_list[0])
+    else:
+        read = _backend_reader(backend)
+        first = np.asarray(read(file_list[0]))
+    frame = np.empty(_to_gray(first).shape, dtype=np.uint16)
+    _store(frame, first, bit_shift)
+    del first
+    shape = frame.shape
+
+    def load(index):
+        out = np.empty(shape, dtype=np.uint16)
+        _store(out, read(file_list[index], out=out), bit_shift)
+        return out
+
+    yield 0, frame
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        next_index = 1
+        while pending or next_index < len(file_list):
+            while next_index < len(file_list) and len(pending) < ahead:
+                pending.append((next_index, pool.submit(load, next_index)))
+                next_index += 1
+            index, fut = pending.popleft()
+            try:
+                frame = fut.result()
+            except Exception as e:
+                if verbose:
+                    print(f"  加载失败 {file_list[index]}: {e}")
+                continue
+            yield index, frame
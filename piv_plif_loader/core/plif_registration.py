@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF → PIV 网格配准
+PLIF 图像是规则网格（1D 递增坐标 X, Y），PIV 网格点在其中的位置只需按坐标查找一次：
+registration_map 对每个 PIV 点预先算出所在单元的 4 个像素下标与双线性权重，
+之后每帧（或整段序列的一个时间块）只是一次向量化的取值加权求和，不再对整幅图像做三角剖分。
+标定或网格不变时映射可一直复用；PIV 点在 PLIF 图像范围外时为 NaN。
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+from core.plif_sequence import PlifSequence
+
+_MAP_CACHE: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+_MAP_CACHE_SIZE = 4
+
+
+def _axis_weights(coords: np.ndarray, points: np.ndarray):
+    """1D 递增坐标上的左侧下标、右侧权重与是否在范围内"""
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.size < 2:
+        raise ValueError("PLIF 坐标至少需要 2 个点")
+    if np.any(np.diff(coords) <= 0):
+        raise ValueError("PLIF 坐标应严格递增")
+    i = np.clip(np.searchsorted(coords, points, side='right') - 1, 0, coords.size - 2)
+    t = (points - coords[i]) / (coords[i + 1] - coords[i])
+    valid = (points >= coords[0]) & (points <= coords[-1])
+    return i, t, valid
+
+
+def registration_map(plif_X: np.ndarray, plif_Y: np.ndarray,
+                     piv_X: np.ndarray, piv_Y: np.ndarray) -> Dict[str, Any]:
+    """
+    PLIF 规则网格到 PIV 网格点的双线性插值映射
+
+    Parameters
+    ----------
+    plif_X, plif_Y : 1D 递增坐标（load_plif / PlifSequence 的 X, Y）
+    piv_X, piv_Y : PIV 网格坐标，任意形状（通常为 (ny, nx)）
+
+    Returns
+    -------
+    dict :
+        index (4, n)   PLIF 图像展平后的像素下标（左下、右下、左上、右上）
+        weight (4, n)  对应权重，float32；范围外的点权重为 0
+        valid (n,)     PIV 点是否在 PLIF 图像范围内
+        shape          PIV 网格形状
+        plif_shape     (len(plif_Y), len(plif_X))
+    """
+    piv_X = np.asarray(piv_X, dtype=np.float64)
+    piv_Y = np.asarray(piv_Y, dtype=np.float64)
+    if piv_X.shape != piv_Y.shape:
+        raise ValueError(f"PIV 网格 X {piv_X.shape} 与 Y {piv_Y.shape} 形状不一致")
+    nx = len(plif_X)
+    ix, tx, vx = _axis_weights(plif_X, piv_X.ravel())
+    iy, ty, vy = _axis_weights(plif_Y, piv_Y.ravel())
+    valid = vx & vy
+    base = iy * nx + ix
+    index = np.stack([base, base + 1, base + nx, base + nx + 1])
+    weight = np.stack([(1 - tx) * (1 - ty), tx * (1 - ty), (1 - tx) * ty, tx * ty])
+    weight[:, ~valid] = 0.0
+    index[:, ~valid] = 0
+    return {
+        'index': index,
+        'weight': weight.astype(np.float32),
+        'valid': valid,
+        'shape': piv_X.shape,
+        'plif_shape': (len(plif_Y), nx),
+    }
+
+
+def cached_registration_map(plif_X, plif_Y, piv_X, piv_Y) -> Dict[str, Any]:
+    """registration_map 的缓存版本：坐标内容相同（同一标定与网格）时直接复用"""
+    key = tuple(hash(np.ascontiguousarray(a).tobytes()) for a in (plif_X, plif_Y, piv_X, piv_Y))
+    key += (np.shape(piv_X),)
+    reg = _MAP_CACHE.get(key)
+    if reg is None:
+        reg = registration_map(plif_X, plif_Y, piv_X, piv_Y)
+        _MAP_CACHE[key] = reg
+        while len(_MAP_CACHE) > _MAP_CACHE_SIZE:
+            _MAP_CACHE.popitem(last=False)
+    else:
+        _MAP_CACHE.move_to_end(key)
+    return reg
+
+
+def apply_registration(reg: Dict[str, Any], scalar: np.ndarray) -> np.ndarray:
+    """
+    把 PLIF 标量场插值到 PIV 网格
+
+    scalar 为一帧 (ny, nx) 或一个时间块 (nt, ny, nx)；返回 PIV 网格形状（前加 nt），float32
+    """
+    scalar = np.asarray(scalar)
+    if scalar.shape[-2:] != reg['plif_shape']:
+        raise ValueError(f"PLIF 图像尺寸 {scalar.shape[-2:]} 与映射 {reg['plif_shape']} 不一致")
+    lead = scalar.shape[:-2]
+    flat = scalar.reshape((-1, scalar.shape[-2] * scalar.shape[-1]))
+    w = reg['weight']
+    # 按 4 个角逐个取值累加，临时数组只有 (nt, n)
+    out = np.zeros((flat.shape[0], w.shape[1]), dtype=np.float32)
+    for k in range(4):
+        out += np.take(flat, reg['index'][k], axis=1) * w[k]
+    out[:, ~reg['valid']] = np.nan
+    return out.reshape(lead + tuple(reg['shape']))
+
+
+def register_sequence(reg: Dict[str, Any], frames, chunk_mb: float = 64,
+                      progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+    """
+    整段 PLIF 序列配准到 PIV 网格，按时间块批量取值
+
+    frames : PlifSequence 或 (nt, ny, nx) 数组（Y 向上，与 PlifSequence.scalars 同向）
+    返回 (nt,) + PIV 网格形状，float32
+    """
+    nt = len(frames)
+    ny, nx = reg['plif_shape']
+    out = np.empty((nt,) + tuple(reg['shape']), dtype=np.float32)
+    step = max(1, int(chunk_mb * 2**20 // (ny * nx * 4)))
+    for t0 in range(0, nt, step):
+        if isinstance(frames, PlifSequence):
+            block = frames.scalars(t0, t0 + step)
+        else:
+            block = np.asarray(frames[t0:t0 + step], dtype=np.float32)
+        out[t0:t0 + len(block)] = apply_registration(reg, block)
+        if progress is not None:
+            progress(min(t0 + step, nt), nt)
+    return out
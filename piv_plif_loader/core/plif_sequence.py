@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF 序列容器
+整段序列以相机原始方向的 uint16 数组 raw (nt, ny, nx) 保存（可为 np.memmap），
+物理坐标 X, Y 只存一份。上下翻转、bin 平均与转为 float32 都在取帧时才做，
+1024×1024 的高速序列内存约为逐帧 float 字典的 1/2 ~ 1/4（bin 时更少）。
+按下标取帧得到与 load_plif 返回字典兼容的只读映射，原有逐帧代码无需修改。
+"""
+
+import pathlib
+from collections.abc import Mapping
+from typing import Optional, Union, Dict, Any, List
+
+import numpy as np
+
+_KEYS = ('x_num', 'y_num', 'X', 'Y', 'scalar')
+
+
+def plif_coords(nx: int, ny: int, x0: float, y0: float, dx: float, dy: float, size: int = 1):
+    """bin 后网格 (ny, nx) 的 1D 物理坐标 X, Y（float32，递增）"""
+    X = np.arange(x0, x0 + nx * dx * size, dx * size, dtype='float32')
+    Y = np.arange(y0, y0 + ny * dy * size, dy * size, dtype='float32')
+    # float32 累加误差可能导致多出元素
+    return X[:nx], Y[:ny]
+
+
+def bin_average(arr: np.ndarray, size: int) -> np.ndarray:
+    """沿最后两个轴 size × size 块平均，float64；size=1 时只转换类型"""
+    ny, nx = arr.shape[-2:]
+    size = min(size, ny, nx)
+    if size <= 1:
+        return arr.astype(np.float64)
+    ny_new, nx_new = max(1, ny // size), max(1, nx // size)
+    trimmed = arr[..., :ny_new * size, :nx_new * size]
+    blocks = trimmed.reshape(arr.shape[:-2] + (ny_new, size, nx_new, size))
+    return blocks.mean(axis=(-3, -1), dtype=np.float64)
+
+
+class PlifFrame(Mapping):
+    """序列中的一帧：scalar 在首次访问时由 raw 计算（翻转、bin、float32），其余键共用"""
+
+    __slots__ = ('_seq', '_index', '_scalar')
+
+    def __init__(self, seq: 'PlifSequence', index: int):
+        self._seq = seq
+        self._index = index
+        self._scalar = None
+
+    def __getitem__(self, key):
+        seq = self._seq
+        if key == 'scalar':
+            if self._scalar is None:
+                self._scalar = seq.scalar(self._index)
+            return self._scalar
+        if key == 'X':
+            return seq.X
+        if key == 'Y':
+            return seq.Y
+        if key == 'x_num':
+            return seq.x_num
+        if key == 'y_num':
+            return seq.y_num
+        return seq.frames[self._index][key]
+
+    def __iter__(self):
+        yield from _KEYS
+        yield from self._seq.frames[self._index]
+
+    def __len__(self):
+        return len(_KEYS) + len(self._seq.frames[self._index])
+
+    def __repr__(self):
+        name = self._seq.frames[self._index].get('file_name', '')
+        return f"PlifFrame({self._index}, {name!r})"
+
+
+class PlifSequence:
+    """
+    uint16 堆叠存储的 PLIF 序列
+
+    Parameters
+    ----------
+    raw : ndarray, np.memmap 或 MrawArray (nt, ny, nx)
+        相机原始方向（第 0 行为图像顶部）的整数图像，已完成 bit_shift
+    size : int
+        bin 平均大小
+    x0, y0, dx, dy : 物理标定参数（同 load_plif）
+    frames : list of dict, optional
+        每帧元数据 (file_name, file_path)，不含数组
+    metadata : dict, optional
+        序列级信息（如 parse_cihx 的结果）
+
+    用法:
+        seq = load_plif_sequence(files, size=2)
+        frame = seq[10]                 # 与 load_plif 返回的字典用法相同
+        c_t = seq.point_series(iy, ix)  # (nt,)，不转换整帧
+    """
+
+    def __init__(self, raw: np.ndarray, size: int = 1, x0: float = 0.0, y0: float = 0.0,
+                 dx: float = 1.0, dy: float = 1.0,
+                 frames: Optional[List[Dict[str, Any]]] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        if raw.ndim != 3:
+            raise ValueError(f"raw 形状应为 (nt, ny, nx)，实际为 {raw.shape}")
+        if dx <= 0 or dy <= 0:
+            raise ValueError("dx 和 dy 必须为正值")
+        self.raw = raw
+        self.size = max(1, min(int(size), *raw.shape[1:]))
+        self.calibration = (float(x0), float(y0), float(dx), float(dy))
+        ny, nx = raw.shape[1:]
+        self.y_num = max(1, ny // self.size)
+        self.x_num = max(1, nx // self.size)
+        self.X, self.Y = plif_coords(self.x_num, self.y_num, x0, y0, dx, dy, self.size)
+        self.frames = frames if frames is not None else [{} for _ in range(raw.shape[0])]
+        self.metadata = metadata
+        if len(self.frames) != raw.shape[0]:
+            raise ValueError(f"元数据 {len(self.frames)} 条与帧数 {raw.shape[0]} 不一致")
+
+    def _with_raw(self, raw, frames) -> 'PlifSequence':
+        x0, y0, dx, dy = self.calibration
+        return PlifSequence(raw, self.size, x0, y0, dx, dy, frames, self.metadata)
+
+    def to_memmap(self, path: Union[str, pathlib.Path]) -> 'PlifSequence':
+        """把 raw 写入 .npy 文件，返回由磁盘映射支撑的新序列"""
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = np.lib.format.open_memmap(path, mode='w+', dtype=self.raw.dtype,
+                                        shape=self.raw.shape)
+        step = max(1, 64 * 2**20 // max(self._frame_bytes, 1))
+        for t0 in range(0, len(self), step):
+            raw[t0:t0 + step] = self.raw[t0:t0 + step]
+        raw.flush()
+        return self._with_raw(raw, self.frames)
+
+    # ---------- 访问 ----------
+    def __len__(self):
+        return self.raw.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._with_raw(self.raw[index], self.frames[index])
+        n = len(self)
+        index = int(index)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"帧序号 {index} 超出范围 [0, {n})")
+        return PlifFrame(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield PlifFrame(self, i)
+
+    def frame(self, index: int) -> PlifFrame:
+        return self[index]
+
+    def scalars(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """帧 [start, stop) 的标量场 (n, y_num, x_num)，float32，Y 向上"""
+        block = np.asarray(self.raw[start:stop, ::-1])
+        return bin_average(block, self.size).astype(np.float32)
+
+    def scalar(self, index: int) -> np.ndarray:
+        """第 index 帧的标量场 (y_num, x_num)，float32"""
+        index = range(len(self))[index]
+        return self.scalars(index, index + 1)[0]
+
+    def point_series(self, iy: int, ix: int) -> np.ndarray:
+        """bin 后网格点 (iy, ix) 的时间序列 (nt,)，float64，只读取对应的像素块"""
+        ny = self.raw.shape[1]
+        s = self.size
+        # 翻转后第 iy 行块对应原图的 [ny - (iy+1)s, ny - iy s) 行
+        rows = slice(ny - (iy + 1) * s, ny - iy * s)
+        block = self.raw[:, rows, ix * s:(ix + 1) * s]
+        return block.reshape(len(self), -1).mean(axis=1, dtype=np.float64)
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        (nt, y_num, x_num) 数组：不 bin 时为 raw 的翻转视图 (uint16, 不复制；.mraw 时取数据才解包)，
+        否则逐块计算为 float32（大小为原图的 2 / size²）
+        """
+        if self.size == 1:
+            return self.raw[:, ::-1]
+        out = np.empty(self.shape, dtype=np.float32)
+        step = max(1, 64 * 2**20 // max(self._frame_bytes, 1))
+        for t0 in range(0, len(self), step):
+            out[t0:t0 + step] = self.scalars(t0, t0 + step)
+        return out
+
+    @property
+    def _frame_bytes(self) -> int:
+        return int(np.prod(self.raw.shape[1:])) * self.raw.dtype.itemsize
+
+    @property
+    def shape(self):
+        """(nt, y_num, x_num)"""
+        return (len(self), self.y_num, self.x_num)
+
+    @property
+    def nbytes(self) -> int:
+        return self.X.nbytes + self.Y.nbytes + self.raw.nbytes
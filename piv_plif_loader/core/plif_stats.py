@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLIF 序列的单遍流式统计
+按时间块读取序列，每块只转换一次为 float64，同时得到：
+    逐帧统计      min / max / mean / std（向量化，无 Python 逐帧循环）
+    逐像素统计    Welford / Chan 合并的时间平均与方差（平均图、RMS 图）、最小/最大图
+    全局直方图    整数数据为逐值计数 (bincount)，浮点数据为等宽直方图（后续块超出区间时
+                  箱宽加倍、相邻箱合并以扩展区间），由此得到分位数
+分位数、显示用的颜色范围 (clim) 在统计结束时一次算出，浏览时无需逐帧重算。
+"""
+
+from typing import Callable, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from core.plif_sequence import PlifSequence
+
+FLOAT_BINS = 4096       # 浮点数据直方图的箱数
+
+
+class StreamingStats:
+    """
+    逐块累加的统计量
+
+    用法:
+        st = StreamingStats()
+        for block in blocks:            # (n, ny, nx)
+            st.update(block)
+        result = st.result(percentiles=(2, 98))
+    """
+
+    def __init__(self, hist_range: Optional[Sequence[float]] = None, bins: int = FLOAT_BINS):
+        self.hist_range = tuple(hist_range) if hist_range is not None else None
+        self.fixed_range = hist_range is not None     # 给定区间时不扩展，超出部分计入端箱
+        self.bins = int(bins)
+        self.count = None           # 逐像素有效样本数
+        self.mean = None
+        self.m2 = None
+        self.min_image = None
+        self.max_image = None
+        self.frame_stats = []       # [(min, max, mean, std) 数组] 按块
+        self.hist = None
+        self.edges = None           # None 表示整数精确计数（第 k 个箱为数值 k）
+        self.offset = 0             # 整数计数的起始值
+
+    def update(self, block: np.ndarray):
+        """累加一个时间块 (n, ny, nx)；整数块不含 NaN，走快速路径"""
+        block = np.asarray(block)
+        if block.ndim == 2:
+            block = block[None]
+        integer = np.issubdtype(block.dtype, np.integer)
+        x = block.astype(np.float64)
+        n = x.shape[0]
+
+        # ---- 逐帧 ----
+        if integer:
+            f_min = block.min(axis=(1, 2)).astype(np.float64)
+            f_max = block.max(axis=(1, 2)).astype(np.float64)
+            f_mean = x.mean(axis=(1, 2))
+            f_std = np.sqrt(np.mean((x - f_mean[:, None, None])**2, axis=(1, 2)))
+        else:
+            f_min = np.nanmin(x, axis=(1, 2))
+            f_max = np.nanmax(x, axis=(1, 2))
+            f_mean = np.nanmean(x, axis=(1, 2))
+            f_std = np.sqrt(np.nanmean((x - f_mean[:, None, None])**2, axis=(1, 2)))
+        self.frame_stats.append((f_min, f_max, f_mean, f_std))
+
+        # ---- 逐像素：块内均值与离差平方和，再按 Chan 公式合并 ----
+        if integer:
+            n_b = np.full(x.shape[1:], float(n))
+            mean_b = x.mean(axis=0)
+            m2_b = np.sum((x - mean_b)**2, axis=0)
+            min_b, max_b = x.min(axis=0), x.max(axis=0)
+        else:
+            finite = np.isfinite(x)
+            n_b = finite.sum(axis=0).astype(np.float64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_b = np.nansum(x, axis=0) / n_b
+            m2_b = np.nansum((x - mean_b)**2, axis=0)
+            min_b = np.where(n_b > 0, np.fmin.reduce(x, axis=0), np.inf)
+            max_b = np.where(n_b > 0, np.fmax.reduce(x, axis=0), -np.inf)
+            mean_b = np.where(n_b > 0, mean_b, 0.0)
+        if self.count is None:
+            self.count, self.mean, self.m2 = n_b, mean_b, m2_b
+            self.min_image, self.max_image = min_b, max_b
+        else:
+            n_a = self.count
+            total = n_a + n_b
+            with np.errstate(invalid='ignore', divide='ignore'):
+                w = np.where(total > 0, n_b / total, 0.0)
+            delta = mean_b - self.mean
+            self.mean = self.mean + delta * w
+            self.m2 = self.m2 + m2_b + delta**2 * n_a * w
+            self.count = total
+            np.minimum(self.min_image, min_b, out=self.min_image)
+            np.maximum(self.max_image, max_b, out=self.max_image)
+
+        # ---- 直方图 ----
+        if integer and self.hist_range is None:
+            self._count_integers(block)
+        else:
+            self._histogram(x)
+
+    def _count_integers(self, block):
+        if self.hist is None:
+            self.offset = min(int(block.min()), 0)
+            self.hist = np.zeros(0, dtype=np.int64)
+        counts = np.bincount((block.ravel() - self.offset).astype(np.intp),
+                             minlength=len(self.hist))
+        if len(counts) > len(self.hist):
+            counts[:len(self.hist)] += self.hist
+            self.hist = counts
+        else:
+            self.hist += counts
+
+    def _histogram(self, x):
+        v = x[np.isfinite(x)]
+        if v.size == 0:
+            return
+        lo, hi = float(v.min()), float(v.max())
+        if self.edges is None:
+            if self.hist_range is None:
+                # 首块确定初始区间，两端各留出一半跨度
+                span = max(hi - lo, 1.0)
+                self.hist_range = (lo - 0.5 * span, hi + 0.5 * span)
+            self.edges = np.linspace(*self.hist_range, self.bins + 1)
+            self.hist = np.zeros(self.bins, dtype=np.int64)
+        elif not self.fixed_range:
+            while lo < self.edges[0] or hi >= self.edges[-1]:
+                self._widen(lo < self.edges[0], hi >= self.edges[-1])
+        idx = np.searchsorted(self.edges, v, side='right') - 1
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        self.hist += np.bincount(idx, minlength=self.bins)
+
+    def _widen(self, lower: bool, upper: bool):
+        """
+        箱宽加倍以扩展区间：向上、向下或两侧各扩展，原来的每个箱恰好落入一个新箱，
+        已有计数直接合并，不需要重新读取数据
+        """
+        width = self.edges[1] - self.edges[0]
+        # 新区间起点相对旧起点向下移动 shift 个旧箱宽
+        shift = self.bins // 2 if (lower and upper) else (self.bins if lower else 0)
+        start = self.edges[0] - shift * width
+        merged = (np.arange(self.bins) + shift) // 2
+        self.hist = np.bincount(merged, weights=self.hist,
+                                minlength=self.bins).astype(np.int64)
+        self.edges = start + 2 * width * np.arange(self.bins + 1)
+        self.hist_range = (float(self.edges[0]), float(self.edges[-1]))
+
+    # ---------- 结果 ----------
+    def bin_values(self):
+        """直方图各箱的代表值（整数计数为数值本身，浮点为箱中心）"""
+        if self.edges is None:
+            return np.arange(len(self.hist), dtype=np.float64) + self.offset
+        return 0.5 * (self.edges[:-1] + self.edges[1:])
+
+    def percentile(self, q, positive_only: bool = False) -> np.ndarray:
+        """
+        由直方图得到的分位数（整数数据为最近秩，浮点数据精度为一个箱宽）
+        positive_only 时只统计 > 0 的值
+        """
+        values = self.bin_values()
+        hist = self.hist
+        if positive_only:
+            hist = np.where(values > 0, hist, 0)
+        cdf = np.cumsum(hist)
+        if cdf[-1] == 0:
+            return np.zeros(np.shape(q))
+        rank = np.asarray(q, dtype=np.float64) / 100.0 * cdf[-1]
+        idx = np.searchsorted(cdf, np.maximum(rank, 1), side='left')
+        return values[np.clip(idx, 0, len(values) - 1)]
+
+    def result(self, percentiles: Sequence[float] = (2, 98)) -> Dict[str, Any]:
+        f_min, f_max, f_mean, f_std = (np.concatenate(a) for a in zip(*self.frame_stats))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.where(self.count > 0, self.m2 / self.count, np.nan)
+            mean_image = np.where(self.count > 0, self.mean, np.nan)
+        pct = self.percentile(percentiles)
+        clim = self.percentile((2, 98), positive_only=True)
+        if not clim[1] > clim[0]:
+            lo, hi = float(np.nanmin(f_min)), float(np.nanmax(f_max))
+            clim = (lo, hi if hi > lo else lo + 1.0)
+        return {
+            'global_min': float(np.nanmin(f_min)),
+            'global_max': float(np.nanmax(f_max)),
+            'per_frame': [{'min': float(a), 'max': float(b), 'mean': float(c), 'std': float(d)}
+                          for a, b, c, d in zip(f_min, f_max, f_mean, f_std)],
+            'frame_min': f_min, 'frame_max': f_max, 'frame_mean': f_mean, 'frame_std': f_std,
+            'mean_image': mean_image.astype(np.float32),
+            'rms_image': np.sqrt(var).astype(np.float32),
+            'min_image': np.where(self.count > 0, self.min_image, np.nan).astype(np.float32),
+            'max_image': np.where(self.count > 0, self.max_image, np.nan).astype(np.float32),
+            'count': self.count,
+            'percentiles': {float(q): float(v) for q, v in zip(percentiles, pct)},
+            'clim': (float(clim[0]), float(clim[1])),
+            'histogram': self.hist,
+            'bin_values': self.bin_values(),
+        }
+
+
+def _blocks(frames, chunk_mb):
+    """按时间块给出 (n, ny, nx)：PlifSequence 取翻转后的原始整数（不 bin 时）或 bin 后的标量"""
+    if isinstance(frames, PlifSequence):
+        nt, ny, nx = frames.shape
+        step = max(1, int(chunk_mb * 2**20 // (ny * nx * 8)))
+        for t0 in range(0, nt, step):
+            if frames.size == 1:
+                yield t0, np.asarray(frames.raw[t0:t0 + step, ::-1])
+            else:
+                yield t0, frames.scalars(t0, t0 + step)
+        return
+    frames = list(frames)
+    shape = frames[0]['scalar'].shape
+    step = max(1, int(chunk_mb * 2**20 // (shape[0] * shape[1] * 8)))
+    for t0 in range(0, len(frames), step):
+        yield t0, np.stack([f['scalar'] for f in frames[t0:t0 + step]])
+
+
+def streaming_statistics(frames, percentiles: Sequence[float] = (2, 98),
+                         chunk_mb: float = 64, hist_range: Optional[Sequence[float]] = None,
+                         bins: int = FLOAT_BINS,
+                         progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    PLIF 序列的单遍统计
+
+    Parameters
+    ----------
+    frames : PlifSequence 或 load_plif 格式的帧字典列表
+    percentiles : 要计算的分位数 [%]
+    chunk_mb : 每个时间块转换为 float64 后的内存 [MB]
+    hist_range, bins : 浮点数据直方图的区间与箱数；None 时由首块确定初始区间，
+                       之后的块超出时自动扩展（给定区间时超出部分计入端箱）
+    progress : progress(已处理帧数, 总帧数)
+
+    Returns
+    -------
+    dict :
+        global_min, global_max, per_frame [{min, max, mean, std}, ...]   (与旧接口一致)
+        frame_min/max/mean/std (nt,)     逐帧统计
+        mean_image, rms_image, min_image, max_image (ny, nx)  逐像素时间统计，rms 为脉动均方根
+        percentiles {q: 值}, clim (vmin, vmax)   > 0 像素的 2/98 分位数，用于显示
+        histogram, bin_values
+    """
+    nt = len(frames)
+    if nt == 0:
+        return {}
+    stats = StreamingStats(hist_range, bins)
+    for t0, block in _blocks(frames, chunk_mb):
+        stats.update(block)
+        if progress is not None:
+            progress(min(t0 + len(block), nt), nt)
+    return stats.result(percentiles)
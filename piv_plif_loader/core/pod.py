@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本征正交分解 (POD)
+快照矩阵 A (nt, n) 的每一行为一帧的脉动速度 [u', v']（减去时间平均，只取掩膜内的点），
+A = Σ σ_k ψ_k φ_kᵀ：φ_k 为空间模态，a_k(t) = σ_k ψ_k(t) 为时间系数，σ_k² / nt 为模态能量。
+
+两种解法：
+    snapshot     Sirovich 快照法，特征分解 nt × nt 相关矩阵 A Aᵀ（帧数不太多时最快，结果精确）
+    randomized   随机化 SVD (Halko et al.)，只求前 n_modes 个模态，适合帧数很多的序列
+两者都按空间行带分块访问 U, V（可为 np.memmap，如 PIV 缓存），每遍只读一次数据，
+内存占用为一个行带加 nt × nt（快照法）或 nt × (n_modes + oversample)（随机化）的矩阵。
+
+用法:
+    pod = compute_pod(seq.U, seq.V, n_modes=10)
+    pod['energy_fraction'][:3], pod['modes_u'][0], pod['coeffs'][:, 0]
+"""
+
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+METHODS = ('auto', 'snapshot', 'randomized')
+SNAPSHOT_MAX_FRAMES = 4096      # auto 模式下快照法的最大帧数 (相关矩阵 128 MB)
+
+
+def _row_bands(shape, chunk_mb):
+    """按行带 (ys) 划分网格，每个行带的 U、V 时间序列块 (float64) 约 chunk_mb"""
+    nt, ny, nx = shape
+    rows = max(1, int(chunk_mb * 2**20 / (nt * nx * 8 * 2)))
+    return [slice(y0, min(y0 + rows, ny)) for y0 in range(0, ny, rows)]
+
+
+def _band_matrix(U, V, ys, mean_u, mean_v, mask):
+    """行带 ys 的快照块 (nt, n_b)：掩膜内的 [u', v']"""
+    m = mask[ys]
+    u = np.asarray(U[:, ys], dtype=np.float64)[:, m] - mean_u[ys][m]
+    v = np.asarray(V[:, ys], dtype=np.float64)[:, m] - mean_v[ys][m]
+    return np.concatenate([u, v], axis=1)
+
+
+def temporal_mean(U, V, chunk_mb: float = 256):
+    """U, V 的时间平均 (ny, nx)，float64，按行带读取"""
+    mean_u = np.empty(U.shape[1:])
+    mean_v = np.empty(U.shape[1:])
+    for ys in _row_bands(U.shape, chunk_mb):
+        mean_u[ys] = np.asarray(U[:, ys]).mean(axis=0, dtype=np.float64)
+        mean_v[ys] = np.asarray(V[:, ys]).mean(axis=0, dtype=np.float64)
+    return mean_u, mean_v
+
+
+def compute_pod(U, V, n_modes: int = 10, method: str = 'auto',
+                mask: Optional[np.ndarray] = None, subtract_mean: bool = True,
+                chunk_mb: float = 256, oversample: int = 10, n_iter: int = 2, seed: int = 0,
+                progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    速度场序列的 POD
+
+    Parameters
+    ----------
+    U, V : ndarray 或 np.memmap (nt, ny, nx)
+    n_modes : 返回的模态数
+    method : 'snapshot', 'randomized' 或 'auto'（帧数 ≤ SNAPSHOT_MAX_FRAMES 时用快照法）
+    mask : bool (ny, nx)，参与分解的点；None 时取时间平均有限的点
+    subtract_mean : 是否减去时间平均
+    chunk_mb : 每个行带块的内存 [MB]
+    oversample, n_iter, seed : 随机化 SVD 的过采样列数、幂迭代次数、随机种子
+    progress : progress(完成遍数, 总遍数)
+
+    Returns
+    -------
+    dict :
+        energy (k,)              模态能量 σ² / nt
+        energy_fraction (k,)     占总脉动能量的比例
+        modes_u, modes_v (k, ny, nx)  单位范数的空间模态，掩膜外为 NaN
+        coeffs (nt, k)           时间系数，A ≈ coeffs @ modes
+        mean_u, mean_v (ny, nx)  时间平均（subtract_mean=False 时为 0）
+        mask (ny, nx), method, total_energy
+    """
+    if U.ndim != 3 or U.shape != V.shape:
+        raise ValueError(f"U, V 形状应为相同的 (nt, ny, nx)，实际为 {U.shape}, {V.shape}")
+    if method not in METHODS:
+        raise ValueError(f"未知方法: {method}，可选 {METHODS}")
+    nt, ny, nx = U.shape
+    if nt < 2:
+        raise ValueError("POD 至少需要 2 帧")
+    if method == 'auto':
+        method = 'snapshot' if nt <= SNAPSHOT_MAX_FRAMES else 'randomized'
+    bands = _row_bands(U.shape, chunk_mb)
+
+    mean_u, mean_v = temporal_mean(U, V, chunk_mb)
+    if mask is None:
+        mask = np.isfinite(mean_u) & np.isfinite(mean_v)
+    if not subtract_mean:
+        mean_u, mean_v = np.zeros((ny, nx)), np.zeros((ny, nx))
+    mask = np.asarray(mask, dtype=bool)
+    if mask.shape != (ny, nx) or not mask.any():
+        raise ValueError("掩膜形状与网格不一致或不含任何点")
+    n_modes = max(1, min(int(n_modes), nt, 2 * int(mask.sum())))
+
+    def blocks():
+        for ys in bands:
+            yield ys, _band_matrix(U, V, ys, mean_u, mean_v, mask)
+
+    if method == 'snapshot':
+        n_pass = 2
+        C = np.zeros((nt, nt))
+        for ys, A in blocks():
+            C += A @ A.T
+        if progress is not None:
+            progress(1, n_pass)
+        total = float(np.trace(C))
+        lam, psi = np.linalg.eigh(C)
+        order = np.argsort(lam)[::-1][:n_modes]
+        lam, psi = np.maximum(lam[order], 0.0), psi[:, order]
+        sigma = np.sqrt(lam)
+        # φ = Aᵀ ψ / σ；σ 为 0 的模态（秩不足）置零
+        inv = np.divide(1.0, sigma, out=np.zeros_like(sigma), where=sigma > 0)
+        modes = _project_modes(blocks(), psi * inv, mask)
+        coeffs = psi * sigma
+    else:
+        n_pass = 3 + n_iter
+        l = min(n_modes + int(oversample), nt)
+        # Y = A Ω，Ω 的各行带部分按需生成（同一种子保证可复现）
+        Y = np.zeros((nt, l))
+        total = 0.0
+        omega_rng = np.random.default_rng(seed)
+        for ys, A in blocks():
+            Y += A @ omega_rng.standard_normal((A.shape[1], l))
+            total += float(np.einsum('ij,ij->', A, A))
+        done = 1
+        if progress is not None:
+            progress(done, n_pass)
+        Q, _ = np.linalg.qr(Y)
+        for _ in range(n_iter):
+            # 幂迭代 Q ← qr(A Aᵀ Q)，按行带累加 Σ_b A_b (A_bᵀ Q)，每次只读一遍数据
+            Y = np.zeros((nt, l))
+            for ys, A in blocks():
+                Y += A @ (A.T @ Q)
+            Q, _ = np.linalg.qr(Y)
+            done += 1
+            if progress is not None:
+                progress(done, n_pass)
+        # B Bᵀ = Qᵀ A Aᵀ Q 的特征分解给出 B = Qᵀ A 的奇异值与左奇异向量
+        G = np.zeros((l, l))
+        for ys, A in blocks():
+            B = Q.T @ A
+            G += B @ B.T
+        lam, W = np.linalg.eigh(G)
+        order = np.argsort(lam)[::-1][:n_modes]
+        sigma = np.sqrt(np.maximum(lam[order], 0.0))
+        psi = Q @ W[:, order]
+        inv = np.divide(1.0, sigma, out=np.zeros_like(sigma), where=sigma > 0)
+        modes = _project_modes(blocks(), psi * inv, mask)
+        coeffs = psi * sigma
+
+    if progress is not None:
+        progress(n_pass, n_pass)
+
+    # 符号约定：每个模态时间系数绝对值最大处为正
+    k_max = np.argmax(np.abs(coeffs), axis=0)
+    sign = np.sign(coeffs[k_max, np.arange(coeffs.shape[1])])
+    sign[sign == 0] = 1.0
+    coeffs *= sign
+    modes *= sign[:, None]
+
+    energy = sigma**2 / nt
+    total_energy = total / nt
+    modes_u, modes_v = _unflatten(modes, mask)
+    return {
+        'energy': energy,
+        'energy_fraction': energy / total_energy if total_energy > 0 else np.zeros_like(energy),
+        'total_energy': total_energy,
+        'modes_u': modes_u,
+        'modes_v': modes_v,
+        'coeffs': coeffs,
+        'mean_u': mean_u,
+        'mean_v': mean_v,
+        'mask': mask,
+        'method': method,
+    }
+
+
+def _project_modes(blocks, weights, mask):
+    """空间模态 (k, 2 n)：各行带 A_bᵀ @ weights 拼接为 [u 部分, v 部分]"""
+    n = int(mask.sum())
+    k = weights.shape[1]
+    modes = np.empty((k, 2 * n))
+    pos = 0
+    for ys, A in blocks:
+        nb = A.shape[1] // 2
+        proj = (A.T @ weights).T
+        modes[:, pos:pos + nb] = proj[:, :nb]
+        modes[:, n + pos:n + pos + nb] = proj[:, nb:]
+        pos += nb
+    return modes
+
+
+def _unflatten(modes, mask):
+    n = int(mask.sum())
+    k = modes.shape[0]
+    modes_u = np.full((k,) + mask.shape, np.nan, dtype=np.float32)
+    modes_v = np.full((k,) + mask.shape, np.nan, dtype=np.float32)
+    modes_u[:, mask] = modes[:, :n]
+    modes_v[:, mask] = modes[:, n:]
+    return modes_u, modes_v
+
+
+def reconstruct(pod: Dict[str, Any], t: int, n_modes: Optional[int] = None):
+    """用前 n_modes 个模态重构第 t 帧的速度场 (u, v)，掩膜外为 NaN"""
+    k = pod['coeffs'].shape[1] if n_modes is None else int(n_modes)
+    a = pod['coeffs'][t, :k]
+    u = pod['mean_u'] + np.tensordot(a, np.nan_to_num(pod['modes_u'][:k]), axes=1)
+    v = pod['mean_v'] + np.tensordot(a, np.nan_to_num(pod['modes_v'][:k]), axes=1)
+    u[~pod['mask']] = np.nan
+    v[~pod['mask']] = np.nan
+    return u, v
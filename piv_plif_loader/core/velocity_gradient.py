@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+速度梯度张量与涡判据
+平面速度梯度张量 A = [[ux, uy], [vx, vy]] 只需差分一次，其余判据都是对分量的逐点运算，
+数组可为单帧 (ny, nx) 或整段 (nt, ny, nx)。记 S = (A + Aᵀ)/2, Ω = (A − Aᵀ)/2,
+tr = ux + vy, det = ux·vy − uy·vx：
+
+    Q-criterion        Q = ½(‖Ω‖² − ‖S‖²) = −½(ux² + 2·uy·vx + vy²)，Q > 0 为涡
+    lambda2            S² + Ω² 的中间特征值（平面流的第三个特征值为 0），λ2 < 0 为涡
+    Delta-criterion    Δ = det − (tr/2)²，A 有复特征值 (Δ > 0) 即局部旋转
+    Swirling strength  λ_ci = √max(Δ, 0)，复特征值的虚部（含散度修正；'lambda_ci' 为
+                       Liutex 所用的不可压缩形式 √max(det, 0)）
+    Strain rate        |S| = √(2 S:S)
+    Liutex / Liutex S  见 core.liutex.liutex_from_gradients
+
+每个判据只有一份实现：out / work 给定时在这些数组上原位计算（derived_fields 在共用的
+工作数组上批量计算），省略时分配新数组（FieldRegistry 由缓存的梯度分量计算）。
+"""
+
+import numpy as np
+
+CRITERIA = ('Q-criterion', 'lambda2', 'Delta-criterion', 'Swirling strength', 'Strain rate')
+
+
+def _buffers(ux, uy, vx, vy, out, work, n):
+    """输出数组与 n 个临时数组（未给出时按梯度分量的形状与类型分配）"""
+    dtype = np.result_type(ux, uy, vx, vy)
+    if out is None:
+        out = np.empty(np.shape(ux), dtype=dtype)
+    work = list(work or [])[:n]
+    work += [np.empty(np.shape(ux), dtype=dtype) for _ in range(n - len(work))]
+    return out, work
+
+
+def q_criterion(ux, uy, vx, vy, out=None, work=None):
+    """Q = −½(ux² + 2·uy·vx + vy²)；work 至少 1 个临时数组"""
+    o, (t1,) = _buffers(ux, uy, vx, vy, out, work, 1)
+    np.multiply(ux, ux, out=o)
+    np.multiply(uy, vx, out=t1)
+    t1 *= 2.0
+    o += t1
+    np.multiply(vy, vy, out=t1)
+    o += t1
+    o *= -0.5
+    return o
+
+
+def lambda2(ux, uy, vx, vy, out=None, work=None):
+    """S² + Ω² 的中间特征值（平面内两个特征值与面外的 0 排序后取中间）；work 至少 2 个"""
+    o, (t1, t2) = _buffers(ux, uy, vx, vy, out, work, 2)
+    # S² + Ω² = [[ux² + uy·vx, s12·tr], [s12·tr, vy² + uy·vx]]，s12 = ½(uy + vx)
+    # 特征值 mean ± half，mean = ½(ux² + vy²) + uy·vx，half = ½|tr|·√((ux−vy)² + (uy+vx)²)
+    np.multiply(ux, ux, out=o)
+    np.multiply(vy, vy, out=t1)
+    o += t1
+    o *= 0.5
+    np.multiply(uy, vx, out=t1)
+    o += t1
+    np.subtract(ux, vy, out=t1)
+    t1 *= t1
+    np.add(uy, vx, out=t2)
+    t2 *= t2
+    t1 += t2
+    np.sqrt(t1, out=t1)
+    np.add(ux, vy, out=t2)
+    np.abs(t2, out=t2)
+    t1 *= t2
+    t1 *= 0.5
+    np.add(o, t1, out=t2)
+    o -= t1
+    np.maximum(o, 0.0, out=o)
+    np.minimum(o, t2, out=o)
+    return o
+
+
+def delta_criterion(ux, uy, vx, vy, out=None, work=None):
+    """Δ = det − (tr/2)²；work 至少 1 个临时数组"""
+    o, (t1,) = _buffers(ux, uy, vx, vy, out, work, 1)
+    np.multiply(ux, vy, out=o)
+    np.multiply(uy, vx, out=t1)
+    o -= t1
+    np.add(ux, vy, out=t1)
+    t1 *= 0.5
+    t1 *= t1
+    o -= t1
+    return o
+
+
+def swirling_strength(ux, uy, vx, vy, out=None, work=None):
+    """λ_ci = √max(Δ, 0)；work 至少 1 个临时数组"""
+    o = delta_criterion(ux, uy, vx, vy, out, work)
+    np.maximum(o, 0.0, out=o)
+    np.sqrt(o, out=o)
+    return o
+
+
+def strain_rate(ux, uy, vx, vy, out=None, work=None):
+    """|S| = √(2(ux² + vy²) + (uy + vx)²)；work 至少 1 个临时数组"""
+    o, (t1,) = _buffers(ux, uy, vx, vy, out, work, 1)
+    np.multiply(ux, ux, out=o)
+    np.multiply(vy, vy, out=t1)
+    o += t1
+    o *= 2.0
+    np.add(uy, vx, out=t1)
+    t1 *= t1
+    o += t1
+    np.sqrt(o, out=o)
+    return o
+
+
+CRITERION_FUNCS = {
+    'Q-criterion': q_criterion,
+    'lambda2': lambda2,
+    'Delta-criterion': delta_criterion,
+    'Swirling strength': swirling_strength,
+    'Strain rate': strain_rate,
+}
@@ -30,6 +30,17 @@ class ControlPanel(QWidget):
         self.spin_bin.setValue(1)
         bin_layout.addWidget(self.spin_bin)
         load_layout.addLayout(bin_layout)
+        self.cb_lazy = QCheckBox("按需加载 (不预先转换缓存)")
+        load_layout.addWidget(self.cb_lazy)
+        # 二进制缓存默认关闭；开启后写入所选目录（未选择时为数据目录）
+        self.cb_cache = QCheckBox("写入二进制缓存")
+        load_layout.addWidget(self.cb_cache)
+        cache_layout = QHBoxLayout()
+        self.lbl_cache_dir = QLabel("缓存位置: 数据目录")
+        self.btn_cache_dir = QPushButton("选择...")
+        cache_layout.addWidget(self.lbl_cache_dir, 1)
+        cache_layout.addWidget(self.btn_cache_dir)
+        load_layout.addLayout(cache_layout)
         load_group.setLayout(load_layout)
         layout.addWidget(load_group)
 
@@ -62,7 +73,13 @@ class ControlPanel(QWidget):
             'Divergence',
             'Grad U',
             'Grad V',
-            'Liutex'
+            'Q-criterion',
+            'lambda2',
+            'Delta-criterion',
+            'Swirling strength',
+            'Strain rate',
+            'Liutex',
+            'Liutex S'
         ])
         display_layout.addWidget(QLabel("选择标量场:"))
         display_layout.addWidget(self.combo_quantity)
@@ -83,19 +100,60 @@ class ControlPanel(QWidget):
         quiver_scale_layout.addWidget(self.quiver_scale)
         display_layout.addLayout(quiver_scale_layout)
 
+        self.cb_plif_overlay = QCheckBox("叠加 PLIF")
+        display_layout.addWidget(self.cb_plif_overlay)
+        self.cb_plif_enhance = QCheckBox("PLIF 增强 (边缘保持滤波 + 阈值掩膜)")
+        display_layout.addWidget(self.cb_plif_enhance)
 
         display_group.setLayout(display_layout)
         layout.addWidget(display_group)
 
         # --- FFT 选点 ---
-        fft_group = QGroupBox("单点 FFT 分析")
+        fft_group = QGroupBox("频谱分析")
         fft_layout = QVBoxLayout()
+        fft_form = QFormLayout()
+        self.spin_fs = QDoubleSpinBox()
+        self.spin_fs.setRange(1e-6, 1e7)
+        self.spin_fs.setDecimals(3)
+        self.spin_fs.setValue(1.0)
+        self.spin_fs.setToolTip("加载时由帧率 (.cihx recordRate) 与文件头帧号推算；未知时为 1 (单位 1/帧)")
+        fft_form.addRow("采样频率 (Hz):", self.spin_fs)
+        self.combo_spectrum = QComboBox()
+        self.combo_spectrum.addItems(["Welch PSD", "FFT 幅值谱"])
+        fft_form.addRow("谱估计:", self.combo_spectrum)
+        self.combo_window = QComboBox()
+        self.combo_window.addItems(['hann', 'hamming', 'blackman', 'boxcar'])
+        fft_form.addRow("窗函数:", self.combo_window)
+        self.spin_nperseg = QSpinBox()
+        self.spin_nperseg.setRange(8, 65536)
+        self.spin_nperseg.setValue(256)
+        fft_form.addRow("段长 nperseg:", self.spin_nperseg)
+        self.spin_overlap = QSpinBox()
+        self.spin_overlap.setRange(0, 95)
+        self.spin_overlap.setValue(50)
+        self.spin_overlap.setSuffix(" %")
+        fft_form.addRow("重叠:", self.spin_overlap)
+        fft_layout.addLayout(fft_form)
         self.btn_pick_point = QPushButton("在流场上选点")
         fft_layout.addWidget(self.btn_pick_point)
+        self.btn_pick_region = QPushButton("框选区域平均谱")
+        fft_layout.addWidget(self.btn_pick_region)
+        self.btn_spectral_maps = QPushButton("全场频谱图 (Welch PSD)")
+        fft_layout.addWidget(self.btn_spectral_maps)
         self.btn_overlay = QPushButton("图像叠加")
         fft_layout.addWidget(self.btn_overlay)
         fft_group.setLayout(fft_layout)
         layout.addWidget(fft_group)
 
+        # --- 模态分解 ---
+        modal_group = QGroupBox("模态分解")
+        modal_layout = QVBoxLayout()
+        self.btn_pod = QPushButton("POD 模态分解")
+        modal_layout.addWidget(self.btn_pod)
+        self.btn_dmd = QPushButton("DMD 动态模态分解")
+        modal_layout.addWidget(self.btn_dmd)
+        modal_group.setLayout(modal_layout)
+        layout.addWidget(modal_group)
+
         layout.addStretch()
         self.setLayout(layout)
@@ -1,19 +1,24 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
                              QWidget, QSlider, QFileDialog, QSpinBox,
                              QDoubleSpinBox, QPushButton, QFormLayout,
-                             QGroupBox, QMessageBox)
+                             QGroupBox, QMessageBox, QProgressDialog, QApplication,
+                             QCheckBox)
 from PyQt6.QtCore import Qt
 import matplotlib
 matplotlib.use('qtagg')
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+import os
 import pathlib
 import numpy as np
 from core.piv_loader import load_piv
 from core.plif_loader import load_plif, parse_cihx
-from core.liutex import liutex_2d
-from core.field_calculations import compute_all_fields
+from core.field_calculations import derived_fields
+from core.fft_analyzer import field_psd_maps
+from core.pod import compute_pod
+from core.dmd import compute_dmd, StreamingDMD, save_dmd
+from gui.canvas import MplCanvas
 
 
 class PLIFCalibrationDialog(QDialog):
@@ -52,27 +57,335 @@ class PLIFCalibrationDialog(QDialog):
 
 
 class FFTDialog(QDialog):
-    def __init__(self, freqs, amplitude, title="FFT 结果", parent=None):
+    """单边谱曲线：kind='amplitude' 为 FFT 幅值谱，kind='psd' 为 Welch 功率谱密度（对数纵轴）"""
+
+    def __init__(self, freqs, amplitude, title="FFT 结果", parent=None, kind='amplitude'):
         super().__init__(parent)
         self.setWindowTitle(title); self.resize(650, 450)
         layout = QVBoxLayout()
-        max_idx = np.argmax(amplitude) if len(amplitude) > 0 else 0
+        # 跳过 0 Hz (DC 分量)
+        start = 1 if kind == 'psd' and len(freqs) > 1 else 0
+        max_idx = start + np.argmax(amplitude[start:]) if len(amplitude) > 0 else 0
         peak_freq = freqs[max_idx] if len(freqs) > 0 else 0
-        layout.addWidget(QLabel(f"峰值频率: {peak_freq:.4f} Hz   |   幅值: {amplitude[max_idx]:.4f}"))
+        name = 'PSD' if kind == 'psd' else '幅值'
+        layout.addWidget(QLabel(f"峰值频率: {peak_freq:.4f} Hz   |   {name}: {amplitude[max_idx]:.4g}"))
         fig = Figure(figsize=(5, 4), dpi=100); ax = fig.add_subplot(111)
-        ax.plot(freqs, amplitude, 'b-')
+        plot = ax.semilogy if kind == 'psd' else ax.plot
+        plot(freqs[start:], amplitude[start:], 'b-')
         if peak_freq > 0:
             ax.plot(peak_freq, amplitude[max_idx], 'ro', markersize=6, label=f'峰值: {peak_freq:.4f} Hz')
             ax.legend()
         ax.set_xlim(0, freqs[-1] if len(freqs) > 0 else 1)
-        ax.set_xlabel('频率 (Hz)'); ax.set_ylabel('幅值'); ax.set_title('单边幅值谱'); ax.grid(True)
+        ax.set_xlabel('频率 (Hz)'); ax.set_ylabel(name)
+        ax.set_title('Welch 功率谱密度' if kind == 'psd' else '单边幅值谱'); ax.grid(True)
         layout.addWidget(FigureCanvas(fig)); self.setLayout(layout)
 
 
+class SpectralMapDialog(QDialog):
+    """全场 Welch PSD：主频图、频带功率图与全场平均谱"""
+
+    def __init__(self, seq, spacing, quantities, fs=1.0, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("全场频谱分析 (Welch PSD)"); self.resize(1200, 520)
+        self.seq, self.spacing = seq, spacing
+        layout = QHBoxLayout()
+
+        params_group = QGroupBox("参数"); form = QFormLayout()
+        self.combo_quantity = QComboBox(); self.combo_quantity.addItems(['U', 'V'] + list(quantities))
+        form.addRow("物理量:", self.combo_quantity)
+        self.spin_fs = QDoubleSpinBox(); self.spin_fs.setRange(1e-6, 1e7); self.spin_fs.setDecimals(3)
+        self.spin_fs.setValue(fs); form.addRow("采样频率 (Hz):", self.spin_fs)
+        self.spin_nperseg = QSpinBox(); self.spin_nperseg.setRange(8, 65536)
+        self.spin_nperseg.setValue(min(256, len(seq))); form.addRow("段长 nperseg:", self.spin_nperseg)
+        self.spin_overlap = QSpinBox(); self.spin_overlap.setRange(0, 95); self.spin_overlap.setValue(50)
+        self.spin_overlap.setSuffix(" %"); form.addRow("重叠:", self.spin_overlap)
+        self.spin_f_lo = QDoubleSpinBox(); self.spin_f_lo.setRange(0.0, 1e7); self.spin_f_lo.setDecimals(3)
+        form.addRow("频带下限 (Hz):", self.spin_f_lo)
+        self.spin_f_hi = QDoubleSpinBox(); self.spin_f_hi.setRange(0.0, 1e7); self.spin_f_hi.setDecimals(3)
+        self.spin_f_hi.setValue(0.5); form.addRow("频带上限 (Hz):", self.spin_f_hi)
+        self.spin_workers = QSpinBox(); self.spin_workers.setRange(1, 256)
+        self.spin_workers.setValue(os.cpu_count() or 1); form.addRow("进程数:", self.spin_workers)
+        btn_run = QPushButton("计算"); btn_run.clicked.connect(self._compute); form.addRow(btn_run)
+        params_group.setLayout(form); layout.addWidget(params_group)
+
+        self.fig = Figure(figsize=(10, 4), dpi=100)
+        self.canvas = FigureCanvas(self.fig)
+        layout.addWidget(self.canvas, 1)
+        self.setLayout(layout)
+        self.result = None
+
+    def _compute(self):
+        nperseg = self.spin_nperseg.value()
+        noverlap = int(min(nperseg, len(self.seq)) * self.spin_overlap.value() / 100)
+        band = (self.spin_f_lo.value(), self.spin_f_hi.value())
+        progress_dlg = QProgressDialog("计算 PSD ...", None, 0, 100, self)
+        progress_dlg.setWindowModality(Qt.WindowModality.WindowModal); progress_dlg.show()
+
+        def progress(done, total):
+            progress_dlg.setValue(int(100 * done / total)); QApplication.processEvents()
+
+        try:
+            self.result = field_psd_maps(
+                self.seq.U, self.seq.V, self.combo_quantity.currentText(),
+                fs=self.spin_fs.value(), spacing=self.spacing, nperseg=nperseg,
+                noverlap=noverlap, bands=[band], workers=self.spin_workers.value(),
+                progress=progress)
+        except Exception as e:
+            QMessageBox.critical(self, "计算失败", str(e)); return
+        finally:
+            progress_dlg.close()
+        self._draw(band)
+
+    def _draw(self, band):
+        r, X, Y = self.result, self.seq.X, self.seq.Y
+        self.fig.clear()
+        ax1, ax2, ax3 = self.fig.subplots(1, 3)
+        im = ax1.pcolormesh(X, Y, r['dominant_freq'], cmap='viridis', shading='auto')
+        self.fig.colorbar(im, ax=ax1, label='Hz'); ax1.set_title('主频'); ax1.set_aspect('equal')
+        power = np.log10(np.maximum(r['band_power'][band], np.finfo(np.float32).tiny))
+        im = ax2.pcolormesh(X, Y, power, cmap='inferno', shading='auto')
+        self.fig.colorbar(im, ax=ax2, label='log10')
+        ax2.set_title(f'频带功率 {band[0]:g}–{band[1]:g} Hz'); ax2.set_aspect('equal')
+        ax3.semilogy(r['freqs'][1:], r['mean_psd'][1:], 'b-')
+        ax3.axvspan(band[0], band[1], color='orange', alpha=0.2)
+        ax3.set_xlabel('频率 (Hz)'); ax3.set_ylabel('PSD'); ax3.set_title('全场平均谱'); ax3.grid(True)
+        self.fig.tight_layout(); self.canvas.draw()
+
+
+class PODDialog(QDialog):
+    """POD 模态分解：模态能量、空间模态与时间系数浏览"""
+
+    def __init__(self, seq, fs=1.0, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("POD 模态分解"); self.resize(1200, 560)
+        self.seq, self.fs = seq, fs
+        self.result = None
+        layout = QHBoxLayout()
+
+        params_group = QGroupBox("参数"); form = QFormLayout()
+        self.spin_modes = QSpinBox(); self.spin_modes.setRange(1, 500)
+        self.spin_modes.setValue(min(20, len(seq))); form.addRow("模态数:", self.spin_modes)
+        self.combo_method = QComboBox(); self.combo_method.addItems(['auto', 'snapshot', 'randomized'])
+        form.addRow("解法:", self.combo_method)
+        self.cb_mean = QCheckBox("减去时间平均"); self.cb_mean.setChecked(True); form.addRow(self.cb_mean)
+        btn_run = QPushButton("计算"); btn_run.clicked.connect(self._compute); form.addRow(btn_run)
+        self.spin_mode = QSpinBox(); self.spin_mode.setRange(1, 1); self.spin_mode.setEnabled(False)
+        self.spin_mode.valueChanged.connect(self._draw); form.addRow("显示模态:", self.spin_mode)
+        self.btn_export = QPushButton("导出 (.npz)"); self.btn_export.setEnabled(False)
+        self.btn_export.clicked.connect(self._export); form.addRow(self.btn_export)
+        self.lbl_info = QLabel(""); self.lbl_info.setWordWrap(True); form.addRow(self.lbl_info)
+        params_group.setLayout(form); layout.addWidget(params_group)
+
+        self.fig = Figure(figsize=(10, 4), dpi=100)
+        self.canvas = FigureCanvas(self.fig)
+        layout.addWidget(self.canvas, 1)
+        self.setLayout(layout)
+
+    def _compute(self):
+        progress_dlg = QProgressDialog("计算 POD ...", None, 0, 100, self)
+        progress_dlg.setWindowModality(Qt.WindowModality.WindowModal); progress_dlg.show()
+
+        def progress(done, total):
+            progress_dlg.setValue(int(100 * done / total)); QApplication.processEvents()
+
+        try:
+            self.result = compute_pod(self.seq.U, self.seq.V, n_modes=self.spin_modes.value(),
+                                      method=self.combo_method.currentText(),
+                                      subtract_mean=self.cb_mean.isChecked(), progress=progress)
+        except Exception as e:
+            QMessageBox.critical(self, "计算失败", str(e)); return
+        finally:
+            progress_dlg.close()
+        r = self.result
+        self.spin_mode.setRange(1, len(r['energy'])); self.spin_mode.setEnabled(True)
+        self.btn_export.setEnabled(True)
+        self.lbl_info.setText(f"{r['method']}: 前 {len(r['energy'])} 个模态占总脉动能量 "
+                              f"{100 * r['energy_fraction'].sum():.1f}%")
+        self._draw()
+
+    def _draw(self):
+        if self.result is None:
+            return
+        r, k = self.result, self.spin_mode.value() - 1
+        X, Y = self.seq.X, self.seq.Y
+        self.fig.clear()
+        ax1, ax2, ax3 = self.fig.subplots(1, 3)
+        idx = np.arange(1, len(r['energy']) + 1)
+        ax1.bar(idx, 100 * r['energy_fraction'], color='steelblue')
+        ax1.bar(k + 1, 100 * r['energy_fraction'][k], color='orange')
+        ax1.plot(idx, 100 * np.cumsum(r['energy_fraction']), 'k.-', label='累计')
+        ax1.set_xlabel('模态'); ax1.set_ylabel('能量 (%)'); ax1.set_title('模态能量'); ax1.legend()
+        mu, mv = r['modes_u'][k], r['modes_v'][k]
+        im = ax2.pcolormesh(X, Y, np.hypot(mu, mv), cmap='viridis', shading='auto')
+        skip = max(1, X.shape[0] // 20)
+        ax2.quiver(X[::skip, ::skip], Y[::skip, ::skip], mu[::skip, ::skip], mv[::skip, ::skip],
+                   color='w', alpha=0.8)
+        self.fig.colorbar(im, ax=ax2)
+        ax2.set_title(f'空间模态 {k + 1} (|φ|)'); ax2.set_aspect('equal')
+        t = np.arange(len(r['coeffs'])) / self.fs
+        ax3.plot(t, r['coeffs'][:, k], 'b-', lw=0.8)
+        ax3.set_xlabel('时间 (s)' if self.fs != 1.0 else '帧'); ax3.set_ylabel(f'a{k + 1}(t)')
+        ax3.set_title('时间系数'); ax3.grid(True)
+        self.fig.tight_layout(); self.canvas.draw()
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出 POD 结果", "pod_modes.npz",
+                                              "NumPy 压缩文件 (*.npz)")
+        if path:
+            np.savez(path, X=self.seq.X, Y=self.seq.Y, fs=self.fs, **self.result)
+
+
+class DMDDialog(QDialog):
+    """
+    DMD：特征值（单位圆）、频率–振幅谱与模态形状
+    数据源为 PIV 速度场 (U, V) 与/或 PLIF 标量序列；精确 DMD 需要堆叠的 PIV 序列，
+    流式 DMD 逐帧读取，按需加载的序列也可用
+    """
+
+    def __init__(self, seq=None, plif=None, plif_coords=None, fs=1.0, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("DMD 动态模态分解"); self.resize(1250, 560)
+        self.seq, self.plif, self.plif_coords, self.fs = seq, plif, plif_coords, fs
+        self.result, self.names = None, []
+        layout = QHBoxLayout()
+
+        params_group = QGroupBox("参数"); form = QFormLayout()
+        self.combo_source = QComboBox()
+        if seq is not None:
+            self.combo_source.addItem("PIV (U, V)")
+        if plif is not None:
+            self.combo_source.addItem("PLIF")
+        if seq is not None and plif is not None:
+            self.combo_source.addItem("PIV + PLIF")
+        form.addRow("数据:", self.combo_source)
+        self.combo_method = QComboBox(); self.combo_method.addItems(["精确 DMD", "流式 DMD"])
+        form.addRow("解法:", self.combo_method)
+        self.spin_rank = QSpinBox(); self.spin_rank.setRange(1, 1000); self.spin_rank.setValue(20)
+        form.addRow("截断秩:", self.spin_rank)
+        self.cb_mean = QCheckBox("减去时间平均 (仅精确 DMD)"); form.addRow(self.cb_mean)
+        self.spin_fs = QDoubleSpinBox(); self.spin_fs.setRange(1e-6, 1e7); self.spin_fs.setDecimals(3)
+        self.spin_fs.setValue(fs); form.addRow("采样频率 (Hz):", self.spin_fs)
+        btn_run = QPushButton("计算"); btn_run.clicked.connect(self._compute); form.addRow(btn_run)
+        self.spin_mode = QSpinBox(); self.spin_mode.setRange(1, 1); self.spin_mode.setEnabled(False)
+        self.spin_mode.valueChanged.connect(self._draw); form.addRow("显示模态:", self.spin_mode)
+        self.combo_field = QComboBox(); self.combo_field.currentIndexChanged.connect(self._draw)
+        form.addRow("模态分量:", self.combo_field)
+        self.btn_export = QPushButton("导出 (.npz + .csv)"); self.btn_export.setEnabled(False)
+        self.btn_export.clicked.connect(self._export); form.addRow(self.btn_export)
+        self.lbl_info = QLabel(""); self.lbl_info.setWordWrap(True); form.addRow(self.lbl_info)
+        params_group.setLayout(form); layout.addWidget(params_group)
+
+        self.canvas = MplCanvas(self, width=10, height=4)
+        layout.addWidget(self.canvas, 1)
+        self.setLayout(layout)
+
+    def _fields(self):
+        """(名称, (nt, ...) 数组) 列表；PIV 与 PLIF 同时使用时取两者帧数的较小值"""
+        source = self.combo_source.currentText()
+        fields = []
+        if source.startswith("PIV"):
+            fields += [('U', self.seq.U), ('V', self.seq.V)]
+        if source.endswith("PLIF"):
+            fields.append(('PLIF', self.plif))
+        nt = min(f.shape[0] for _, f in fields)
+        return [(n, f[:nt]) for n, f in fields]
+
+    def _compute(self):
+        streaming = self.combo_method.currentText() == "流式 DMD"
+        source = self.combo_source.currentText()
+        if not streaming and source.startswith("PIV") and not hasattr(self.seq, 'U'):
+            QMessageBox.warning(self, "警告", "精确 DMD 需要堆叠的序列，请改用流式 DMD 或取消“按需加载”")
+            return
+        dt = 1.0 / self.spin_fs.value()
+        progress_dlg = QProgressDialog("计算 DMD ...", None, 0, 100, self)
+        progress_dlg.setWindowModality(Qt.WindowModality.WindowModal); progress_dlg.show()
+
+        def progress(done, total):
+            progress_dlg.setValue(int(100 * done / total)); QApplication.processEvents()
+
+        try:
+            if streaming:
+                self.names, self.result = self._compute_streaming(source, dt, progress)
+            else:
+                fields = self._fields()
+                self.names = [n for n, _ in fields]
+                self.result = compute_dmd([f for _, f in fields], dt=dt, rank=self.spin_rank.value(),
+                                          subtract_mean=self.cb_mean.isChecked(), progress=progress)
+        except Exception as e:
+            QMessageBox.critical(self, "计算失败", str(e)); return
+        finally:
+            progress_dlg.close()
+        r = self.result
+        self.spin_mode.setRange(1, len(r['eigenvalues'])); self.spin_mode.setEnabled(True)
+        self.combo_field.blockSignals(True)
+        self.combo_field.clear(); self.combo_field.addItems(self.names)
+        self.combo_field.blockSignals(False)
+        self.btn_export.setEnabled(True)
+        self.lbl_info.setText(f"{len(r['eigenvalues'])} 个模态, Δt = {r['dt']:.4g} s")
+        self._draw()
+
+    def _compute_streaming(self, source, dt, progress):
+        use_piv, use_plif = source.startswith("PIV"), source.endswith("PLIF")
+        lengths = ([len(self.seq)] if use_piv else []) + ([len(self.plif)] if use_plif else [])
+        nt = min(lengths)
+        sdmd = StreamingDMD(max_rank=self.spin_rank.value())
+        for i in range(nt):
+            fields = []
+            if use_piv:
+                frame = self.seq[i]
+                fields += [frame['U'], frame['V']]
+            if use_plif:
+                fields.append(self.plif[i])
+            sdmd.update(fields)
+            if i % 20 == 0:
+                progress(i, nt)
+        names = (['U', 'V'] if use_piv else []) + (['PLIF'] if use_plif else [])
+        return names, sdmd.compute(dt)
+
+    def _draw(self):
+        if self.result is None or self.combo_field.currentIndex() < 0:
+            return
+        r, k = self.result, self.spin_mode.value() - 1
+        fig = self.canvas.fig
+        fig.clear()
+        ax1, ax2, ax3 = fig.subplots(1, 3)
+        theta = np.linspace(0, 2 * np.pi, 200)
+        ax1.plot(np.cos(theta), np.sin(theta), 'k--', lw=0.8)
+        lam = r['eigenvalues']
+        ax1.scatter(lam.real, lam.imag, c=np.log10(np.abs(r['amplitude']) + 1e-30), cmap='viridis', s=18)
+        ax1.plot(lam[k].real, lam[k].imag, 'ro', mfc='none', ms=10)
+        ax1.set_aspect('equal'); ax1.set_title('特征值 λ'); ax1.set_xlabel('Re'); ax1.set_ylabel('Im')
+        pos = r['frequency'] >= 0
+        ax2.stem(r['frequency'][pos], np.abs(r['amplitude'][pos]), basefmt=' ')
+        ax2.plot(r['frequency'][k], abs(r['amplitude'][k]), 'ro', mfc='none', ms=10)
+        ax2.set_yscale('log'); ax2.set_xlabel('频率 (Hz)'); ax2.set_ylabel('|b|'); ax2.set_title('DMD 谱')
+        ax2.grid(True)
+        f = self.combo_field.currentIndex()
+        mode = r['modes'][f][k].real
+        if self.names[f] == 'PLIF' and self.plif_coords is not None:
+            X, Y = np.meshgrid(*self.plif_coords)
+        else:
+            X, Y = self.seq.X, self.seq.Y
+        im = ax3.pcolormesh(X, Y, mode, cmap='RdBu_r', shading='auto')
+        fig.colorbar(im, ax=ax3)
+        ax3.set_title(f"模态 {k + 1} {self.names[f]} (Re)  f = {r['frequency'][k]:.3g} Hz, "
+                      f"σ = {r['growth_rate'][k]:.3g}", fontsize=9)
+        ax3.set_aspect('equal')
+        fig.tight_layout(); self.canvas.draw()
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出 DMD 结果", "dmd_modes.npz",
+                                              "NumPy 压缩文件 (*.npz)")
+        if path:
+            save_dmd(self.result, path, self.names)
+
+
 class ImageOverlayDialog(QDialog):
     """双图叠加 - 分别加载 PIV(txt/dat) 或 PLIF，叠加显示。"""
 
-    QUANTITIES = ['Velocity magnitude', 'Vorticity', 'Divergence', 'Grad U', 'Grad V', 'Liutex']
+    QUANTITIES = ['Velocity magnitude', 'Vorticity', 'Divergence', 'Grad U', 'Grad V',
+                  'Q-criterion', 'lambda2', 'Delta-criterion', 'Swirling strength', 'Strain rate',
+                  'Liutex']
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -164,8 +477,7 @@ class ImageOverlayDialog(QDialog):
                 if X.shape[1] > 1 and np.allclose(X[0, :], X[0, 0]): X, Y, U, V = X.T, Y.T, U.T, V.T
                 dx = float(X[0, 1] - X[0, 0]) if X.shape[1] > 1 else 1.0
                 dy = float(Y[1, 0] - Y[0, 0]) if Y.shape[0] > 1 else 1.0
-                fields = compute_all_fields(U, V, dx, dy)
-                R, _, _, _ = liutex_2d(U, V, dx, dy, signed=True); fields['Liutex'] = R
+                fields = derived_fields(U, V, dx, dy, self.QUANTITIES)
                 self.data[side] = {'type': 'piv', 'X': X, 'Y': Y, 'fields': fields}
                 lbl.setText(f"PIV: {path}\n{X.shape[1]}x{X.shape[0]} grid")
             except Exception as e:
@@ -1,3 +1,4 @@
+import os
 import sys
 import pathlib
 import numpy as np
@@ -7,19 +8,28 @@ from PyQt6.QtWidgets import (
     QPushButton, QLabel, QDialog
 )
 from PyQt6.QtCore import Qt, QTimer
+from matplotlib.widgets import RectangleSelector
 
 from gui.canvas import MplCanvas, NavigationToolbar
 from gui.controls import ControlPanel
-from gui.dialogs import FFTDialog, PLIFCalibrationDialog, ImageOverlayDialog
+from gui.dialogs import (FFTDialog, PLIFCalibrationDialog, ImageOverlayDialog, SpectralMapDialog,
+                         PODDialog, DMDDialog)
 from gui.plif_raw_viewer import PlifRawViewerDialog
-from core.piv_loader import load_piv_batch, load_piv
-from core.plif_loader import load_plif_batch
-from core.liutex import liutex_2d
-from core.field_calculations import compute_all_fields
-from core.fft_analyzer import point_fft
+from core.piv_loader import load_piv, get_piv_info, load_piv_sequence, load_piv_lazy
+from core.piv_cache import load_piv_cached, default_cache_dir
+from core.plif_loader import load_plif_sequence, parse_cihx
+from core.plif_registration import cached_registration_map, apply_registration
+from core.plif_enhance import PlifEnhancer
+from core.field_registry import default_registry
+from core.fft_analyzer import point_fft, welch_psd, sampling_rate, region_signal, region_psd
+from core.frame_cache import FrameCache
 
 
 class MainWindow(QMainWindow):
+    FRAME_CACHE_SIZE = 32       # 缓存的速度场帧数
+    PREFETCH_FRAMES = 8         # 沿播放方向预取的帧数
+    FIELD_CACHE_MB = 512        # 导出物理量缓存的内存预算
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PIV/PLIF Liutex 分析工具")
@@ -27,9 +37,14 @@ class MainWindow(QMainWindow):
 
         self.piv_data_list = []
         self.plif_data_list = []
-        self.liutex_R = []
-        self.derived_fields = []
+        self.cache_root = None          # PIV 二进制缓存的根目录，None 为数据目录
+        self.plif_enhancer = None
+        self.frame_cache = None
+        self.field_registry = None
+        self.current_quantity = 'Velocity magnitude'
+        self.grid_spacing = (1.0, 1.0)
         self.current_frame = 0
+        self.play_direction = 1
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.next_frame)
@@ -37,6 +52,7 @@ class MainWindow(QMainWindow):
 
         self.pick_mode = False
         self._pick_connection = None
+        self._region_selector = None
 
         self.cbar = None
 
@@ -64,17 +80,24 @@ class MainWindow(QMainWindow):
         self.controls = ControlPanel()
 
         self.controls.btn_load_piv.clicked.connect(self.load_piv_data)
+        self.controls.btn_cache_dir.clicked.connect(self.choose_cache_dir)
         self.controls.btn_load_plif_raw.clicked.connect(self.open_plif_raw_viewer)
         self.controls.btn_load_plif.clicked.connect(self.load_plif_data)
         self.controls.btn_play.clicked.connect(self.start_play)
         self.controls.btn_stop.clicked.connect(self.stop_play)
         self.controls.slider.valueChanged.connect(self.set_frame)
         self.controls.btn_pick_point.clicked.connect(self.enter_pick_mode)
+        self.controls.btn_pick_region.clicked.connect(self.enter_region_mode)
+        self.controls.btn_spectral_maps.clicked.connect(self.open_spectral_map_dialog)
         self.controls.btn_overlay.clicked.connect(self.open_overlay_dialog)
+        self.controls.btn_pod.clicked.connect(self.open_pod_dialog)
+        self.controls.btn_dmd.clicked.connect(self.open_dmd_dialog)
         self.controls.combo_quantity.currentTextChanged.connect(self.update_plot)
         self.controls.cb_quiver.stateChanged.connect(self.update_plot)
         self.controls.cb_streamline.stateChanged.connect(self.update_plot)
         self.controls.quiver_scale.valueChanged.connect(self.update_plot)
+        self.controls.cb_plif_overlay.stateChanged.connect(self.update_plot)
+        self.controls.cb_plif_enhance.stateChanged.connect(self.update_plot)
 
         main_layout.addWidget(left_widget, 3)
         main_layout.addWidget(self.controls, 1)
@@ -97,22 +120,66 @@ class MainWindow(QMainWindow):
             ftype = 'txt'
 
         bin_size = self.controls.spin_bin.value()
+        # 文件较多时多进程并行解析
+        workers = os.cpu_count() if len(files) >= 32 else None
+        lazy = self.controls.cb_lazy.isChecked()
         try:
-            self.piv_data_list = load_piv_batch(files, filetype=ftype, size=bin_size,
-                                                verbose=True)
-            if not self.piv_data_list:
-                raise RuntimeError("没有成功加载任何文件")
+            # 序列以 PivSequence 存储：共用网格 + 堆叠的 U、V，下标取帧用法与字典相同。
+            # 勾选缓存时首次加载写入二进制缓存（按文件列表区分目录），之后直接内存映射打开；
+            # 按需加载时没有缓存也不转换，帧在显示时才解析
+            if self.controls.cb_cache.isChecked():
+                cache_dir = default_cache_dir(files, bin_size, root=self.cache_root)
+                self.piv_data_list = load_piv_cached(files, filetype=ftype, size=bin_size,
+                                                     verbose=True, workers=workers,
+                                                     cache_dir=cache_dir, lazy=lazy)
+            elif lazy:
+                self.piv_data_list = load_piv_lazy(files, ftype, bin_size)
+            else:
+                self.piv_data_list = load_piv_sequence(files, ftype, bin_size,
+                                                       verbose=True, workers=workers)
         except Exception as e:
             QMessageBox.critical(self, "加载失败", str(e))
             return
 
-        self.precompute_fields()
+        self.setup_frame_cache()
+        self.current_frame = 0
+        self.controls.spin_fs.setValue(self.detect_sampling_rate(files, ftype))
 
         self.controls.slider.setMaximum(len(self.piv_data_list) - 1)
         self.controls.slider.setValue(0)
         self.controls.lbl_frame.setText(f"帧: 0 / {len(self.piv_data_list)-1}")
         self.update_plot()
 
+    def choose_cache_dir(self):
+        """选择二进制缓存的根目录（选择后同时开启缓存）"""
+        path = QFileDialog.getExistingDirectory(self, "选择缓存位置")
+        if not path:
+            return
+        self.cache_root = path
+        self.controls.lbl_cache_dir.setText(f"缓存位置: {path}")
+        self.controls.cb_cache.setChecked(True)
+
+    def detect_sampling_rate(self, files, filetype='txt'):
+        """
+        采样频率：帧率取数据目录下的 .cihx，其次取 PLIF 原始文件夹的元数据；
+        导出间隔由文件头帧号推算。都没有时为 1 (单位 1/帧)
+        """
+        record_rate = 0
+        cihx = sorted(pathlib.Path(files[0]).parent.glob('*.cihx'))
+        if cihx:
+            try:
+                record_rate = parse_cihx(cihx[0])['record_rate']
+            except Exception:
+                record_rate = 0
+        viewer = getattr(self, '_plif_viewer', None)
+        if not record_rate and viewer is not None and viewer.metadata:
+            record_rate = viewer.metadata.get('record_rate', 0)
+        frames = getattr(self.piv_data_list, 'frames', None)
+        if frames is None:
+            # 按需加载：只读前若干个文件头
+            frames = [get_piv_info(f, filetype) for f in files[:16]]
+        return sampling_rate(frames, record_rate)
+
     def open_overlay_dialog(self):
         """打开独立的双图叠加对话框。"""
         dlg = ImageOverlayDialog(self)
@@ -137,7 +204,7 @@ class MainWindow(QMainWindow):
         params = dlg.get_params()
 
         try:
-            self.plif_data_list = load_plif_batch(
+            self.plif_data_list = load_plif_sequence(
                 files,
                 size=params['size'],
                 x0=params['x0'],
@@ -146,34 +213,50 @@ class MainWindow(QMainWindow):
                 dy=params['dy'],
                 verbose=True
             )
-            if not self.plif_data_list:
-                raise RuntimeError("所有 PLIF 文件加载失败")
         except Exception as e:
             QMessageBox.critical(self, "PLIF 加载失败", str(e))
             return
         self.update_plot()
 
-    def precompute_fields(self):
-        self.liutex_R = []
-        self.derived_fields = []
-        for piv in self.piv_data_list:
-            X, Y = piv['X'], piv['Y']
-            U, V = piv['U'], piv['V']
-
-            if X.shape[1] > 1 and np.allclose(X[0, :], X[0, 0]):
-                X = X.T; Y = Y.T; U = U.T; V = V.T
-                piv['X'], piv['Y'] = X, Y
-                piv['U'], piv['V'] = U, V
-                piv['xnum'], piv['ynum'] = piv['ynum'], piv['xnum']
-
-            dx = float(X[0, 1] - X[0, 0]) if X.shape[1] > 1 else 1.0
-            dy = float(Y[1, 0] - Y[0, 0]) if Y.shape[0] > 1 else 1.0
-
-            R, _, _, _ = liutex_2d(U, V, dx, dy, signed=True)
-            self.liutex_R.append(R)
-
-            fields = compute_all_fields(U, V, dx, dy)
-            self.derived_fields.append(fields)
+    def setup_frame_cache(self):
+        """
+        速度场按需逐帧读取，存入有界 LRU 缓存 (FrameCache)，后台线程沿播放方向预取后续帧；
+        导出物理量由 FieldRegistry 在首次查看时计算，按 (帧, 物理量) 缓存，受内存预算限制
+        """
+        if self.frame_cache is not None:
+            self.frame_cache.close()
+        seq = self.piv_data_list
+        # 网格各帧共用，方向只需整体调整一次（视图，不复制数据）
+        if seq.X.shape[1] > 1 and np.allclose(seq.X[0, :], seq.X[0, 0]):
+            seq = self.piv_data_list = seq.transposed()
+        X, Y = seq.X, seq.Y
+        dx = float(X[0, 1] - X[0, 0]) if X.shape[1] > 1 else 1.0
+        dy = float(Y[1, 0] - Y[0, 0]) if Y.shape[0] > 1 else 1.0
+        self.grid_spacing = (dx, dy)
+
+        registry = self.field_registry = default_registry(
+            None, dx, dy, memory_budget=self.FIELD_CACHE_MB * 2**20)
+
+        def compute(i):
+            piv = seq[i]
+            # 预取时顺带计算当前显示的物理量
+            registry.get(i, self.current_quantity, piv)
+            return piv
+
+        self.frame_cache = FrameCache(compute, maxsize=self.FRAME_CACHE_SIZE)
+
+    def prefetch_frames(self):
+        n = len(self.piv_data_list)
+        count = min(self.PREFETCH_FRAMES, n - 1)
+        self.frame_cache.prefetch((self.current_frame + self.play_direction * k) % n
+                                  for k in range(1, count + 1))
+
+    def closeEvent(self, event):
+        if self.frame_cache is not None:
+            self.frame_cache.close()
+        if self.plif_enhancer is not None:
+            self.plif_enhancer.close()
+        super().closeEvent(event)
 
     # ========== 帧控制 ==========
     def start_play(self):
@@ -191,8 +274,12 @@ class MainWindow(QMainWindow):
         self.controls.slider.setValue(nxt)
 
     def set_frame(self, idx):
+        n = len(self.piv_data_list)
+        if n > 1 and idx != self.current_frame:
+            # 前进（含末帧回到首帧）或后退，决定预取方向
+            self.play_direction = 1 if (idx - self.current_frame) % n <= n // 2 else -1
         self.current_frame = idx
-        self.controls.lbl_frame.setText(f"帧: {idx} / {len(self.piv_data_list)-1}")
+        self.controls.lbl_frame.setText(f"帧: {idx} / {n-1}")
         self.update_plot()
 
     # ========== 绘图更新 ==========
@@ -200,18 +287,17 @@ class MainWindow(QMainWindow):
         if not self.piv_data_list:
             return
         idx = self.current_frame
-        piv = self.piv_data_list[idx]
+        quantity = self.current_quantity = self.controls.combo_quantity.currentText()
+        try:
+            piv = self.frame_cache.get(idx)
+            scalar = self.field_registry.get(idx, quantity, piv)
+        except Exception as e:
+            self.statusBar().showMessage(f"帧 {idx} 加载失败: {e}", 5000)
+            return
+        self.prefetch_frames()
         X, Y = piv['X'], piv['Y']
         U, V = piv['U'], piv['V']
 
-        quantity = self.controls.combo_quantity.currentText()
-        if quantity == 'Liutex':
-            scalar = self.liutex_R[idx]
-        else:
-            scalar = self.derived_fields[idx].get(quantity,
-                     self.derived_fields[idx].get('Velocity magnitude',
-                         list(self.derived_fields[idx].values())[0]))
-
         ax = self.canvas_flow.ax
 
         if self.cbar is not None:
@@ -222,6 +308,10 @@ class MainWindow(QMainWindow):
         cf = ax.contourf(X, Y, scalar, levels=50, cmap='jet')
         self.cbar = self.canvas_flow.fig.colorbar(cf, ax=ax)
 
+        if self.controls.cb_plif_overlay.isChecked() and self.plif_data_list:
+            plif = self.plif_on_piv(idx, X, Y)
+            ax.pcolormesh(X, Y, plif, cmap='gray', alpha=0.5, shading='auto')
+
         if self.controls.cb_quiver.isChecked():
             skip = max(1, X.shape[0] // 20)
             scale = float(self.controls.quiver_scale.value())
@@ -245,6 +335,28 @@ class MainWindow(QMainWindow):
         ax.set_title(quantity)
         self.canvas_flow.draw()
 
+    def plif_on_piv(self, idx, X, Y):
+        """
+        第 idx 帧对应的 PLIF 标量场插值到 PIV 网格 (X, Y)；PLIF 帧数较少时取最后一帧。
+        勾选增强时先在 PLIF 分辨率上增强（PlifEnhancer 缓存并预取后续帧）。
+        下标与权重映射按标定与网格缓存，逐帧只做一次向量化取值
+        """
+        seq = self.plif_data_list
+        reg = cached_registration_map(seq.X, seq.Y, X, Y)
+        i = min(idx, len(seq) - 1)
+        if not self.controls.cb_plif_enhance.isChecked():
+            return apply_registration(reg, seq.scalar(i))
+        if self.plif_enhancer is None or self.plif_enhancer.frames is not seq:
+            if self.plif_enhancer is not None:
+                self.plif_enhancer.close()
+            # 增强结果按 (参数, 帧号) 缓存，线程池沿播放方向预取
+            self.plif_enhancer = PlifEnhancer(seq, maxsize=self.FRAME_CACHE_SIZE)
+        enhanced = self.plif_enhancer.get(i)
+        n = len(seq)
+        self.plif_enhancer.prefetch((i + self.play_direction * k) % n
+                                    for k in range(1, min(self.PREFETCH_FRAMES, n - 1) + 1))
+        return apply_registration(reg, enhanced)
+
     # ========== FFT 选点 ==========
     def enter_pick_mode(self):
         if not self.piv_data_list:
@@ -264,23 +376,124 @@ class MainWindow(QMainWindow):
 
         x_click, y_click = event.xdata, event.ydata
 
-        X = self.piv_data_list[0]['X']
-        Y = self.piv_data_list[0]['Y']
+        X = self.piv_data_list.X
+        Y = self.piv_data_list.Y
         dist = np.sqrt((X - x_click)**2 + (Y - y_click)**2)
         iy, ix = np.unravel_index(np.argmin(dist), X.shape)
 
         quantity = self.controls.combo_quantity.currentText()
-        signal = []
-        for frame in range(len(self.piv_data_list)):
-            if quantity == 'Liutex':
-                signal.append(self.liutex_R[frame][iy, ix])
-            else:
-                signal.append(self.derived_fields[frame].get(quantity, 0.0)[iy, ix])
+        signal = self.point_signal(iy, ix, quantity)
+        opts = self.spectrum_options()
+
+        title = f"{quantity} 频谱 at ({X[iy,ix]:.2f}, {Y[iy,ix]:.2f})"
+        if self.controls.combo_spectrum.currentText() == "Welch PSD":
+            freqs, psd = welch_psd(signal, **opts)
+            dlg = FFTDialog(freqs, psd, title=title, kind='psd')
+        else:
+            freqs, amp = point_fft(signal, dt=1.0 / opts['fs'], window=opts['window'])
+            dlg = FFTDialog(freqs, amp, title=title)
+        dlg.exec()
+
+    def spectrum_options(self):
+        """控制面板中的谱估计参数（welch_psd 关键字）"""
+        c = self.controls
+        nperseg = min(c.spin_nperseg.value(), len(self.piv_data_list))
+        return {
+            'fs': c.spin_fs.value(),
+            'window': c.combo_window.currentText(),
+            'nperseg': nperseg,
+            'noverlap': int(nperseg * c.spin_overlap.value() / 100),
+        }
+
+    # ========== 区域平均谱 ==========
+    def enter_region_mode(self):
+        if not self.piv_data_list:
+            QMessageBox.warning(self, "警告", "请先加载数据")
+            return
+        self.statusBar().showMessage("在流场上拖动鼠标框选区域", 5000)
+        self._region_selector = RectangleSelector(
+            self.canvas_flow.ax, self.on_region_selected, useblit=True,
+            button=[1], interactive=False)
+
+    def on_region_selected(self, press, release):
+        self._region_selector.set_active(False)
+        self._region_selector = None
+        x0, x1 = sorted((press.xdata, release.xdata))
+        y0, y1 = sorted((press.ydata, release.ydata))
+        X, Y = self.piv_data_list.X, self.piv_data_list.Y
+        mask = (X >= x0) & (X <= x1) & (Y >= y0) & (Y <= y1)
+        if not mask.any():
+            QMessageBox.warning(self, "警告", "框选区域内没有网格点")
+            return
+        rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+        ys, xs = slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
+
+        quantity = self.controls.combo_quantity.currentText()
+        opts = self.spectrum_options()
+        if self.controls.combo_spectrum.currentText() != "Welch PSD":
+            # 幅值谱模式：整段一段（不分段平均）的周期图
+            opts.update(nperseg=len(self.piv_data_list), noverlap=0)
+        try:
+            freqs, psd = region_psd(self.piv_data_list, ys, xs, quantity, self.grid_spacing, **opts)
+        except Exception as e:
+            QMessageBox.critical(self, "计算失败", str(e))
+            return
+        n_points = (ys.stop - ys.start) * (xs.stop - xs.start)
+        dlg = FFTDialog(freqs, psd, kind='psd',
+                        title=f"{quantity} 区域平均谱 ({n_points} 点, "
+                              f"x {x0:.2f}–{x1:.2f}, y {y0:.2f}–{y1:.2f})")
+        dlg.exec()
 
-        freqs, amp = point_fft(np.array(signal), dt=1.0)
-        dlg = FFTDialog(freqs, amp, title=f"FFT at ({X[iy,ix]:.2f}, {Y[iy,ix]:.2f})")
+    def open_spectral_map_dialog(self):
+        """全场 Welch PSD 图"""
+        if self.stacked_sequence() is None:
+            return
+        combo = self.controls.combo_quantity
+        quantities = [combo.itemText(i) for i in range(combo.count())]
+        dlg = SpectralMapDialog(self.piv_data_list, self.grid_spacing, quantities,
+                                self.controls.spin_fs.value(), self)
         dlg.exec()
 
+    def stacked_sequence(self):
+        """整段分析（全场谱、模态分解）需要堆叠存储的序列，按需解析模式下不可用"""
+        if not self.piv_data_list:
+            QMessageBox.warning(self, "警告", "请先加载数据")
+            return None
+        if not hasattr(self.piv_data_list, 'U'):
+            QMessageBox.warning(self, "警告", "该分析需要堆叠的序列，请取消“按需加载”后重新加载")
+            return None
+        return self.piv_data_list
+
+    def open_pod_dialog(self):
+        seq = self.stacked_sequence()
+        if seq is None:
+            return
+        dlg = PODDialog(seq, self.controls.spin_fs.value(), self)
+        dlg.exec()
+
+    def open_dmd_dialog(self):
+        if not self.piv_data_list and not self.plif_data_list:
+            QMessageBox.warning(self, "警告", "请先加载 PIV 或 PLIF 数据")
+            return
+        plif = coords = None
+        if self.plif_data_list:
+            # 不 bin 时为 uint16 原图的翻转视图，DMD 按行带转换为浮点
+            plif = self.plif_data_list.data
+            coords = (self.plif_data_list.X, self.plif_data_list.Y)
+        dlg = DMDDialog(self.piv_data_list or None, plif, coords,
+                        self.controls.spin_fs.value(), self)
+        dlg.exec()
+
+    def point_signal(self, iy, ix, quantity):
+        """
+        网格点 (iy, ix) 处物理量的时间序列
+        各物理量只依赖该点的一阶差分，取其 3x3 邻域的速度时间序列计算即可，
+        结果与整场计算后取该点相同
+        """
+        block = region_signal(self.piv_data_list, slice(iy, iy + 1), slice(ix, ix + 1),
+                              quantity, self.grid_spacing)
+        return block[:, 0, 0].astype(np.float64)
+
     # ========== 保存标量场 ==========
     def save_scalar_data(self):
         if not self.piv_data_list:
@@ -288,13 +501,13 @@ class MainWindow(QMainWindow):
             return
         idx = self.current_frame
         quantity = self.controls.combo_quantity.currentText()
-        if quantity == 'Liutex':
-            data = self.liutex_R[idx]
-        else:
-            data = self.derived_fields[idx].get(quantity)
-            if data is None:
-                QMessageBox.warning(self, "错误", "无法获取当前标量场")
-                return
+        try:
+            data = self.field_registry.get(idx, quantity, self.frame_cache.get(idx))
+        except Exception:
+            data = None
+        if data is None:
+            QMessageBox.warning(self, "错误", "无法获取当前标量场")
+            return
         default_name = f"{quantity}_frame{idx}.npy"
         file_path, _ = QFileDialog.getSaveFileName(
             self, "保存标量场数据", default_name,
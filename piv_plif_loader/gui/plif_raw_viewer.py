@@ -8,7 +8,8 @@ PLIF 原始图像浏览与画图组件。
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
     QSlider, QLabel, QGroupBox, QFormLayout,
-    QCheckBox, QFileDialog, QMessageBox, QWidget
+    QCheckBox, QFileDialog, QMessageBox, QWidget, QComboBox, QProgressDialog, QApplication,
+    QSpinBox
 )
 from PyQt6.QtCore import Qt, QTimer
 import numpy as np
@@ -16,7 +17,8 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
 from core.plif_loader import load_plif_raw_folder, compute_plif_statistics
-from core.fft_analyzer import point_fft
+from core.plif_enhance import PlifEnhancer
+from core.fft_analyzer import point_fft, sampling_rate
 from gui.dialogs import FFTDialog
 
 
@@ -28,17 +30,19 @@ class PlifRawViewerDialog(QDialog):
         self.setWindowTitle("PLIF 原始图像浏览")
         self.resize(1100, 750)
 
-        self.frames = []            # list of dict from load_plif
+        self.frames = []            # PlifSequence（uint16 堆叠，取帧时转为 float32）
         self.metadata = None
         self.current_frame = 0
         self.bit_shift_override = None  # None = auto-detect
         self.playing = False
         self.stats = None
+        self.enhancer = None
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.next_frame)
 
         self.cbar = None
+        self._im = None             # 复用的 AxesImage，换帧时只更新数据
         self.pick_mode = False
         self._pick_connection = None
 
@@ -131,6 +135,37 @@ class PlifRawViewerDialog(QDialog):
         stats_group.setLayout(self.stats_form)
         right.addWidget(stats_group)
 
+        # 显示内容：当前帧或整段序列的逐像素统计图
+        view_layout = QFormLayout()
+        self.combo_view = QComboBox()
+        self.combo_view.addItems(["当前帧", "时间平均图", "RMS 图"])
+        self.combo_view.currentIndexChanged.connect(self._reset_image)
+        view_layout.addRow("显示:", self.combo_view)
+        right.addLayout(view_layout)
+
+        # 增强显示：边缘保持滤波 + 阈值掩膜 + 模糊，结果按参数缓存
+        enhance_group = QGroupBox("增强显示")
+        enhance_form = QFormLayout()
+        self.cb_enhance = QCheckBox("启用")
+        self.cb_enhance.stateChanged.connect(self._reset_image)
+        enhance_form.addRow(self.cb_enhance)
+        self.spin_threshold = QSpinBox()
+        self.spin_threshold.setRange(0, 255)
+        self.spin_threshold.setValue(30)
+        self.spin_threshold.valueChanged.connect(self._on_enhance_params)
+        enhance_form.addRow("阈值:", self.spin_threshold)
+        self.spin_blur = QSpinBox()
+        self.spin_blur.setRange(1, 99)
+        self.spin_blur.setValue(15)
+        self.spin_blur.valueChanged.connect(self._on_enhance_params)
+        enhance_form.addRow("模糊核:", self.spin_blur)
+        self.cb_edge = QCheckBox("边缘保持滤波")
+        self.cb_edge.setChecked(True)
+        self.cb_edge.stateChanged.connect(self._on_enhance_params)
+        enhance_form.addRow(self.cb_edge)
+        enhance_group.setLayout(enhance_form)
+        right.addWidget(enhance_group)
+
         # 保存按钮
         self.btn_save = QPushButton("保存当前帧为 PNG")
         self.btn_save.clicked.connect(self.save_current_frame)
@@ -144,6 +179,11 @@ class PlifRawViewerDialog(QDialog):
         self.btn_pick_plif.clicked.connect(self.enter_pick_mode)
         self.btn_pick_plif.setEnabled(False)
         fft_layout.addWidget(self.btn_pick_plif)
+        window_form = QFormLayout()
+        self.combo_window = QComboBox()
+        self.combo_window.addItems(['hann', 'hamming', 'blackman', 'boxcar'])
+        window_form.addRow("窗函数:", self.combo_window)
+        fft_layout.addLayout(window_form)
         fft_group.setLayout(fft_layout)
         right.addWidget(fft_group)
 
@@ -166,12 +206,29 @@ class PlifRawViewerDialog(QDialog):
 
         self.frames = result['frames']
         self.metadata = result['metadata']
-        self.stats = compute_plif_statistics(self.frames)
+        # 单遍统计：逐帧统计、平均/RMS 图与显示用的颜色范围一次算出
+        progress_dlg = QProgressDialog("统计 PLIF 序列 ...", None, 0, len(self.frames), self)
+        progress_dlg.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dlg.show()
+
+        def progress(done, total):
+            progress_dlg.setValue(done)
+            QApplication.processEvents()
+
+        try:
+            self.stats = compute_plif_statistics(self.frames, progress=progress)
+        finally:
+            progress_dlg.close()
         self.current_frame = 0
+        if self.enhancer is not None:
+            self.enhancer.close()
+        self.enhancer = PlifEnhancer(self.frames, **self._enhance_params())
+        self._reset_image()
 
         self.slider.setMaximum(len(self.frames) - 1)
         self.slider.setValue(0)
-        self.lbl_folder.setText(folder)
+        source = "（.mraw 内存映射）" if result.get('source') == 'mraw' else ""
+        self.lbl_folder.setText(folder + source)
         self.btn_save.setEnabled(True)
         self.btn_pick_plif.setEnabled(True)
 
@@ -189,39 +246,64 @@ class PlifRawViewerDialog(QDialog):
 
         self.update_plot()
 
-    def update_plot(self):
-        if not self.frames:
-            return
-        idx = max(0, min(self.current_frame, len(self.frames) - 1))
-        frame = self.frames[idx]
-        scalar = frame['scalar']
-        x_num = frame['x_num']
-        y_num = frame['y_num']
-
-        # 先移除旧 colorbar，再清除 axes（否则 colorbar 内部状态丢失）
+    def _reset_image(self):
+        """数据或显示内容改变时重建图像与 colorbar"""
         if self.cbar is not None:
             self.cbar.remove()
             self.cbar = None
-
+        self._im = None
         self.ax_img.clear()
+        self.update_plot()
 
-        # 主图像
-        vmin = np.percentile(scalar[scalar > 0], 2) if np.any(scalar > 0) else 0
-        vmax = np.percentile(scalar[scalar > 0], 98) if np.any(scalar > 0) else 1
-        im = self.ax_img.imshow(scalar, cmap='hot', aspect='equal',
-                                origin='lower', vmin=vmin, vmax=vmax)
-
-        self.cbar = self.fig.colorbar(im, ax=self.ax_img, label="Intensity")
-        self.ax_img.set_title(f"PLIF 帧 {idx+1}/{len(self.frames)}  —  "
-                              f"{frame['file_name']}")
-        self.ax_img.set_xlabel(f"x ({x_num} px)")
-        self.ax_img.set_ylabel(f"y ({y_num} px)")
+    def _enhance_params(self):
+        return {'thres_hold': self.spin_threshold.value(), 'blur_size': self.spin_blur.value(),
+                'edge_preserving': self.cb_edge.isChecked()}
+
+    def _on_enhance_params(self):
+        if self.enhancer is not None:
+            self.enhancer.set_params(**self._enhance_params())
+            if self.cb_enhance.isChecked():
+                self.update_plot()
+
+    def _view_image(self, idx):
+        """(图像, 颜色范围, 标题)"""
+        view = self.combo_view.currentText()
+        if view == "当前帧":
+            title = f"PLIF 帧 {idx+1}/{len(self.frames)}  —  {self.frames[idx]['file_name']}"
+            if self.cb_enhance.isChecked() and self.enhancer is not None:
+                img = self.enhancer.get(idx)
+                # 预取后续帧，播放时不必等待
+                n = len(self.frames)
+                self.enhancer.prefetch((idx + k) % n for k in range(1, min(8, n - 1) + 1))
+                return img, (0.0, 100.0), title + "  [增强]"
+            return self.frames[idx]['scalar'], self.stats['clim'], title
+        key = 'mean_image' if view == "时间平均图" else 'rms_image'
+        img = self.stats[key]
+        finite = img[np.isfinite(img)]
+        clim = tuple(np.percentile(finite, (2, 98))) if finite.size else (0, 1)
+        return img, clim, f"PLIF {view} ({len(self.frames)} 帧)"
 
-        self.fig.tight_layout()
-        self.canvas.draw()
+    def update_plot(self):
+        if not self.frames or self.stats is None:
+            return
+        idx = max(0, min(self.current_frame, len(self.frames) - 1))
+        scalar, (vmin, vmax), title = self._view_image(idx)
+
+        # 颜色范围在加载时由整段序列的直方图确定；换帧只更新图像数据
+        if self._im is None:
+            self._im = self.ax_img.imshow(scalar, cmap='hot', aspect='equal',
+                                          origin='lower', vmin=vmin, vmax=vmax)
+            self.cbar = self.fig.colorbar(self._im, ax=self.ax_img, label="Intensity")
+            self.ax_img.set_xlabel(f"x ({self.frames.x_num} px)")
+            self.ax_img.set_ylabel(f"y ({self.frames.y_num} px)")
+            self.fig.tight_layout()
+        else:
+            self._im.set_data(scalar)
+        self.ax_img.set_title(title)
+        self.canvas.draw_idle()
 
         # 更新统计标签
-        if self.stats and idx < len(self.stats['per_frame']):
+        if idx < len(self.stats['per_frame']):
             s = self.stats['per_frame'][idx]
             self.lbl_stat_min.setText(f"{s['min']:.2f}")
             self.lbl_stat_max.setText(f"{s['max']:.2f}")
@@ -276,16 +358,25 @@ class PlifRawViewerDialog(QDialog):
 
         ix = int(round(event.xdata))
         iy = int(round(event.ydata))
-        if not (0 <= ix < self.frames[0]["x_num"] and 0 <= iy < self.frames[0]["y_num"]):
+        if not (0 <= ix < self.frames.x_num and 0 <= iy < self.frames.y_num):
             QMessageBox.warning(self, "越界", f"坐标 ({ix}, {iy}) 超出图像范围")
             return
 
-        signal = np.array([f["scalar"][iy, ix] for f in self.frames])
-        freqs, amp = point_fft(signal, dt=1.0)
+        signal = self.frames.point_series(iy, ix)
+        # 原始 PLIF 为连续相机帧，采样率即 .cihx 的 record_rate（缺失时频率单位为 1/帧）
+        fs = sampling_rate(record_rate=(self.metadata or {}).get('record_rate'))
+        freqs, amp = point_fft(signal, dt=1.0 / fs, window=self.combo_window.currentText())
         dlg = FFTDialog(freqs, amp, title=f"PLIF FFT at ({ix}, {iy})")
         dlg.exec()
 
 
+    def closeEvent(self, event):
+        self.stop_play()
+        if self.enhancer is not None:
+            self.enhancer.close()
+            self.enhancer = None
+        super().closeEvent(event)
+
     def save_current_frame(self):
         if not self.frames:
             return
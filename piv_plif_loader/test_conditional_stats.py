@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""PLIF 分区条件统计测试脚本"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.conditional_stats import (plif_zones, conditional_statistics, conditional_table,
+                                    save_conditional, plot_conditional)
+from core.plif_sequence import PlifSequence
+
+
+def test_conditional_statistics():
+    """bincount 单遍统计与逐帧掩膜计算一致；NaN 与无效标签不计入"""
+    print("\n[测试] 条件统计")
+    rng = np.random.default_rng(0)
+    nt, ny, nx = 9, 14, 18
+    labels = rng.integers(-1, 2, (nt, ny, nx)).astype(np.int8)
+    vort = (100.0 + rng.normal(size=(nt, ny, nx)) + 3.0 * labels).astype(np.float32)
+    vort[0, :2] = np.nan
+    div = rng.normal(size=(nt, ny, nx)).astype(np.float32)
+    fields = {'Vorticity': vort, 'Divergence': div}
+
+    res = conditional_statistics(fields, labels, chunk_mb=0.004)
+    for q, f in fields.items():
+        for t in range(nt):
+            for z in range(2):
+                v = f[t][(labels[t] == z) & np.isfinite(f[t])].astype(np.float64)
+                assert res['n'][q][t, z] == v.size
+                np.testing.assert_allclose(res['mean'][q][t, z], v.mean(), rtol=1e-10)
+                np.testing.assert_allclose(res['var'][q][t, z], v.var(), rtol=1e-8)
+        for z in range(2):
+            v = f[(labels == z) & np.isfinite(f)].astype(np.float64)
+            np.testing.assert_allclose(res['zone_mean'][q][z], v.mean(), rtol=1e-10)
+            np.testing.assert_allclose(res['zone_var'][q][z], v.var(), rtol=1e-8)
+            assert res['histogram'][q][z].sum() == v.size
+            pdf_area = np.sum(res['pdf'][q][z] * np.diff(res['bin_edges'][q]))
+            assert abs(pdf_area - 1.0) < 1e-9
+    np.testing.assert_array_equal(res['count'][:, 1], (labels == 1).sum(axis=(1, 2)))
+    assert 'frame_histogram' not in res
+
+    # 逐帧直方图：与逐帧 np.histogram 一致，对帧求和为整体直方图
+    res_t = conditional_statistics(fields, labels, chunk_mb=0.004, frame_hist=True)
+    for q, f in fields.items():
+        fh = res_t['frame_histogram'][q]
+        e = res_t['bin_edges'][q]
+        assert fh.shape == (nt, 2, len(e) - 1)
+        np.testing.assert_array_equal(fh.sum(axis=0), res_t['histogram'][q])
+        for t in range(nt):
+            for z in range(2):
+                v = f[t][(labels[t] == z) & np.isfinite(f[t])]
+                expected, _ = np.histogram(np.clip(v, e[0], e[-1]), e)
+                np.testing.assert_array_equal(fh[t, z], expected)
+    assert res['zone_mean']['Vorticity'][1] - res['zone_mean']['Vorticity'][0] > 2.5
+
+    # 前几块没有有效标签（如点火前）：直方图区间取自首个有数据的块，而不是固定为 (-1, 1)
+    late = labels.copy()
+    late[:4] = -1
+    res_l = conditional_statistics(fields, late, chunk_mb=0.004)
+    v = vort[(late >= 0) & np.isfinite(vort)].astype(np.float64)
+    e = res_l['bin_edges']['Vorticity']
+    assert e[0] < v.min() and e[-1] > v.max(), (e[0], e[-1])
+    assert res_l['histogram']['Vorticity'].sum() == v.size
+    np.testing.assert_allclose(np.nansum(res_l['n']['Vorticity'] * res_l['mean']['Vorticity']),
+                               v.sum(), rtol=1e-10)
+    empty = conditional_statistics(fields, np.full_like(labels, -1), chunk_mb=0.004)
+    assert np.all(np.isnan(empty['zone_mean']['Divergence']))
+    assert empty['histogram']['Divergence'].sum() == 0
+    print(f"  ✓ {nt} 帧 × 2 区 × {len(fields)} 个物理量, 已燃区涡量均值 "
+          f"{res['zone_mean']['Vorticity'][1]:.3f}")
+
+
+def test_plif_zones_and_export():
+    """PLIF 配准到 PIV 网格后分区；导出 npz / csv 并绘图"""
+    print("\n[测试] PLIF 分区与导出")
+    raw = np.full((3, 40, 50), 100, dtype=np.uint16)
+    raw[:, :, 25:] = 3000                       # 右半边为已燃区
+    plif = PlifSequence(raw, dx=0.1, dy=0.1)
+    X, Y = np.meshgrid(np.linspace(0.2, 6.0, 12), np.linspace(0.2, 3.7, 8))
+    labels = plif_zones(plif, X, Y, nt=5, thresholds=(1000,))
+    assert labels.shape == (5,) + X.shape and labels.dtype == np.int8
+    np.testing.assert_array_equal(labels[0][X < 2.4], 0)
+    np.testing.assert_array_equal(labels[4][(X > 2.6) & (X < 4.9)], 1)
+    assert np.all(labels[0][X > 4.9] == -1), "PLIF 范围外应为 -1"
+    enhanced = plif_zones(plif, X, Y, enhance={'edge_preserving': False})
+    assert set(np.unique(enhanced)) <= {-1, 0, 1}
+
+    U = np.broadcast_to(X, labels.shape).astype(np.float32)
+    res = conditional_statistics({'U': U}, labels, frame_hist=True)
+    table = conditional_table(res)
+    assert len(table) == 5 * 2 and set(table['zone']) == {'unburned', 'burned'}
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / 'run.1'          # 目录名含 '.'：csv 仍与 npz 同名
+        out.mkdir()
+        save_conditional(res, out / 'cond')       # np.savez 自动补 .npz
+        data = np.load(out / 'cond.npz')
+        assert data['mean_U'].shape == (5, 2)
+        assert data['frame_histogram_U'].shape == (5, 2) + data['histogram_U'].shape[1:]
+        csv = pd.read_csv(out / 'cond.csv')
+        assert (csv['frame'] == -1).sum() == 2
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(1, 2)
+    plot_conditional(axes[0], res, 'U')
+    plot_conditional(axes[1], res, 'U', kind='mean')
+    assert len(axes[0].lines) == 2
+    plt.close(fig)
+    print(f"  ✓ 区标签 {labels.shape}, 长表 {len(table)} 行")
+
+
+if __name__ == "__main__":
+    test_conditional_statistics()
+    test_plif_zones_and_export()
+    print("\n所有条件统计测试完成")
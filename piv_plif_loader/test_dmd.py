@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""DMD (动态模态分解) 测试脚本"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.dmd import compute_dmd, StreamingDMD, save_dmd
+
+
+def make_waves(nt=200, ny=12, nx=16, dt=1e-3):
+    """平均流 + 50 Hz 衰减行波 + 120 Hz 中性行波（已知频率与增长率）"""
+    t = np.arange(nt) * dt
+    y, x = np.mgrid[0:ny, 0:nx]
+
+    def wave(f, g, kx, ky):
+        return np.exp(g * t)[:, None, None] * np.cos(2 * np.pi * f * t[:, None, None] - kx * x - ky * y)
+
+    U = 2.0 + wave(50, -1.0, 0.5, 0.1) + 0.5 * wave(120, 0.0, 0.2, 0.4)
+    V = 0.3 * wave(50, -1.0, 0.3, 0.2) + 0.2 * wave(120, 0.0, 0.7, 0.1)
+    return U.astype(np.float32), V.astype(np.float32), dt
+
+
+def reference_dmd(A, rank):
+    """直接 SVD 的精确 DMD（A 每列一个快照）"""
+    X, Y = A[:, :-1], A[:, 1:]
+    U, S, Vh = np.linalg.svd(X, full_matrices=False)
+    U, S, Vh = U[:, :rank], S[:rank], Vh[:rank]
+    eigvals, W = np.linalg.eig(U.T @ Y @ Vh.T / S)
+    return eigvals, Y @ Vh.T / S @ W / eigvals
+
+
+def test_exact_dmd():
+    """精确 DMD：频率、增长率与已知值一致，特征值与模态与直接 SVD 实现一致"""
+    print("\n[测试] compute_dmd")
+    U, V, dt = make_waves()
+    r = compute_dmd([U, V], dt=dt, rank=5, chunk_mb=0.02)
+    np.testing.assert_allclose(np.sort(np.abs(r['frequency'])), [0, 50, 50, 120, 120], atol=1e-3)
+    growth = dict(zip(np.round(np.abs(r['frequency'])), r['growth_rate']))
+    assert abs(growth[50] + 1.0) < 1e-3 and abs(growth[120]) < 1e-3, growth
+    assert r['modes'][0].shape == (5,) + U.shape[1:] and r['modes'][1].shape == (5,) + V.shape[1:]
+
+    A = np.concatenate([U.reshape(len(U), -1), V.reshape(len(V), -1)], axis=1).T.astype(np.float64)
+    eigvals, Phi = reference_dmd(A, 5)
+    k = np.argmin(np.abs(eigvals - r['eigenvalues'][0]))
+    mode = np.concatenate([r['modes'][0][0].ravel(), r['modes'][1][0].ravel()])
+    np.testing.assert_allclose(mode, Phi[:, k], atol=1e-5 * np.abs(Phi[:, k]).max())
+    print(f"  ✓ 频率 {np.round(r['frequency'], 2)}")
+
+
+def test_streaming_dmd_and_export():
+    """流式 DMD 逐帧更新，与精确 DMD 的特征值一致；导出 npz + csv"""
+    print("\n[测试] StreamingDMD / save_dmd")
+    U, V, dt = make_waves()
+    sdmd = StreamingDMD(max_rank=5)
+    for u, v in zip(U, V):
+        sdmd.update([u, v])
+    r = sdmd.compute(dt)
+    exact = compute_dmd([U, V], dt=dt, rank=5)
+    np.testing.assert_allclose(np.sort_complex(r['eigenvalues']),
+                               np.sort_complex(exact['eigenvalues']), atol=1e-6)
+    np.testing.assert_allclose(np.abs(r['amplitude']), np.abs(exact['amplitude']), rtol=1e-4)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        save_dmd(r, Path(tmp) / 'dmd.npz', ['U', 'V'])
+        data = np.load(Path(tmp) / 'dmd.npz')
+        assert data['mode_U'].shape == (5,) + U.shape[1:] and float(data['dt']) == dt
+        table = pd.read_csv(Path(tmp) / 'dmd.csv')
+        np.testing.assert_allclose(table['frequency_Hz'], r['frequency'])
+    print(f"  ✓ 流式 DMD 秩 {sdmd.Qx.shape[1]}, {sdmd.n_frames} 帧")
+
+
+if __name__ == "__main__":
+    test_exact_dmd()
+    test_streaming_dmd_and_export()
+    print("\n所有 DMD 测试完成")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""频谱分析测试脚本（点谱、Welch PSD、区域平均谱、全场谱图）"""
+
+import sys
+import numpy as np
+from pathlib import Path
+from scipy import signal as sps
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.fft_analyzer import (field_psd_maps, point_fft, welch_psd, sampling_rate,
+                               region_psd)
+from core.piv_sequence import PivSequence
+from core.field_calculations import compute_fields_stack
+
+
+def make_waves(nt=512, ny=18, nx=25, fs=100.0, seed=0):
+    """U 的频率沿 x 从 5 Hz 线性增加到 30 Hz"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(nt) / fs
+    f0 = np.linspace(5.0, 30.0, nx)[None, None, :]
+    U = np.sin(2 * np.pi * f0 * t[:, None, None]) + 0.1 * rng.normal(size=(nt, ny, nx))
+    V = rng.normal(size=(nt, ny, nx))
+    return U.astype(np.float32), V.astype(np.float32), f0.ravel()
+
+
+def test_dominant_frequency_and_band_power():
+    """主频图还原各列正弦频率；分块结果与整场 scipy.signal.welch 一致"""
+    print("\n[测试] field_psd_maps 主频/频带功率")
+    U, V, f0 = make_waves()
+    r = field_psd_maps(U, V, 'U', fs=100.0, nperseg=128, bands=[(4.0, 6.0)],
+                       tile=7, workers=1, keep_psd=True)
+    df = r['freqs'][1] - r['freqs'][0]
+    assert np.all(np.abs(r['dominant_freq'] - f0[None, :]) <= df), r['dominant_freq'][0]
+
+    freqs, psd = sps.welch(U, fs=100.0, nperseg=128, axis=0)
+    np.testing.assert_allclose(r['psd'], psd, rtol=1e-4)
+    np.testing.assert_allclose(r['mean_psd'], psd.mean(axis=(1, 2)), rtol=1e-4)
+    band = r['band_power'][(4.0, 6.0)]
+    assert band[:, 0].min() > 10 * band[:, -1].max(), "5 Hz 列的带内功率应远大于 30 Hz 列"
+    print(f"  ✓ 主频范围 {r['dominant_freq'].min():.2f}–{r['dominant_freq'].max():.2f} Hz")
+
+
+def test_process_pool_and_derived_quantity():
+    """进程池与串行结果一致；导出物理量按块计算时边界 (halo) 正确"""
+    print("\n[测试] field_psd_maps 进程池 / 导出物理量")
+    U, V, _ = make_waves(nt=128, ny=11, nx=13)
+    kwargs = dict(fs=100.0, spacing=(0.5, 0.25), nperseg=64, noverlap=32, keep_psd=True, tile=4)
+    serial = field_psd_maps(U, V, 'Vorticity', workers=1, **kwargs)
+    pooled = field_psd_maps(U, V, 'Vorticity', workers=2, **kwargs)
+    np.testing.assert_array_equal(serial['psd'], pooled['psd'])
+    np.testing.assert_array_equal(serial['dominant_freq'], pooled['dominant_freq'])
+
+    W = compute_fields_stack(U, V, 0.5, 0.25, ['Vorticity'])['Vorticity']
+    _, psd = sps.welch(W, fs=100.0, nperseg=64, noverlap=32, axis=0)
+    np.testing.assert_allclose(serial['psd'], psd, rtol=1e-3, atol=1e-12)
+    print(f"  ✓ PSD 立方体 {serial['psd'].shape}")
+
+
+def test_welch_psd_and_point_fft():
+    """welch_psd 与 scipy.signal.welch 一致；加窗幅值谱还原正弦幅值"""
+    print("\n[测试] welch_psd / point_fft")
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(301, 3, 2))
+    for window, nperseg, noverlap in (('hann', 64, None), ('hamming', 51, 20), ('boxcar', 301, 0)):
+        freqs, psd = welch_psd(x, fs=250.0, nperseg=nperseg, noverlap=noverlap, window=window)
+        f_ref, p_ref = sps.welch(x, fs=250.0, nperseg=nperseg, noverlap=noverlap,
+                                 window=window, axis=0)
+        np.testing.assert_allclose(freqs, f_ref)
+        np.testing.assert_allclose(psd, p_ref, rtol=1e-10, atol=1e-20)
+
+    fs = 1000.0
+    t = np.arange(2000) / fs
+    freqs, amp = point_fft(1.5 * np.sin(2 * np.pi * 125.0 * t) + 0.3, dt=1 / fs, window='hann')
+    k = np.argmax(amp)
+    assert freqs[k] == 125.0 and abs(amp[k] - 1.5) < 1e-3, (freqs[k], amp[k])
+    print(f"  ✓ 峰值 {freqs[k]:.1f} Hz, 幅值 {amp[k]:.4f}")
+
+
+def test_sampling_rate_and_region_psd():
+    """采样频率由帧率与帧号间隔推算；区域平均谱等于区域内逐点 PSD 的平均"""
+    print("\n[测试] sampling_rate / region_psd")
+    frames = [{'step': s} for s in (10, 12, 14, 16, 18)]
+    assert sampling_rate(frames, record_rate=2000) == 1000.0
+    assert sampling_rate([{'step': np.nan}] * 3, record_rate=500) == 500.0
+    assert sampling_rate(frames) == 1.0
+
+    U, V, _ = make_waves(nt=200, ny=10, nx=12)
+    ny, nx = U.shape[1:]
+    Y, X = np.mgrid[0:ny, 0:nx].astype(np.float32)
+    seq = PivSequence(X, Y, U, V)
+    ys, xs = slice(0, 4), slice(5, 9)
+    freqs, psd = region_psd(seq, ys, xs, 'Vorticity', (0.5, 0.25), fs=100.0, nperseg=64)
+    W = compute_fields_stack(U, V, 0.5, 0.25, ['Vorticity'])['Vorticity'][:, ys, xs]
+    _, p_ref = sps.welch(W, fs=100.0, nperseg=64, axis=0)
+    np.testing.assert_allclose(psd, p_ref.mean(axis=(1, 2)), rtol=1e-4)
+    print(f"  ✓ 区域平均谱 {psd.shape}")
+
+
+if __name__ == "__main__":
+    test_dominant_frequency_and_band_power()
+    test_process_pool_and_derived_quantity()
+    test_welch_psd_and_point_fft()
+    test_sampling_rate_and_region_psd()
+    print("\n所有频谱分析测试完成")
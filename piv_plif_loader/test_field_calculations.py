@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""整段序列导出物理量 (compute_fields_stack / derived_fields) 测试脚本"""
+
+import sys
+import numpy as np
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.liutex import liutex_2d
+from core.velocity_gradient import CRITERION_FUNCS
+from core.field_calculations import (
+    compute_all_fields, compute_gradients, compute_fields_stack, derived_fields,
+    SEQUENCE_QUANTITIES
+)
+
+
+def test_stack_matches_per_frame():
+    """分块向量化结果与逐帧 compute_all_fields / liutex_2d 完全一致（含 2 点宽的网格）"""
+    print("\n[测试] compute_fields_stack 与逐帧计算一致")
+    rng = np.random.default_rng(0)
+    for shape in [(7, 20, 30), (5, 2, 9)]:
+        U = rng.normal(size=shape).astype(np.float32)
+        V = rng.normal(size=shape).astype(np.float32)
+        out = compute_fields_stack(U, V, 0.5, 0.3, chunk_size=3)
+        assert set(out) == set(SEQUENCE_QUANTITIES)
+        for t in range(shape[0]):
+            fields = compute_all_fields(U[t], V[t], 0.5, 0.3)
+            R, S, lambda_ci, _ = liutex_2d(U[t], V[t], 0.5, 0.3, signed=True)
+            fields.update({'Liutex': R, 'Liutex S': S, 'lambda_ci': lambda_ci})
+            grads = compute_gradients(U[t], V[t], 0.5, 0.3)
+            fields.update({q: f(*grads) for q, f in CRITERION_FUNCS.items()})
+            for q in SEQUENCE_QUANTITIES:
+                np.testing.assert_array_equal(out[q][t], fields[q], err_msg=q)
+        print(f"  ✓ {shape}: {len(out)} 个物理量一致")
+
+
+def test_derived_fields_subset_and_out():
+    """quantities 只计算所需物理量；out 预分配时直接写入"""
+    print("\n[测试] derived_fields / out 预分配")
+    rng = np.random.default_rng(1)
+    U = rng.normal(size=(4, 6, 8)).astype(np.float32)
+    V = rng.normal(size=(4, 6, 8)).astype(np.float32)
+    fields = derived_fields(U[2], V[2], 1.0, 1.0, quantities=['Vorticity', 'Liutex'])
+    assert list(fields) == ['Vorticity', 'Liutex']
+
+    out = {'Liutex': np.zeros(U.shape, dtype=np.float32)}
+    result = compute_fields_stack(U, V, 1.0, 1.0, quantities=['Liutex'], out=out)
+    assert result is out
+    np.testing.assert_array_equal(out['Liutex'][2], fields['Liutex'])
+    print("  ✓ 子集与预分配输出正常")
+
+
+if __name__ == "__main__":
+    test_stack_matches_per_frame()
+    test_derived_fields_subset_and_out()
+    print("\n所有导出物理量测试完成")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""导出物理量按需计算注册表 (FieldRegistry) 测试脚本"""
+
+import sys
+import numpy as np
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.liutex import liutex_2d
+from core.field_calculations import compute_all_fields, compute_gradients
+from core.field_registry import FieldRegistry, default_registry
+
+
+def make_frames(n=4, ny=10, nx=14, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'U': rng.normal(size=(ny, nx)).astype(np.float32),
+             'V': rng.normal(size=(ny, nx)).astype(np.float32)} for _ in range(n)]
+
+
+def test_values_match_direct_computation():
+    """注册表结果与 compute_all_fields / liutex_2d 一致；Q 与 ½(Ω² − S²) 一致"""
+    print("\n[测试] FieldRegistry 数值")
+    frames = make_frames()
+    reg = default_registry(lambda i: frames[i], 0.5, 0.25)
+    for i, f in enumerate(frames):
+        direct = compute_all_fields(f['U'], f['V'], 0.5, 0.25)
+        for q, arr in direct.items():
+            np.testing.assert_array_equal(reg.get(i, q), arr, err_msg=q)
+        R, S, lambda_ci, _ = liutex_2d(f['U'], f['V'], 0.5, 0.25)
+        np.testing.assert_array_equal(reg.get(i, 'Liutex'), R)
+        # R / S / λ_ci 取自同一次缓存的 Liutex 分解
+        parts = reg.get(i, '_liutex')
+        assert reg.get(i, 'Liutex S') is parts[1]
+        np.testing.assert_array_equal(reg.get(i, 'Liutex S'), S)
+        np.testing.assert_array_equal(reg.get(i, 'lambda_ci'), lambda_ci)
+
+        ux, uy, vx, vy = compute_gradients(f['U'], f['V'], 0.5, 0.25)
+        omega2 = 0.5 * (uy - vx)**2
+        strain2 = ux**2 + vy**2 + 0.5 * (uy + vx)**2
+        np.testing.assert_allclose(reg.get(i, 'Q-criterion'), 0.5 * (omega2 - strain2),
+                                   rtol=1e-5, atol=1e-5)
+    assert 'ux' not in reg.quantities and 'Q-criterion' in reg.quantities
+    assert '_liutex' not in reg.quantities
+    print(f"  ✓ {len(reg.quantities)} 个物理量: {reg.quantities}")
+
+
+def test_lazy_and_shared_dependencies():
+    """首次访问才计算；各物理量共用梯度，只缓存实际访问过的量"""
+    print("\n[测试] FieldRegistry 按需计算与依赖")
+    frames = make_frames()
+    calls = []
+    reg = FieldRegistry(lambda i: frames[i])
+    reg.register(('ux', 'uy', 'vx', 'vy'), ('U', 'V'),
+                 lambda u, v: calls.append('grad') or compute_gradients(u, v, 1.0, 1.0),
+                 display=False)
+    reg.register('Vorticity', ('vx', 'uy'), lambda vx, uy: calls.append('w') or vx - uy)
+    reg.register('Divergence', ('ux', 'vy'), lambda ux, vy: calls.append('d') or ux + vy)
+    assert calls == []
+    reg.get(1, 'Vorticity')
+    reg.get(1, 'Divergence')
+    reg.get(1, 'Vorticity')
+    assert calls == ['grad', 'w', 'd'], calls
+    assert reg.is_cached(1, 'ux') and not reg.is_cached(0, 'Vorticity')
+    assert sorted(reg.dependencies('Divergence')) == ['U', 'V', 'ux', 'vy']
+    try:
+        reg.register('Bad', ('missing',), lambda x: x)
+        raise AssertionError("未登记的依赖应报错")
+    except KeyError:
+        pass
+    print(f"  ✓ 计算调用: {calls}")
+
+
+def test_memory_budget():
+    """缓存总字节数不超过预算，最久未用的项先被淘汰"""
+    print("\n[测试] FieldRegistry 内存预算")
+    frames = make_frames(n=6)
+    frame_bytes = frames[0]['U'].nbytes
+    reg = default_registry(lambda i: frames[i], 1.0, 1.0, memory_budget=10 * frame_bytes)
+    for i in range(6):
+        reg.get(i, 'Vorticity')              # 每帧 4 个梯度分量 + 涡量
+        assert reg.nbytes <= reg.memory_budget
+    assert reg.is_cached(5, 'Vorticity') and not reg.is_cached(0, 'Vorticity')
+    print(f"  ✓ 缓存 {reg.nbytes} 字节 (预算 {reg.memory_budget})")
+
+
+def test_time_series_block():
+    """(nt, ny, nx) 块整体计算与逐帧结果一致"""
+    print("\n[测试] FieldRegistry 时间序列块")
+    frames = make_frames(n=5)
+    U = np.stack([f['U'] for f in frames])
+    V = np.stack([f['V'] for f in frames])
+    block = default_registry(None, 0.5, 0.5).get(0, 'Liutex', {'U': U, 'V': V})
+    per_frame = default_registry(lambda i: frames[i], 0.5, 0.5)
+    for t in range(5):
+        np.testing.assert_array_equal(block[t], per_frame.get(t, 'Liutex'))
+    print(f"  ✓ 块形状 {block.shape}")
+
+
+if __name__ == "__main__":
+    test_values_match_direct_computation()
+    test_lazy_and_shared_dependencies()
+    test_memory_budget()
+    test_time_series_block()
+    print("\n所有 FieldRegistry 测试完成")
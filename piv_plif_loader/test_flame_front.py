@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""火焰锋面提取与跟踪测试脚本"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.flame_front import extract_front, extract_fronts, front_statistics
+from core.piv_sequence import PivSequence
+from core.plif_sequence import PlifSequence
+
+
+def expanding_flame(nt=5, ny=160, nx=200, r0=30, growth=2):
+    """半径每帧增加 growth 像素的圆形已燃区（像素 0.1 mm，圆心 (10, 8) mm）"""
+    yy, xx = np.mgrid[0:ny, 0:nx]
+    raw = np.full((nt, ny, nx), 200, dtype=np.uint16)
+    for t in range(nt):
+        raw[t][(xx - 100)**2 + (yy - 80)**2 < (r0 + growth * t)**2] = 3000
+    return PlifSequence(raw, dx=0.1, dy=0.1)
+
+
+def test_circle_geometry():
+    """圆形锋面：周长、曲率 1/r（向未燃侧凸出为正）、法向指向外侧"""
+    print("\n[测试] 单帧锋面几何")
+    seq = expanding_flame(nt=1)
+    front = extract_front(seq.scalar(0), seq.X, seq.Y, level=1000)
+    r = 3.0
+    assert len(front['segment_length']) == 1 and front['closed'][0]
+    assert abs(front['ds'].sum() - 2 * np.pi * r) < 0.05 * 2 * np.pi * r
+    k = np.average(front['curvature'], weights=front['ds'])
+    assert abs(k - 1 / r) < 0.05 / r, k
+    radial = front['points'] - np.array([10.0, 15.9 - 8.0])
+    radial /= np.hypot(radial[:, 0], radial[:, 1])[:, None]
+    assert np.all(np.sum(radial * front['normal'], axis=1) > 0.9)
+    print(f"  ✓ 周长 {front['ds'].sum():.3f} (理论 {2 * np.pi * r:.3f}), 平均曲率 {k:.4f}")
+
+
+def test_circle_curvature_distribution():
+    """圆上曲率处处为 1/r：标准差接近 0、κ > 0 的比例为 1；物理平滑尺度相同时随分辨率收敛"""
+    print("\n[测试] 圆形锋面曲率分布")
+    r = 3.0
+    for n, dx in [(201, 0.1), (401, 0.05)]:
+        yy, xx = np.mgrid[0:n, 0:n] * dx
+        image = np.where((xx - 10)**2 + (yy - 10)**2 < r**2, 3000, 200).astype(np.uint16)
+        seq = PlifSequence(image[None], dx=dx, dy=dx)
+        k = 0.1 / dx
+        front = extract_front(seq.scalar(0), seq.X, seq.Y, level=1000, sigma=2 * k, smooth=6 * k)
+        stats = front_statistics(front, 20.0)
+        assert abs(stats['curvature_mean'] - 1 / r) < 0.05 / r, stats
+        assert stats['curvature_std'] < 0.1 / r, stats
+        assert stats['curvature_positive'] == 1.0, stats
+        # 重采样后点距约 1 像素
+        np.testing.assert_allclose(front['ds'], dx, rtol=0.05)
+        print(f"  ✓ {n}²: κ = {stats['curvature_mean']:.4f} ± {stats['curvature_std']:.4f}")
+
+
+def test_sequence_speeds():
+    """整段序列：锋面速度、法向流速与位移速度；表格逐帧写入 CSV"""
+    print("\n[测试] 锋面序列与位移速度")
+    seq = expanding_flame()
+    X, Y = np.meshgrid(np.linspace(0, 20, 21), np.linspace(0, 16, 17))
+    U = np.full((len(seq),) + X.shape, 0.5, dtype=np.float32)
+    piv = PivSequence(X, Y, U, np.zeros_like(U)).transposed()
+    dt = 0.5
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(tmp) / 'fronts.csv'
+        res = extract_fronts(seq, level=1000, piv=piv, dt=dt, workers=2, csv_path=csv)
+        table = res['table']
+        pd.testing.assert_frame_equal(pd.read_csv(csv), table, check_dtype=False)
+    assert list(table['frame']) == list(range(len(seq)))
+    np.testing.assert_allclose(table['V_n_mean'][:-1], 0.2 / dt, rtol=0.05)
+    assert np.isnan(table['V_n_mean'].iloc[-1])
+    # 均匀来流在圆上的法向分量平均为 0
+    np.testing.assert_allclose(table['u_n_mean'], 0.0, atol=1e-3)
+    f = res['fronts'][0]
+    np.testing.assert_allclose(f['S_d'], f['V_n'] - f['u_n'])
+    assert np.all(np.diff(table['length']) > 0)
+    print(f"  ✓ {len(seq)} 帧, V_n = {table['V_n_mean'][0]:.3f} (理论 {0.2 / dt:.3f})")
+
+
+def test_speed_units():
+    """坐标 mm、速度 m/s：V_n 经 length_scale 换算为 m/s 后与 u_n 相减"""
+    print("\n[测试] 位移速度单位换算 (mm 坐标, m/s 速度)")
+    seq = expanding_flame()                     # 半径每帧增加 0.2 mm
+    dt = 1e-4                                   # 10 kHz
+    X, Y = np.meshgrid(np.arange(0, 20.01, 0.25), np.arange(0, 16.01, 0.25))
+    rx, ry = X - 10.0, Y - 7.9
+    r = np.hypot(rx, ry) + 1e-12
+    # 径向向外 1.5 m/s 的来流
+    U = np.broadcast_to(1.5 * rx / r, (len(seq),) + X.shape).astype(np.float32)
+    V = np.broadcast_to(1.5 * ry / r, (len(seq),) + X.shape).astype(np.float32)
+    res = extract_fronts(seq, level=1000, piv=PivSequence(X, Y, U, V), dt=dt,
+                         length_scale=1e-3, workers=1)
+    table = res['table'].iloc[:-1]
+    np.testing.assert_allclose(table['V_n_mean'], 0.2e-3 / dt, rtol=0.05)
+    np.testing.assert_allclose(table['u_n_mean'], 1.5, rtol=0.01)
+    np.testing.assert_allclose(table['S_d_mean'], 0.2e-3 / dt - 1.5, atol=0.1)
+    print(f"  ✓ V_n = {table['V_n_mean'].iloc[0]:.3f} m/s, S_d = {table['S_d_mean'].iloc[0]:.3f} m/s")
+
+
+if __name__ == "__main__":
+    test_circle_geometry()
+    test_circle_curvature_distribution()
+    test_sequence_speeds()
+    test_speed_units()
+    print("\n所有火焰锋面测试完成")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""逐帧结果 LRU 缓存 (FrameCache) 测试脚本"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.frame_cache import FrameCache
+
+
+def wait_until(cond, timeout=5.0):
+    t0 = time.perf_counter()
+    while not cond():
+        if time.perf_counter() - t0 > timeout:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_lru_bound():
+    """缓存帧数不超过 maxsize，最久未用的帧被淘汰，命中时不重复计算"""
+    print("\n[测试] FrameCache LRU")
+    calls = []
+    cache = FrameCache(lambda i: calls.append(i) or i * 10, maxsize=3)
+    try:
+        assert [cache.get(i) for i in range(3)] == [0, 10, 20]
+        cache.get(0)                    # 0 变为最近使用
+        cache.get(3)                    # 淘汰 1
+        assert len(cache) == 3
+        assert 1 not in cache and 0 in cache and 3 in cache
+        cache.get(0)
+        assert calls == [0, 1, 2, 3], calls
+        print(f"  ✓ 计算次数 {len(calls)}, 缓存 {len(cache)} 帧")
+    finally:
+        cache.close()
+
+
+def test_prefetch():
+    """预取在后台线程计算，之后 get 直接命中；新的预取请求替换未开始的旧请求"""
+    print("\n[测试] FrameCache 预取")
+    threads = {}
+    release = threading.Event()
+
+    def compute(i):
+        threads[i] = threading.current_thread().name
+        if i == 0:
+            release.wait(5.0)
+        return i
+
+    cache = FrameCache(compute, maxsize=10)
+    try:
+        cache.prefetch([0, 1, 2])
+        assert wait_until(lambda: 0 in threads)
+        cache.prefetch([5, 6])          # 1, 2 尚未开始，被替换
+        release.set()
+        assert wait_until(lambda: 5 in cache and 6 in cache)
+        assert 1 not in threads and 2 not in threads, threads
+        assert cache.get(0) == 0        # 预取线程已完成
+        assert threads[6] == 'FrameCachePrefetch'
+        print(f"  ✓ 预取帧: {sorted(threads)}")
+    finally:
+        cache.close()
+
+
+def test_compute_error():
+    """计算失败不缓存，get 抛出异常，之后可重试"""
+    print("\n[测试] FrameCache 计算失败")
+    fail = {'on': True}
+
+    def compute(i):
+        if fail['on']:
+            raise ValueError("bad frame")
+        return i
+
+    cache = FrameCache(compute, maxsize=4)
+    try:
+        try:
+            cache.get(2)
+            raise AssertionError("应抛出 ValueError")
+        except ValueError:
+            pass
+        assert 2 not in cache
+        fail['on'] = False
+        assert cache.get(2) == 2
+        print("  ✓ 失败后重试成功")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_lru_bound()
+    test_prefetch()
+    test_compute_error()
+    print("\n所有 FrameCache 测试完成")
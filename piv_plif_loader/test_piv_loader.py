@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""PIV 序列加载测试脚本（用合成的 DaVis txt 文件）"""
+
+import sys
+import tempfile
+import numpy as np
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.piv_loader import load_piv, load_piv_batch, load_piv_sequence, load_piv_lazy
+from core.piv_sequence import PivSequence
+from core.piv_cache import (convert_piv_cache, default_cache_dir, is_cache_valid, load_piv_cached,
+                            open_piv_cache, read_cache_meta)
+
+
+def write_davis_txt(path, step, nx=12, ny=9, seed=0):
+    """写一个 DaVis 标准 txt（制表符分隔、逗号小数，Y 递减）"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.0, 11.0, nx)
+    y = np.linspace(8.0, 0.0, ny)
+    lines = [f"#DaVis 8.4.0 2D-vector {step} {nx} {ny} \"\" \"mm\" \"\" \"mm\" \"velocity\" \"m/s\""]
+    for xi in x:
+        for yi in y:
+            u, v = rng.normal(size=2)
+            lines.append("\t".join(f"{val:.6f}".replace('.', ',') for val in (xi, yi, u, v)))
+    Path(path).write_text("\n".join(lines) + "\n")
+
+
+def make_sequence(folder, n=6):
+    files = []
+    for i in range(n):
+        path = Path(folder) / f"B{i + 1:05d}.txt"
+        write_davis_txt(path, step=i + 1, seed=i)
+        files.append(str(path))
+    return files
+
+
+def test_load_piv_batch_parallel():
+    """workers=N 与逐个加载结果一致，顺序不变，X/Y 各帧共用"""
+    print("\n[测试] load_piv_batch(workers=2)")
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sequence(tmp)
+        serial = load_piv_batch(files, verbose=False)
+        parallel = load_piv_batch(files, verbose=True, workers=2)
+
+        assert len(parallel) == len(serial) == len(files)
+        for a, b in zip(serial, parallel):
+            assert a['file_name'] == b['file_name']
+            assert a['step'] == b['step']
+            np.testing.assert_array_equal(a['U'], b['U'])
+            np.testing.assert_array_equal(a['V'], b['V'])
+            np.testing.assert_array_equal(a['X'], b['X'])
+
+        assert parallel[0]['X'] is parallel[-1]['X'], "X 网格应各帧共用"
+        assert parallel[0]['U'].base is parallel[-1]['U'].base, "U 应为同一堆叠数组的视图"
+        assert parallel[0]['U'].base.shape == (len(files),) + parallel[0]['U'].shape
+        print(f"  ✓ {len(parallel)} 帧一致, 堆叠数组形状 {parallel[0]['U'].base.shape}")
+
+
+def test_load_piv_batch_parallel_skips_bad_file():
+    """损坏的文件被跳过，其余帧保持顺序"""
+    print("\n[测试] load_piv_batch 并行加载跳过损坏文件")
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sequence(tmp, n=4)
+        Path(files[2]).write_text("broken header\n")
+        frames = load_piv_batch(files, verbose=False, workers=2)
+        names = [f['file_name'] for f in frames]
+        assert names == [Path(f).name for i, f in enumerate(files) if i != 2], names
+        expected = load_piv(files[3])
+        np.testing.assert_array_equal(frames[-1]['U'], expected['U'])
+
+        # 并行写入磁盘映射：成功帧前移，结果即映射本身
+        seq = load_piv_sequence(files, verbose=False, workers=2, memmap_dir=Path(tmp) / 'mm')
+        assert isinstance(seq.U, np.memmap) and len(seq) == 3
+        np.testing.assert_array_equal(seq[2]['U'], expected['U'])
+        del seq
+
+        # 全部失败：逐个与并行加载都返回空列表
+        for f in files:
+            Path(f).write_text("broken header\n")
+        for workers in (None, 1, 2):
+            assert load_piv_batch(files, verbose=False, workers=workers) == [], workers
+        print(f"  ✓ 加载 {len(frames)} 帧: {names}")
+
+
+def test_piv_sequence():
+    """PivSequence 逐帧用法与字典一致，单点时间序列为视图，内存约为逐帧字典的一半"""
+    print("\n[测试] PivSequence")
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sequence(tmp)
+        frames = load_piv_batch(files, verbose=False)
+        seq = load_piv_sequence(files, verbose=False)
+
+        assert len(seq) == len(frames)
+        assert seq.shape == (len(frames),) + frames[0]['U'].shape
+        assert seq.U.dtype == np.float32
+        for a, b in zip(frames, seq):
+            assert b['file_name'] == a['file_name'] and b['step'] == a['step']
+            np.testing.assert_array_equal(b['U'], a['U'])
+            np.testing.assert_array_equal(b['V'], a['V'])
+            np.testing.assert_array_equal(b['X'], a['X'])
+        assert dict(seq[-1])['file_name'] == frames[-1]['file_name']
+
+        series = seq.point_series(2, 3, 'V')
+        np.testing.assert_array_equal(series, [f['V'][2, 3] for f in frames])
+        assert np.shares_memory(series, seq.V), "时间序列应为视图"
+
+        list_bytes = sum(f[k].nbytes for f in frames for k in ('X', 'Y', 'U', 'V'))
+        # 网格只存一份: (2 nt + 2) / (4 nt)，帧数多时趋于一半
+        assert seq.nbytes == (2 * len(frames) + 2) * frames[0]['U'].nbytes, seq.nbytes
+
+        seq_t = seq.transposed()
+        np.testing.assert_array_equal(seq_t[1]['U'], frames[1]['U'].T)
+        assert seq_t[1]['xnum'] == frames[1]['ynum']
+        print(f"  ✓ {len(seq)} 帧, {seq.nbytes} 字节 (逐帧字典 {list_bytes} 字节)")
+
+
+def test_piv_sequence_memmap():
+    """memmap_dir 给定时 U、V 由磁盘映射支撑，内容不变"""
+    print("\n[测试] PivSequence 内存映射")
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sequence(tmp, n=4)
+        frames = load_piv_batch(files, verbose=False)
+        seq = PivSequence.from_frames(frames, memmap_dir=Path(tmp) / 'cache')
+        assert isinstance(seq.U, np.memmap)
+        assert (Path(tmp) / 'cache' / 'U.npy').exists()
+        np.testing.assert_array_equal(seq[2]['U'], frames[2]['U'])
+        np.testing.assert_array_equal(np.load(Path(tmp) / 'cache' / 'V.npy')[3], frames[3]['V'])
+        sub = seq[1:3]
+        assert len(sub) == 2 and sub[0]['file_name'] == frames[1]['file_name']
+        del seq, sub
+        print("  ✓ 内存映射序列与逐帧加载一致")
+
+
+def test_piv_cache():
+    """二进制缓存：转换后内容一致、内存映射打开；源文件或参数变化时缓存失效"""
+    print("\n[测试] PIV 二进制缓存")
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sequence(tmp, n=7)
+        Path(files[4]).write_text("broken header\n")
+        odd = Path(tmp) / 'B99999.txt'       # 网格尺寸不同的文件只让它自己失败
+        write_davis_txt(odd, step=99, nx=10)
+        cache = Path(tmp) / 'cache'
+        expected = load_piv_batch(files, verbose=False)
+
+        seq = convert_piv_cache(files[:5] + [str(odd)] + files[5:], cache, verbose=False)
+        assert len(seq) == len(expected) == 6
+        failed = [f for f, _ in read_cache_meta(cache)['failed']]
+        assert failed == [files[4], str(odd)], failed
+        seq = convert_piv_cache(files, cache, verbose=False)
+        assert isinstance(seq.U, np.memmap)
+        assert seq.header['step'] == 1 and seq.header['line'].startswith('#DaVis')
+        for a, b in zip(expected, seq):
+            assert a['file_name'] == b['file_name'] and a['step'] == b['step']
+            np.testing.assert_array_equal(a['U'], b['U'])
+            np.testing.assert_array_equal(a['V'], b['V'])
+        np.testing.assert_array_equal(seq.X, expected[0]['X'])
+        del seq
+
+        assert is_cache_valid(cache, files)
+        assert not is_cache_valid(cache, files, size=2)
+        assert not is_cache_valid(cache, files[:-1])
+        reopened = load_piv_cached(files, cache_dir=cache, verbose=False)
+        np.testing.assert_array_equal(reopened[5]['U'], expected[5]['U'])
+        del reopened
+
+        old = open_piv_cache(cache)
+        write_davis_txt(files[0], step=1, seed=99)
+        assert not is_cache_valid(cache, files), "源文件修改后缓存应失效"
+        seq = load_piv_cached(files, cache_dir=cache, verbose=False)
+        np.testing.assert_array_equal(seq[0]['U'], load_piv(files[0])['U'])
+        # 重建写入新目录后替换，仍打开着的旧缓存内容不变
+        np.testing.assert_array_equal(old[0]['U'], expected[0]['U'])
+        del seq, old
+        assert is_cache_valid(cache, files)
+        assert sorted(p.name for p in Path(tmp).iterdir() if p.is_dir()) == ['cache']
+
+        # 默认位置按文件列表区分：子集不会覆盖整段序列的缓存
+        assert default_cache_dir(files, 1) != default_cache_dir(files[:3], 1)
+        assert default_cache_dir(files, 1) == default_cache_dir(list(reversed(files))[::-1], 1)
+        assert default_cache_dir(files, 2, root=cache).parent == cache
+        print("  ✓ 缓存转换、重新打开、失效检测正常")
+
+
+def test_load_piv_lazy():
+    """按需加载：取帧时才解析文件，结果与逐个加载一致；转置与区域时间序列与 PivSequence 一致"""
+    print("\n[测试] load_piv_lazy")
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_sequence(tmp, n=5)
+        lazy = load_piv_lazy(files)
+        seq = load_piv_sequence(files, verbose=False)
+        assert len(lazy) == len(seq) and lazy.shape == seq.shape
+
+        Path(files[3]).write_text("broken header\n")     # 构造后损坏：取该帧时才报错
+        np.testing.assert_array_equal(lazy[2]['U'], seq[2]['U'])
+        try:
+            lazy[3]
+            raise AssertionError("应在取帧时抛出异常")
+        except ValueError:
+            pass
+
+        lazy_t, seq_t = lazy.transposed(), seq.transposed()
+        np.testing.assert_array_equal(lazy_t.X, seq_t.X)
+        np.testing.assert_array_equal(lazy_t[1]['V'], seq_t[1]['V'])
+        assert lazy_t[1]['xnum'] == seq_t[1]['xnum']
+        U_l, V_l = lazy_t[:3].region_series(slice(0, 3), slice(2, 5))
+        U_s, V_s = seq_t[:3].region_series(slice(0, 3), slice(2, 5))
+        np.testing.assert_array_equal(U_l, U_s)
+        np.testing.assert_array_equal(V_l, V_s)
+        print(f"  ✓ {len(lazy)} 帧按需解析")
+
+
+if __name__ == "__main__":
+    test_load_piv_batch_parallel()
+    test_load_piv_batch_parallel_skips_bad_file()
+    test_piv_sequence()
+    test_piv_sequence_memmap()
+    test_piv_cache()
+    test_load_piv_lazy()
+    print("\n所有 PIV 加载测试完成")
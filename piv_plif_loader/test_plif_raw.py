@@ -167,6 +167,122 @@ def test_bit_shift_parameter():
     test_file.unlink(missing_ok=True)
 
 
+def write_cihx(path, width, height, bit_depth, total_frame, effective_depth=None, side='Lower'):
+    """写一个最小的 .cihx（二进制前缀 + XML）"""
+    xml = f"""<?xml version="1.0" encoding="UTF-8" ?>
+<cih>
+<fileInfo><date>2024/01/01</date><time>00:00:00</time></fileInfo>
+<recordInfo><recordRate>20000</recordRate><shutterSpeed>40000</shutterSpeed></recordInfo>
+<frameInfo><totalFrame>{total_frame}</totalFrame><recordedFrame>{total_frame}</recordedFrame></frameInfo>
+<imageDataInfo>
+<resolution><width>{width}</width><height>{height}</height></resolution>
+<colorInfo><type>Mono</type><bit>{bit_depth}</bit></colorInfo>
+<effectiveBit><depth>{effective_depth or bit_depth}</depth><side>{side}</side></effectiveBit>
+</imageDataInfo>
+<basicInfo><cameraName>FASTCAM SA-Z</cameraName></basicInfo>
+</cih>"""
+    Path(path).write_bytes(b"CIHX\x00\x01" + xml.encode('utf-8'))
+
+
+def pack12(frames):
+    """uint16 (nt, ny, nx) -> 12 bit 紧凑字节（每 2 个像素 3 字节，高位在前）"""
+    p = frames.reshape(-1, 2).astype(np.uint16)
+    out = np.empty((p.shape[0], 3), dtype=np.uint8)
+    out[:, 0] = p[:, 0] >> 4
+    out[:, 1] = ((p[:, 0] & 0x0F) << 4) | (p[:, 1] >> 8)
+    out[:, 2] = p[:, 1] & 0xFF
+    return out.tobytes()
+
+
+def test_mraw():
+    """.mraw：12 bit 解包与 16 bit 高位存储右移正确；文件夹加载优先内存映射 .mraw"""
+    import tempfile
+    from core.mraw_reader import open_mraw, MrawArray
+
+    print("\n" + "=" * 60)
+    print("[测试 6] .mraw 内存映射读取")
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 4096, (5, 6, 8), dtype=np.uint16)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder12 = Path(tmp) / "rec12"
+        folder12.mkdir()
+        write_cihx(folder12 / "rec.cihx", 8, 6, 12, 5)
+        (folder12 / "rec.mraw").write_bytes(pack12(frames))
+        raw = open_mraw(folder12 / "rec.mraw")
+        assert isinstance(raw, MrawArray) and raw.shape == frames.shape
+        np.testing.assert_array_equal(raw[2], frames[2])
+        np.testing.assert_array_equal(np.asarray(raw[1:4, ::-1]), frames[1:4, ::-1])
+        np.testing.assert_array_equal(raw[:, 2:4, 3:5], frames[:, 2:4, 3:5])
+
+        result = load_plif_raw_folder(folder12, size=2, max_frames=4, verbose=False)
+        seq = result['frames']
+        assert result['source'] == 'mraw' and len(seq) == 4
+        expected = frames[3, ::-1].reshape(3, 2, 4, 2).mean(axis=(1, 3))
+        np.testing.assert_allclose(seq[3]['scalar'], expected)
+        np.testing.assert_allclose(seq.point_series(1, 2), frames[:4, 2:4, 4:6].mean(axis=(1, 2)))
+        stats = compute_plif_statistics(seq)
+        assert len(stats['per_frame']) == 4
+
+        folder16 = Path(tmp) / "rec16"
+        folder16.mkdir()
+        write_cihx(folder16 / "rec.cihx", 8, 6, 16, 5, effective_depth=12, side='Higher')
+        (folder16 / "rec.mraw").write_bytes((frames << 4).astype('<u2').tobytes())
+        raw16 = open_mraw(folder16 / "rec.mraw")
+        np.testing.assert_array_equal(np.asarray(raw16), frames)
+        raw16_noshift = open_mraw(folder16 / "rec.mraw", bit_shift=0)
+        assert isinstance(raw16_noshift, np.memmap), "16 bit 不移位时应直接为 memmap"
+        del raw, raw16, raw16_noshift, seq, result
+    print("  ✓ 12/16 bit .mraw 读取正确，文件夹加载使用 .mraw")
+
+
+def test_streaming_statistics():
+    """单遍分块统计与 numpy 逐帧/逐像素结果一致；整数数据分位数与最近秩一致；NaN 被忽略"""
+    from core.plif_sequence import PlifSequence
+
+    print("\n" + "=" * 60)
+    print("[测试 7] 流式 PLIF 统计")
+    rng = np.random.default_rng(1)
+    raw = rng.integers(0, 4096, (23, 10, 12), dtype=np.uint16)
+    seq = PlifSequence(raw)
+    # chunk_mb 很小，强制分成多块合并
+    stats = compute_plif_statistics(seq, percentiles=(5, 50, 95), chunk_mb=0.005)
+    data = raw[:, ::-1].astype(np.float64)
+    np.testing.assert_allclose(stats['mean_image'], data.mean(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(stats['rms_image'], data.std(axis=0), rtol=1e-5)
+    np.testing.assert_array_equal(stats['max_image'], data.max(axis=0))
+    np.testing.assert_allclose(stats['frame_std'], data.std(axis=(1, 2)))
+    assert [s['min'] for s in stats['per_frame']] == list(data.min(axis=(1, 2)))
+    for q, v in stats['percentiles'].items():
+        assert v == np.percentile(data, q, method='inverted_cdf'), (q, v)
+    vmin, vmax = stats['clim']
+    assert 0 < vmin < vmax <= stats['global_max']
+
+    frames = [{'scalar': f.astype(np.float32)} for f in data]
+    frames[3]['scalar'][2, 4] = np.nan
+    data[3, 2, 4] = np.nan
+    fstats = compute_plif_statistics(frames, percentiles=(50,), chunk_mb=0.005)
+    np.testing.assert_allclose(fstats['mean_image'], np.nanmean(data, axis=0), rtol=1e-6)
+    np.testing.assert_allclose(fstats['rms_image'], np.nanstd(data, axis=0), rtol=1e-5)
+    np.testing.assert_allclose(fstats['frame_mean'], np.nanmean(data, axis=(1, 2)))
+    p50 = fstats['percentiles'][50.0]
+    assert abs(p50 - np.nanpercentile(data, 50)) < 4, p50     # 浮点直方图箱宽约 2
+    print(f"  ✓ {len(seq)} 帧, clim = ({vmin:.0f}, {vmax:.0f}), 中位数 {stats['percentiles'][50.0]:.0f}")
+
+    # 首块之后才点火：bin 后的浮点直方图区间随后续块扩展，分位数与 clim 不被截断
+    raw = rng.integers(90, 110, (200, 16, 16), dtype=np.uint16)
+    raw[100:] += 4000
+    binned = PlifSequence(raw, size=2)
+    late = compute_plif_statistics(binned, percentiles=(50, 98), chunk_mb=0.01)
+    data = binned.scalars()
+    width = late['bin_values'][1] - late['bin_values'][0]
+    for q, v in late['percentiles'].items():
+        expected = np.percentile(data, q, method='inverted_cdf')
+        assert abs(v - expected) <= width, (q, v, expected)
+    assert late['histogram'].sum() == data.size
+    assert late['clim'][1] > 4000, late['clim']
+    print(f"  ✓ 后段点火: 98% 分位数 {late['percentiles'][98.0]:.0f}, 箱宽 {width:.2f}")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("PLIF 原始 (Photron FASTCAM) 数据加载测试")
@@ -177,6 +293,8 @@ if __name__ == "__main__":
     test_load_single_tiff_raw()
     test_compute_statistics()
     test_bit_shift_parameter()
+    test_mraw()
+    test_streaming_statistics()
 
     print("\n" + "=" * 60)
     print("所有 PLIF 原始数据测试完成")
@@ -121,6 +121,36 @@ def test_align_plif_to_piv():
           f"对齐形状 {aligned.shape}")
 
 
+def test_plif_registration():
+    """规则网格配准：与 RegularGridInterpolator 一致，范围外为 NaN；整段批量与逐帧一致"""
+    from scipy.interpolate import RegularGridInterpolator
+    from core.plif_loader import align_plif_to_piv
+    from core.plif_registration import registration_map, register_sequence
+    from core.plif_sequence import PlifSequence
+
+    print("\n[测试] PLIF → PIV 规则网格配准")
+    rng = np.random.default_rng(0)
+    seq = PlifSequence(rng.integers(0, 4096, (7, 30, 40), dtype=np.uint16), dx=0.5, dy=0.25,
+                       x0=1.0, y0=2.0)
+    piv_X, piv_Y = np.meshgrid(np.linspace(0.0, 22.0, 12), np.linspace(2.5, 9.0, 9))
+    piv = {'X': piv_X.T, 'Y': piv_Y.T}          # 与 PIV 加载结果一样为转置视图
+
+    aligned = align_plif_to_piv(seq[3], piv)
+    interp = RegularGridInterpolator((seq.Y, seq.X), seq.scalar(3), bounds_error=False,
+                                     fill_value=np.nan)
+    expected = interp((piv['Y'], piv['X']))
+    assert aligned.shape == piv['X'].shape and aligned.dtype == np.float32
+    np.testing.assert_array_equal(np.isnan(aligned), np.isnan(expected))
+    np.testing.assert_allclose(aligned, expected, rtol=1e-5)
+    assert np.isnan(aligned).any() and not np.isnan(aligned).all()
+
+    reg = registration_map(seq.X, seq.Y, piv['X'], piv['Y'])
+    batch = register_sequence(reg, seq, chunk_mb=0.01)
+    assert batch.shape == (len(seq),) + piv['X'].shape
+    np.testing.assert_array_equal(batch[3], aligned)
+    print(f"  ✓ {len(seq)} 帧批量配准, 范围外 {int(np.isnan(aligned).sum())} 点为 NaN")
+
+
 def test_readme_example():
     """模拟 README 使用流程"""
     print("\n[测试] 模拟完整 PLIF 加载流程")
@@ -202,6 +232,134 @@ def test_bin_with_scaling():
     test_file.unlink(missing_ok=True)
 
 
+def write_tiff_sequence(folder, n=6, shape=(24, 32), shift=4, seed=0):
+    """写 n 张 16-bit 单通道 TIFF（有效值左移 shift 位，模拟 Photron 高位存储）"""
+    import tifffile
+    rng = np.random.default_rng(seed)
+    files, values = [], []
+    for i in range(n):
+        img = rng.integers(0, 4096, shape, dtype=np.uint16)
+        path = Path(folder) / f"C001H001S0001{i:06d}.tif"
+        tifffile.imwrite(path, img << shift)
+        files.append(path)
+        values.append(img)
+    return files, np.stack(values)
+
+
+def test_read_tiff_stack():
+    """read_tiff_stack：线程池读取到 uint16 堆叠数组，原地右移；坏帧置 0 并报告；可写入 memmap"""
+    import tempfile
+    from core.plif_reader import read_tiff_stack, iter_tiff_frames
+
+    print("\n[测试] read_tiff_stack / iter_tiff_frames")
+    with tempfile.TemporaryDirectory() as tmp:
+        files, expected = write_tiff_sequence(tmp)
+        for workers in (1, 3):
+            r = read_tiff_stack(files, bit_shift=4, workers=workers)
+            assert r['data'].dtype == np.uint16 and r['backend'] == 'tifffile'
+            np.testing.assert_array_equal(r['data'], expected)
+
+        Path(files[2]).write_bytes(b"not a tiff")
+        out = np.lib.format.open_memmap(Path(tmp) / 'plif.npy', mode='w+', dtype=np.uint16,
+                                        shape=expected.shape)
+        r = read_tiff_stack(files, bit_shift=4, workers=2, out=out)
+        assert r['data'] is out and [f[0] for f in r['failed']] == [2]
+        assert not out[2].any()
+        np.testing.assert_array_equal(out[3], expected[3])
+        del out, r
+
+        frames = list(iter_tiff_frames(files, bit_shift=4, workers=2, ahead=2))
+        assert [i for i, _ in frames] == [0, 1, 3, 4, 5]
+        np.testing.assert_array_equal(frames[-1][1], expected[5])
+        print(f"  ✓ {len(files)} 帧, 坏帧被跳过/置零")
+
+
+def test_load_plif_raw_folder_stack():
+    """load_plif_raw_folder 经 read_tiff_stack 读取，结果与逐个 load_plif 一致"""
+    import tempfile
+    from core.plif_loader import load_plif_raw_folder
+
+    print("\n[测试] load_plif_raw_folder (并行读取)")
+    with tempfile.TemporaryDirectory() as tmp:
+        files, _ = write_tiff_sequence(tmp, n=5)
+        result = load_plif_raw_folder(tmp, size=2, bit_shift=4, dx=0.1, dy=0.1,
+                                      verbose=False, workers=2)
+        serial = load_plif_batch(files, size=2, bit_shift=4, dx=0.1, dy=0.1, verbose=False)
+        assert len(result['frames']) == len(serial) == 5
+        for a, b in zip(result['frames'], serial):
+            assert a['file_name'] == b['file_name']
+            np.testing.assert_array_equal(a['scalar'], b['scalar'])
+            np.testing.assert_array_equal(a['X'], b['X'])
+        print(f"  ✓ {len(serial)} 帧与逐个加载一致")
+
+
+def test_plif_enhance():
+    """增强流水线：批量与逐帧 enhance_plif 一致；PlifEnhancer 按参数缓存"""
+    from core.plif_loader import enhance_plif
+    from core.plif_enhance import enhance_sequence, enhance_frame, PlifEnhancer
+    from core.plif_sequence import PlifSequence
+
+    print("\n[测试] PLIF 增强流水线")
+    rng = np.random.default_rng(1)
+    seq = PlifSequence(rng.integers(0, 4096, (5, 40, 48), dtype=np.uint16))
+    batch = enhance_sequence(seq, workers=2, thres_hold=40)
+    assert batch.shape == seq.shape and batch.dtype == np.float32
+    for i in range(len(seq)):
+        np.testing.assert_array_equal(batch[i], enhance_plif(seq.scalar(i), thres_hold=40))
+
+    plain = enhance_frame(seq.scalar(0), edge_preserving=False)
+    assert plain.shape == seq.shape[1:] and plain.max() <= 100
+
+    enh = PlifEnhancer(seq, workers=1, maxsize=8, thres_hold=40)
+    try:
+        np.testing.assert_array_equal(enh.get(2), batch[2])
+        enh.set_params(blur_size=5)
+        assert not enh.is_cached(2)
+        enh.get(2)
+        enh.set_params(blur_size=15)
+        assert enh.is_cached(2), "参数改回后应命中缓存"
+        enh.prefetch(range(len(seq)))
+        np.testing.assert_array_equal(enh.get(4), batch[4])
+    finally:
+        enh.close()
+    print(f"  ✓ {len(seq)} 帧批量增强与逐帧一致, 参数缓存命中")
+
+
+def test_plif_sequence():
+    """PlifSequence：uint16 堆叠、坐标共用，取帧/单点序列/整段数据与逐帧 load_plif 一致"""
+    import tempfile
+    from core.plif_loader import load_plif_sequence
+
+    print("\n[测试] PlifSequence")
+    with tempfile.TemporaryDirectory() as tmp:
+        files, _ = write_tiff_sequence(tmp, n=6, shape=(25, 32))
+        Path(files[2]).write_bytes(b"not a tiff")
+        serial = load_plif_batch(files, size=2, bit_shift=4, dx=0.1, dy=0.2, verbose=False)
+        seq = load_plif_sequence(files, size=2, bit_shift=4, dx=0.1, dy=0.2, verbose=False,
+                                 workers=2, memmap_path=Path(tmp) / 'cache' / 'raw.npy')
+        assert isinstance(seq.raw, np.memmap) and seq.raw.dtype == np.uint16
+        assert len(seq) == len(serial) == 5 and seq.shape == (5,) + serial[0]['scalar'].shape
+        for a, b in zip(serial, seq):
+            assert a['file_name'] == b['file_name']
+            assert a['x_num'] == b['x_num'] and a['y_num'] == b['y_num']
+            np.testing.assert_array_equal(a['scalar'], b['scalar'])
+            np.testing.assert_array_equal(a['Y'], b['Y'])
+        assert seq[0]['X'] is seq[-1]['X'], "坐标应各帧共用"
+
+        series = seq.point_series(3, 5)
+        np.testing.assert_allclose(series, [f['scalar'][3, 5] for f in serial], rtol=1e-6)
+        np.testing.assert_array_equal(seq.data[4], serial[4]['scalar'])
+        assert seq[1:3][0]['file_name'] == serial[1]['file_name']
+
+        float_bytes = sum(f['scalar'].nbytes + f['X'].nbytes + f['Y'].nbytes for f in serial)
+        print(f"  ✓ {len(seq)} 帧, 原始 uint16 {seq.raw.nbytes} 字节 "
+              f"(逐帧 float 字典 {float_bytes} 字节, bin=2)")
+
+        full = load_plif_sequence(files[:2], bit_shift=4, verbose=False)
+        assert np.shares_memory(full.data, full.raw), "不 bin 时整段数据应为视图"
+        del seq, full
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("PLIF TIFF 加载模块测试")
@@ -213,9 +371,14 @@ if __name__ == "__main__":
     test_bin_average()
     test_enhance_plif()
     test_align_plif_to_piv()
+    test_plif_registration()
     test_dx_dy_scaling()
     test_bin_with_scaling()
     test_readme_example()
+    test_read_tiff_stack()
+    test_load_plif_raw_folder_stack()
+    test_plif_sequence()
+    test_plif_enhance()
 
     print("\n" + "=" * 60)
     print("所有测试完成")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""POD (本征正交分解) 测试脚本"""
+
+import sys
+import tempfile
+import numpy as np
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.pod import compute_pod, reconstruct
+
+
+def make_flow(nt=240, ny=16, nx=24, noise=0.02, seed=0):
+    """平均流 + 两个已知模态 + 噪声"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(nt)
+    y, x = np.mgrid[0:ny, 0:nx]
+    m1 = np.sin(2 * np.pi * x / nx) * np.cos(np.pi * y / ny)
+    m2 = np.cos(2 * np.pi * x / nx) * np.sin(np.pi * y / ny)
+    a1 = 4.0 * np.sin(0.2 * t)[:, None, None]
+    a2 = 1.5 * np.cos(0.05 * t)[:, None, None]
+    U = 3.0 + a1 * m1 + a2 * m2 + noise * rng.normal(size=(nt, ny, nx))
+    V = 1.0 + a1 * m2 + noise * rng.normal(size=(nt, ny, nx))
+    return U.astype(np.float32), V.astype(np.float32)
+
+
+def snapshot_matrix(U, V):
+    nt = U.shape[0]
+    return np.concatenate([(U - U.mean(0)).reshape(nt, -1),
+                           (V - V.mean(0)).reshape(nt, -1)], axis=1).astype(np.float64)
+
+
+def test_snapshot_matches_svd():
+    """快照法的模态能量与完整 SVD 一致，前两个模态可重构原场"""
+    print("\n[测试] compute_pod(method='snapshot')")
+    U, V = make_flow()
+    pod = compute_pod(U, V, n_modes=6, method='snapshot', chunk_mb=0.05)
+    s = np.linalg.svd(snapshot_matrix(U, V), compute_uv=False)
+    np.testing.assert_allclose(pod['energy'], s[:6]**2 / len(U), rtol=1e-6)
+    assert pod['energy_fraction'][:2].sum() > 0.99
+    norms = np.sqrt(np.nansum(pod['modes_u']**2, axis=(1, 2)) + np.nansum(pod['modes_v']**2, axis=(1, 2)))
+    np.testing.assert_allclose(norms, 1.0, rtol=1e-5)
+
+    u, v = reconstruct(pod, 37, n_modes=2)
+    assert np.abs(u - U[37]).max() < 0.15 and np.abs(v - V[37]).max() < 0.15
+    print(f"  ✓ 能量比例 {np.round(pod['energy_fraction'][:3], 4)}")
+
+
+def test_randomized_memmap_with_mask():
+    """随机化 SVD 在内存映射的序列上按行带计算，与快照法一致；掩膜外的点不参与"""
+    print("\n[测试] compute_pod(method='randomized') 内存映射 + 掩膜")
+    U, V = make_flow(nt=180)
+    mask = np.ones(U.shape[1:], dtype=bool)
+    mask[:3, :5] = False
+    with tempfile.TemporaryDirectory() as tmp:
+        np.save(Path(tmp) / 'U.npy', U)
+        np.save(Path(tmp) / 'V.npy', V)
+        Um = np.load(Path(tmp) / 'U.npy', mmap_mode='r')
+        Vm = np.load(Path(tmp) / 'V.npy', mmap_mode='r')
+        calls = []
+        rand = compute_pod(Um, Vm, n_modes=3, method='randomized', mask=mask, chunk_mb=0.05,
+                           progress=lambda done, total: calls.append((done, total)))
+        exact = compute_pod(Um, Vm, n_modes=3, method='snapshot', mask=mask, chunk_mb=0.05)
+        del Um, Vm
+    assert calls[-1][0] == calls[-1][1]
+    np.testing.assert_allclose(rand['energy'][:2], exact['energy'][:2], rtol=1e-6)
+    np.testing.assert_allclose(rand['modes_u'][:2], exact['modes_u'][:2], atol=1e-5)
+    np.testing.assert_allclose(rand['coeffs'][:, :2], exact['coeffs'][:, :2], atol=1e-4)
+    assert np.isnan(rand['modes_u'][:, :3, :5]).all() and not np.isnan(rand['modes_u'][:, 3:]).any()
+    print(f"  ✓ 随机化 SVD 能量 {np.round(rand['energy'][:2], 4)}")
+
+
+if __name__ == "__main__":
+    test_snapshot_matches_svd()
+    test_randomized_memmap_with_mask()
+    print("\n所有 POD 测试完成")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""速度梯度张量涡判据测试脚本"""
+
+import sys
+import numpy as np
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.field_calculations import compute_gradients, derived_fields, compute_fields_stack
+from core.field_registry import default_registry
+from core.velocity_gradient import (CRITERIA, CRITERION_FUNCS, lambda2, swirling_strength,
+                                    strain_rate)
+
+
+def test_analytic_flows():
+    """刚体旋转与纯剪切的解析值"""
+    print("\n[测试] 刚体旋转 / 纯剪切")
+    y, x = np.mgrid[0:12, 0:16] * 0.5
+    w, g = 3.0, 2.0
+    quantities = CRITERIA + ('Liutex', 'Liutex S')
+    rot = derived_fields(-w * y, w * x, 0.5, 0.5, quantities)
+    expected = {'Q-criterion': w**2, 'lambda2': -w**2, 'Delta-criterion': w**2,
+                'Swirling strength': w, 'Strain rate': 0.0, 'Liutex': 2 * w, 'Liutex S': 0.0}
+    for q, value in expected.items():
+        np.testing.assert_allclose(rot[q], value, atol=1e-5, err_msg=q)
+    shear = derived_fields(g * y, np.zeros_like(x), 0.5, 0.5, quantities)
+    for q in ('Q-criterion', 'lambda2', 'Delta-criterion', 'Swirling strength', 'Liutex'):
+        np.testing.assert_allclose(shear[q], 0.0, atol=1e-5, err_msg=q)
+    np.testing.assert_allclose(shear['Strain rate'], g, rtol=1e-6)
+    print(f"  ✓ {len(expected)} 个判据")
+
+
+def test_eigenvalues_and_batches():
+    """λ2 与 λ_ci 与特征值直接计算一致；整段分块、逐帧与注册表共用同一组判据函数"""
+    print("\n[测试] 特征值与分块计算")
+    rng = np.random.default_rng(0)
+    U = rng.normal(size=(5, 9, 11)).astype(np.float32)
+    V = rng.normal(size=(5, 9, 11)).astype(np.float32)
+    ux, uy, vx, vy = compute_gradients(U[0].astype(np.float64), V[0].astype(np.float64), 0.4, 0.3)
+    A = np.stack([np.stack([ux, uy], axis=-1), np.stack([vx, vy], axis=-1)], axis=-2)
+
+    S = 0.5 * (A + np.swapaxes(A, -1, -2))
+    W = 0.5 * (A - np.swapaxes(A, -1, -2))
+    M = np.zeros(A.shape[:-2] + (3, 3))
+    M[..., :2, :2] = S @ S + W @ W
+    np.testing.assert_allclose(lambda2(ux, uy, vx, vy), np.linalg.eigvalsh(M)[..., 1],
+                               atol=1e-10)
+    np.testing.assert_allclose(swirling_strength(ux, uy, vx, vy),
+                               np.abs(np.linalg.eigvals(A).imag).max(axis=-1), atol=1e-7)
+    np.testing.assert_allclose(strain_rate(ux, uy, vx, vy),
+                               np.sqrt(2 * np.sum(S * S, axis=(-2, -1))), rtol=1e-12)
+
+    batch = compute_fields_stack(U, V, 0.4, 0.3, CRITERIA, chunk_size=2)
+    reg = default_registry(lambda i: {'U': U[i], 'V': V[i]}, 0.4, 0.3)
+    for t in range(len(U)):
+        single = derived_fields(U[t], V[t], 0.4, 0.3, CRITERIA)
+        grads = compute_gradients(U[t], V[t], 0.4, 0.3)
+        for q in CRITERIA:
+            np.testing.assert_array_equal(batch[q][t], single[q], err_msg=q)
+            np.testing.assert_array_equal(reg.get(t, q), single[q], err_msg=q)
+            np.testing.assert_array_equal(CRITERION_FUNCS[q](*grads), single[q], err_msg=q)
+    # 所有判据共用一次梯度：注册表中只缓存一组梯度分量
+    grads = compute_gradients(U[0], V[0], 0.4, 0.3)
+    np.testing.assert_array_equal(reg.get(0, 'ux'), grads[0])
+    print(f"  ✓ {len(U)} 帧分块结果与逐帧、注册表一致")
+
+
+if __name__ == "__main__":
+    test_analytic_flows()
+    test_eigenvalues_and_batches()
+    print("\n所有速度梯度判据测试完成")
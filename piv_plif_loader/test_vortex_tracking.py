@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Liutex 涡识别与跟踪测试脚本"""
+
+import sys
+import numpy as np
+from pathlib import Path
+
+# 添加项目根目录到搜索路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.liutex import liutex_2d
+from core.vortex_tracking import frame_vortices, detect_vortices, track_vortices, track_table
+
+
+def lamb_oseen(X, Y, xc, yc, gamma, rc):
+    """Lamb-Oseen 涡的速度场（环量 gamma，核半径 rc）"""
+    dx, dy = X - xc, Y - yc
+    r2 = dx**2 + dy**2 + 1e-12
+    ut = gamma / (2 * np.pi * r2) * (1 - np.exp(-r2 / rc**2))
+    return -ut * dy, ut * dx
+
+
+def moving_pair(nt=12, ny=48, nx=96, h=0.5, speed=1.0):
+    """正负两个涡随均匀来流向 +x 平移，每帧移动 speed（单位长度）"""
+    y, x = np.mgrid[0:ny, 0:nx] * h
+    U = np.empty((nt, ny, nx), dtype=np.float32)
+    V = np.empty_like(U)
+    for t in range(nt):
+        u1, v1 = lamb_oseen(x, y, 8 + speed * t, 7, 20.0, 2.0)
+        u2, v2 = lamb_oseen(x, y, 10 + speed * t, 17, -15.0, 2.0)
+        U[t] = 0.5 + u1 + u2
+        V[t] = v1 + v2
+    return x, y, U, V, h
+
+
+def test_frame_vortices():
+    """单帧：正负两个涡各自成区，形心、符号与环量正确"""
+    print("\n[测试] 单帧涡识别")
+    X, Y, U, V, h = moving_pair(nt=1)
+    R, _, _, omega = liutex_2d(U[0], V[0], h, h)
+    v = frame_vortices(R, omega, X, Y, threshold=0.5, cell_area=h * h)
+    assert len(v['sign']) == 2, v['sign']
+    order = np.argsort(-v['sign'])
+    np.testing.assert_allclose(v['x'][order], [8, 10], atol=0.3)
+    np.testing.assert_allclose(v['y'][order], [7, 17], atol=0.3)
+    assert v['circulation'][order[0]] > 0 > v['circulation'][order[1]]
+    assert np.all(np.sign(v['peak_R']) == v['sign'])
+    assert set(np.unique(v['labels'])) == {0, 1, 2}
+    print(f"  ✓ 环量 {np.round(v['circulation'][order], 2)}, 面积 {np.round(v['area'][order], 2)}")
+
+
+def test_detect_and_track():
+    """整段序列：进程池与单进程结果一致；两条轨迹贯穿全程，迁移速度正确"""
+    print("\n[测试] 涡识别与跟踪")
+    X, Y, U, V, h = moving_pair()
+    serial = detect_vortices(U, V, X, Y, h, h, threshold=0.5, chunk_size=5, workers=1)
+    pooled = detect_vortices(U, V, X, Y, h, h, threshold=0.5, chunk_size=5, workers=2)
+    assert serial.equals(pooled)
+    assert len(serial) == 2 * U.shape[0]
+
+    # 删除正涡的第 4 帧，max_gap=1 时轨迹仍连续
+    gap = serial.drop(serial.index[(serial['frame'] == 4) & (serial['sign'] > 0)])
+    assert track_vortices(gap, max_distance=1.5)['track'].nunique() == 3
+    tracked = track_vortices(gap, max_distance=2.5, max_gap=1)
+    table = track_table(tracked, dt=0.1)
+    assert len(table) == 2
+    assert list(table['lifetime'].round(6)) == [1.2, 1.2]
+    np.testing.assert_allclose(table['convection_speed'], 10.0, rtol=0.05)
+    assert set(table['sign']) == {1, -1}
+    print(f"  ✓ {len(serial)} 个涡, {len(table)} 条轨迹, 寿命 {list(table['lifetime'])}")
+
+
+if __name__ == "__main__":
+    test_frame_vortices()
+    test_detect_and_track()
+    print("\n所有涡跟踪测试完成")